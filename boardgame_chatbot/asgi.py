@@ -13,4 +13,21 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'boardgame_chatbot.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Django 설정이 끝난 뒤 import (앱 모듈이 모델/설정을 사용)
+from django.conf import settings  # noqa: E402
+from chatbot.websocket import ChatSocketApp  # noqa: E402
+
+chat_socket = ChatSocketApp()
+
+
+async def application(scope, receive, send):
+    """HTTP는 Django, CHAT_SOCKET_PATH의 websocket은 룰 설명 채팅 소켓으로"""
+    if scope['type'] == 'websocket':
+        if scope['path'] == getattr(settings, 'CHAT_SOCKET_PATH', '/ws/chat/'):
+            await chat_socket(scope, receive, send)
+        else:
+            await send({'type': 'websocket.close', 'code': 4404})
+        return
+    await django_application(scope, receive, send)
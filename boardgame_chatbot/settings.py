@@ -13,20 +13,51 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 import os
 import socket
+import tempfile
+import time
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # 환경 감지 (로컬 vs EC2)
+# DJANGO_ENV 환경변수(ec2 / local)로 결정하고, 메타데이터 서비스 프로브는
+# EC2_METADATA_PROBE=1 일 때만 사용 (결과는 임시 파일에 캐싱)
+EC2_ENV_NAMES = ('ec2', 'prod', 'production')
+LOCAL_ENV_NAMES = ('local', 'dev', 'development')
+EC2_PROBE_CACHE_PATH = Path(tempfile.gettempdir()) / 'boardgame_chatbot_ec2_probe'
+EC2_PROBE_CACHE_TTL = 86400  # 프로브 결과 재사용 시간(초)
+
 def is_ec2_environment():
     """EC2 환경인지 감지"""
-    try:
-        # EC2 메타데이터 서비스 확인
-        socket.create_connection(('169.254.169.254', 80), timeout=1)
+    django_env = os.getenv('DJANGO_ENV', '').strip().lower()
+    if django_env in EC2_ENV_NAMES:
         return True
-    except:
+    if django_env in LOCAL_ENV_NAMES:
+        return False
+
+    if os.getenv('EC2_METADATA_PROBE', '').strip().lower() not in ('1', 'true', 'yes'):
         return False
 
+    # 캐시된 프로브 결과가 있으면 재사용 (워커/관리 명령마다 1초씩 기다리지 않도록)
+    try:
+        if time.time() - EC2_PROBE_CACHE_PATH.stat().st_mtime < EC2_PROBE_CACHE_TTL:
+            return EC2_PROBE_CACHE_PATH.read_text().strip() == '1'
+    except OSError:
+        pass
+
+    try:
+        # EC2 메타데이터 서비스 확인
+        socket.create_connection(('169.254.169.254', 80), timeout=1).close()
+        detected = True
+    except OSError:
+        detected = False
+
+    try:
+        EC2_PROBE_CACHE_PATH.write_text('1' if detected else '0')
+    except OSError:
+        pass
+    return detected
+
 IS_EC2 = is_ec2_environment()
 
 # Quick-start development settings - unsuitable for production
@@ -64,11 +95,15 @@ if IS_EC2:
     MIDDLEWARE.append('whitenoise.middleware.WhiteNoiseMiddleware')
 
 MIDDLEWARE.extend([
+    # 응답 압축(br/gzip) 후 ConditionalGet이 계산한 ETag를 약한 ETag로 바꾸므로 이 순서 유지
+    'chatbot.middleware.CompressionMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'chatbot.middleware.RateLimitMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ])
 
@@ -105,8 +140,11 @@ if IS_EC2:
             'PASSWORD': 'hwang0719',
             'HOST': 'localhost',
             'PORT': '5432',
+            # 요청마다 새로 연결하지 않고 워커별 연결을 재사용 (끊긴 연결은 요청 시작 시 확인 후 교체)
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '600')),
+            'CONN_HEALTH_CHECKS': True,
             'OPTIONS': {
-                'connect_timeout': 20,
+                'connect_timeout': 5,
             }
         }
     }
@@ -116,9 +154,20 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                'timeout': 20,  # 잠금 대기 시간(초) - SQLITE_PRAGMAS의 busy_timeout과 같은 값이어야 함
+            }
         }
     }
 
+# SQLite 연결마다 적용할 PRAGMA (chatbot.signals) - WAL은 읽기와 쓰기가 서로 막지 않아
+# 동시에 QA를 저장해도 "database is locked"가 거의 나지 않음
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': 20000,  # ms - 연결 시 실행되어 OPTIONS['timeout']을 덮어쓰므로 같은 20초로
+    'synchronous': 'NORMAL',  # WAL에서는 NORMAL로도 커밋 손실 없음 (전원 장애 시 마지막 트랜잭션만)
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -161,8 +210,8 @@ if IS_EC2:
         import whitenoise
         STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
     except ImportError:
-        # WhiteNoise가 없으면 기본 설정 사용
-        STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        # WhiteNoise가 없으면 해시 파일명 + gzip/brotli 사전 압축 (nginx gzip_static용)
+        STATICFILES_STORAGE = 'chatbot.storage.CompressedManifestStaticFilesStorage'
 else:
     # 로컬 개발 환경
     STATICFILES_DIRS = [
@@ -180,6 +229,21 @@ STATICFILES_FINDERS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# QR 코드 설정 (QR_BASE_URL 환경변수가 없을 때만 퍼블릭 IP 감지)
+QR_BASE_URL_TTL = 3600  # 감지한 퍼블릭 IP 재사용 시간(초)
+QR_BASE_URL_FAILURE_TTL = 300  # 감지 실패 시 재시도까지 대기 시간(초)
+QR_IP_LOOKUP_TIMEOUT = 3  # 외부 IP 서비스별 타임아웃(초)
+QR_CACHE_DIR = MEDIA_ROOT / 'qr'  # 생성된 QR PNG 디스크 캐시 (워커 간 공유)
+QR_DISK_CACHE_MAX_FILES = 1000  # 디스크 캐시 파일 수 상한 (넘으면 오래된 것부터 삭제)
+QR_MEMORY_CACHE_SIZE = 128  # 워커별 메모리 캐시 이미지 수 (LRU)
+QR_CACHE_MAX_AGE = 86400  # 브라우저/nginx 캐시 시간(초)
+QR_ASSET_DIR = BASE_DIR / 'static' / 'chatbot' / 'qr'  # render_qr_assets 명령 출력 위치
+QR_ASSET_VARIANTS = {  # 사전 렌더링할 포맷/크기/오류 정정 레벨 조합
+    'formats': ['svg', 'png'],
+    'sizes': [4, 10],
+    'error_corrections': ['L', 'M'],
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -193,10 +257,69 @@ AI_DATA_PATH = 'ai_data'
 
 # Runpod 백엔드 설정
 RUNPOD_API_URL = 'https://r8asrxwuomha7r-8000.proxy.runpod.net'
+# 여러 파드로 늘릴 때: RUNPOD_API_URLS="https://pod1...,https://pod2..." (없으면 RUNPOD_API_URL 하나)
+RUNPOD_API_URLS = [url.strip() for url in os.getenv('RUNPOD_API_URLS', '').split(',') if url.strip()] or [RUNPOD_API_URL]
+RUNPOD_HEALTH_CHECK_INTERVAL = 10.0  # 파드 상태 확인 주기(초) - 파드가 둘 이상일 때만
+RUNPOD_HEALTH_CHECK_TIMEOUT = 3.0
+RUNPOD_UNHEALTHY_THRESHOLD = 2  # 연속 실패 시 상태 확인으로 복구될 때까지 제외
+RUNPOD_SESSION_AFFINITY_TTL = 86400  # 세션 -> 파드 기록 유지 시간(초)
+# 헤지 요청 (게임 목록 등 멱등 GET, 파드가 둘 이상일 때만): 최근 응답 시간 백분위를 넘기면 다른 파드로 한 번 더 보내 먼저 온 응답 사용
+RUNPOD_HEDGE_ENABLED = os.getenv('RUNPOD_HEDGE', '1') == '1'
+RUNPOD_HEDGE_PERCENTILE = 95  # 이 백분위 시간까지 응답이 없으면 헤지
+RUNPOD_HEDGE_MIN_SAMPLES = 20  # 응답 시간 표본이 이만큼 쌓이기 전에는 헤지 안 함
+RUNPOD_HEDGE_MIN_DELAY = 0.05  # 헤지 전 최소 대기(초)
+RUNPOD_HEDGE_WINDOW = 200  # 응답 시간/헤지 비율을 계산할 최근 요청 수
+RUNPOD_HEDGE_MAX_RATE = 0.1  # 최근 요청 중 헤지 비율 상한 - 장애 시 부하가 두 배가 되지 않도록
+# 재시도 정책 - 'default' 위에 엔드포인트별 값을 덮어씀 (max_attempts는 첫 시도 포함)
+# 세션 대화 기록이 남는 POST는 요청이 처리되지 않은 게 확실한 503/연결 실패만, 세션이 있는 같은 파드로 재시도
+# (502/504는 프록시 뒤에서 이미 처리됐을 수 있고, 다른 파드에는 세션이 없음)
+RUNPOD_SESSION_RETRY_POLICY = {'retry_statuses': [503], 'retry_connect_errors': True, 'retry_timeouts': False,
+                               'same_backend': True}
+RUNPOD_RETRY_POLICY = {
+    'default': {'max_attempts': 2, 'retry_statuses': [502, 503, 504], 'retry_connect_errors': True,
+                'retry_timeouts': False, 'backoff_base': 0.2, 'backoff_max': 2.0},
+    '/explain-rules': RUNPOD_SESSION_RETRY_POLICY,
+    '/recommend': RUNPOD_SESSION_RETRY_POLICY,
+    '/rule-summary': RUNPOD_SESSION_RETRY_POLICY,
+    '/games': {'max_attempts': 3, 'retry_timeouts': True},
+    '/health': {'max_attempts': 1},
+    '/session/close': {'max_attempts': 3},
+}
+# 뷰별 전체 처리 시간 예산(초) - 재시도/백오프 포함 Runpod 호출이 이 안에 끝나야 함 (gunicorn timeout 120초보다 짧게)
+RUNPOD_REQUEST_DEADLINES = {
+    'chat': 60,
+    'rule_summary': 45,
+    'close_session': 10,
+    'batch_chat': 90,  # 스트리밍이므로 nginx proxy_read_timeout(줄 사이 간격)과는 별개
+    'prefetch': 60,  # 백그라운드 미리 받기 (요청 응답과 무관)
+}
 RUNPOD_API_KEY = None  # 필요시 설정
 RUNPOD_TIMEOUT = 30.0
 RUNPOD_USE_FALLBACK = True
 
+# 요청 제한 설정 (토큰 버킷: rate=초당 보충 토큰 수, burst=순간 최대 요청 수)
+RATE_LIMIT_ENABLED = True
+# 'local': 워커별 메모리 버킷, 'cache': CACHES 'default'를 공유하는 버킷 (멀티 워커용)
+RATE_LIMIT_BACKEND = 'cache' if IS_EC2 else 'local'
+# 'ip': 클라이언트 IP 기준, 'session': 서버에 있는 세션이면 세션 기준 (같은 매장 Wi-Fi 공유 시)
+RATE_LIMIT_KEY = 'ip'
+# 세션 모드에서 같은 IP의 모든 세션이 함께 쓰는 버킷 크기 (규칙의 몇 배) - 쿠키를 바꿔 가며 한도를 피하지 못하게
+RATE_LIMIT_SESSION_IP_FACTOR = 5
+# nginx가 넘겨주는 X-Real-IP / X-Forwarded-For 헤더 신뢰 여부
+RATE_LIMIT_TRUST_PROXY_HEADERS = IS_EC2
+RATE_LIMIT_RULES = {
+    'chat_api': {'rate': 1.0, 'burst': 10},
+    'rule_summary_api': {'rate': 0.5, 'burst': 5},
+    'batch_chat_api': {'rate': 0.1, 'burst': 3},  # 요청 하나가 최대 BATCH_CHAT_MAX_ITEMS개 호출
+    'prefetch_api': {'rate': 1.0, 'burst': 10},  # 검색 결과 hover마다 호출될 수 있음
+    'faq_api': {'rate': 2.0, 'burst': 20},
+    'conversation_api': {'rate': 1.0, 'burst': 10},
+    'generate_qr': {'rate': 2.0, 'burst': 20},
+    'game_search_api': {'rate': 5.0, 'burst': 30},  # 타이핑마다 호출되므로 넉넉하게
+    'trending_games_api': {'rate': 2.0, 'burst': 20},
+    'qa_analytics_api': {'rate': 1.0, 'burst': 10},
+}
+
 # 보안 설정 (EC2 배포용)
 if IS_EC2:
     SECURE_BROWSER_XSS_FILTER = True
@@ -255,17 +378,168 @@ LOGGING = {
     },
 }
 
-# 캐시 설정
-if IS_EC2:
-    CACHES = {
-        'default': {
-            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-            'LOCATION': 'boardgame-cache',
-        }
+# 캐시 설정 - CACHE_PROFILE 환경변수로 선택
+#   locmem: 워커별 메모리 (로컬 기본값)
+#   file:   파일 캐시, 같은 서버의 워커끼리 공유 - set()마다 폴더 전체를 나열하므로(항목 수에 비례)
+#           요청마다 쓰는 레이트 리밋/파드 고정 기록이 있는 운영 서버에는 맞지 않음
+#   sqlite: 별도 SQLite 파일의 DB 캐시 (EC2 기본값, python manage.py createcachetable --database cache)
+#   redis:  REDIS_URL의 Redis (redis 패키지가 없으면 sqlite로 대체)
+CACHE_PROFILE = os.getenv('CACHE_PROFILE', 'sqlite' if IS_EC2 else 'locmem').strip().lower()
+# 프로젝트 폴더 아래에 둠 - systemd 유닛은 PrivateTmp=true라 /tmp가 서비스마다 달라서 gunicorn/uvicorn/SSH 셸이 공유하지 못함
+CACHE_DIR = Path(os.getenv('CACHE_DIR', BASE_DIR / 'cache'))
+REDIS_URL = os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/1')
+
+if CACHE_PROFILE == 'redis':
+    import importlib.util
+    if importlib.util.find_spec('redis') is None:
+        CACHE_PROFILE = 'sqlite'
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'boardgame-cache',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(CACHE_DIR),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'sqlite': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    },
+}
+if CACHE_PROFILE not in CACHE_BACKENDS:
+    CACHE_PROFILE = 'locmem'
+
+CACHES = {
+    'default': {
+        **CACHE_BACKENDS[CACHE_PROFILE],
+        'KEY_PREFIX': 'bovi',
+        'TIMEOUT': 300,
     }
+}
+
+if CACHE_PROFILE == 'sqlite':
+    # 캐시 테이블만 담는 SQLite 파일 (PostgreSQL 연결을 캐시 조회에 쓰지 않도록 분리)
+    DATABASES['cache'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': CACHE_DIR / 'cache.sqlite3',
+        'OPTIONS': {'timeout': 20},
+    }
+    DATABASE_ROUTERS = ['chatbot.db_router.CacheRouter']
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+# 캐시 키 버전 - 값을 올려 배포하면 해당 네임스페이스의 기존 캐시를 모든 워커에서 한 번에 무시
+# (실행 중에는 python manage.py bump_cache_version <네임스페이스>)
+CACHE_KEY_VERSIONS = {
+    'games': 1,  # Runpod 게임 목록
+    'rule_summary': 1,  # 게임별 룰 요약
+    'health': 1,  # Runpod 헬스체크 결과
+    'session_backend': 1,  # 세션 -> Runpod 파드 고정 기록
+    'faq_answer': 1,  # 자주 묻는 질문 답변 (미리 받기)
+    'faq_questions': 1,  # 게임별 자주 묻는 질문 목록
+    'faq': 1,  # build_faqs가 만든 게임별 추천 질문과 답변
+}
+GAME_LIST_CACHE_TIMEOUT = 3600  # 게임 목록 공유 캐시 시간(초)
+GAME_LIST_FAILURE_CACHE_TIMEOUT = 60  # Runpod 연결 실패로 기본 목록을 쓴 경우 재시도까지(초)
+GAME_LIST_LOCAL_TTL = 30  # 워커 메모리에 들고 있다가 공유 캐시를 다시 확인하는 주기(초)
+RULE_SUMMARY_CACHE_TIMEOUT = 86400  # 룰 요약 캐시 시간(초)
+HEALTH_STATUS_CACHE_TIMEOUT = 30  # 헬스체크 결과 캐시 시간(초) - 홈 화면마다 Runpod 호출 방지
+
+# 템플릿 캐시 설정
+STATIC_PAGE_CACHE_TIMEOUT = 3600  # 요청별 데이터가 없는 페이지(게임 추천) 전체 캐시 시간(초)
+
+# 응답 압축 (CompressionMiddleware) - Brotli 패키지가 있으면 br 우선
+COMPRESSION_MIN_SIZE = 512  # 이보다 작은 응답은 압축 이득이 헤더 비용보다 작음
+COMPRESSION_CONTENT_TYPES = ['text/html', 'application/json', 'text/plain']
+COMPRESSION_BROTLI_QUALITY = 5  # 요청마다 압축하므로 속도 우선 (사전 압축 정적 파일은 최고 품질)
+
+# 일괄 채팅 API (/api/chat/batch/)
+BATCH_CHAT_MAX_ITEMS = 10
+BATCH_CHAT_MAX_CONCURRENCY = 4  # 요청 하나가 Runpod에 동시에 보내는 최대 호출 수
+
+# 룰 요약/자주 묻는 질문 미리 받기 (/api/games/prefetch/)
+PREFETCH_TOP_QUESTIONS = 3  # 게임별로 미리 답변을 받아 둘 질문 수
+PREFETCH_LOOKBACK_DAYS = 30  # 자주 묻는 질문을 셀 기간
+PREFETCH_MIN_QUESTION_COUNT = 2  # 이보다 적게 나온 질문은 미리 받지 않음
+PREFETCH_MAX_WORKERS = 2  # 워커당 백그라운드 스레드 수
+PREFETCH_LOCK_TIMEOUT = 120  # 같은 게임 중복 실행 방지 잠금(초)
+PREFETCH_QUESTIONS_CACHE_TIMEOUT = 3600  # 게임별 자주 묻는 질문 목록 캐시(초)
+FAQ_ANSWER_CACHE_TIMEOUT = 86400  # 미리 받은 답변 캐시(초)
+
+# 추천 질문 칩 (build_faqs 명령을 매일 실행해 RuleFAQ 테이블 갱신)
+FAQ_TOP_QUESTIONS = 5  # 게임별 추천 질문 수
+FAQ_LOOKBACK_DAYS = 90  # 자주 묻는 질문을 셀 기간
+FAQ_MIN_QUESTION_COUNT = 3  # 이보다 적게 나온 질문은 추천하지 않음
+FAQ_BUILD_CONCURRENCY = 4  # 답변을 다시 만들 때 Runpod 동시 요청 수
+FAQ_CACHE_TIMEOUT = 86400  # 게임별 추천 질문 공유 캐시(초) - build_faqs 실행 시 바로 무효화
+FAQ_CACHE_MAX_AGE = 600  # 추천 질문 API 브라우저 캐시(초)
+
+# 대화 기록 (새로고침 복원, 다른 파드로 세션 옮기기) - 만료된 대화는 prune_conversations 명령으로 삭제
+CONVERSATION_TTL = 86400  # 마지막 턴 이후 보관 시간(초)
+CONVERSATION_MAX_TURNS = 200  # 대화 하나에 저장하는 최대 턴 수
+CONVERSATION_RESTORE_TURNS = 50  # 복원 API가 돌려주는 최근 턴 수
+CONVERSATION_REHYDRATE_TURNS = 10  # 세션을 다시 만들 때 Runpod에 보내는 최근 질문/답변 수
+CONVERSATION_COMPRESS_MIN_BYTES = 256  # 이보다 짧은 턴은 압축하지 않음
+
+# 룰 설명 채팅 웹소켓 (ASGI 서버 필요 - EC2는 boardgame_chatbot_ws 서비스의 uvicorn이 /ws/ 처리)
+# 꺼져 있거나 연결이 안 되면 페이지는 기존 /api/chat/ fetch로 보냄
+CHAT_SOCKET_ENABLED = os.getenv('CHAT_SOCKET', '1' if IS_EC2 else '0').strip().lower() in ('1', 'true', 'yes')
+CHAT_SOCKET_PATH = '/ws/chat/'
+CHAT_SOCKET_HEARTBEAT_INTERVAL = 20  # 서버 ping 간격(초)
+CHAT_SOCKET_IDLE_TIMEOUT = 60  # 이 시간 동안 클라이언트 프레임이 없으면 연결 종료
+CHAT_SOCKET_SEND_TIMEOUT = 10  # 클라이언트가 이 시간 안에 프레임을 받지 않으면 느린 연결로 보고 종료
+CHAT_SOCKET_MAX_PENDING = 3  # 연결당 처리 대기 질문 수 (넘으면 busy 오류)
+CHAT_SOCKET_MAX_CONCURRENT_TURNS = 8  # 워커당 동시에 Runpod 답변을 기다리는 질문 수
+CHAT_SOCKET_MAX_MESSAGE_BYTES = 8192  # 클라이언트 프레임 최대 크기
+CHAT_SOCKET_CHUNK_CHARS = 1024  # 답변 청크 최대 글자 수
+
+# 모바일 PWA (서비스 워커는 HTTPS 또는 localhost에서만 등록됨)
+PWA_CACHE_VERSION = '1'  # 올리면 정적 파일이 그대로여도 셸 캐시를 새로 받음
+PWA_THEME_COLOR = '#5096ff'
+PWA_MANIFEST_MAX_AGE = 86400  # 매니페스트 브라우저 캐시(초)
+PWA_SUMMARY_CACHE_LIMIT = 30  # 오프라인용으로 보관하는 룰 요약 수
+PWA_SUMMARY_NETWORK_TIMEOUT_MS = 3000  # 보관한 요약이 있으면 이 시간까지만 네트워크를 기다림
+
+# 게임 검색 API 설정
+GAME_SEARCH_DEFAULT_LIMIT = 10  # 기본 결과 수
+GAME_SEARCH_MAX_LIMIT = 50  # limit 파라미터 상한
+GAME_SEARCH_MAX_QUERY_LENGTH = 50  # 검색어 최대 길이 (초과분은 잘라냄)
+GAME_SEARCH_FUZZY_CUTOFF = 0.6  # 오타 허용 검색 유사도 하한 (0~1)
+GAME_SEARCH_CACHE_MAX_AGE = 300  # 검색 결과 브라우저 캐시 시간(초)
+
+# 기간별 인기 게임 (시간별 집계 GameQAHourly) 설정
+TRENDING_DEFAULT_LIMIT = 5  # 기본 순위 개수
+TRENDING_MAX_LIMIT = 20  # limit 파라미터 상한
+TRENDING_CACHE_TIMEOUT = 60  # 순위 계산 결과 캐시 시간(초)
+TRENDING_RETENTION_HOURS = 24 * 14  # rebuild_trending --prune 시 남길 시간 버킷 (1주 + 비교용 직전 1주)
+
+# QA 분석 API (aggregate_qa_stats 요약 테이블) 설정
+QA_ANALYTICS_DEFAULT_DAYS = 30  # 기본 조회 기간(일)
+QA_ANALYTICS_MAX_DAYS = 180  # days 파라미터 상한
+QA_ANALYTICS_CACHE_TIMEOUT = 300  # 분석 결과 캐시 시간(초) - 새 집계가 끝나면 즉시 갱신
+QA_ANALYTICS_AGGREGATE_DAYS = 2  # 주기 집계 시 다시 계산할 최근 일수 (오늘 + 어제)
+QA_ANALYTICS_TOP_QUESTIONS = 20  # 반복 질문 상위 개수
+QA_ANALYTICS_LENGTH_BUCKETS = [0, 100, 200, 500, 1000, 2000]  # 답변 길이 분포 구간 하한(글자)
+
+# QA 답변 저장 설정
+ANSWER_BLOB_MIN_LENGTH = 200  # 이 길이(글자) 이상 답변은 AnswerBlob에 압축·중복 제거 저장
+ANSWER_BLOB_CODEC = 'auto'  # auto(zstandard 설치 시 zstd, 아니면 zlib) / zstd / zlib
+
+# QA 보존/보관 설정 (archive_qa 명령)
+QA_RETENTION_DAYS = 180  # 이보다 오래된 QA는 보관 대상
+QA_ARCHIVE_MODE = 'table'  # table: 월별 보관 테이블(PostgreSQL은 파티션) / file: 월별 .jsonl.gz
+QA_ARCHIVE_DIR = BASE_DIR / 'archive' / 'qa'  # file 모드 출력 위치
 
 # 세션 설정
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# 세션은 캐시에서 먼저 읽고 DB에도 저장 (요청마다 세션 조회 쿼리 없음, 캐시가 비워져도 유지)
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
 SESSION_COOKIE_AGE = 86400  # 24시간
 SESSION_COOKIE_SECURE = not DEBUG
 SESSION_COOKIE_HTTPONLY = True
@@ -1,25 +1,167 @@
+from django import forms
 from django.contrib import admin
-from .models import GPTRuleQA, FinetuningRuleQA
+from .models import (
+    GPTRuleQA, FinetuningRuleQA, AnswerBlob, ArchivedQACount, GameQAHourly,
+    QADailyStat, QAAnswerLengthStat, QAQuestionDailyStat, QAAggregation, QATopQuestion, RuleFAQ,
+    Conversation, ConversationTurn,
+)
+from .cache_keys import invalidate
+from .qa_analytics import normalize_question
+
+
+class RuleQAAdminForm(forms.ModelForm):
+    """답변은 AnswerBlob에 압축 저장될 수 있으므로 answer 속성으로 읽고 쓰는 폼"""
+    answer = forms.CharField(label='답변 내용', widget=forms.Textarea, required=False)
+
+    class Meta:
+        fields = ['game_name', 'question']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['answer'].initial = self.instance.answer
+
+    def save(self, commit=True):
+        self.instance.answer = self.cleaned_data['answer']
+        return super().save(commit)
 
 # Register your models here.
 @admin.register(GPTRuleQA)
 class GPTRuleQAAdmin(admin.ModelAdmin):
-    list_display = ['id', 'game_name', 'question_preview', 'created_at']
-    list_filter = ['game_name', 'created_at']
-    search_fields = ['game_name', 'question', 'answer']
+    form = RuleQAAdminForm
+    list_display = ['id', 'game_name', 'question_preview', 'answer_source', 'latency_ms', 'created_at']
+    list_filter = ['game_name', 'answer_source', 'created_at']
+    # 긴 답변은 압축 저장되므로 답변 검색은 짧은(인라인) 답변에만 적용됨
+    search_fields = ['game_name', 'question', 'answer_inline']
+    readonly_fields = ['answer_source', 'latency_ms', 'session_id', 'response_size', 'prompt_tokens', 'completion_tokens']
     ordering = ['-created_at']
-    
+
     def question_preview(self, obj):
         return obj.question[:50] + '...' if len(obj.question) > 50 else obj.question
     question_preview.short_description = '질문'
 
 @admin.register(FinetuningRuleQA)
 class FinetuningRuleQAAdmin(admin.ModelAdmin):
-    list_display = ['id', 'game_name', 'question_preview', 'created_at']
-    list_filter = ['game_name', 'created_at']
-    search_fields = ['game_name', 'question', 'answer']
+    form = RuleQAAdminForm
+    list_display = ['id', 'game_name', 'question_preview', 'answer_source', 'latency_ms', 'created_at']
+    list_filter = ['game_name', 'answer_source', 'created_at']
+    # 긴 답변은 압축 저장되므로 답변 검색은 짧은(인라인) 답변에만 적용됨
+    search_fields = ['game_name', 'question', 'answer_inline']
+    readonly_fields = ['answer_source', 'latency_ms', 'session_id', 'response_size', 'prompt_tokens', 'completion_tokens']
     ordering = ['-created_at']
-    
+
     def question_preview(self, obj):
         return obj.question[:50] + '...' if len(obj.question) > 50 else obj.question
     question_preview.short_description = '질문'
+
+@admin.register(AnswerBlob)
+class AnswerBlobAdmin(admin.ModelAdmin):
+    list_display = ['hash', 'codec', 'size', 'compressed_size', 'created_at']
+    list_filter = ['codec']
+    readonly_fields = ['hash', 'codec', 'size', 'compressed_size', 'text_preview', 'created_at']
+    exclude = ['data']
+    ordering = ['-created_at']
+
+    def compressed_size(self, obj):
+        return len(obj.data)
+    compressed_size.short_description = '압축 크기(바이트)'
+
+    def text_preview(self, obj):
+        return obj.text
+    text_preview.short_description = '답변 원문'
+
+    def has_add_permission(self, request):
+        return False  # 내용 주소 방식이라 QA 저장 시에만 생성
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(ArchivedQACount)
+class ArchivedQACountAdmin(admin.ModelAdmin):
+    list_display = ['month', 'source', 'game_name', 'count']
+    list_filter = ['source', 'month']
+    search_fields = ['game_name']
+    ordering = ['-month', 'source', 'game_name']
+
+@admin.register(GameQAHourly)
+class GameQAHourlyAdmin(admin.ModelAdmin):
+    list_display = ['hour', 'source', 'game_name', 'count']
+    list_filter = ['source']
+    search_fields = ['game_name']
+    ordering = ['-hour', 'source', 'game_name']
+
+@admin.register(QADailyStat)
+class QADailyStatAdmin(admin.ModelAdmin):
+    list_display = ['day', 'source', 'game_name', 'question_count', 'fallback_count', 'answer_chars']
+    list_filter = ['source', 'day']
+    search_fields = ['game_name']
+    ordering = ['-day', 'source', 'game_name']
+
+@admin.register(QAAnswerLengthStat)
+class QAAnswerLengthStatAdmin(admin.ModelAdmin):
+    list_display = ['day', 'source', 'bucket', 'count']
+    list_filter = ['source', 'day']
+    ordering = ['-day', 'source', 'bucket']
+
+@admin.register(QAQuestionDailyStat)
+class QAQuestionDailyStatAdmin(admin.ModelAdmin):
+    list_display = ['day', 'source', 'game_name', 'question', 'count']
+    list_filter = ['source', 'day']
+    search_fields = ['game_name', 'question']
+    ordering = ['-day', 'source', 'game_name']
+
+@admin.register(QAAggregation)
+class QAAggregationAdmin(admin.ModelAdmin):
+    list_display = ['source', 'aggregated_through', 'aggregated_at']
+
+@admin.register(QATopQuestion)
+class QATopQuestionAdmin(admin.ModelAdmin):
+    list_display = ['source', 'game_name', 'question', 'count']
+    list_filter = ['source']
+    search_fields = ['game_name', 'question']
+    ordering = ['-count']
+
+
+@admin.register(RuleFAQ)
+class RuleFAQAdmin(admin.ModelAdmin):
+    """답변을 고치면 추천 질문 캐시('faq')를 무효화해서 바로 반영"""
+    list_display = ['source', 'game_name', 'rank', 'question', 'ask_count', 'updated_at']
+    list_filter = ['source', 'game_name']
+    search_fields = ['game_name', 'question', 'answer']
+    ordering = ['source', 'game_name', 'rank']
+    readonly_fields = ['normalized_question', 'ask_count', 'updated_at']
+
+    def save_model(self, request, obj, form, change):
+        obj.normalized_question = normalize_question(obj.question)[:255]
+        super().save_model(request, obj, form, change)
+        invalidate('faq')
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate('faq')
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        invalidate('faq')
+
+
+class ConversationTurnInline(admin.TabularInline):
+    """턴 내용은 압축돼 있으므로 text 속성으로 표시 (추가 전용이라 수정 불가)"""
+    model = ConversationTurn
+    fields = ['role', 'game_name', 'text', 'created_at']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Conversation)
+class ConversationAdmin(admin.ModelAdmin):
+    list_display = ['session_id', 'chat_type', 'game_name', 'turn_count', 'updated_at', 'expires_at']
+    list_filter = ['chat_type']
+    search_fields = ['session_id', 'game_name']
+    ordering = ['-updated_at']
+    readonly_fields = ['session_id', 'chat_type', 'game_name', 'turn_count', 'created_at', 'updated_at']
+    inlines = [ConversationTurnInline]
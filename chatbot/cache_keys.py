@@ -0,0 +1,39 @@
+"""버전이 붙은 캐시 키 (게임 목록, 룰 요약, 헬스체크 공용)
+
+키 = 네임스페이스 + 설정 버전(CACHE_KEY_VERSIONS) + 세대 번호. 세대 번호는 공유 캐시에
+들어 있어서 bump_cache_version 명령(invalidate)으로 올리면 모든 워커가 바로 새 키를 쓴다.
+키 본문은 해시로 바꿔서 게임 이름의 공백/한글이 memcached·파일 캐시 키 제약에 걸리지 않게 한다.
+"""
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _generation_key(namespace):
+    return f"cache_generation:{namespace}"
+
+
+def get_version(namespace):
+    """네임스페이스 현재 버전 문자열 ('설정 버전.세대')"""
+    base = getattr(settings, 'CACHE_KEY_VERSIONS', {}).get(namespace, 1)
+    generation = cache.get(_generation_key(namespace))
+    if generation is None:
+        cache.add(_generation_key(namespace), 1, None)
+        generation = cache.get(_generation_key(namespace)) or 1
+    return f"{base}.{generation}"
+
+
+def make_key(namespace, *parts):
+    """네임스페이스 버전이 들어간 캐시 키"""
+    digest = hashlib.sha1('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:20]
+    return f"{namespace}:v{get_version(namespace)}:{digest}"
+
+
+def invalidate(namespace):
+    """네임스페이스 세대 번호를 올려 기존 키를 모두 무효화 - 새 버전 반환"""
+    try:
+        cache.incr(_generation_key(namespace))
+    except ValueError:
+        # 세대 번호가 아직 없거나 만료된 경우 (1은 기존 키와 겹칠 수 있으므로 2부터)
+        cache.set(_generation_key(namespace), 2, None)
+    return get_version(namespace)
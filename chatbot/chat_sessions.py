@@ -0,0 +1,39 @@
+"""백엔드(Runpod) 세션 소유 기록 - 사용자의 Django 세션에 그 사용자가 받은 백엔드 세션 ID를 남긴다
+
+chat_api/rule_summary_api와 채팅 웹소켓이 기록하고, 웹소켓은 여기 있는(또는 자기가 만든) 세션만
+이어 쓰고 연결이 끊길 때 닫는다 - 남이 보낸 세션 ID로 다른 사용자의 세션을 닫지 못하게.
+"""
+from importlib import import_module
+from django.conf import settings
+
+OWNED_SESSIONS_KEY = 'runpod_sessions'
+MAX_OWNED_SESSIONS = 20  # 오래된 것부터 버림 (탭/게임마다 세션이 바뀜)
+
+
+def ensure_session(request):
+    """채팅 페이지에서 Django 세션을 미리 만듦 - 웹소켓 핸드셰이크에 세션 쿠키가 실리도록"""
+    if not request.session.session_key:
+        request.session.save()
+
+
+def load_session(session_key):
+    """세션 키 -> SessionStore (키가 없으면 None, 값은 처음 접근할 때 읽음)"""
+    if not session_key:
+        return None
+    return import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+
+
+def remember_session(session, session_id):
+    """백엔드 세션 ID를 이 사용자 소유로 기록 (저장은 호출한 쪽 - 뷰는 SessionMiddleware가 함)"""
+    if session is None or not session_id:
+        return
+    owned = [sid for sid in session.get(OWNED_SESSIONS_KEY, []) if sid != session_id]
+    owned.append(session_id)
+    session[OWNED_SESSIONS_KEY] = owned[-MAX_OWNED_SESSIONS:]
+
+
+def owns_session(session, session_id):
+    """이 사용자가 받은 백엔드 세션인지"""
+    if session is None or not session_id:
+        return False
+    return session_id in session.get(OWNED_SESSIONS_KEY, [])
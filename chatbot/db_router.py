@@ -0,0 +1,21 @@
+class CacheRouter:
+    """CACHE_PROFILE='sqlite'일 때 DB 캐시 테이블을 'cache' DB(별도 SQLite 파일)로 보냄"""
+    app_label = 'django_cache'  # DatabaseCache가 쓰는 내부 모델의 app_label
+    database = 'cache'
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == self.app_label:
+            return self.database
+        return None
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label == self.app_label:
+            return self.database
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == self.app_label:
+            return db == self.database
+        if db == self.database:
+            return False
+        return None
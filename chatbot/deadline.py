@@ -0,0 +1,43 @@
+"""요청 마감 시간 - 뷰에서 정한 전체 처리 시간 예산을 Runpod 호출까지 전달
+
+contextvars로 전달하므로 서비스/클라이언트 메서드 시그니처를 바꾸지 않아도 되고,
+sync_* 메서드가 만드는 이벤트 루프의 태스크에도 그대로 복사된다.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from django.conf import settings
+
+_deadline = ContextVar('runpod_deadline', default=None)
+
+
+@contextmanager
+def deadline_scope(seconds):
+    """이 블록 안의 Runpod 호출은 seconds 안에 끝나야 함 (바깥 마감이 더 이르면 그쪽 유지)"""
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline():
+    """현재 마감 시각 (time.monotonic 기준, 없으면 None)"""
+    return _deadline.get()
+
+
+def with_deadline(name):
+    """뷰 데코레이터 - RUNPOD_REQUEST_DEADLINES[name]초를 이 요청의 Runpod 호출 마감으로"""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            seconds = getattr(settings, 'RUNPOD_REQUEST_DEADLINES', {}).get(name, 60)
+            with deadline_scope(seconds):
+                return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
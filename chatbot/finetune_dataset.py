@@ -0,0 +1,239 @@
+"""파인튜닝 데이터셋 빌더 구성 요소 (build_finetune_dataset 명령 공용)
+
+행 전처리(정규화, 길이 필터, MinHash)는 프로세스 풀에서 돌기 때문에 Django 모델에
+의존하지 않는 순수 함수로 둔다. 중복 판정 키와 진행 상태는 출력 폴더의 SQLite
+파일 하나에 함께 커밋해서, 중단 후 다시 실행해도 같은 지점부터 이어서 만든다.
+"""
+import os
+import json
+import sqlite3
+import hashlib
+import unicodedata
+
+# 모듈러 해시 순열용 메르센 소수 (2^61 - 1)
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Runpod 서버가 내려갔을 때 저장된 폴백/오류 답변 - 학습 데이터에서 제외
+# (출처가 기록되지 않았거나 오류 문구가 'backend' 출처로 저장된 예전 행은 문구로 판단)
+FALLBACK_MARKERS = (
+    '🤖 기본 설명', '⚙️ 기본 설명', '🤖 기본 답변', '⚙️ 기본 답변',
+    '일시적인 문제가 발생했습니다', '게임은 현재 지원하지 않습니다',
+    '룰 설명 서비스에 연결할 수 없습니다', '룰 요약 서비스에 연결할 수 없습니다',
+    '답변을 가져올 수 없습니다', '요약을 가져올 수 없습니다',
+    '룰 설명 요청이 실패했습니다', '룰 요약 요청이 실패했습니다',
+    '룰 질문 답변 중 오류가 발생했습니다',
+    'AI 서버에 연결할 수 없습니다', '답변이 늦어지고 있습니다',
+)
+# 폴백/오류 답변의 answer_source 값
+FALLBACK_SOURCES = ('fallback', 'error')
+
+
+def is_fallback_answer(answer, answer_source=''):
+    """Runpod 서버 장애 시 저장된 폴백/오류 답변인지 (출처 또는 문구)"""
+    return answer_source in FALLBACK_SOURCES or any(marker in (answer or '') for marker in FALLBACK_MARKERS)
+
+
+def normalize_text(text):
+    """NFKC 정규화 + 소문자 + 공백 정리 (중복 판정용)"""
+    return ' '.join(unicodedata.normalize('NFKC', text or '').lower().split())
+
+
+def make_permutations(num_perm, seed=1):
+    """MinHash 순열 계수 (a, b) 목록 - 같은 seed면 항상 같은 값"""
+    permutations = []
+    for i in range(num_perm):
+        digest = hashlib.blake2b(f"{seed}:{i}".encode('utf-8'), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], 'big') % MERSENNE_PRIME or 1
+        b = int.from_bytes(digest[8:], 'big') % MERSENNE_PRIME
+        permutations.append((a, b))
+    return permutations
+
+
+def shingles(text, size):
+    """문자 n-gram 집합 (짧은 텍스트는 전체를 하나로)"""
+    text = text.replace(' ', '')
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def minhash_signature(text, permutations, shingle_size):
+    """텍스트의 MinHash 서명 (순열 수만큼의 최솟값)"""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'big')
+        for s in shingles(text, shingle_size)
+    ]
+    return [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in permutations]
+
+
+def lsh_band_keys(signature, bands):
+    """서명을 bands개 구간으로 나눈 LSH 키 - 하나라도 같으면 유사 중복 후보"""
+    rows = len(signature) // bands
+    keys = []
+    for band in range(bands):
+        chunk = signature[band * rows:(band + 1) * rows]
+        digest = hashlib.blake2b(repr(chunk).encode('ascii'), digest_size=12).hexdigest()
+        keys.append(f"{band}:{digest}")
+    return keys
+
+
+def prepare_batch(rows, config):
+    """프로세스 풀 작업 단위 - (source, pk, game, question, answer, answer_source) 행들을 전처리
+
+    길이/폴백 필터를 통과한 행만 정확 중복 키, LSH 키, 샘플링 값과 함께 반환하고,
+    제외된 행은 사유별 개수로 센다.
+    """
+    permutations = make_permutations(config['num_perm'], config['seed'])
+    prepared = []
+    skipped = {'length': 0, 'fallback': 0}
+
+    for source, pk, game_name, question, answer, answer_source in rows:
+        question = (question or '').strip()
+        answer = (answer or '').strip()
+        if not (config['min_question'] <= len(question) <= config['max_question']
+                and config['min_answer'] <= len(answer) <= config['max_answer']):
+            skipped['length'] += 1
+            continue
+        if is_fallback_answer(answer, answer_source):
+            skipped['fallback'] += 1
+            continue
+
+        normalized = normalize_text(f"{question}\n{answer}")
+        exact_key = hashlib.sha256(f"{normalize_text(game_name)}\x1f{normalized}".encode('utf-8')).hexdigest()
+        signature = minhash_signature(normalized, permutations, config['shingle_size'])
+        # 해시 기반 샘플링 값 (0~1) - 재실행해도 같은 행이 뽑힘
+        sample_value = int(exact_key[:8], 16) / 0xFFFFFFFF
+
+        prepared.append({
+            'source': source,
+            'pk': pk,
+            'game_name': game_name,
+            'question': question,
+            'answer': answer,
+            'exact_key': exact_key,
+            'band_keys': lsh_band_keys(signature, config['bands']),
+            'sample_value': sample_value,
+        })
+    return prepared, skipped
+
+
+class DedupStore:
+    """디스크 기반 중복 키 + 진행 상태 저장소 (수천만 행이어도 메모리 일정)"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS exact_keys (key TEXT PRIMARY KEY) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS band_keys (key TEXT PRIMARY KEY) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS game_counts (game TEXT PRIMARY KEY, count INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS candidates (game TEXT NOT NULL, sample_value REAL NOT NULL, record TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS candidates_game_sample ON candidates (game, sample_value);
+        """)
+
+    def load_state(self):
+        row = self.conn.execute("SELECT value FROM state WHERE key = 'checkpoint'").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_state(self, state):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO state (key, value) VALUES ('checkpoint', ?)",
+            (json.dumps(state, ensure_ascii=False),)
+        )
+
+    def is_exact_duplicate(self, key):
+        """처음 보는 키면 등록하고 False"""
+        cursor = self.conn.execute("INSERT OR IGNORE INTO exact_keys (key) VALUES (?)", (key,))
+        return cursor.rowcount == 0
+
+    def is_near_duplicate(self, band_keys):
+        """LSH 구간 중 하나라도 이미 있으면 True, 아니면 모든 구간 등록"""
+        placeholders = ','.join('?' * len(band_keys))
+        found = self.conn.execute(
+            f"SELECT 1 FROM band_keys WHERE key IN ({placeholders}) LIMIT 1", band_keys
+        ).fetchone()
+        if found:
+            return True
+        self.conn.executemany("INSERT OR IGNORE INTO band_keys (key) VALUES (?)", [(k,) for k in band_keys])
+        return False
+
+    def clear_game_counts(self):
+        self.conn.execute("DELETE FROM game_counts")
+
+    def increment_game(self, game):
+        self.conn.execute(
+            "INSERT INTO game_counts (game, count) VALUES (?, 1) "
+            "ON CONFLICT(game) DO UPDATE SET count = count + 1",
+            (game,)
+        )
+
+    def game_counts(self):
+        return dict(self.conn.execute("SELECT game, count FROM game_counts ORDER BY count DESC"))
+
+    def add_candidate(self, game, sample_value, record):
+        """게임당 상한이 있을 때 - 중복 제거를 통과한 행을 모아 두었다가 게임별로 뽑음"""
+        self.conn.execute(
+            "INSERT INTO candidates (game, sample_value, record) VALUES (?, ?, ?)",
+            (game, sample_value, json.dumps(record, ensure_ascii=False))
+        )
+
+    def candidate_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def iter_game_samples(self, max_per_game):
+        """게임마다 sample_value가 작은 순으로 max_per_game개 (해시 순서라 게임 안에서 고르게 뽑힘)"""
+        games = [row[0] for row in self.conn.execute("SELECT DISTINCT game FROM candidates ORDER BY game")]
+        for game in games:
+            rows = self.conn.execute(
+                "SELECT record FROM candidates WHERE game = ? ORDER BY sample_value, rowid LIMIT ?",
+                (game, max_per_game)
+            ).fetchall()
+            for (record,) in rows:
+                yield game, json.loads(record)
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class ShardWriter:
+    """chat 포맷 JSONL 샤드 쓰기 - 재개 시 체크포인트 위치 이후 내용은 잘라냄"""
+
+    def __init__(self, output_dir, shard_size, shard_index=0, shard_rows=0, shard_bytes=0):
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        self.shard_index = shard_index
+        self.shard_rows = shard_rows
+        self._file = None
+        self._open(truncate_to=shard_bytes)
+
+    def _path(self, index):
+        return os.path.join(self.output_dir, f"shard-{index:05d}.jsonl")
+
+    def _open(self, truncate_to=0):
+        self._file = open(self._path(self.shard_index), 'a+b')
+        # 마지막 체크포인트 이후에 쓰였던(커밋되지 않은) 행 제거
+        self._file.truncate(truncate_to)
+        self._file.seek(truncate_to)
+
+    def write(self, record):
+        if self.shard_rows >= self.shard_size:
+            self._file.close()
+            self.shard_index += 1
+            self.shard_rows = 0
+            self._open()
+        self._file.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+        self.shard_rows += 1
+
+    def sync(self):
+        """체크포인트 저장 전 디스크에 반영"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return {'shard_index': self.shard_index, 'shard_rows': self.shard_rows, 'shard_bytes': self._file.tell()}
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,61 @@
+import time
+from datetime import timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+from chatbot.qa_analytics import aggregate_daily, aggregate_top_questions, mark_aggregated, next_aggregation_day
+from chatbot.qa_io import QA_MODELS
+
+
+class Command(BaseCommand):
+    help = 'QA 분석 요약 테이블(일별 통계, 답변 길이 분포, 반복 질문)을 마지막 집계 기준일부터 갱신합니다 (cron 주기 실행용)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'QA_ANALYTICS_AGGREGATE_DAYS', 2),
+            help='마지막 집계 기준일과 별개로 최근 며칠은 항상 다시 계산 (기본값: QA_ANALYTICS_AGGREGATE_DAYS)'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='가장 오래된 QA부터 전체 다시 계산 (보관된 QA의 과거 통계는 사라짐)'
+        )
+        parser.add_argument(
+            '--type',
+            choices=['all'] + list(QA_MODELS),
+            default='all',
+            help='집계할 QA 종류 (기본값: all)'
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days는 1 이상이어야 합니다.')
+
+        qa_types = list(QA_MODELS) if options['type'] == 'all' else [options['type']]
+        today = timezone.now().astimezone(dt_timezone.utc).date()
+        top_limit = getattr(settings, 'QA_ANALYTICS_TOP_QUESTIONS', 20)
+        started = time.perf_counter()
+
+        for qa_type in qa_types:
+            window_start = today - timedelta(days=options['days'] - 1)
+            since_day = None if options['full'] else next_aggregation_day(qa_type, window_start)
+            if since_day is None:
+                # --full 또는 처음 집계 - 가장 오래된 QA부터
+                since_day = window_start
+                oldest = QA_MODELS[qa_type].objects.aggregate(oldest=Min('created_at'))['oldest']
+                if oldest is not None:
+                    since_day = min(since_day, oldest.astimezone(dt_timezone.utc).date())
+
+            daily_rows, length_rows, question_rows = aggregate_daily(qa_type, since_day)
+            top_rows = aggregate_top_questions(qa_type, top_limit)
+            version = mark_aggregated(qa_type, today)
+            self.stdout.write(
+                f"📊 {qa_type}: {since_day} 이후 일별 {daily_rows:,}행, 길이 분포 {length_rows:,}행, "
+                f"질문 {question_rows:,}행, 반복 질문 {top_rows:,}개"
+            )
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"✅ QA 분석 집계 완료 ({elapsed:,.1f}초, 버전 {version})"))
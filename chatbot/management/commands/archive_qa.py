@@ -0,0 +1,229 @@
+import os
+import gzip
+import json
+from collections import Counter, defaultdict
+from datetime import timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from chatbot.models import ArchivedQACount
+from chatbot.qa_io import QA_MODELS, serialize_row
+
+# 직접 작성하는 SQL의 IN (...) 파라미터 수 (SQLite 변수 개수 제한 고려)
+IN_CHUNK = 500
+
+
+def month_of(created_at):
+    """생성 시각이 속한 달의 1일 (UTC 기준)"""
+    return created_at.astimezone(dt_timezone.utc).date().replace(day=1)
+
+
+def next_month(month):
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class TableArchiver:
+    """월별 보관 테이블로 이동
+
+    PostgreSQL: <테이블>_archive를 created_at 기준 RANGE 파티션 테이블로 만들고 월별 파티션을 붙임
+    (오래된 달은 DETACH/DROP PARTITION으로 즉시 정리 가능). 그 외 DB: 월별 테이블 <테이블>_archive_YYYYMM.
+    """
+
+    def __init__(self):
+        self.quote = connection.ops.quote_name
+        self.partitioned = connection.vendor == 'postgresql'
+        self._ready = set()
+
+    def describe(self, model, month):
+        return f"{self._table_name(model, month)} 테이블"
+
+    def _table_name(self, model, month):
+        return f"{model._meta.db_table}_archive_{month:%Y%m}"
+
+    def _ensure_table(self, model, month):
+        """보관 테이블(파티션) 생성 후 이름 반환"""
+        table = self._table_name(model, month)
+        if table in self._ready:
+            return table
+
+        hot = model._meta.db_table
+        with connection.cursor() as cursor:
+            if self.partitioned:
+                parent = f"{hot}_archive"
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {self.quote(parent)} "
+                    f"(LIKE {self.quote(hot)} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)"
+                )
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {self.quote(table)} PARTITION OF {self.quote(parent)} "
+                    f"FOR VALUES FROM (%s) TO (%s)",
+                    [f"{month:%Y-%m-%d} 00:00:00+00", f"{next_month(month):%Y-%m-%d} 00:00:00+00"]
+                )
+            else:
+                cursor.execute(f"CREATE TABLE IF NOT EXISTS {self.quote(table)} AS SELECT * FROM {self.quote(hot)} WHERE 1 = 0")
+        self._ready.add(table)
+        return table
+
+    def archive(self, model, qa_type, month, pks):
+        table = self._ensure_table(model, month)
+        hot = model._meta.db_table
+        with connection.cursor() as cursor:
+            # 나중에 원본 테이블에 컬럼이 추가돼도 깨지지 않도록 공통 컬럼만 복사
+            archive_columns = {c.name for c in connection.introspection.get_table_description(cursor, table)}
+            hot_columns = [c.name for c in connection.introspection.get_table_description(cursor, hot)]
+            columns = ', '.join(self.quote(c) for c in hot_columns if c in archive_columns)
+            for chunk in chunked(pks, IN_CHUNK):
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(
+                    f"INSERT INTO {self.quote(table)} ({columns}) "
+                    f"SELECT {columns} FROM {self.quote(hot)} WHERE id IN ({placeholders})",
+                    chunk
+                )
+
+
+class FileArchiver:
+    """월별 gzip JSONL 파일로 내보내기 (qa_import로 다시 가져올 수 있는 형식)
+
+    파일은 DB 삭제 커밋 전에 쓰므로, 도중에 실패하면 같은 행이 파일에 두 번 들어갈 수 있다.
+    content_hash가 같아 qa_import 시 자동으로 한 번만 저장된다.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+
+    def describe(self, model, month):
+        return f"{self.output_dir}/<종류>/{month:%Y-%m}.jsonl.gz"
+
+    def archive(self, model, qa_type, month, pks):
+        directory = os.path.join(self.output_dir, qa_type)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{month:%Y-%m}.jsonl.gz")
+
+        rows = model.objects.filter(pk__in=pks).order_by('pk').values_list(
+            'game_name', 'question', 'answer_inline', 'answer_blob_id', 'created_at', 'content_hash'
+        )
+        # 'at' 모드는 gzip 멤버를 이어 붙이므로 기존 파일과 합쳐서 그대로 읽힘
+        with gzip.open(path, 'at', encoding='utf-8') as f:
+            for game_name, question, answer_inline, answer_blob_id, created_at, content_hash in rows:
+                answer = model.resolve_answer(answer_inline, answer_blob_id)
+                if not content_hash:
+                    content_hash = model.compute_content_hash(game_name, question, answer, created_at)
+                row = serialize_row(qa_type, game_name, question, answer, created_at, content_hash)
+                f.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+class Command(BaseCommand):
+    help = '보존 기간이 지난 QA를 월별 보관 테이블(또는 압축 JSONL 파일)로 옮기고 순위용 월별 집계를 남깁니다'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'QA_RETENTION_DAYS', 180),
+            help='이 일수보다 오래된 QA를 보관 (기본값: QA_RETENTION_DAYS)'
+        )
+        parser.add_argument(
+            '--mode',
+            choices=['table', 'file'],
+            default=getattr(settings, 'QA_ARCHIVE_MODE', 'table'),
+            help='table: 월별 보관 테이블(PostgreSQL은 파티션), file: 월별 .jsonl.gz 파일'
+        )
+        parser.add_argument(
+            '--output-dir',
+            default=str(getattr(settings, 'QA_ARCHIVE_DIR', 'archive/qa')),
+            help='file 모드 출력 폴더 (기본값: QA_ARCHIVE_DIR)'
+        )
+        parser.add_argument(
+            '--type',
+            choices=['all'] + list(QA_MODELS),
+            default='all',
+            help='보관할 QA 종류 (기본값: all)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='트랜잭션 하나에서 옮길 행 수 (기본값: 2000)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='옮기지 않고 월별 대상 행 수만 출력'
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days는 1 이상이어야 합니다.')
+
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        qa_types = list(QA_MODELS) if options['type'] == 'all' else [options['type']]
+        archiver = TableArchiver() if options['mode'] == 'table' else FileArchiver(options['output_dir'])
+        batch_size = max(1, options['batch_size'])
+
+        self.stdout.write(f"🗄️  QA 보관 시작: {cutoff:%Y-%m-%d %H:%M} 이전 ({options['days']}일 초과), 모드: {options['mode']}")
+
+        for qa_type in qa_types:
+            model = QA_MODELS[qa_type]
+            queryset = model.objects.filter(created_at__lt=cutoff)
+
+            if options['dry_run']:
+                self._print_plan(qa_type, queryset, archiver, model)
+                continue
+
+            moved = 0
+            months = Counter()
+            while True:
+                batch = list(queryset.order_by('pk').values_list('pk', 'game_name', 'created_at')[:batch_size])
+                if not batch:
+                    break
+
+                by_month = defaultdict(list)
+                for pk, game_name, created_at in batch:
+                    by_month[month_of(created_at)].append((pk, game_name))
+
+                # 보관 테이블 INSERT + 집계 갱신 + 원본 DELETE를 한 트랜잭션으로
+                with transaction.atomic():
+                    for month, rows in by_month.items():
+                        pks = [pk for pk, _ in rows]
+                        archiver.archive(model, qa_type, month, pks)
+                        self._add_rollup(qa_type, month, Counter(game for _, game in rows))
+                        for chunk in chunked(pks, IN_CHUNK):
+                            model.objects.filter(pk__in=chunk).delete()
+                        months[month] += len(rows)
+
+                moved += len(batch)
+                self.stdout.write(f"⏳ {qa_type}: {moved:,}행 이동")
+
+            if moved:
+                detail = ', '.join(f"{month:%Y-%m} {count:,}" for month, count in sorted(months.items()))
+                self.stdout.write(self.style.SUCCESS(f"✅ {qa_type}: {moved:,}행 보관 ({detail})"))
+            else:
+                self.stdout.write(f"📭 {qa_type}: 보관할 QA가 없습니다.")
+
+    def _add_rollup(self, qa_type, month, game_counts):
+        """게임별·월별 보관 개수 누적 (순위/통계에서 합산)"""
+        for game_name, count in game_counts.items():
+            updated = ArchivedQACount.objects.filter(
+                source=qa_type, game_name=game_name, month=month
+            ).update(count=F('count') + count)
+            if not updated:
+                ArchivedQACount.objects.create(source=qa_type, game_name=game_name, month=month, count=count)
+
+    def _print_plan(self, qa_type, queryset, archiver, model):
+        plan = queryset.annotate(
+            month=TruncMonth('created_at', tzinfo=dt_timezone.utc)
+        ).values('month').annotate(rows=Count('id')).order_by('month')
+        total = 0
+        for item in plan:
+            month = item['month'].date() if hasattr(item['month'], 'date') else item['month']
+            total += item['rows']
+            self.stdout.write(f"  {qa_type} {month:%Y-%m}: {item['rows']:,}행 -> {archiver.describe(model, month)}")
+        self.stdout.write(f"📋 {qa_type}: 총 {total:,}행 보관 예정 (--dry-run)")
@@ -0,0 +1,116 @@
+import gzip
+import json
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.template.loader import render_to_string
+from django.test import Client
+from chatbot.middleware import brotli, compress_body
+from chatbot.qa_io import QA_MODELS
+from chatbot.services.runpod_client import RunpodClient
+
+# QA 데이터가 없을 때 쓰는 대표 답변 (실제 룰 설명과 비슷한 길이/구성)
+SAMPLE_ANSWER = (
+    "카탄에서는 자기 차례에 주사위 두 개를 굴려 나온 숫자의 타일에 인접한 정착지와 도시가 자원을 받습니다. "
+    "정착지는 자원 1장, 도시는 2장을 받으며 7이 나오면 도둑을 옮기고 카드가 8장 이상인 플레이어는 절반을 버립니다. "
+    "건설 비용은 도로(나무+벽돌), 정착지(나무+벽돌+양+밀), 도시(밀 2+광석 3), 발전 카드(양+밀+광석)입니다.\n\n"
+) * 6
+
+
+class Command(BaseCommand):
+    help = '대표 응답(채팅 답변, 룰 요약, 룰 설명 페이지)의 압축 전후 전송 바이트 비교 (미들웨어와 같은 조건)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--samples',
+            type=int,
+            default=20,
+            help='QA 테이블에서 가져올 최근 답변 수 (기본값: 20, 없으면 대표 답변 사용)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='압축 시간 측정 반복 횟수 (기본값: 20)'
+        )
+
+    def handle(self, *args, **options):
+        if options['samples'] < 1 or options['repeat'] < 1:
+            raise CommandError('--samples와 --repeat는 1 이상이어야 합니다.')
+
+        encodings = ['gzip'] + (['br'] if brotli is not None else [])
+        if brotli is None:
+            self.stdout.write(self.style.WARNING('⚠️ brotli 패키지가 없어 gzip만 측정합니다 (pip install Brotli)'))
+
+        # 미들웨어와 같이 COMPRESSION_MIN_SIZE 미만이거나 압축 결과가 더 크면 원본 그대로 전송
+        min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 512)
+        header = f"{'응답':<28} {'원본':>9}" + ''.join(f" {name:>16}" for name in encodings)
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        totals = {'raw': 0, **{name: 0 for name in encodings}}
+        for label, body in self._samples(options['samples']):
+            row = f"{label:<28} {len(body):>9,}"
+            totals['raw'] += len(body)
+            for name in encodings:
+                if len(body) < min_size:
+                    wire, elapsed = len(body), 0.0
+                else:
+                    compressed, elapsed = self._compress(body, name, options['repeat'])
+                    wire = min(len(compressed), len(body))
+                totals[name] += wire
+                row += f" {wire:>7,} {wire / len(body):>4.0%} {elapsed:>3.1f}ms"
+            self.stdout.write(row)
+
+        self.stdout.write('-' * len(header))
+        summary = ', '.join(
+            f"{name} {totals[name]:,}B ({1 - totals[name] / totals['raw']:.0%} 절감)" for name in encodings
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ 합계 원본 {totals['raw']:,}B -> {summary}"))
+        self._check_pipeline()
+
+    def _samples(self, limit):
+        """(이름, 응답 바이트) - 실제 API/페이지와 같은 형태로 직렬화"""
+        answers = []
+        for qa_type, model in QA_MODELS.items():
+            for qa in model.objects.order_by('-created_at')[:limit]:
+                answers.append((qa_type, qa.game_name, qa.answer))
+        if not answers:
+            answers = [('gpt', '카탄', SAMPLE_ANSWER)]
+
+        for qa_type, game_name, answer in answers[:limit]:
+            body = json.dumps({'response': answer, 'session_id': 'a' * 36, 'status': 'success'},
+                              cls=DjangoJSONEncoder).encode('utf-8')
+            yield f"채팅 답변 ({qa_type}) {game_name[:8]}", body
+
+        summary = json.dumps({'summary': SAMPLE_ANSWER, 'game_name': '카탄', 'session_id': 'a' * 36,
+                              'status': 'success'}).encode('utf-8')
+        yield '룰 요약', summary
+
+        context = {'available_games': RunpodClient.FALLBACK_GAMES * 5, 'games_version': 'bench'}
+        for template in ('chatbot/gpt_rules.html', 'chatbot/finetuning_rules.html'):
+            yield f"페이지 {template.split('/')[-1]}", render_to_string(template, context).encode('utf-8')
+        mobile_context = {**context, 'chat_type': 'gpt_rules', 'chat_type_name': 'GPT 룰 설명'}
+        yield '페이지 mobile_chat.html', render_to_string('chatbot/mobile_chat.html', mobile_context).encode('utf-8')
+
+    @staticmethod
+    def _compress(body, encoding, repeat):
+        """(압축 결과, 1회 평균 ms) - 응답 미들웨어와 같은 설정"""
+        started = time.perf_counter()
+        for _ in range(repeat):
+            compressed = compress_body(body, encoding)
+        return compressed, (time.perf_counter() - started) * 1000 / repeat
+
+    def _check_pipeline(self):
+        """미들웨어 적용 확인 - 압축 응답과 ETag 재검증(304)"""
+        client = Client()
+        response = client.get('/api/games/trending/?window=week&limit=20', HTTP_ACCEPT_ENCODING='gzip')
+        encoding = response.get('Content-Encoding', '없음')
+        etag = response.get('ETag')
+        self.stdout.write(f"🔎 /api/games/trending/: Content-Encoding={encoding}, ETag={etag}")
+        if encoding == 'gzip':
+            gzip.decompress(response.content)
+        if etag:
+            revalidated = client.get('/api/games/trending/?window=week&limit=20', HTTP_ACCEPT_ENCODING='gzip',
+                                     HTTP_IF_NONE_MATCH=etag)
+            self.stdout.write(f"🔎 If-None-Match 재요청: {revalidated.status_code}")
@@ -0,0 +1,115 @@
+import time
+import threading
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, connection, connections
+from django.db.backends.signals import connection_created
+
+
+class Command(BaseCommand):
+    help = 'DB 연결 재사용 효과 측정 - 요청마다 새로 연결(CONN_MAX_AGE=0)과 영구 연결의 초당 요청 수 비교'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='모드별로 흉내 낼 요청 수 (기본값: 500)'
+        )
+        parser.add_argument(
+            '--conn-max-age',
+            type=int,
+            help='비교할 영구 연결 유지 시간(초) (기본값: 현재 설정값, 0이면 600)'
+        )
+        parser.add_argument(
+            '--writers',
+            type=int,
+            default=0,
+            help='동시에 쓰기를 하는 스레드 수 - SQLite 잠금 오류 확인용 (기본값: 0, 건너뜀)'
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests는 1 이상이어야 합니다.')
+
+        settings_dict = connection.settings_dict
+        original_max_age = settings_dict['CONN_MAX_AGE']
+        persistent_max_age = options['conn_max_age'] if options['conn_max_age'] is not None else (original_max_age or 600)
+
+        self.stdout.write(f"🔌 DB: {connection.vendor} ({settings_dict['NAME']}), 요청 {options['requests']:,}회씩")
+        try:
+            before = self._run(0, options['requests'])
+            after = self._run(persistent_max_age, options['requests'])
+        finally:
+            settings_dict['CONN_MAX_AGE'] = original_max_age
+            connection.close()
+
+        for label, (rate, opened) in (('요청마다 연결 (CONN_MAX_AGE=0)', before),
+                                      (f'영구 연결 (CONN_MAX_AGE={persistent_max_age})', after)):
+            self.stdout.write(f"  {label:<36} {rate:>10,.0f} req/sec, 새 연결 {opened:,}회")
+        if before[0]:
+            self.stdout.write(self.style.SUCCESS(f"✅ 영구 연결이 {after[0] / before[0]:,.1f}배 빠름"))
+
+        if options['writers'] > 0:
+            self._bench_writers(options['writers'])
+
+    def _run(self, max_age, total):
+        """요청 시작/종료 신호로 실제 요청 처리 흐름(close_old_connections)을 흉내 냄 - (초당 요청 수, 새 연결 수)"""
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        opened = []
+        counter = lambda sender, connection, **kwargs: opened.append(1)  # noqa: E731
+        connection_created.connect(counter, weak=False)
+        try:
+            started = time.perf_counter()
+            for _ in range(total):
+                request_started.send(sender=self.__class__)
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                request_finished.send(sender=self.__class__)
+            elapsed = time.perf_counter() - started
+        finally:
+            connection_created.disconnect(counter)
+        return total / elapsed if elapsed > 0 else 0, len(opened)
+
+    def _bench_writers(self, writers, writes_per_thread=50):
+        """여러 스레드가 동시에 INSERT할 때 잠금 오류 수 (WAL/busy_timeout 효과 확인)"""
+        table = 'bench_db_connections_tmp'
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, value TEXT)")
+            mode = None
+            if connection.vendor == 'sqlite':
+                cursor.execute('PRAGMA journal_mode')
+                mode = cursor.fetchone()[0]
+
+        errors = []
+
+        def write():
+            try:
+                for i in range(writes_per_thread):
+                    try:
+                        with connections['default'].cursor() as cursor:
+                            cursor.execute(f"INSERT INTO {table} (value) VALUES (%s)", [str(i)])
+                    except Exception as e:
+                        errors.append(str(e))
+            finally:
+                connections['default'].close()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=write) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {table}")
+        close_old_connections()
+
+        total = writers * writes_per_thread
+        journal = f", journal_mode={mode}" if mode else ''
+        self.stdout.write(f"✍️  동시 쓰기 {writers}스레드 × {writes_per_thread}회: {total / elapsed:,.0f} writes/sec, 오류 {len(errors)}건{journal}")
+        if errors:
+            self.stdout.write(self.style.WARNING(f"⚠️  첫 오류: {errors[0]}"))
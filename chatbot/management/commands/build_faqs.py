@@ -0,0 +1,178 @@
+import time
+import asyncio
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from chatbot.cache_keys import invalidate
+from chatbot.models import RuleFAQ
+from chatbot.qa_analytics import frequent_questions, is_fallback_answer
+from chatbot.qa_io import QA_MODELS
+from chatbot.services import get_rule_explanation_service
+from chatbot.services.runpod_client import RunpodError
+
+
+class Command(BaseCommand):
+    help = '게임별 자주 묻는 질문을 뽑아 답변을 다시 만들고 추천 질문(RuleFAQ) 테이블을 교체합니다 (매일 cron 실행용)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=getattr(settings, 'FAQ_TOP_QUESTIONS', 5),
+            help='게임별 추천 질문 수 (기본값: FAQ_TOP_QUESTIONS)'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'FAQ_LOOKBACK_DAYS', 90),
+            help='최근 며칠의 질문을 셀지 (기본값: FAQ_LOOKBACK_DAYS)'
+        )
+        parser.add_argument(
+            '--min-count',
+            type=int,
+            default=getattr(settings, 'FAQ_MIN_QUESTION_COUNT', 3),
+            help='이보다 적게 나온 질문은 제외 (기본값: FAQ_MIN_QUESTION_COUNT)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=getattr(settings, 'FAQ_BUILD_CONCURRENCY', 4),
+            help='Runpod 동시 요청 수 (기본값: FAQ_BUILD_CONCURRENCY)'
+        )
+        parser.add_argument(
+            '--type',
+            choices=['all'] + list(QA_MODELS),
+            default='all',
+            help='처리할 QA 종류 (기본값: all)'
+        )
+        parser.add_argument(
+            '--game',
+            help='이 게임만 다시 만들기 (다른 게임의 추천 질문은 그대로 둠)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='뽑힌 질문만 출력하고 Runpod 호출/저장은 하지 않음'
+        )
+
+    def handle(self, *args, **options):
+        if options['top'] < 1 or options['days'] < 1 or options['min_count'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--top, --days, --min-count, --concurrency는 1 이상이어야 합니다.')
+
+        rule_service = get_rule_explanation_service()
+        if not options['dry_run'] and rule_service.runpod_client.sync_health_check().get('status') == 'error':
+            # 기본 게임 목록으로 판단하면 멀쩡한 게임의 추천 질문까지 지워지므로 아예 중단
+            raise CommandError('Runpod 서버에 연결할 수 없어 중단합니다 (기존 추천 질문은 그대로 유지).')
+
+        qa_types = list(QA_MODELS) if options['type'] == 'all' else [options['type']]
+        since = timezone.now() - timedelta(days=options['days'])
+        available_games = set(rule_service.get_available_games())
+        started = time.perf_counter()
+
+        # (QA 종류, 게임) -> [(순위, 정규화 질문, 대표 원문, 횟수)]
+        mined = {}
+        for qa_type in qa_types:
+            top = frequent_questions(qa_type, since, options['top'], options['min_count'], options['game'])
+            unsupported = sorted(game_name for game_name in top if game_name not in available_games)
+            if unsupported:
+                self.stdout.write(self.style.WARNING(
+                    f"⚠️ {qa_type}: 지원하지 않는 게임 {len(unsupported)}개 건너뜀 ({', '.join(unsupported[:5])}"
+                    f"{' 등' if len(unsupported) > 5 else ''})"
+                ))
+            for game_name, questions in top.items():
+                if game_name not in available_games:
+                    continue
+                # 정규화 질문은 고유 키(255자)로 쓰므로 그보다 긴 질문은 제외
+                mined[(qa_type, game_name)] = [
+                    (rank, key, question, count)
+                    for rank, (key, question, count) in enumerate(
+                        [item for item in questions if len(item[0]) <= 255], start=1
+                    )
+                ]
+            self.stdout.write(f"🔎 {qa_type}: 게임 {sum(1 for t, _ in mined if t == qa_type):,}개에서 질문 추출")
+
+        jobs = [(qa_type, game_name, question) for (qa_type, game_name), rows in mined.items()
+                for _, _, question, _ in rows]
+        if options['dry_run']:
+            for (qa_type, game_name), rows in sorted(mined.items()):
+                for rank, _, question, count in rows:
+                    self.stdout.write(f"  {qa_type} {game_name} #{rank}: {question} ({count}회)")
+            self.stdout.write(self.style.SUCCESS(f"✅ 미리보기: 질문 {len(jobs):,}개 (저장하지 않음)"))
+            return
+
+        answers = asyncio.run(self._generate(jobs, options['concurrency']))
+        saved, kept, dropped = self._save(mined, answers, qa_types, replace_all=not options['game'])
+        version = invalidate('faq')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ 추천 질문 갱신 완료: 새 답변 {saved:,}개, 기존 답변 유지 {kept:,}개, 제외 {dropped:,}개 "
+            f"({elapsed:,.1f}초, 캐시 버전 {version})"
+        ))
+
+    async def _generate(self, jobs, concurrency):
+        """질문마다 새 세션으로 답변 생성 (동시 요청 수 제한) - {(QA 종류, 게임, 질문): 답변 또는 None}"""
+        client = get_rule_explanation_service().runpod_client
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def generate(qa_type, game_name, question):
+            async with semaphore:
+                try:
+                    result = await client.explain_rules(game_name, question, qa_type, "")
+                except RunpodError as e:
+                    self.stdout.write(self.style.WARNING(f"⚠️ 답변 생성 실패 ({e.kind}): {game_name} - {question}"))
+                    return None
+                data = result.get('data', {}) if result.get('status') == 'success' else {}
+                # 캐시용으로 만든 세션은 대화를 이어가지 않으므로 바로 닫음
+                if data.get('session_id'):
+                    try:
+                        await client.close_session(data['session_id'])
+                    except RunpodError:
+                        pass
+                answer = (data.get('answer') or '').strip()
+                if not answer or is_fallback_answer(answer):
+                    self.stdout.write(self.style.WARNING(f"⚠️ 답변 없음: {game_name} - {question}"))
+                    return None
+                return answer
+
+        results = await asyncio.gather(*(generate(*job) for job in jobs))
+        return dict(zip(jobs, results))
+
+    @staticmethod
+    def _save(mined, answers, qa_types, replace_all):
+        """(QA 종류, 게임)별로 추천 질문 교체 - 답변 생성에 실패하면 기존 답변 유지, 둘 다 없으면 제외"""
+        saved = kept = dropped = 0
+        with transaction.atomic():
+            for (qa_type, game_name), rows in mined.items():
+                existing = {
+                    faq.normalized_question: faq
+                    for faq in RuleFAQ.objects.filter(source=qa_type, game_name=game_name)
+                }
+                keep_keys = []
+                for rank, key, question, count in rows:
+                    answer = answers.get((qa_type, game_name, question))
+                    if answer is not None:
+                        RuleFAQ.objects.update_or_create(
+                            source=qa_type, game_name=game_name, normalized_question=key,
+                            defaults={'question': question, 'answer': answer, 'ask_count': count, 'rank': rank},
+                        )
+                        saved += 1
+                    elif key in existing:
+                        # update()는 auto_now를 건드리지 않으므로 updated_at은 답변을 만든 시각으로 남음
+                        RuleFAQ.objects.filter(pk=existing[key].pk).update(question=question, ask_count=count, rank=rank)
+                        kept += 1
+                    else:
+                        dropped += 1
+                        continue
+                    keep_keys.append(key)
+                RuleFAQ.objects.filter(source=qa_type, game_name=game_name).exclude(
+                    normalized_question__in=keep_keys
+                ).delete()
+
+            if replace_all:
+                # 이번에 질문이 뽑히지 않은 게임(질문이 줄었거나 지원 종료)의 추천 질문 삭제
+                for qa_type in qa_types:
+                    games = [game_name for source, game_name in mined if source == qa_type]
+                    RuleFAQ.objects.filter(source=qa_type).exclude(game_name__in=games).delete()
+        return saved, kept, dropped
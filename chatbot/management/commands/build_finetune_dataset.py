@@ -0,0 +1,229 @@
+import os
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from chatbot.models import GPTRuleQA, FinetuningRuleQA
+from chatbot.finetune_dataset import DedupStore, ShardWriter, prepare_batch
+
+# --source 값 -> 모델
+SOURCES = {
+    'gpt': GPTRuleQA,
+    'finetuning': FinetuningRuleQA,
+}
+
+DEFAULT_SYSTEM_PROMPT = '당신은 보드게임 룰을 정확하고 친절하게 설명하는 도우미입니다.'
+
+
+class Command(BaseCommand):
+    help = '저장된 QA를 중복 제거·필터링·게임별 샘플링해 파인튜닝용 chat JSONL 샤드로 만듭니다 (중단 후 재개 가능)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir', help='샤드와 체크포인트를 저장할 폴더')
+        parser.add_argument('--source', choices=['all'] + list(SOURCES), default='all', help='사용할 QA 테이블 (기본값: all)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='DB에서 한 번에 읽고 워커에 넘길 행 수 (기본값: 5000)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='전처리 프로세스 수 (기본값: CPU 수)')
+        parser.add_argument('--shard-size', type=int, default=100000, help='샤드 하나당 행 수 (기본값: 100000)')
+        parser.add_argument('--min-question', type=int, default=5, help='질문 최소 글자 수')
+        parser.add_argument('--max-question', type=int, default=1000, help='질문 최대 글자 수')
+        parser.add_argument('--min-answer', type=int, default=20, help='답변 최소 글자 수')
+        parser.add_argument('--max-answer', type=int, default=8000, help='답변 최대 글자 수')
+        parser.add_argument('--sample-rate', type=float, default=1.0, help='게임별로 남길 비율 0~1 (기본값: 1.0)')
+        parser.add_argument('--max-per-game', type=int, default=0, help='게임당 최대 행 수 - 게임마다 해시 순서로 고르게 뽑음 (0이면 제한 없음)')
+        parser.add_argument('--num-perm', type=int, default=64, help='MinHash 순열 수 (기본값: 64)')
+        parser.add_argument('--bands', type=int, default=8, help='LSH 구간 수 - 적을수록 더 비슷해야 중복 (기본값: 8, 유사도 약 0.77)')
+        parser.add_argument('--shingle-size', type=int, default=5, help='MinHash 문자 n-gram 크기 (기본값: 5)')
+        parser.add_argument('--system-prompt', default=DEFAULT_SYSTEM_PROMPT, help='각 샘플 앞에 넣을 system 메시지')
+        parser.add_argument('--restart', action='store_true', help='기존 체크포인트를 지우고 처음부터 다시 만들기')
+
+    def handle(self, *args, **options):
+        if options['num_perm'] % options['bands'] != 0:
+            raise CommandError('--num-perm은 --bands로 나누어떨어져야 합니다.')
+        if not 0 < options['sample_rate'] <= 1:
+            raise CommandError('--sample-rate는 0보다 크고 1 이하여야 합니다.')
+
+        output_dir = options['output_dir']
+        os.makedirs(output_dir, exist_ok=True)
+        store_path = os.path.join(output_dir, 'dedup.sqlite3')
+        if options['restart']:
+            self._clean_output(output_dir)
+
+        config = {
+            'num_perm': options['num_perm'],
+            'bands': options['bands'],
+            'shingle_size': options['shingle_size'],
+            'seed': 1,
+            'min_question': options['min_question'],
+            'max_question': options['max_question'],
+            'min_answer': options['min_answer'],
+            'max_answer': options['max_answer'],
+            'sample_rate': options['sample_rate'],
+            'max_per_game': options['max_per_game'],
+            'shard_size': options['shard_size'],
+            'system_prompt': options['system_prompt'],
+            'sources': list(SOURCES) if options['source'] == 'all' else [options['source']],
+        }
+        sources = config['sources']
+
+        store = DedupStore(store_path)
+        state = store.load_state()
+        if state is None:
+            state = {
+                'config': config,
+                'last_pk': {source: 0 for source in sources},
+                'shard_index': 0, 'shard_rows': 0, 'shard_bytes': 0,
+                'counts': {'read': 0, 'written': 0, 'length': 0, 'fallback': 0,
+                           'sampled_out': 0, 'exact_dup': 0, 'near_dup': 0, 'game_cap': 0},
+            }
+        else:
+            if state['config'] != config:
+                store.close()
+                raise CommandError('체크포인트와 옵션이 다릅니다. 같은 옵션으로 다시 실행하거나 --restart를 사용하세요.')
+            self.stdout.write(f"🔁 체크포인트에서 재개: {state['counts']['read']:,}행 처리됨, 샤드 {state['shard_index']}")
+
+        writer = ShardWriter(output_dir, options['shard_size'], state['shard_index'], state['shard_rows'], state['shard_bytes'])
+        self.system_prompt = options['system_prompt']
+        self.sample_rate = options['sample_rate']
+        self.max_per_game = options['max_per_game']
+
+        started = time.perf_counter()
+        read_at_start = state['counts']['read']
+        workers = max(1, options['workers'])
+
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for source, last_pk, rows in self._iter_batches(sources, state['last_pk'], options['batch_size']):
+                    pending.append((source, last_pk, len(rows), executor.submit(prepare_batch, rows, config)))
+                    # 워커 수의 2배까지만 미리 제출해서 메모리 사용량을 묶어 둠
+                    if len(pending) >= workers * 2:
+                        self._consume(pending.popleft(), store, writer, state, started, read_at_start)
+                while pending:
+                    self._consume(pending.popleft(), store, writer, state, started, read_at_start)
+            if self.max_per_game and store.candidate_count() != state.get('sampled_candidates'):
+                # 상한 모드는 후보 수집 중에 샤드를 쓰지 않으므로 후보가 늘었으면 처음부터 다시 씀
+                writer.close()
+                writer = ShardWriter(output_dir, options['shard_size'])
+                self._write_game_samples(store, writer, state)
+        finally:
+            writer.close()
+
+        self._write_manifest(output_dir, store, state, options)
+        store.close()
+
+        counts = state['counts']
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"\n🎉 데이터셋 생성 완료! ({elapsed:,.1f}초)"))
+        self.stdout.write(f"📊 읽은 행: {counts['read']:,}개 → 저장: {counts['written']:,}개 (샤드 {state['shard_index'] + 1}개)")
+        self.stdout.write(
+            f"🧹 제외 - 길이 {counts['length']:,}, 폴백 답변 {counts['fallback']:,}, 샘플링 {counts['sampled_out']:,}, "
+            f"정확 중복 {counts['exact_dup']:,}, 유사 중복 {counts['near_dup']:,}, 게임 상한 {counts['game_cap']:,}"
+        )
+
+    def _iter_batches(self, sources, last_pk, batch_size):
+        """pk 기준 키셋 페이지네이션으로 (source, 배치 마지막 pk, 행 목록) 반환"""
+        for source in sources:
+            model = SOURCES[source]
+            cursor = last_pk.get(source, 0)
+            while True:
+                rows = list(
+                    model.objects.filter(pk__gt=cursor).order_by('pk')
+                    .values_list('pk', 'game_name', 'question', 'answer_inline', 'answer_blob_id', 'answer_source')[:batch_size]
+                )
+                if not rows:
+                    break
+                cursor = rows[-1][0]
+                yield source, cursor, [
+                    (source, pk, game, question, model.resolve_answer(answer_inline, answer_blob_id), answer_source)
+                    for pk, game, question, answer_inline, answer_blob_id, answer_source in rows
+                ]
+
+    def _consume(self, item, store, writer, state, started, read_at_start):
+        """전처리 결과 하나를 순서대로 반영 - 샤드 쓰기와 체크포인트를 같은 SQLite 트랜잭션으로 커밋"""
+        source, last_pk, row_count, future = item
+        prepared, skipped = future.result()
+        counts = state['counts']
+        counts['read'] += row_count
+        counts['length'] += skipped['length']
+        counts['fallback'] += skipped['fallback']
+
+        for row in prepared:
+            # 샘플링을 먼저 - 해시 기반이라 중복 행들은 모두 같은 결정을 받음
+            if row['sample_value'] > self.sample_rate:
+                counts['sampled_out'] += 1
+                continue
+            if store.is_exact_duplicate(row['exact_key']):
+                counts['exact_dup'] += 1
+                continue
+            if store.is_near_duplicate(row['band_keys']):
+                counts['near_dup'] += 1
+                continue
+
+            record = {
+                'messages': [
+                    {'role': 'system', 'content': self.system_prompt},
+                    {'role': 'user', 'content': f"[{row['game_name']}] {row['question']}"},
+                    {'role': 'assistant', 'content': row['answer']},
+                ],
+                'metadata': {'source': row['source'], 'id': row['pk'], 'game_name': row['game_name']},
+            }
+            if self.max_per_game:
+                # 게임당 상한은 전체를 본 뒤에 적용 (pk 앞쪽 행만 남지 않게)
+                store.add_candidate(row['game_name'], row['sample_value'], record)
+                continue
+            writer.write(record)
+            store.increment_game(row['game_name'])
+            counts['written'] += 1
+
+        state['last_pk'][source] = last_pk
+        state.update(writer.sync())
+        store.save_state(state)
+        store.commit()
+
+        elapsed = time.perf_counter() - started
+        rate = (counts['read'] - read_at_start) / elapsed if elapsed > 0 else 0
+        self.stdout.write(f"⏳ {counts['read']:,}행 처리, {counts['written']:,}행 저장 ({rate:,.0f} rows/sec)")
+
+    def _write_game_samples(self, store, writer, state):
+        """--max-per-game: 모아 둔 후보에서 게임별로 샘플링해 샤드에 쓰기
+
+        샤드를 처음부터 다시 쓰고 한 트랜잭션으로 커밋하므로, 중간에 멈추거나 다음 실행에서 후보가 늘면 이 단계만 다시 한다.
+        """
+        counts = state['counts']
+        candidates = store.candidate_count()
+        store.clear_game_counts()
+        written = 0
+        for game, record in store.iter_game_samples(self.max_per_game):
+            writer.write(record)
+            store.increment_game(game)
+            written += 1
+
+        counts['written'] = written
+        counts['game_cap'] = candidates - written
+        state.update(writer.sync())
+        state['sampled_candidates'] = candidates
+        store.save_state(state)
+        store.commit()
+        self.stdout.write(f"🎲 게임별 샘플링: 후보 {candidates:,}행 → {written:,}행 저장")
+
+    def _write_manifest(self, output_dir, store, state, options):
+        """샤드 목록과 통계 (학습 job 설정용)"""
+        shards = [f"shard-{i:05d}.jsonl" for i in range(state['shard_index'] + 1)]
+        manifest = {
+            'current_finetuning_model': getattr(settings, 'FINETUNING_MODEL_ID', None),
+            'system_prompt': options['system_prompt'],
+            'shards': shards,
+            'counts': state['counts'],
+            'config': state['config'],
+            'games': store.game_counts(),
+        }
+        with open(os.path.join(output_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    def _clean_output(self, output_dir):
+        """--restart: 이전 실행의 샤드/체크포인트 삭제"""
+        for name in os.listdir(output_dir):
+            if name.startswith('shard-') or name.startswith('dedup.sqlite3') or name == 'manifest.json':
+                os.remove(os.path.join(output_dir, name))
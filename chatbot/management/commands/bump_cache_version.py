@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from chatbot.cache_keys import get_version, invalidate
+
+
+class Command(BaseCommand):
+    help = '캐시 네임스페이스 버전을 올려 모든 워커의 기존 캐시를 무효화합니다 (게임 목록/룰 요약 갱신 후)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'namespaces',
+            nargs='*',
+            help='무효화할 네임스페이스 (기본값: CACHE_KEY_VERSIONS 전체)'
+        )
+
+    def handle(self, *args, **options):
+        known = list(getattr(settings, 'CACHE_KEY_VERSIONS', {}))
+        namespaces = options['namespaces'] or known
+        unknown = [namespace for namespace in namespaces if namespace not in known]
+        if unknown:
+            raise CommandError(f"알 수 없는 네임스페이스: {', '.join(unknown)} (사용 가능: {', '.join(known)})")
+
+        for namespace in namespaces:
+            before = get_version(namespace)
+            after = invalidate(namespace)
+            self.stdout.write(f"🔄 {namespace}: v{before} -> v{after}")
+        self.stdout.write(self.style.SUCCESS(f"✅ 캐시 {len(namespaces)}개 네임스페이스 무효화 완료 ({settings.CACHE_PROFILE})"))
@@ -0,0 +1,110 @@
+import os
+import sys
+import json
+import time
+import subprocess
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# 워커 기동과 같은 순서로 import: 설정 -> 앱 로딩 -> URLconf(뷰) -> WSGI 애플리케이션
+BOOT_SCRIPT = (
+    "import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns; "
+    "import boardgame_chatbot.wsgi"
+)
+
+
+class Command(BaseCommand):
+    help = '워커 기동 시 import 비용을 python -X importtime으로 측정해 보고합니다'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='출력할 상위 모듈 수 (기본값: 20)'
+        )
+        parser.add_argument(
+            '--sort',
+            choices=['cumulative', 'self'],
+            default='cumulative',
+            help='정렬 기준 (기본값: cumulative)'
+        )
+        parser.add_argument(
+            '--filter',
+            default='',
+            help='모듈 이름에 이 문자열이 포함된 항목만 출력 (예: chatbot)'
+        )
+        parser.add_argument(
+            '--json',
+            dest='json_path',
+            help='결과를 JSON 파일로 저장 (기동 시간 추이 추적용)'
+        )
+
+    def handle(self, *args, **options):
+        env = os.environ.copy()
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'boardgame_chatbot.settings')
+
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        wall_ms = (time.perf_counter() - started) * 1000
+
+        if result.returncode != 0:
+            raise CommandError(f'기동 스크립트 실행 실패:\n{result.stderr[-2000:]}')
+
+        entries = self._parse_importtime(result.stderr)
+        if not entries:
+            raise CommandError('importtime 출력을 해석하지 못했습니다.')
+
+        total_import_us = sum(entry['self_us'] for entry in entries)
+        selected = [e for e in entries if options['filter'] in e['module']]
+        key = 'cumulative_us' if options['sort'] == 'cumulative' else 'self_us'
+        selected.sort(key=lambda e: e[key], reverse=True)
+        selected = selected[:options['top']]
+
+        self.stdout.write(f'⏱️  프로세스 전체: {wall_ms:,.1f}ms (인터프리터 기동 포함)')
+        self.stdout.write(f'📦 import 합계: {total_import_us / 1000:,.1f}ms, 모듈 {len(entries)}개\n')
+        self.stdout.write(f'{"cumulative(ms)":>15} {"self(ms)":>10}  module')
+        for entry in selected:
+            self.stdout.write(
+                f'{entry["cumulative_us"] / 1000:>15,.1f} {entry["self_us"] / 1000:>10,.1f}  {entry["module"]}'
+            )
+
+        if options['json_path']:
+            report = {
+                'measured_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'wall_ms': round(wall_ms, 1),
+                'import_ms': round(total_import_us / 1000, 1),
+                'module_count': len(entries),
+                'top': selected,
+            }
+            with open(options['json_path'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'\n📝 JSON 저장: {options["json_path"]}'))
+
+    def _parse_importtime(self, stderr):
+        """'import time: self [us] | cumulative | imported package' 형식 파싱"""
+        entries = []
+        for line in stderr.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            parts = line[len('import time:'):].split('|')
+            if len(parts) != 3:
+                continue
+            try:
+                self_us = int(parts[0].strip())
+                cumulative_us = int(parts[1].strip())
+            except ValueError:
+                continue  # 헤더 줄
+            entries.append({
+                'module': parts[2].strip(),
+                'self_us': self_us,
+                'cumulative_us': cumulative_us,
+            })
+        return entries
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Sum
+from django.db.models.functions import Length
+from django.utils import timezone
+from chatbot.models import Conversation, ConversationTurn
+from chatbot.services import get_conversation_store
+
+
+class Command(BaseCommand):
+    help = '만료된 대화 기록(CONVERSATION_TTL)을 삭제합니다 (cron 주기 실행용)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='한 번에 삭제할 대화 수 (기본값: 1000)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='삭제 대상 수만 출력'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size는 1 이상이어야 합니다.')
+
+        expired = Conversation.objects.filter(expires_at__lte=timezone.now()).count()
+        if options['dry_run']:
+            self.stdout.write(f"🔎 만료된 대화 {expired:,}개 (삭제하지 않음)")
+        else:
+            deleted = get_conversation_store().prune_expired(options['batch_size'])
+            self.stdout.write(f"🧹 만료된 대화 {deleted:,}개 삭제")
+
+        stats = ConversationTurn.objects.aggregate(turns=Count('id'), stored=Sum(Length('data')))
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ 남은 대화 {Conversation.objects.count():,}개, 턴 {stats['turns']:,}개 ({stats['stored'] or 0:,}B 저장)"
+        ))
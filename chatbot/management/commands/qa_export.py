@@ -0,0 +1,92 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from chatbot.qa_io import QA_MODELS, FORMATS, RowWriter, detect_format, serialize_row
+
+
+class Command(BaseCommand):
+    help = 'QA 데이터를 JSONL/CSV/Parquet 파일로 스트리밍 내보내기 (qa_import로 다시 가져올 수 있음)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="출력 파일 경로 ('-'는 표준 출력, .gz면 gzip 압축)")
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='파일 포맷 (기본값: 확장자로 판단)'
+        )
+        parser.add_argument(
+            '--type',
+            choices=['all'] + list(QA_MODELS),
+            default='all',
+            help='내보낼 QA 종류 (기본값: all)'
+        )
+        parser.add_argument(
+            '--game',
+            help='특정 게임만 내보내기'
+        )
+        parser.add_argument(
+            '--since',
+            help='이 날짜(YYYY-MM-DD) 이후 생성된 QA만 내보내기'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='DB에서 한 번에 가져올 행 수 (기본값: 2000)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            fmt = detect_format(options['path'], options['format'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        since = None
+        if options['since']:
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError(f"--since 형식 오류: {options['since']} (YYYY-MM-DD)")
+
+        batch_size = max(1, options['batch_size'])
+        qa_types = list(QA_MODELS) if options['type'] == 'all' else [options['type']]
+        # 표준 출력으로 내보낼 때는 진행 메시지가 데이터에 섞이지 않도록 stderr 사용
+        log = self.stderr if options['path'] == '-' else self.stdout
+
+        log.write(f"📤 QA 내보내기 시작: {options['path']} ({fmt})")
+        started = time.perf_counter()
+        exported = 0
+
+        try:
+            with RowWriter(options['path'], fmt, batch_size) as writer:
+                for qa_type in qa_types:
+                    model = QA_MODELS[qa_type]
+                    queryset = model.objects.all()
+                    if options['game']:
+                        queryset = queryset.filter(game_name=options['game'])
+                    if since:
+                        queryset = queryset.filter(created_at__date__gte=since)
+
+                    # iterator: PostgreSQL에서는 서버 사이드 커서로 batch_size씩만 메모리에 올림
+                    rows = queryset.order_by('pk').values_list(
+                        'game_name', 'question', 'answer_inline', 'answer_blob_id', 'created_at', 'content_hash'
+                    ).iterator(chunk_size=batch_size)
+
+                    for game_name, question, answer_inline, answer_blob_id, created_at, content_hash in rows:
+                        answer = model.resolve_answer(answer_inline, answer_blob_id)
+                        if not content_hash:
+                            content_hash = model.compute_content_hash(game_name, question, answer, created_at)
+                        writer.write(serialize_row(qa_type, game_name, question, answer, created_at, content_hash))
+                        exported += 1
+                        if exported % 100000 == 0:
+                            self._report(log, exported, started)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        elapsed = time.perf_counter() - started
+        rate = exported / elapsed if elapsed > 0 else 0
+        log.write(self.style.SUCCESS(f'🎉 내보내기 완료: {exported:,}개 ({elapsed:,.1f}초, {rate:,.0f} rows/sec)'))
+
+    def _report(self, log, exported, started):
+        elapsed = time.perf_counter() - started
+        rate = exported / elapsed if elapsed > 0 else 0
+        log.write(f'⏳ {exported:,}행 내보냄 ({rate:,.0f} rows/sec)')
@@ -0,0 +1,141 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from chatbot.models import GameQAHourly
+from chatbot.qa_io import QA_MODELS, FORMATS, detect_format, iter_rows, parse_created_at, parse_row
+
+
+class Command(BaseCommand):
+    help = 'QA 파일(JSONL/CSV/Parquet)을 스트리밍으로 읽어 일괄 저장합니다 (content_hash로 중복 제외)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="입력 파일 경로 ('-'는 표준 입력, .gz 지원)")
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='파일 포맷 (기본값: 확장자로 판단)'
+        )
+        parser.add_argument(
+            '--type',
+            choices=list(QA_MODELS),
+            help='행에 type 값이 없을 때 사용할 QA 종류'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='INSERT 한 번에 넣을 행 수 (기본값: 1000)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=20000,
+            help='트랜잭션 하나에 넣을 행 수 (기본값: 20000)'
+        )
+        parser.add_argument(
+            '--skip-invalid',
+            action='store_true',
+            help='형식이 잘못된 행은 건너뛰기 (기본값: 중단)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            fmt = detect_format(options['path'], options['format'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.batch_size = max(1, options['batch_size'])
+        chunk_size = max(self.batch_size, options['chunk_size'])
+        counts_before = {qa_type: model.objects.count() for qa_type, model in QA_MODELS.items()}
+
+        self.stdout.write(f"📥 QA 가져오기 시작: {options['path']} ({fmt})")
+        started = time.perf_counter()
+        processed = invalid = 0
+        chunk = {qa_type: [] for qa_type in QA_MODELS}
+        chunk_rows = 0
+
+        try:
+            for line_no, row in enumerate(iter_rows(options['path'], fmt, self.batch_size), start=1):
+                try:
+                    qa_type, instance = self._build_instance(parse_row(row), options['type'])
+                except (KeyError, TypeError, ValueError) as e:
+                    if not options['skip_invalid']:
+                        raise CommandError(f"{line_no}번째 행 오류: {e}")
+                    invalid += 1
+                    continue
+
+                chunk[qa_type].append(instance)
+                chunk_rows += 1
+                processed += 1
+                if chunk_rows >= chunk_size:
+                    self._write_chunk(chunk)
+                    chunk = {qa_type: [] for qa_type in QA_MODELS}
+                    chunk_rows = 0
+                    self._report(processed, started)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if chunk_rows:
+            self._write_chunk(chunk)
+
+        elapsed = time.perf_counter() - started
+        inserted = {
+            qa_type: model.objects.count() - counts_before[qa_type]
+            for qa_type, model in QA_MODELS.items()
+        }
+        total_inserted = sum(inserted.values())
+        if total_inserted:
+            # bulk_create는 save()를 거치지 않으므로 최근 시간별 집계는 원본에서 다시 계산
+            hours = getattr(settings, 'TRENDING_RETENTION_HOURS', 24 * 14)
+            GameQAHourly.rebuild(timezone.now() - timedelta(hours=hours))
+        rate = processed / elapsed if elapsed > 0 else 0
+
+        self.stdout.write(self.style.SUCCESS(f'\n🎉 가져오기 완료! ({elapsed:,.1f}초, {rate:,.0f} rows/sec)'))
+        self.stdout.write(f'📊 읽은 행: {processed:,}개')
+        self.stdout.write(f'📊 새로 저장: {total_inserted:,}개 (GPT {inserted["gpt"]:,}, 파인튜닝 {inserted["finetuning"]:,})')
+        self.stdout.write(f'📊 중복 제외: {processed - total_inserted:,}개')
+        if invalid:
+            self.stdout.write(self.style.WARNING(f'⚠️  형식 오류로 건너뛴 행: {invalid:,}개'))
+
+    def _build_instance(self, row, default_type):
+        """파일 행 -> (QA 종류, 저장 전 모델 인스턴스)"""
+        qa_type = row.get('type') or default_type
+        if qa_type not in QA_MODELS:
+            raise ValueError(f"QA 종류를 알 수 없습니다: {qa_type!r} (--type으로 지정하세요)")
+
+        model = QA_MODELS[qa_type]
+        game_name = row['game_name']
+        question = row['question']
+        answer = row['answer']
+        if not game_name or not question:
+            raise ValueError("game_name과 question은 비어 있을 수 없습니다")
+        created_at = parse_created_at(row.get('created_at'))
+
+        # 파일에 적힌 해시는 믿지 않고 다시 계산 (수정된 행이 중복으로 버려지지 않도록)
+        content_hash = model.compute_content_hash(game_name, question, answer, created_at)
+        return qa_type, model(
+            game_name=game_name,
+            question=question,
+            answer=answer,
+            created_at=created_at,
+            content_hash=content_hash,
+        )
+
+    def _write_chunk(self, chunk):
+        """청크 하나를 트랜잭션 하나로 저장 - 같은 해시는 DB 유니크 제약으로 무시"""
+        with transaction.atomic():
+            for qa_type, instances in chunk.items():
+                if instances:
+                    # 긴 답변은 AnswerBlob으로 (같은 답변은 한 번만 저장)
+                    QA_MODELS[qa_type].prepare_for_bulk_create(instances)
+                    QA_MODELS[qa_type].objects.bulk_create(
+                        instances, batch_size=self.batch_size, ignore_conflicts=True
+                    )
+
+    def _report(self, processed, started):
+        elapsed = time.perf_counter() - started
+        rate = processed / elapsed if elapsed > 0 else 0
+        self.stdout.write(f'⏳ {processed:,}행 처리 ({rate:,.0f} rows/sec)')
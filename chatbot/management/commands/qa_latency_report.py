@@ -0,0 +1,131 @@
+import json
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+from chatbot.qa_analytics import latency_percentiles
+from chatbot.qa_io import QA_MODELS
+
+# 보고서의 chat_type 이름 (QA 종류와 1:1)
+CHAT_TYPES = {
+    'gpt': 'gpt_rules',
+    'finetuning': 'finetuning_rules',
+}
+
+
+class Command(BaseCommand):
+    help = 'QA 응답 시간(latency_ms) 백분위를 게임별 또는 채팅 타입별로 출력합니다 (느린 게임/캐싱 대상 찾기)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=7,
+            help='최근 며칠 데이터로 계산할지 (기본값: 7)'
+        )
+        parser.add_argument(
+            '--by',
+            choices=['game', 'chat_type'],
+            default='game',
+            help='묶는 기준 (기본값: game)'
+        )
+        parser.add_argument(
+            '--type',
+            choices=['all'] + list(QA_MODELS),
+            default='all',
+            help='대상 QA 종류 (기본값: all)'
+        )
+        parser.add_argument(
+            '--game',
+            help='특정 게임만'
+        )
+        parser.add_argument(
+            '--percentiles',
+            default='50,90,95,99',
+            help='출력할 백분위 (기본값: 50,90,95,99)'
+        )
+        parser.add_argument(
+            '--min-count',
+            type=int,
+            default=5,
+            help='응답 수가 이보다 적은 그룹은 제외 (기본값: 5)'
+        )
+        parser.add_argument(
+            '--json',
+            dest='json_path',
+            help='결과를 JSON 파일로도 저장'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            percentiles = sorted({float(p) for p in options['percentiles'].split(',') if p.strip()})
+        except ValueError:
+            raise CommandError(f"--percentiles 형식 오류: {options['percentiles']}")
+        if not percentiles or not all(0 < p <= 100 for p in percentiles):
+            raise CommandError('--percentiles 값은 0보다 크고 100 이하여야 합니다.')
+        if options['days'] < 1:
+            raise CommandError('--days는 1 이상이어야 합니다.')
+
+        since = timezone.now() - timedelta(days=options['days'])
+        qa_types = list(QA_MODELS) if options['type'] == 'all' else [options['type']]
+
+        rows = []
+        for qa_type in qa_types:
+            queryset = QA_MODELS[qa_type].objects.filter(created_at__gte=since)
+            if options['game']:
+                queryset = queryset.filter(game_name=options['game'])
+
+            if options['by'] == 'chat_type':
+                groups = [(CHAT_TYPES[qa_type], queryset)]
+            else:
+                game_names = queryset.filter(latency_ms__isnull=False).values_list('game_name', flat=True).order_by('game_name').distinct()
+                groups = [(f"{game_name} ({CHAT_TYPES[qa_type]})", queryset.filter(game_name=game_name))
+                          for game_name in game_names]
+
+            for label, group in groups:
+                values, total = latency_percentiles(group, percentiles)
+                if total < options['min_count']:
+                    continue
+                summary = group.filter(latency_ms__isnull=False).aggregate(
+                    avg=Avg('latency_ms'),
+                    fallbacks=Count('id', filter=Q(answer_source__in=['fallback', 'error'])),
+                    tokens=Sum('completion_tokens'),
+                )
+                rows.append({
+                    'group': label,
+                    'count': total,
+                    'avg_ms': round(summary['avg'] or 0),
+                    'percentiles': {f"p{p:g}": values[p] for p in percentiles},
+                    'fallback_ratio': round(summary['fallbacks'] / total, 4),
+                    'completion_tokens': summary['tokens'],
+                })
+
+        if not rows:
+            self.stdout.write(f"📭 최근 {options['days']}일 동안 응답 시간이 기록된 QA가 없습니다.")
+            return
+
+        # 가장 느린 그룹(최상위 백분위 기준)부터
+        top = f"p{percentiles[-1]:g}"
+        rows.sort(key=lambda row: row['percentiles'][top], reverse=True)
+
+        self.stdout.write(f"⏱️  최근 {options['days']}일 응답 시간 (ms, {options['by']}별, {top} 내림차순)")
+        header = f"{'그룹':<32}{'응답 수':>8}{'평균':>8}" + ''.join(f"{key:>8}" for key in rows[0]['percentiles']) + f"{'폴백':>8}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for row in rows:
+            self.stdout.write(
+                f"{row['group'][:30]:<32}{row['count']:>8,}{row['avg_ms']:>8,}"
+                + ''.join(f"{value:>8,}" for value in row['percentiles'].values())
+                + f"{row['fallback_ratio'] * 100:>7.1f}%"
+            )
+
+        if options['json_path']:
+            report = {
+                'days': options['days'],
+                'by': options['by'],
+                'generated_at': timezone.now().isoformat(timespec='seconds'),
+                'rows': rows,
+            }
+            with open(options['json_path'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'\n📝 JSON 저장: {options["json_path"]}'))
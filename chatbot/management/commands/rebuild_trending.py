@@ -0,0 +1,35 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from chatbot.models import GameQAHourly
+
+
+class Command(BaseCommand):
+    help = '기간별 인기 게임 순위용 시간별 집계(GameQAHourly)를 원본 QA에서 다시 계산합니다'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=getattr(settings, 'TRENDING_RETENTION_HOURS', 24 * 14),
+            help='최근 몇 시간의 버킷을 다시 계산할지 (기본값: TRENDING_RETENTION_HOURS)'
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='TRENDING_RETENTION_HOURS보다 오래된 버킷 삭제'
+        )
+
+    def handle(self, *args, **options):
+        if options['hours'] < 1:
+            raise CommandError('--hours는 1 이상이어야 합니다.')
+
+        since = timezone.now() - timedelta(hours=options['hours'])
+        self.stdout.write(f"🔄 시간별 집계 재계산: {since:%Y-%m-%d %H}시 이후")
+        buckets = GameQAHourly.rebuild(since)
+        self.stdout.write(self.style.SUCCESS(f"✅ {buckets:,}개 버킷 저장"))
+
+        if options['prune']:
+            deleted = GameQAHourly.prune(getattr(settings, 'TRENDING_RETENTION_HOURS', 24 * 14))
+            self.stdout.write(f"🧹 오래된 버킷 {deleted:,}개 삭제")
@@ -0,0 +1,99 @@
+import os
+import json
+import time
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from chatbot.services import get_qr_code_service
+from chatbot.views import CHAT_TYPE_NAMES
+
+
+class Command(BaseCommand):
+    help = '모든 채팅 타입의 QR 코드 변형(포맷/크기/오류 정정)을 정적 파일로 미리 렌더링합니다'
+
+    def add_arguments(self, parser):
+        variants = getattr(settings, 'QR_ASSET_VARIANTS', {})
+        parser.add_argument(
+            '--base-url',
+            default=os.getenv('QR_BASE_URL'),
+            help='QR에 넣을 베이스 URL (기본값: QR_BASE_URL 환경변수)'
+        )
+        parser.add_argument(
+            '--output',
+            default=getattr(settings, 'QR_ASSET_DIR', None),
+            help='출력 디렉토리 (기본값: settings.QR_ASSET_DIR)'
+        )
+        parser.add_argument(
+            '--formats',
+            nargs='+',
+            default=variants.get('formats', ['svg', 'png']),
+            help='렌더링할 포맷 (svg, png)'
+        )
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            type=int,
+            default=variants.get('sizes', [10]),
+            help='렌더링할 box_size 목록'
+        )
+        parser.add_argument(
+            '--error-corrections',
+            nargs='+',
+            default=variants.get('error_corrections', ['L']),
+            help='렌더링할 오류 정정 레벨 (L, M, Q, H)'
+        )
+
+    def handle(self, *args, **options):
+        base_url = options['base_url']
+        if not base_url:
+            raise CommandError('--base-url 또는 QR_BASE_URL 환경변수가 필요합니다.')
+        if not options['output']:
+            raise CommandError('--output 또는 settings.QR_ASSET_DIR이 필요합니다.')
+
+        base_url = base_url.rstrip('/')
+        qr_code_service = get_qr_code_service()
+        output_dir = Path(options['output'])
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        started = time.perf_counter()
+        files = []
+        urls = {}
+        total_bytes = 0
+
+        for chat_type in CHAT_TYPE_NAMES:
+            mobile_url = f"{base_url}{reverse('chatbot:mobile_chat', args=[chat_type])}"
+            urls[chat_type] = mobile_url
+
+            for fmt in options['formats']:
+                for size in options['sizes']:
+                    for error_correction in options['error_corrections']:
+                        try:
+                            variant = qr_code_service.normalize_variant(fmt, size, error_correction)
+                        except ValueError as e:
+                            raise CommandError(str(e))
+
+                        image = qr_code_service.render(mobile_url, *variant)
+                        name = qr_code_service.asset_name(chat_type, *variant)
+                        (output_dir / name).write_bytes(image)
+                        files.append(name)
+                        total_bytes += len(image)
+                        self.stdout.write(f'📱 {name} ({len(image):,} bytes)')
+
+        manifest = {
+            'base_url': base_url,
+            'urls': urls,
+            'files': sorted(set(files)),
+        }
+        (output_dir / 'manifest.json').write_text(
+            json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8'
+        )
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n🎉 QR 에셋 {len(set(files))}개 생성 완료 ({total_bytes:,} bytes, {elapsed:.2f}초)\n'
+                f'📁 {output_dir}\n'
+                f'collectstatic 이후 nginx/WhiteNoise가 /static/chatbot/qr/ 에서 직접 서빙합니다.'
+            )
+        )
@@ -0,0 +1,145 @@
+import math
+import logging
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+from .ratelimit import ClientRateLimiter, validate_rules
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+def get_client_ip(request):
+    """클라이언트 IP 추출 (nginx 뒤에서는 프록시 헤더 사용)"""
+    if getattr(settings, 'RATE_LIMIT_TRUST_PROXY_HEADERS', False):
+        real_ip = request.META.get('HTTP_X_REAL_IP')
+        if real_ip:
+            return real_ip.strip()
+        forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+        if forwarded_for:
+            return forwarded_for.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', 'unknown')
+
+
+def create_client_rate_limiter(rule, scope):
+    """RATE_LIMIT_RULES 규칙 하나 -> 설정(RATE_LIMIT_BACKEND, RATE_LIMIT_KEY)에 맞는 클라이언트별 제한기"""
+    return ClientRateLimiter(
+        getattr(settings, 'RATE_LIMIT_BACKEND', 'local'), rule['rate'], rule['burst'], scope=scope,
+        key_type=getattr(settings, 'RATE_LIMIT_KEY', 'ip'),
+        session_ip_factor=getattr(settings, 'RATE_LIMIT_SESSION_IP_FACTOR', 5),
+    )
+
+
+class RateLimitMiddleware:
+    """채팅 API 요청 제한 미들웨어 - URL 이름별 토큰 버킷, 초과 시 429 응답"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'RATE_LIMIT_ENABLED', True)
+        rules = getattr(settings, 'RATE_LIMIT_RULES', {})
+        validate_rules(rules)
+
+        # URL 이름 -> 제한기 (워커 기동 시 한 번만 생성)
+        self.limiters = {url_name: create_client_rate_limiter(rule, url_name) for url_name, rule in rules.items()}
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.enabled or request.resolver_match is None:
+            return None
+
+        limiter = self.limiters.get(request.resolver_match.url_name)
+        if limiter is None:
+            return None
+
+        allowed, retry_after, client_key = limiter.consume(get_client_ip(request), getattr(request, 'session', None))
+        if allowed:
+            return None
+
+        retry_seconds = max(1, math.ceil(retry_after))
+        logger.warning(f"🚦 요청 제한 초과: {request.resolver_match.url_name} - {client_key} ({retry_seconds}초 후 재시도)")
+        response = JsonResponse({
+            'error': '요청이 너무 많습니다. 잠시 후 다시 시도해주세요.',
+            'retry_after': retry_seconds,
+            'status': 'error'
+        }, status=429)
+        response['Retry-After'] = str(retry_seconds)
+        return response
+
+
+def parse_accept_encoding(header):
+    """Accept-Encoding -> {인코딩: q값} (q=0은 거부)"""
+    encodings = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            encodings[name.strip().lower()] = q
+    return encodings
+
+
+def compress_body(content, encoding):
+    """br(brotli 패키지가 있을 때) 또는 gzip으로 압축"""
+    if encoding == 'br':
+        return brotli.compress(content, quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5))
+    # Django GZipMiddleware와 같이 임의 길이 파일명을 넣어 BREACH 공격 완화
+    return compress_string(content, max_random_bytes=100)
+
+
+class CompressionMiddleware:
+    """HTML/JSON 응답 압축 - 클라이언트가 받으면 br, 아니면 gzip (COMPRESSION_MIN_SIZE 바이트 이상만)
+
+    스트리밍 응답은 청크 단위 전송이 늦어지지 않도록 압축하지 않는다.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 512)
+        self.content_types = tuple(getattr(settings, 'COMPRESSION_CONTENT_TYPES', ('text/html', 'application/json')))
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in self.content_types or len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self._choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressed = compress_body(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # 압축하면 바이트가 달라지므로 강한 ETag를 약한 ETag로 (If-None-Match는 약한 비교라 304 유지)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+    @staticmethod
+    def _choose_encoding(header):
+        encodings = parse_accept_encoding(header)
+        if brotli is not None and encodings.get('br', 0) > 0:
+            return 'br'
+        if encodings.get('gzip', encodings.get('*', 0)) > 0:
+            return 'gzip'
+        return None
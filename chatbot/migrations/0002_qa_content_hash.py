@@ -0,0 +1,66 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:19
+
+import hashlib
+from datetime import timezone as dt_timezone
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def compute_content_hash(game_name, question, answer, created_at):
+    """BaseRuleQA.compute_content_hash와 동일 (마이그레이션은 현재 모델 코드에 의존하지 않음)"""
+    if django.utils.timezone.is_aware(created_at):
+        created_at = created_at.astimezone(dt_timezone.utc).replace(tzinfo=None)
+    source = '\x1f'.join([game_name, question, answer, created_at.isoformat(timespec='microseconds')])
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def backfill_content_hash(apps, schema_editor):
+    """기존 행의 content_hash 채우기 (1000행 단위, 완전히 같은 행이 또 있으면 비워 둠)"""
+    for model_name in ('GPTRuleQA', 'FinetuningRuleQA'):
+        model = apps.get_model('chatbot', model_name)
+        seen = set()
+        batch = []
+        queryset = model.objects.filter(content_hash__isnull=True).order_by('pk')
+        for qa in queryset.only('id', 'game_name', 'question', 'answer', 'created_at').iterator(chunk_size=1000):
+            content_hash = compute_content_hash(qa.game_name, qa.question, qa.answer, qa.created_at)
+            if content_hash in seen:
+                continue
+            seen.add(content_hash)
+            qa.content_hash = content_hash
+            batch.append(qa)
+            if len(batch) >= 1000:
+                model.objects.bulk_update(batch, ['content_hash'])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='finetuningruleqa',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True, verbose_name='내용 해시'),
+        ),
+        migrations.AddField(
+            model_name='gptruleqa',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True, verbose_name='내용 해시'),
+        ),
+        migrations.AlterField(
+            model_name='finetuningruleqa',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='생성 시간'),
+        ),
+        migrations.AlterField(
+            model_name='gptruleqa',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='생성 시간'),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
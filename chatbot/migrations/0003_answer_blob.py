@@ -0,0 +1,127 @@
+import zlib
+import hashlib
+from django.db import migrations, models, transaction
+import django.db.models.deletion
+import django.utils.timezone
+
+# 이 길이 이상인 기존 답변을 AnswerBlob으로 옮김 (settings.ANSWER_BLOB_MIN_LENGTH 기본값과 동일)
+MIN_LENGTH = 200
+CHUNK_SIZE = 1000
+QA_MODELS = ('GPTRuleQA', 'FinetuningRuleQA')
+
+
+def move_answers_to_blobs(apps, schema_editor):
+    """기존 긴 답변을 해시별로 한 번만 압축 저장하고 QA 행은 참조로 교체 (CHUNK_SIZE 행 단위)"""
+    AnswerBlob = apps.get_model('chatbot', 'AnswerBlob')
+    for model_name in QA_MODELS:
+        model = apps.get_model('chatbot', model_name)
+        last_pk = 0
+        while True:
+            chunk = list(
+                model.objects.filter(pk__gt=last_pk, answer_blob__isnull=True)
+                .order_by('pk').only('id', 'answer_inline')[:CHUNK_SIZE]
+            )
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+
+            long_answers = [qa for qa in chunk if len(qa.answer_inline) >= MIN_LENGTH]
+            if not long_answers:
+                continue
+
+            hashes = {}
+            blobs = []
+            for qa in long_answers:
+                text = qa.answer_inline
+                if text not in hashes:
+                    raw = text.encode('utf-8')
+                    hashes[text] = hashlib.sha256(raw).hexdigest()
+                    # 마이그레이션은 항상 zlib (zstandard 설치 여부와 무관하게 재현 가능)
+                    blobs.append(AnswerBlob(hash=hashes[text], codec='zlib', data=zlib.compress(raw, 6), size=len(raw)))
+            for qa in long_answers:
+                qa.answer_blob_id = hashes[qa.answer_inline]
+                qa.answer_inline = ''
+            # 청크마다 따로 커밋 - 중간에 멈춰도 다시 실행하면 남은 행부터 이어서 처리
+            with transaction.atomic():
+                AnswerBlob.objects.bulk_create(blobs, ignore_conflicts=True)
+                model.objects.bulk_update(long_answers, ['answer_blob', 'answer_inline'])
+
+
+def restore_inline_answers(apps, schema_editor):
+    """되돌리기: AnswerBlob 원문을 다시 QA 행에 풀어 넣음"""
+    AnswerBlob = apps.get_model('chatbot', 'AnswerBlob')
+    texts = {}
+    for model_name in QA_MODELS:
+        model = apps.get_model('chatbot', model_name)
+        last_pk = 0
+        while True:
+            chunk = list(
+                model.objects.filter(pk__gt=last_pk, answer_blob__isnull=False)
+                .order_by('pk').only('id', 'answer_blob')[:CHUNK_SIZE]
+            )
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            for qa in chunk:
+                if qa.answer_blob_id not in texts:
+                    blob = AnswerBlob.objects.get(pk=qa.answer_blob_id)
+                    if blob.codec != 'zlib':
+                        raise RuntimeError(f"zlib가 아닌 답변({blob.codec})은 자동으로 되돌릴 수 없습니다")
+                    texts[qa.answer_blob_id] = zlib.decompress(bytes(blob.data)).decode('utf-8')
+                qa.answer_inline = texts[qa.answer_blob_id]
+                qa.answer_blob_id = None
+            model.objects.bulk_update(chunk, ['answer_blob', 'answer_inline'])
+
+
+class Migration(migrations.Migration):
+    # 수백만 행을 하나의 트랜잭션으로 묶지 않도록 청크 단위로 커밋
+    atomic = False
+
+    dependencies = [
+        ('chatbot', '0002_qa_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerBlob',
+            fields=[
+                ('hash', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='해시')),
+                ('codec', models.CharField(max_length=10, verbose_name='압축 방식')),
+                ('data', models.BinaryField(verbose_name='압축 데이터')),
+                ('size', models.PositiveIntegerField(verbose_name='원문 크기(바이트)')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='생성 시간')),
+            ],
+            options={
+                'verbose_name': '답변 원문',
+                'verbose_name_plural': '답변 원문들',
+            },
+        ),
+        # answer -> answer_inline: 모델 상태만 바꾸고 DB 컬럼 이름(answer)은 그대로
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(model_name='gptruleqa', old_name='answer', new_name='answer_inline'),
+                migrations.RenameField(model_name='finetuningruleqa', old_name='answer', new_name='answer_inline'),
+                migrations.AlterField(
+                    model_name='gptruleqa',
+                    name='answer_inline',
+                    field=models.TextField(blank=True, db_column='answer', verbose_name='답변 내용'),
+                ),
+                migrations.AlterField(
+                    model_name='finetuningruleqa',
+                    name='answer_inline',
+                    field=models.TextField(blank=True, db_column='answer', verbose_name='답변 내용'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='gptruleqa',
+            name='answer_blob',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='chatbot.answerblob', verbose_name='답변 원문'),
+        ),
+        migrations.AddField(
+            model_name='finetuningruleqa',
+            name='answer_blob',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='chatbot.answerblob', verbose_name='답변 원문'),
+        ),
+        migrations.RunPython(move_answers_to_blobs, restore_inline_answers),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0003_answer_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedQACount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=20, verbose_name='QA 종류')),
+                ('game_name', models.CharField(max_length=100, verbose_name='게임 이름')),
+                ('month', models.DateField(verbose_name='월')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='보관된 질문 수')),
+            ],
+            options={
+                'verbose_name': '보관된 QA 집계',
+                'verbose_name_plural': '보관된 QA 집계들',
+                'ordering': ['-month', 'source', 'game_name'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='archivedqacount',
+            constraint=models.UniqueConstraint(fields=('source', 'game_name', 'month'), name='unique_archived_qa_count'),
+        ),
+    ]
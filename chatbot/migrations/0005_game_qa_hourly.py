@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:28
+
+from datetime import timedelta, timezone as dt_timezone
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+# 기간별 순위(최대 1주 + 비교용 직전 1주)에 필요한 만큼만 채움
+BACKFILL_HOURS = 24 * 14
+
+
+def backfill_hourly(apps, schema_editor):
+    """최근 QA로 시간별 집계 채우기"""
+    GameQAHourly = apps.get_model('chatbot', 'GameQAHourly')
+    since = timezone.now() - timedelta(hours=BACKFILL_HOURS)
+    for model_name, source in (('GPTRuleQA', 'gpt'), ('FinetuningRuleQA', 'finetuning')):
+        model = apps.get_model('chatbot', model_name)
+        rows = model.objects.filter(created_at__gte=since).annotate(
+            bucket=TruncHour('created_at', tzinfo=dt_timezone.utc)
+        ).values('game_name', 'bucket').annotate(question_count=Count('id')).order_by()
+        GameQAHourly.objects.bulk_create(
+            [
+                GameQAHourly(source=source, game_name=row['game_name'], hour=row['bucket'], count=row['question_count'])
+                for row in rows
+            ],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0004_archived_qa_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameQAHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=20, verbose_name='QA 종류')),
+                ('game_name', models.CharField(max_length=100, verbose_name='게임 이름')),
+                ('hour', models.DateTimeField(verbose_name='시간')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='질문 수')),
+            ],
+            options={
+                'verbose_name': '시간별 QA 집계',
+                'verbose_name_plural': '시간별 QA 집계들',
+                'ordering': ['-hour', 'source', 'game_name'],
+                'indexes': [models.Index(fields=['hour'], name='game_qa_hourly_hour_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='gameqahourly',
+            constraint=models.UniqueConstraint(fields=('source', 'game_name', 'hour'), name='unique_game_qa_hourly'),
+        ),
+        migrations.RunPython(backfill_hourly, migrations.RunPython.noop),
+    ]
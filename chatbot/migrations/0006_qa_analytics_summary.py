@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0005_game_qa_hourly'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QAAnswerLengthStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=20, verbose_name='QA 종류')),
+                ('day', models.DateField(verbose_name='날짜')),
+                ('bucket', models.PositiveIntegerField(verbose_name='길이 구간')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='답변 수')),
+            ],
+            options={
+                'verbose_name': '답변 길이 분포',
+                'verbose_name_plural': '답변 길이 분포들',
+                'ordering': ['-day', 'source', 'bucket'],
+            },
+        ),
+        migrations.CreateModel(
+            name='QADailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=20, verbose_name='QA 종류')),
+                ('game_name', models.CharField(max_length=100, verbose_name='게임 이름')),
+                ('day', models.DateField(verbose_name='날짜')),
+                ('question_count', models.PositiveIntegerField(default=0, verbose_name='질문 수')),
+                ('fallback_count', models.PositiveIntegerField(default=0, verbose_name='폴백 답변 수')),
+                ('answer_chars', models.PositiveBigIntegerField(default=0, verbose_name='답변 글자 수 합계')),
+            ],
+            options={
+                'verbose_name': '일별 QA 통계',
+                'verbose_name_plural': '일별 QA 통계들',
+                'ordering': ['-day', 'source', 'game_name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='QATopQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=20, verbose_name='QA 종류')),
+                ('game_name', models.CharField(max_length=100, verbose_name='게임 이름')),
+                ('question', models.TextField(verbose_name='질문 내용')),
+                ('count', models.PositiveIntegerField(verbose_name='질문 횟수')),
+            ],
+            options={
+                'verbose_name': '자주 묻는 질문 통계',
+                'verbose_name_plural': '자주 묻는 질문 통계들',
+                'ordering': ['-count'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='qadailystat',
+            constraint=models.UniqueConstraint(fields=('source', 'game_name', 'day'), name='unique_qa_daily_stat'),
+        ),
+        migrations.AddConstraint(
+            model_name='qaanswerlengthstat',
+            constraint=models.UniqueConstraint(fields=('source', 'day', 'bucket'), name='unique_qa_answer_length_stat'),
+        ),
+    ]
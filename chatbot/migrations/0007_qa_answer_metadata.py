@@ -0,0 +1,81 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0006_qa_analytics_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='finetuningruleqa',
+            name='answer_source',
+            field=models.CharField(blank=True, choices=[('backend', '백엔드'), ('cache', '캐시'), ('fallback', '폴백'), ('error', '오류')], db_index=True, max_length=10, verbose_name='답변 출처'),
+        ),
+        migrations.AddField(
+            model_name='finetuningruleqa',
+            name='completion_tokens',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='출력 토큰 수'),
+        ),
+        migrations.AddField(
+            model_name='finetuningruleqa',
+            name='latency_ms',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True, verbose_name='응답 시간(ms)'),
+        ),
+        migrations.AddField(
+            model_name='finetuningruleqa',
+            name='prompt_tokens',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='입력 토큰 수'),
+        ),
+        migrations.AddField(
+            model_name='finetuningruleqa',
+            name='response_size',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='응답 크기(바이트)'),
+        ),
+        migrations.AddField(
+            model_name='finetuningruleqa',
+            name='session_id',
+            field=models.CharField(blank=True, db_index=True, max_length=100, verbose_name='세션 ID'),
+        ),
+        migrations.AddField(
+            model_name='gptruleqa',
+            name='answer_source',
+            field=models.CharField(blank=True, choices=[('backend', '백엔드'), ('cache', '캐시'), ('fallback', '폴백'), ('error', '오류')], db_index=True, max_length=10, verbose_name='답변 출처'),
+        ),
+        migrations.AddField(
+            model_name='gptruleqa',
+            name='completion_tokens',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='출력 토큰 수'),
+        ),
+        migrations.AddField(
+            model_name='gptruleqa',
+            name='latency_ms',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True, verbose_name='응답 시간(ms)'),
+        ),
+        migrations.AddField(
+            model_name='gptruleqa',
+            name='prompt_tokens',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='입력 토큰 수'),
+        ),
+        migrations.AddField(
+            model_name='gptruleqa',
+            name='response_size',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='응답 크기(바이트)'),
+        ),
+        migrations.AddField(
+            model_name='gptruleqa',
+            name='session_id',
+            field=models.CharField(blank=True, db_index=True, max_length=100, verbose_name='세션 ID'),
+        ),
+        migrations.AddIndex(
+            model_name='finetuningruleqa',
+            index=models.Index(fields=['game_name', 'created_at'], name='finetuningruleqa_game_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gptruleqa',
+            index=models.Index(fields=['game_name', 'created_at'], name='gptruleqa_game_time_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0007_qa_answer_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RuleFAQ',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=20, verbose_name='QA 종류')),
+                ('game_name', models.CharField(max_length=100, verbose_name='게임 이름')),
+                ('normalized_question', models.CharField(max_length=255, verbose_name='정규화 질문')),
+                ('question', models.TextField(verbose_name='질문 내용')),
+                ('answer', models.TextField(verbose_name='답변 내용')),
+                ('ask_count', models.PositiveIntegerField(default=0, verbose_name='질문 횟수')),
+                ('rank', models.PositiveSmallIntegerField(default=0, verbose_name='순위')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='답변 생성 시간')),
+            ],
+            options={
+                'verbose_name': '자주 묻는 질문 답변',
+                'verbose_name_plural': '자주 묻는 질문 답변들',
+                'ordering': ['source', 'game_name', 'rank'],
+                'indexes': [models.Index(fields=['source', 'game_name', 'rank'], name='chatbot_rul_source_ad169f_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='rulefaq',
+            constraint=models.UniqueConstraint(fields=('source', 'game_name', 'normalized_question'), name='unique_rule_faq'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0008_rule_faq'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_id', models.CharField(max_length=100, unique=True, verbose_name='세션 ID')),
+                ('chat_type', models.CharField(max_length=20, verbose_name='채팅 타입')),
+                ('game_name', models.CharField(max_length=100, verbose_name='게임 이름')),
+                ('turn_count', models.PositiveIntegerField(default=0, verbose_name='턴 수')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성 시간')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='마지막 턴 시간')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='만료 시간')),
+            ],
+            options={
+                'verbose_name': '대화',
+                'verbose_name_plural': '대화들',
+                'ordering': ['-updated_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ConversationTurn',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('user', '사용자'), ('assistant', '챗봇'), ('summary', '룰 요약')], max_length=10, verbose_name='역할')),
+                ('game_name', models.CharField(max_length=100, verbose_name='게임 이름')),
+                ('codec', models.CharField(blank=True, max_length=10, verbose_name='압축 방식')),
+                ('data', models.BinaryField(verbose_name='내용')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='생성 시간')),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='turns', to='chatbot.conversation')),
+            ],
+            options={
+                'verbose_name': '대화 턴',
+                'verbose_name_plural': '대화 턴들',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['conversation', '-id'], name='conversation_turn_recent_idx')],
+            },
+        ),
+    ]
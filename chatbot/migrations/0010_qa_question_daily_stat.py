@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0009_conversation_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QAAggregation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=20, unique=True, verbose_name='QA 종류')),
+                ('aggregated_through', models.DateField(verbose_name='집계 기준일')),
+                ('aggregated_at', models.DateTimeField(verbose_name='집계 시각')),
+            ],
+            options={
+                'verbose_name': 'QA 집계 상태',
+                'verbose_name_plural': 'QA 집계 상태들',
+            },
+        ),
+        migrations.CreateModel(
+            name='QAQuestionDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=20, verbose_name='QA 종류')),
+                ('game_name', models.CharField(max_length=100, verbose_name='게임 이름')),
+                ('day', models.DateField(verbose_name='날짜')),
+                ('question_hash', models.CharField(max_length=40, verbose_name='질문 해시')),
+                ('question', models.TextField(verbose_name='질문 내용')),
+                ('count', models.PositiveIntegerField(verbose_name='질문 횟수')),
+            ],
+            options={
+                'verbose_name': '일별 질문 통계',
+                'verbose_name_plural': '일별 질문 통계들',
+                'ordering': ['-day', 'source', 'game_name'],
+                'indexes': [models.Index(fields=['source', 'day'], name='qa_question_daily_source_day')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='qaquestiondailystat',
+            constraint=models.UniqueConstraint(fields=('source', 'game_name', 'day', 'question_hash'), name='unique_qa_question_daily_stat'),
+        ),
+    ]
@@ -1,76 +1,548 @@
-from django.db import models
-from django.db.models import Count
+import zlib
+import hashlib
+from functools import lru_cache
+import logging
+from datetime import timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+try:
+    import zstandard
+except ImportError:  # zstd는 선택 기능 - 없으면 zlib로 압축
+    zstandard = None
+
+logger = logging.getLogger(__name__)
 
 # Create your models here.
-class GPTRuleQA(models.Model):
-    """GPT 룰 설명 질문답변 - 사용자가 질문하면 자동 저장"""
+class AnswerBlob(models.Model):
+    """답변 원문 저장소 - 같은 답변은 sha256 해시 하나로 한 번만 압축 저장"""
+    CODEC_ZLIB = 'zlib'
+    CODEC_ZSTD = 'zstd'
+    
+    hash = models.CharField('해시', max_length=64, primary_key=True)
+    codec = models.CharField('압축 방식', max_length=10)
+    data = models.BinaryField('압축 데이터')
+    size = models.PositiveIntegerField('원문 크기(바이트)')
+    created_at = models.DateTimeField('생성 시간', default=timezone.now, editable=False)
+    
+    class Meta:
+        verbose_name = '답변 원문'
+        verbose_name_plural = '답변 원문들'
+    
+    def __str__(self):
+        return f"{self.hash[:12]} ({self.codec}, {self.size}B -> {len(self.data)}B)"
+    
+    @property
+    def text(self):
+        return self.decode(self.codec, self.data)
+    
+    @staticmethod
+    def hash_text(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def encode(cls, text):
+        """텍스트 압축 - (codec, 바이트) 반환 (ANSWER_BLOB_CODEC: auto/zstd/zlib)"""
+        raw = text.encode('utf-8')
+        codec = getattr(settings, 'ANSWER_BLOB_CODEC', 'auto')
+        if codec == 'auto':
+            codec = cls.CODEC_ZSTD if zstandard is not None else cls.CODEC_ZLIB
+        if codec == cls.CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("ANSWER_BLOB_CODEC='zstd'에는 zstandard 패키지가 필요합니다")
+            return codec, zstandard.ZstdCompressor(level=10).compress(raw)
+        return cls.CODEC_ZLIB, zlib.compress(raw, 6)
+    
+    @classmethod
+    def decode(cls, codec, data):
+        data = bytes(data)  # PostgreSQL은 memoryview로 반환
+        if codec == cls.CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("zstd로 압축된 답변을 읽으려면 zstandard 패키지가 필요합니다")
+            return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+        return zlib.decompress(data).decode('utf-8')
+    
+    @classmethod
+    def store_many(cls, texts):
+        """여러 답변을 한 번에 저장 - {원문: 해시} 반환 (이미 있는 해시는 건너뜀)"""
+        hashes = {text: cls.hash_text(text) for text in set(texts)}
+        blobs = []
+        for text, blob_hash in hashes.items():
+            codec, data = cls.encode(text)
+            blobs.append(cls(hash=blob_hash, codec=codec, data=data, size=len(text.encode('utf-8'))))
+        cls.objects.bulk_create(blobs, batch_size=500, ignore_conflicts=True)
+        return hashes
+    
+    @classmethod
+    def store(cls, text):
+        return cls.store_many([text])[text]
+    
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def get_text(blob_hash):
+        """해시로 원문 조회 - 내용 주소 방식이라 값이 바뀌지 않으므로 프로세스 내 캐싱"""
+        blob = AnswerBlob.objects.only('codec', 'data').get(pk=blob_hash)
+        return blob.text
+
+
+# QA 답변 출처 - backend: Runpod 응답, cache: 캐시된 답변, fallback: 서버 장애 시 기본 답변, error: 오류 메시지
+ANSWER_SOURCE_CHOICES = [
+    ('backend', '백엔드'),
+    ('cache', '캐시'),
+    ('fallback', '폴백'),
+    ('error', '오류'),
+]
+
+
+class BaseRuleQA(models.Model):
+    """룰 설명 QA 공통 필드 (GPT/파인튜닝 테이블이 같은 구조를 가짐)"""
     # 번호 (PK, 오토인크리먼트) - Django가 자동으로 id 필드 생성
     game_name = models.CharField('게임 이름', max_length=100)
     question = models.TextField('질문 내용')
-    answer = models.TextField('답변 내용')
-    created_at = models.DateTimeField('생성 시간', auto_now_add=True)
+    # 짧은 답변은 그대로, 긴 답변은 AnswerBlob에 저장하고 여기는 비워 둠 (answer 속성으로 접근)
+    answer_inline = models.TextField('답변 내용', db_column='answer', blank=True)
+    answer_blob = models.ForeignKey(
+        AnswerBlob, verbose_name='답변 원문', null=True, blank=True,
+        on_delete=models.PROTECT, related_name='+', editable=False
+    )
+    # 가져오기/내보내기 시 원래 시각을 보존해야 하므로 auto_now_add 대신 default 사용
+    created_at = models.DateTimeField('생성 시간', default=timezone.now, editable=False)
+    # 중복 방지 키 - 같은 QA를 여러 번 가져와도 한 행만 남음 (qa_import 참고)
+    content_hash = models.CharField('내용 해시', max_length=64, unique=True, null=True, blank=True, editable=False)
+    # 답변 생성 메타데이터 (chat_api가 저장, 기존/가져온 행은 비어 있음) - 느린 게임·폴백 분석용
+    answer_source = models.CharField('답변 출처', max_length=10, choices=ANSWER_SOURCE_CHOICES, blank=True, db_index=True)
+    latency_ms = models.PositiveIntegerField('응답 시간(ms)', null=True, blank=True, db_index=True)
+    session_id = models.CharField('세션 ID', max_length=100, blank=True, db_index=True)
+    response_size = models.PositiveIntegerField('응답 크기(바이트)', null=True, blank=True)
+    prompt_tokens = models.PositiveIntegerField('입력 토큰 수', null=True, blank=True)
+    completion_tokens = models.PositiveIntegerField('출력 토큰 수', null=True, blank=True)
     
     class Meta:
-        verbose_name = 'GPT 룰 QA'
-        verbose_name_plural = 'GPT 룰 QA들'
-        ordering = ['-created_at']
+        abstract = True
+        indexes = [
+            # 게임별 기간 지연 시간 조회 (qa_latency_report)
+            models.Index(fields=['game_name', 'created_at'], name='%(class)s_game_time_idx'),
+        ]
     
     def __str__(self):
         return f"{self.id}: {self.game_name} - {self.question[:30]}"
     
+    @property
+    def answer(self):
+        """답변 원문 (AnswerBlob에 있으면 풀어서 반환)"""
+        if self.answer_blob_id is None:
+            return self.answer_inline
+        return AnswerBlob.get_text(self.answer_blob_id)
+    
+    @answer.setter
+    def answer(self, text):
+        self.answer_inline = text or ''
+        self.answer_blob = None
+    
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        self.prepare_for_bulk_create([self])
+        super().save(*args, **kwargs)
+        if adding:
+            # 실시간 순위용 시간별 집계 (bulk_create 경로는 GameQAHourly.rebuild 사용)
+            GameQAHourly.record(self.ARCHIVE_SOURCE, self.game_name, self.created_at)
+    
+    @classmethod
+    def prepare_for_bulk_create(cls, instances):
+        """content_hash 계산 + 긴 답변을 AnswerBlob으로 이동 (bulk_create는 save()를 거치지 않음)"""
+        min_length = getattr(settings, 'ANSWER_BLOB_MIN_LENGTH', 200)
+        long_answers = []
+        for qa in instances:
+            if not qa.content_hash:
+                qa.content_hash = cls.compute_content_hash(
+                    qa.game_name, qa.question, qa.answer, qa.created_at
+                )
+            if qa.answer_blob_id is None and len(qa.answer_inline) >= min_length:
+                long_answers.append(qa)
+        
+        if long_answers:
+            hashes = AnswerBlob.store_many(qa.answer_inline for qa in long_answers)
+            for qa in long_answers:
+                qa.answer_blob_id = hashes[qa.answer_inline]
+                qa.answer_inline = ''
+        return instances
+    
+    @staticmethod
+    def resolve_answer(answer_inline, answer_blob_id):
+        """values_list('answer_inline', 'answer_blob_id') 결과에서 답변 원문 얻기"""
+        if answer_blob_id is None:
+            return answer_inline
+        return AnswerBlob.get_text(answer_blob_id)
+    
+    @staticmethod
+    def compute_content_hash(game_name, question, answer, created_at):
+        """게임/질문/답변/생성 시각 기준 sha256 (DB 종류와 무관하게 같은 값)"""
+        if timezone.is_aware(created_at):
+            created_at = created_at.astimezone(dt_timezone.utc).replace(tzinfo=None)
+        source = '\x1f'.join([game_name, question, answer, created_at.isoformat(timespec='microseconds')])
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def get_game_counts(cls):
+        """게임별 질문 수 {게임: 개수} - 보관(archive_qa)된 행은 월별 집계로 합산"""
+        counts = {
+            item['game_name']: item['question_count']
+            for item in cls.objects.values('game_name').annotate(question_count=Count('id'))
+        }
+        archived = ArchivedQACount.objects.filter(source=cls.ARCHIVE_SOURCE).values('game_name').annotate(
+            archived_count=Sum('count')
+        )
+        for item in archived:
+            counts[item['game_name']] = counts.get(item['game_name'], 0) + item['archived_count']
+        return counts
+    
+    @classmethod
+    def get_total_count(cls):
+        """전체 질문 수 (보관된 행 포함)"""
+        archived = ArchivedQACount.objects.filter(source=cls.ARCHIVE_SOURCE).aggregate(total=Sum('count'))['total']
+        return cls.objects.count() + (archived or 0)
+    
     @classmethod
     def get_game_rankings(cls, limit=10):
         """게임별 질문 수 순위를 반환"""
-        return cls.objects.values('game_name').annotate(
-            question_count=Count('id')
-        ).order_by('-question_count')[:limit]
+        rankings = [
+            {'game_name': game, 'question_count': count}
+            for game, count in cls.get_game_counts().items()
+        ]
+        rankings.sort(key=lambda x: x['question_count'], reverse=True)
+        return rankings[:limit]
+
+
+class GPTRuleQA(BaseRuleQA):
+    """GPT 룰 설명 질문답변 - 사용자가 질문하면 자동 저장"""
+    ARCHIVE_SOURCE = 'gpt'
+    
+    class Meta(BaseRuleQA.Meta):
+        verbose_name = 'GPT 룰 QA'
+        verbose_name_plural = 'GPT 룰 QA들'
+        ordering = ['-created_at']
 
 
-class FinetuningRuleQA(models.Model):
+class FinetuningRuleQA(BaseRuleQA):
     """파인튜닝 룰 설명 질문답변 - 사용자가 질문하면 자동 저장"""
-    # 번호 (PK, 오토인크리먼트) - Django가 자동으로 id 필드 생성
+    ARCHIVE_SOURCE = 'finetuning'
+    
+    class Meta(BaseRuleQA.Meta):
+        verbose_name = '파인튜닝 룰 QA'
+        verbose_name_plural = '파인튜닝 룰 QA들'
+        ordering = ['-created_at']
+
+
+class ArchivedQACount(models.Model):
+    """보관된 QA의 게임별·월별 개수 - 원본 행을 옮긴 뒤에도 순위/통계가 유지되도록"""
+    source = models.CharField('QA 종류', max_length=20)  # gpt / finetuning
+    game_name = models.CharField('게임 이름', max_length=100)
+    month = models.DateField('월')  # 해당 월 1일 (UTC 기준)
+    count = models.PositiveIntegerField('보관된 질문 수', default=0)
+    
+    class Meta:
+        verbose_name = '보관된 QA 집계'
+        verbose_name_plural = '보관된 QA 집계들'
+        ordering = ['-month', 'source', 'game_name']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'game_name', 'month'], name='unique_archived_qa_count'),
+        ]
+    
+    def __str__(self):
+        return f"{self.source} {self.month:%Y-%m} {self.game_name}: {self.count}"
+
+
+class GameQAHourly(models.Model):
+    """게임별·시간별 질문 수 - 최근 1시간/1일/1주 순위를 버킷 합으로 계산 (QA 저장 시 증가)"""
+    source = models.CharField('QA 종류', max_length=20)  # gpt / finetuning
+    game_name = models.CharField('게임 이름', max_length=100)
+    hour = models.DateTimeField('시간')  # 정시 (UTC 기준)
+    count = models.PositiveIntegerField('질문 수', default=0)
+    
+    class Meta:
+        verbose_name = '시간별 QA 집계'
+        verbose_name_plural = '시간별 QA 집계들'
+        ordering = ['-hour', 'source', 'game_name']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'game_name', 'hour'], name='unique_game_qa_hourly'),
+        ]
+        indexes = [
+            models.Index(fields=['hour'], name='game_qa_hourly_hour_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.source} {self.hour:%Y-%m-%d %H}시 {self.game_name}: {self.count}"
+    
+    @staticmethod
+    def truncate_hour(value):
+        """시각이 속한 정시 (UTC 기준)"""
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value, dt_timezone.utc)
+        return value.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    
+    @classmethod
+    def record(cls, source, game_name, created_at, count=1):
+        """버킷 하나 증가 - 집계 실패가 QA 저장을 막지 않도록 오류는 로그만 남김"""
+        hour = cls.truncate_hour(created_at)
+        try:
+            updated = cls.objects.filter(source=source, game_name=game_name, hour=hour).update(
+                count=F('count') + count
+            )
+            if updated:
+                return
+            try:
+                with transaction.atomic():
+                    cls.objects.create(source=source, game_name=game_name, hour=hour, count=count)
+            except IntegrityError:
+                # 다른 워커가 같은 버킷을 먼저 만든 경우
+                cls.objects.filter(source=source, game_name=game_name, hour=hour).update(count=F('count') + count)
+        except DatabaseError as e:
+            logger.warning(f"⚠️ 시간별 QA 집계 실패 ({source}, {game_name}): {e}")
+    
+    @classmethod
+    def rebuild(cls, since):
+        """since 이후 버킷을 원본 QA에서 다시 계산 (일괄 가져오기 후 / 누락 복구용) - 저장한 버킷 수 반환"""
+        from django.db.models.functions import TruncHour
+        
+        since = cls.truncate_hour(since)
+        buckets = []
+        for model in (GPTRuleQA, FinetuningRuleQA):
+            rows = model.objects.filter(created_at__gte=since).annotate(
+                bucket=TruncHour('created_at', tzinfo=dt_timezone.utc)
+            ).values('game_name', 'bucket').annotate(question_count=Count('id')).order_by()
+            buckets.extend(
+                cls(source=model.ARCHIVE_SOURCE, game_name=row['game_name'],
+                    hour=row['bucket'], count=row['question_count'])
+                for row in rows
+            )
+        with transaction.atomic():
+            cls.objects.filter(hour__gte=since).delete()
+            cls.objects.bulk_create(buckets, batch_size=500)
+        return len(buckets)
+    
+    @classmethod
+    def prune(cls, keep_hours):
+        """keep_hours보다 오래된 버킷 삭제 - 삭제한 행 수 반환"""
+        cutoff = cls.truncate_hour(timezone.now()) - timedelta(hours=keep_hours)
+        deleted, _ = cls.objects.filter(hour__lt=cutoff).delete()
+        return deleted
+    
+    @classmethod
+    def get_window_counts(cls, start, end, source=None):
+        """[start, end) 구간 게임별 질문 수 {게임: 개수} - 버킷 수 × 게임 수만 읽음"""
+        queryset = cls.objects.filter(hour__gte=start, hour__lt=end)
+        if source:
+            queryset = queryset.filter(source=source)
+        return {
+            item['game_name']: item['question_count']
+            for item in queryset.values('game_name').annotate(question_count=Sum('count')).order_by()
+        }
+
+
+class QADailyStat(models.Model):
+    """게임별·일별 QA 요약 (aggregate_qa_stats 명령이 갱신, 분석 API는 이 테이블만 읽음)"""
+    source = models.CharField('QA 종류', max_length=20)  # gpt / finetuning
+    game_name = models.CharField('게임 이름', max_length=100)
+    day = models.DateField('날짜')  # UTC 기준
+    question_count = models.PositiveIntegerField('질문 수', default=0)
+    fallback_count = models.PositiveIntegerField('폴백 답변 수', default=0)
+    answer_chars = models.PositiveBigIntegerField('답변 글자 수 합계', default=0)
+    
+    class Meta:
+        verbose_name = '일별 QA 통계'
+        verbose_name_plural = '일별 QA 통계들'
+        ordering = ['-day', 'source', 'game_name']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'game_name', 'day'], name='unique_qa_daily_stat'),
+        ]
+    
+    def __str__(self):
+        return f"{self.source} {self.day} {self.game_name}: {self.question_count}"
+
+
+class QAAnswerLengthStat(models.Model):
+    """일별 답변 길이 분포 - bucket은 구간 하한(글자 수, QA_ANALYTICS_LENGTH_BUCKETS)"""
+    source = models.CharField('QA 종류', max_length=20)
+    day = models.DateField('날짜')
+    bucket = models.PositiveIntegerField('길이 구간')
+    count = models.PositiveIntegerField('답변 수', default=0)
+    
+    class Meta:
+        verbose_name = '답변 길이 분포'
+        verbose_name_plural = '답변 길이 분포들'
+        ordering = ['-day', 'source', 'bucket']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'day', 'bucket'], name='unique_qa_answer_length_stat'),
+        ]
+    
+    def __str__(self):
+        return f"{self.source} {self.day} {self.bucket}자~: {self.count}"
+
+
+class QAQuestionDailyStat(models.Model):
+    """게임별·일별 질문 원문 횟수 - 반복 질문/자주 묻는 질문은 원본 QA 대신 이 테이블을 합산"""
+    source = models.CharField('QA 종류', max_length=20)
+    game_name = models.CharField('게임 이름', max_length=100)
+    day = models.DateField('날짜')  # UTC 기준
+    question_hash = models.CharField('질문 해시', max_length=40)  # 질문 원문 sha1 (TextField는 유니크 제약에 못 씀)
+    question = models.TextField('질문 내용')
+    count = models.PositiveIntegerField('질문 횟수')
+    
+    class Meta:
+        verbose_name = '일별 질문 통계'
+        verbose_name_plural = '일별 질문 통계들'
+        ordering = ['-day', 'source', 'game_name']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'game_name', 'day', 'question_hash'], name='unique_qa_question_daily_stat'),
+        ]
+        indexes = [
+            models.Index(fields=['source', 'day'], name='qa_question_daily_source_day'),
+        ]
+    
+    def __str__(self):
+        return f"{self.source} {self.day} {self.game_name}: {self.question[:30]} ({self.count})"
+
+
+class QAAggregation(models.Model):
+    """QA 종류별 마지막 집계 - aggregated_through 이전 날짜는 요약 테이블이 완전함
+
+    aggregated_at은 분석 API 버전(ETag/Last-Modified)이라 캐시가 아닌 DB에 두고 항상 앞으로만 간다.
+    """
+    source = models.CharField('QA 종류', max_length=20, unique=True)
+    aggregated_through = models.DateField('집계 기준일')  # 이 날짜부터는 다음 집계에서 다시 계산
+    aggregated_at = models.DateTimeField('집계 시각')
+    
+    class Meta:
+        verbose_name = 'QA 집계 상태'
+        verbose_name_plural = 'QA 집계 상태들'
+    
+    def __str__(self):
+        return f"{self.source}: {self.aggregated_through} ({self.aggregated_at})"
+
+
+class QATopQuestion(models.Model):
+    """자주 반복되는 질문 (집계 때마다 일별 질문 통계에서 다시 계산해 교체)"""
+    source = models.CharField('QA 종류', max_length=20)
     game_name = models.CharField('게임 이름', max_length=100)
     question = models.TextField('질문 내용')
+    count = models.PositiveIntegerField('질문 횟수')
+    
+    class Meta:
+        verbose_name = '자주 묻는 질문 통계'
+        verbose_name_plural = '자주 묻는 질문 통계들'
+        ordering = ['-count']
+    
+    def __str__(self):
+        return f"{self.source} {self.game_name}: {self.question[:30]} ({self.count})"
+
+
+class RuleFAQ(models.Model):
+    """게임별 자주 묻는 질문과 미리 만든 답변 (build_faqs 명령이 매일 갱신, 추천 질문 칩으로 표시)"""
+    source = models.CharField('QA 종류', max_length=20)  # gpt / finetuning
+    game_name = models.CharField('게임 이름', max_length=100)
+    normalized_question = models.CharField('정규화 질문', max_length=255)  # normalize_question 결과
+    question = models.TextField('질문 내용')  # 가장 많이 쓰인 원문 (칩에 표시)
     answer = models.TextField('답변 내용')
+    ask_count = models.PositiveIntegerField('질문 횟수', default=0)
+    rank = models.PositiveSmallIntegerField('순위', default=0)
+    updated_at = models.DateTimeField('답변 생성 시간', auto_now=True)
+    
+    class Meta:
+        verbose_name = '자주 묻는 질문 답변'
+        verbose_name_plural = '자주 묻는 질문 답변들'
+        ordering = ['source', 'game_name', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'game_name', 'normalized_question'], name='unique_rule_faq'),
+        ]
+        indexes = [
+            models.Index(fields=['source', 'game_name', 'rank']),
+        ]
+    
+    def __str__(self):
+        return f"{self.source} {self.game_name}: {self.question[:30]}"
+
+
+class Conversation(models.Model):
+    """룰 설명 대화 - 브라우저 세션 ID별 한 행 (새로고침 복원, 다른 파드로 세션 옮기기용)
+
+    턴은 ConversationTurn에 추가만 하고, 만료(expires_at)는 턴을 추가할 때마다 늘어난다.
+    백엔드가 새 session_id를 주면 이 행의 session_id만 바꾸므로 턴은 그대로 이어진다.
+    """
+    session_id = models.CharField('세션 ID', max_length=100, unique=True)
+    chat_type = models.CharField('채팅 타입', max_length=20)  # gpt_rules / finetuning_rules
+    game_name = models.CharField('게임 이름', max_length=100)  # 마지막으로 질문한 게임
+    turn_count = models.PositiveIntegerField('턴 수', default=0)
     created_at = models.DateTimeField('생성 시간', auto_now_add=True)
+    updated_at = models.DateTimeField('마지막 턴 시간', auto_now=True)
+    expires_at = models.DateTimeField('만료 시간', db_index=True)
     
     class Meta:
-        verbose_name = '파인튜닝 룰 QA'
-        verbose_name_plural = '파인튜닝 룰 QA들'
-        ordering = ['-created_at']
+        verbose_name = '대화'
+        verbose_name_plural = '대화들'
+        ordering = ['-updated_at']
     
     def __str__(self):
-        return f"{self.id}: {self.game_name} - {self.question[:30]}"
+        return f"{self.session_id[:8]} {self.game_name} ({self.turn_count}턴)"
+
+
+class ConversationTurn(models.Model):
+    """대화 한 턴 (추가 전용) - 긴 내용은 AnswerBlob과 같은 방식으로 압축 (codec이 비어 있으면 UTF-8 원문)"""
+    ROLE_CHOICES = [
+        ('user', '사용자'),
+        ('assistant', '챗봇'),
+        ('summary', '룰 요약'),
+    ]
     
-    @classmethod
-    def get_game_rankings(cls, limit=10):
-        """게임별 질문 수 순위를 반환"""
-        return cls.objects.values('game_name').annotate(
-            question_count=Count('id')
-        ).order_by('-question_count')[:limit]
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='turns')
+    role = models.CharField('역할', max_length=10, choices=ROLE_CHOICES)
+    game_name = models.CharField('게임 이름', max_length=100)
+    codec = models.CharField('압축 방식', max_length=10, blank=True)
+    data = models.BinaryField('내용')
+    created_at = models.DateTimeField('생성 시간', default=timezone.now, editable=False)
+    
+    class Meta:
+        verbose_name = '대화 턴'
+        verbose_name_plural = '대화 턴들'
+        ordering = ['id']
+        indexes = [
+            # 대화별 최근 턴 조회 (복원 API)
+            models.Index(fields=['conversation', '-id'], name='conversation_turn_recent_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.conversation_id} {self.role}: {self.text[:30]}"
+    
+    @property
+    def text(self):
+        if not self.codec:
+            return bytes(self.data).decode('utf-8')
+        return AnswerBlob.decode(self.codec, self.data)
+    
+    @text.setter
+    def text(self, value):
+        """CONVERSATION_COMPRESS_MIN_BYTES 이상이고 압축해서 작아질 때만 압축"""
+        raw = (value or '').encode('utf-8')
+        if len(raw) >= getattr(settings, 'CONVERSATION_COMPRESS_MIN_BYTES', 256):
+            codec, data = AnswerBlob.encode(value)
+            if len(data) < len(raw):
+                self.codec, self.data = codec, data
+                return
+        self.codec, self.data = '', raw
 
 
 # 통합 게임 순위 조회 함수
 def get_combined_game_rankings(limit=10):
     """GPT와 파인튜닝 QA를 합쳐서 게임별 질문 수 순위를 반환"""
-    from django.db.models import Value
-    from django.db.models.functions import Coalesce
     
-    # GPT QA에서 게임별 질문 수
-    gpt_rankings = GPTRuleQA.objects.values('game_name').annotate(
-        gpt_count=Count('id')
-    )
-    
-    # 파인튜닝 QA에서 게임별 질문 수  
-    ft_rankings = FinetuningRuleQA.objects.values('game_name').annotate(
-        ft_count=Count('id')
-    )
+    # 게임별 질문 수 (보관된 행 포함)
+    gpt_data = GPTRuleQA.get_game_counts()
+    ft_data = FinetuningRuleQA.get_game_counts()
     
     # 모든 게임 이름 수집
     all_games = set()
-    gpt_data = {item['game_name']: item['gpt_count'] for item in gpt_rankings}
-    ft_data = {item['game_name']: item['ft_count'] for item in ft_rankings}
-    
     all_games.update(gpt_data.keys())
     all_games.update(ft_data.keys())
     
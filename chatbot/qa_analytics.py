@@ -0,0 +1,267 @@
+"""QA 분석 요약 (aggregate_qa_stats 명령과 분석 API 공용)
+
+무거운 GROUP BY와 답변 원문 읽기는 주기 실행하는 집계 작업에서만 하고, 결과를
+요약 테이블(QADailyStat, QAAnswerLengthStat, QAQuestionDailyStat, QATopQuestion)에 저장한다.
+집계는 QA 종류별 마지막 집계 기준일(QAAggregation)부터만 원본을 읽는다. API는 요약
+테이블만 읽고 집계 버전별로 캐싱하므로 요청 시간에는 원본 QA 테이블을 건드리지 않는다.
+"""
+import re
+import math
+import hashlib
+import bisect
+import unicodedata
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+from .finetune_dataset import is_fallback_answer
+from .models import QADailyStat, QAAnswerLengthStat, QAAggregation, QAQuestionDailyStat, QATopQuestion
+from .qa_io import QA_MODELS
+
+# 한 번도 집계하지 않았을 때의 버전
+INITIAL_VERSION = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# 질문 비교 시 무시하는 문자 (띄어쓰기는 사람마다 달라서 모두 제거)
+QUESTION_IGNORED_CHARS = re.compile(r'[\s?!.,~…"\'()\[\]]+')
+
+
+def normalize_question(question):
+    """같은 질문 판별용 정규화 - '몇 명이서 해요?'와 '몇명이서 해요'를 같은 질문으로"""
+    return QUESTION_IGNORED_CHARS.sub('', unicodedata.normalize('NFKC', question or '').lower())
+
+
+def question_hash(question):
+    return hashlib.sha1(question.encode('utf-8')).hexdigest()
+
+
+def frequent_questions(qa_type, since, limit, min_count=1, game_name=None, scan_limit=None):
+    """게임별 자주 묻는 질문 {게임: [(정규화 질문, 대표 원문, 횟수)]} - 정규화가 같은 질문은 합쳐서 셈
+
+    집계가 끝난 날짜는 일별 질문 통계(일 단위)에서, 그 이후만 원본 QA에서 센다.
+    대표 원문은 가장 많이 쓰인 표현. scan_limit을 주면 (게임, 원문) 묶음을 많은 순으로 그만큼만 읽는다.
+    """
+    rows = []
+    raw_since = since
+    state = QAAggregation.objects.filter(source=qa_type).first()
+    if state is not None and day_start(state.aggregated_through) > since:
+        summary = QAQuestionDailyStat.objects.filter(
+            source=qa_type, day__gte=since.astimezone(dt_timezone.utc).date(), day__lt=state.aggregated_through
+        )
+        if game_name is not None:
+            summary = summary.filter(game_name=game_name)
+        summary = summary.values('game_name', 'question_hash').annotate(
+            text=Max('question'), question_count=Sum('count')
+        ).order_by('-question_count')
+        rows.extend((row['game_name'], row['text'], row['question_count']) for row in summary[:scan_limit])
+        raw_since = day_start(state.aggregated_through)
+
+    queryset = QA_MODELS[qa_type].objects.filter(created_at__gte=raw_since)
+    if game_name is not None:
+        queryset = queryset.filter(game_name=game_name)
+    raw = queryset.values('game_name', 'question').annotate(question_count=Count('id')).order_by('-question_count')
+    rows.extend((row['game_name'], row['question'], row['question_count']) for row in raw[:scan_limit])
+
+    counts = defaultdict(Counter)
+    display = defaultdict(dict)
+    for game, question, count in sorted(rows, key=lambda row: -row[2]):
+        key = normalize_question(question)
+        if not key:
+            continue
+        counts[game][key] += count
+        display[game].setdefault(key, question.strip())
+    return {
+        game: [(key, display[game][key], count) for key, count in counter.most_common(limit) if count >= min_count]
+        for game, counter in counts.items()
+    }
+
+def get_length_buckets():
+    return sorted(getattr(settings, 'QA_ANALYTICS_LENGTH_BUCKETS', [0, 100, 200, 500, 1000, 2000]))
+
+
+def latency_percentiles(queryset, percentiles):
+    """latency_ms 백분위 {p: ms} (nearest-rank) - 값을 모두 읽지 않고 인덱스 정렬 + OFFSET으로 한 행씩 조회"""
+    queryset = queryset.filter(latency_ms__isnull=False)
+    total = queryset.count()
+    if not total:
+        return {}, 0
+    ordered = queryset.order_by('latency_ms').values_list('latency_ms', flat=True)
+    result = {}
+    for p in percentiles:
+        rank = max(math.ceil(p / 100 * total), 1)
+        result[p] = ordered[rank - 1]
+    return result, total
+
+
+def day_start(day):
+    return datetime(day.year, day.month, day.day, tzinfo=dt_timezone.utc)
+
+
+def aggregate_daily(qa_type, since_day, batch_size=2000):
+    """since_day(UTC) 이후 일별 통계를 다시 계산해 교체 - 저장한 (일별 행, 길이 분포 행, 질문 행) 수 반환"""
+    model = QA_MODELS[qa_type]
+    buckets = get_length_buckets()
+    daily = defaultdict(lambda: [0, 0, 0])  # (게임, 날짜) -> [질문 수, 폴백 수, 답변 글자 수]
+    lengths = Counter()  # (날짜, 구간) -> 개수
+    questions = Counter()  # (게임, 날짜, 질문 원문) -> 개수
+
+    rows = model.objects.filter(created_at__gte=day_start(since_day)).order_by().values_list(
+        'game_name', 'question', 'answer_inline', 'answer_blob_id', 'created_at', 'answer_source'
+    ).iterator(chunk_size=batch_size)
+    for game_name, question, answer_inline, answer_blob_id, created_at, answer_source in rows:
+        answer = model.resolve_answer(answer_inline, answer_blob_id)
+        day = created_at.astimezone(dt_timezone.utc).date()
+        stat = daily[(game_name, day)]
+        stat[0] += 1
+        stat[1] += is_fallback_answer(answer, answer_source)
+        stat[2] += len(answer)
+        lengths[(day, buckets[max(bisect.bisect_right(buckets, len(answer)) - 1, 0)])] += 1
+        questions[(game_name, day, question)] += 1
+
+    with transaction.atomic():
+        QADailyStat.objects.filter(source=qa_type, day__gte=since_day).delete()
+        QAAnswerLengthStat.objects.filter(source=qa_type, day__gte=since_day).delete()
+        QAQuestionDailyStat.objects.filter(source=qa_type, day__gte=since_day).delete()
+        QADailyStat.objects.bulk_create(
+            [
+                QADailyStat(source=qa_type, game_name=game_name, day=day, question_count=count,
+                            fallback_count=fallback, answer_chars=chars)
+                for (game_name, day), (count, fallback, chars) in daily.items()
+            ],
+            batch_size=500,
+        )
+        QAAnswerLengthStat.objects.bulk_create(
+            [
+                QAAnswerLengthStat(source=qa_type, day=day, bucket=bucket, count=count)
+                for (day, bucket), count in lengths.items()
+            ],
+            batch_size=500,
+        )
+        QAQuestionDailyStat.objects.bulk_create(
+            [
+                QAQuestionDailyStat(source=qa_type, game_name=game_name, day=day,
+                                    question_hash=question_hash(question), question=question, count=count)
+                for (game_name, day, question), count in questions.items()
+            ],
+            batch_size=500,
+        )
+    return len(daily), len(lengths), len(questions)
+
+
+def aggregate_top_questions(qa_type, limit):
+    """같은 게임에서 똑같이 반복된 질문 상위 limit개로 교체 (일별 질문 통계 합산) - 저장한 행 수 반환"""
+    top = QAQuestionDailyStat.objects.filter(source=qa_type).values('game_name', 'question_hash').annotate(
+        text=Max('question'), question_count=Sum('count')
+    ).filter(question_count__gte=2).order_by('-question_count')[:limit]
+    rows = [
+        QATopQuestion(source=qa_type, game_name=item['game_name'], question=item['text'],
+                      count=item['question_count'])
+        for item in top
+    ]
+    with transaction.atomic():
+        QATopQuestion.objects.filter(source=qa_type).delete()
+        QATopQuestion.objects.bulk_create(rows)
+    return len(rows)
+
+
+def next_aggregation_day(qa_type, window_start):
+    """다시 계산할 첫 날 - 마지막 집계 기준일부터 (cron이 며칠 멈췄어도 빠짐없이), 처음이면 None (전체)"""
+    state = QAAggregation.objects.filter(source=qa_type).first()
+    if state is None:
+        return None
+    return min(window_start, state.aggregated_through)
+
+
+def mark_aggregated(qa_type, through_day):
+    """집계 완료 기록 - 분석 API 버전이 되므로 같은 초에 다시 집계해도 이전 버전보다 뒤로 (항상 증가)"""
+    aggregated_at = timezone.now().replace(microsecond=0)
+    latest = QAAggregation.objects.aggregate(latest=Max('aggregated_at'))['latest']
+    if latest is not None and aggregated_at <= latest:
+        aggregated_at = latest + timedelta(seconds=1)
+    QAAggregation.objects.update_or_create(
+        source=qa_type, defaults={'aggregated_through': through_day, 'aggregated_at': aggregated_at}
+    )
+    return aggregated_at.astimezone(dt_timezone.utc).isoformat(timespec='seconds')
+
+
+def get_version():
+    """분석 결과 버전 (마지막 집계 시각) - 워커마다 다르지 않도록 캐시가 아닌 DB에서 읽음 (종류별 한 행)"""
+    latest = QAAggregation.objects.aggregate(latest=Max('aggregated_at'))['latest']
+    return (latest or INITIAL_VERSION).astimezone(dt_timezone.utc).isoformat(timespec='seconds')
+
+
+def build_report(days, source='all'):
+    """분석 API 응답 - 요약 테이블만 읽음 (집계 버전 + 파라미터별로 캐싱)"""
+    version = get_version()
+    cache_key = f"qa_analytics:{version}:{source}:{days}"
+    report = cache.get(cache_key)
+    if report is not None:
+        return report
+
+    start_day = timezone.now().astimezone(dt_timezone.utc).date() - timedelta(days=days - 1)
+    daily_qs = QADailyStat.objects.filter(day__gte=start_day)
+    length_qs = QAAnswerLengthStat.objects.filter(day__gte=start_day)
+    top_qs = QATopQuestion.objects.all()
+    if source != 'all':
+        daily_qs = daily_qs.filter(source=source)
+        length_qs = length_qs.filter(source=source)
+        top_qs = top_qs.filter(source=source)
+
+    per_day = [
+        {'day': item['day'].isoformat(), 'game_name': item['game_name'], 'count': item['total']}
+        for item in daily_qs.values('day', 'game_name').annotate(total=Sum('question_count')).order_by('day', 'game_name')
+    ]
+
+    games = []
+    total_questions = total_fallbacks = 0
+    per_game = daily_qs.values('game_name').annotate(
+        total=Sum('question_count'), fallbacks=Sum('fallback_count'), chars=Sum('answer_chars')
+    ).order_by('-total')
+    for item in per_game:
+        total_questions += item['total']
+        total_fallbacks += item['fallbacks']
+        games.append({
+            'game_name': item['game_name'],
+            'count': item['total'],
+            'fallback_count': item['fallbacks'],
+            'fallback_ratio': round(item['fallbacks'] / item['total'], 4) if item['total'] else 0,
+            'avg_answer_length': round(item['chars'] / item['total']) if item['total'] else 0,
+        })
+
+    buckets = get_length_buckets()
+    length_counts = dict(length_qs.values_list('bucket').annotate(total=Sum('count')).order_by())
+    length_distribution = [
+        {
+            'min': bucket,
+            'max': buckets[i + 1] - 1 if i + 1 < len(buckets) else None,
+            'count': length_counts.get(bucket, 0),
+        }
+        for i, bucket in enumerate(buckets)
+    ]
+
+    # GPT/파인튜닝에 같은 질문이 있으면 합산
+    top_counter = Counter()
+    for game_name, question, count in top_qs.values_list('game_name', 'question', 'count'):
+        top_counter[(game_name, question)] += count
+    limit = getattr(settings, 'QA_ANALYTICS_TOP_QUESTIONS', 20)
+    top_questions = [
+        {'game_name': game_name, 'question': question, 'count': count}
+        for (game_name, question), count in top_counter.most_common(limit)
+    ]
+
+    report = {
+        'days': days,
+        'source': source,
+        'start_day': start_day.isoformat(),
+        'aggregated_at': version,
+        'total_questions': total_questions,
+        'fallback_ratio': round(total_fallbacks / total_questions, 4) if total_questions else 0,
+        'per_day': per_day,
+        'games': games,
+        'length_distribution': length_distribution,
+        'top_questions': top_questions,
+    }
+    cache.set(cache_key, report, getattr(settings, 'QA_ANALYTICS_CACHE_TIMEOUT', 300))
+    return report
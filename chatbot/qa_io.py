@@ -0,0 +1,176 @@
+"""QA 데이터 스트리밍 입출력 (qa_import / qa_export 명령 공용)
+
+JSONL, CSV, Parquet 파일을 한 행씩(또는 배치 단위로) 읽고 써서 파일 크기와 무관하게
+메모리 사용량이 일정하다. 경로가 .gz로 끝나면 gzip으로 압축/해제한다.
+"""
+import io
+import csv
+import sys
+import gzip
+import json
+from datetime import timezone as dt_timezone
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import GPTRuleQA, FinetuningRuleQA
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet은 선택 기능 (pip install pyarrow)
+    pa = None
+    pq = None
+
+# 파일의 type 값 -> 모델
+QA_MODELS = {
+    'gpt': GPTRuleQA,
+    'finetuning': FinetuningRuleQA,
+}
+
+FIELDS = ['type', 'game_name', 'question', 'answer', 'created_at', 'content_hash']
+FORMATS = ['jsonl', 'csv', 'parquet']
+
+# 답변이 긴 CSV 행도 읽을 수 있도록 필드 크기 제한 완화
+csv.field_size_limit(2 ** 31 - 1)
+
+
+def detect_format(path, fmt=None):
+    """명시한 포맷이 없으면 확장자로 판단 (.jsonl, .csv, .parquet, 각각 .gz 허용)"""
+    if fmt:
+        return fmt
+    if path == '-':
+        return 'jsonl'
+    name = path[:-3] if path.endswith('.gz') else path
+    for candidate, extensions in (('jsonl', ('.jsonl', '.ndjson', '.json')),
+                                  ('csv', ('.csv',)),
+                                  ('parquet', ('.parquet',))):
+        if name.endswith(extensions):
+            return candidate
+    raise ValueError(f"파일 포맷을 알 수 없습니다: {path} (--format으로 지정하세요)")
+
+
+def require_parquet():
+    if pq is None:
+        raise ValueError("Parquet 입출력에는 pyarrow가 필요합니다 (pip install pyarrow)")
+
+
+def open_text(path, mode):
+    """텍스트 스트림 열기 ('-'는 표준 입출력, .gz는 gzip)"""
+    if path == '-':
+        stream = sys.stdin.buffer if mode == 'r' else sys.stdout.buffer
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def iter_rows(path, fmt, batch_size=1000):
+    """파일의 행을 하나씩 반환 - JSONL은 줄 문자열 그대로 (parse_row로 행마다 파싱해야 잘못된 줄만 건너뛸 수 있음)"""
+    if fmt == 'jsonl':
+        with open_text(path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+    elif fmt == 'csv':
+        with open_text(path, 'r') as f:
+            yield from csv.DictReader(f)
+    elif fmt == 'parquet':
+        require_parquet()
+        parquet_file = pq.ParquetFile(path)
+        for record_batch in parquet_file.iter_batches(batch_size=batch_size):
+            yield from record_batch.to_pylist()
+    else:
+        raise ValueError(f"지원하지 않는 포맷: {fmt}")
+
+
+def parse_row(row):
+    """iter_rows 값 -> dict (JSON 형식 오류는 ValueError)"""
+    if isinstance(row, str):
+        row = json.loads(row)
+        if not isinstance(row, dict):
+            raise ValueError("JSON 객체가 아닙니다")
+    return row
+
+
+def parse_created_at(value):
+    """created_at 값을 aware datetime으로 - 빈 값은 ValueError
+
+    content_hash에 생성 시각이 들어가므로 현재 시각으로 채우면 같은 파일을 다시 가져올 때마다 중복 행이 생긴다.
+    """
+    if not value:
+        raise ValueError("created_at이 없습니다 (중복 판정에 필요)")
+    if isinstance(value, str):
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(f"created_at 형식 오류: {value}")
+        value = parsed
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, dt_timezone.utc)
+    return value
+
+
+def serialize_row(qa_type, game_name, question, answer, created_at, content_hash):
+    """모델 값 -> 파일 행 (시각은 UTC ISO 8601)"""
+    return {
+        'type': qa_type,
+        'game_name': game_name,
+        'question': question,
+        'answer': answer,
+        'created_at': created_at.astimezone(dt_timezone.utc).isoformat(timespec='microseconds'),
+        'content_hash': content_hash,
+    }
+
+
+class RowWriter:
+    """포맷별 행 쓰기 (with 문으로 사용)"""
+
+    def __init__(self, path, fmt, batch_size=1000):
+        self.path = path
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self._file = None
+        self._csv = None
+        self._parquet = None
+        self._buffer = []
+
+    def __enter__(self):
+        if self.fmt == 'parquet':
+            require_parquet()
+            if self.path == '-':
+                raise ValueError("Parquet은 표준 출력으로 쓸 수 없습니다")
+            schema = pa.schema([(field, pa.string()) for field in FIELDS])
+            self._parquet = pq.ParquetWriter(self.path, schema, compression='zstd')
+        else:
+            self._file = open_text(self.path, 'w')
+            if self.fmt == 'csv':
+                self._csv = csv.DictWriter(self._file, fieldnames=FIELDS)
+                self._csv.writeheader()
+        return self
+
+    def write(self, row):
+        if self.fmt == 'jsonl':
+            self._file.write(json.dumps(row, ensure_ascii=False) + '\n')
+        elif self.fmt == 'csv':
+            self._csv.writerow(row)
+        else:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_parquet()
+
+    def _flush_parquet(self):
+        if self._buffer:
+            self._parquet.write_batch(pa.RecordBatch.from_pylist(self._buffer, schema=self._parquet.schema))
+            self._buffer = []
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._parquet is not None:
+            if exc_type is None:
+                self._flush_parquet()
+            self._parquet.close()
+        if self._file is not None:
+            if self.path == '-':
+                self._file.flush()
+                self._file.detach()
+            else:
+                self._file.close()
+        return False
@@ -0,0 +1,179 @@
+import abc
+import time
+import threading
+import logging
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+
+class BaseRateLimiter(abc.ABC):
+    """토큰 버킷 기반 요청 제한기 공통 클래스
+
+    rate: 초당 채워지는 토큰 수(0보다 커야 함), capacity: 버킷 최대 크기(순간 허용량, 1 이상)
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        if not self.rate > 0 or not self.capacity >= 1:
+            raise ImproperlyConfigured(f"요청 제한 설정 오류: rate는 0보다, burst는 1 이상이어야 합니다 (rate={rate}, burst={capacity})")
+
+    def _refill(self, tokens, last, now):
+        """경과 시간만큼 토큰 보충"""
+        elapsed = max(0.0, now - last)
+        return min(self.capacity, tokens + elapsed * self.rate)
+
+    def _retry_after(self, tokens, cost):
+        """토큰이 cost만큼 쌓일 때까지 남은 시간(초)"""
+        return max(0.0, (cost - tokens) / self.rate)
+
+    @abc.abstractmethod
+    def consume(self, key, cost=1):
+        """토큰 소비 시도 - (허용 여부, 재시도까지 남은 초) 반환"""
+
+
+class LocalMemoryRateLimiter(BaseRateLimiter):
+    """프로세스 메모리에 버킷을 두는 제한기 (단일 워커/로컬 개발용)"""
+
+    # 버킷 수가 이 값을 넘으면 가득 찬(=오래 쉰) 버킷부터 정리
+    MAX_KEYS = 10000
+
+    def __init__(self, rate, capacity):
+        super().__init__(rate, capacity)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, cost=1):
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.capacity, now))
+            tokens = self._refill(tokens, last, now)
+
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                allowed, retry_after = True, 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, retry_after = False, self._retry_after(tokens, cost)
+
+            if len(self._buckets) > self.MAX_KEYS:
+                self._prune(now)
+
+        return allowed, retry_after
+
+    def _prune(self, now):
+        """이미 가득 찼을 버킷 삭제 (없는 버킷과 동일하게 취급되므로 안전)"""
+        full_after = self.capacity / self.rate
+        stale = [k for k, (_, last) in self._buckets.items() if now - last >= full_after]
+        for k in stale:
+            del self._buckets[k]
+
+
+class CacheRateLimiter(BaseRateLimiter):
+    """Django 캐시에 버킷을 두는 제한기 (여러 gunicorn 워커가 공유)
+
+    버킷 읽기/쓰기는 cache.add로 잡는 짧은 잠금 안에서 한다 (locmem/sqlite/redis의 add는 원자적).
+    잠금을 LOCK_WAIT 안에 못 잡으면 같은 클라이언트 요청이 동시에 몰린 것이므로 거부한다.
+    """
+
+    LOCK_TIMEOUT = 1  # 초 - 잠금을 잡은 워커가 죽어도 이 시간 뒤에 풀림
+    LOCK_WAIT = 0.05  # 초
+
+    def __init__(self, rate, capacity, cache_alias='default', prefix='ratelimit'):
+        super().__init__(rate, capacity)
+        self.cache = caches[cache_alias]
+        self.prefix = prefix
+        # 버킷이 가득 차는 시간이 지나면 항목이 없어도 결과가 같으므로 만료시킨다
+        full_after = self.capacity / self.rate
+        self.ttl = max(1, int(full_after) + 1)
+
+    def consume(self, key, cost=1):
+        cache_key = f"{self.prefix}:{key}"
+        lock_key = f"{cache_key}:lock"
+        wait_until = time.monotonic() + self.LOCK_WAIT
+        while not self.cache.add(lock_key, 1, self.LOCK_TIMEOUT):
+            if time.monotonic() >= wait_until:
+                return False, self._retry_after(0.0, cost)
+            time.sleep(0.005)
+
+        try:
+            now = time.time()
+            tokens, last = self.cache.get(cache_key, (self.capacity, now))
+            tokens = self._refill(tokens, last, now)
+
+            if tokens >= cost:
+                self.cache.set(cache_key, (tokens - cost, now), self.ttl)
+                return True, 0.0
+
+            self.cache.set(cache_key, (tokens, now), self.ttl)
+            return False, self._retry_after(tokens, cost)
+        finally:
+            self.cache.delete(lock_key)
+
+
+RATE_LIMITER_BACKENDS = {
+    'local': LocalMemoryRateLimiter,
+    'cache': CacheRateLimiter,
+}
+
+
+def validate_rules(rules):
+    """RATE_LIMIT_RULES 검사 - 워커 기동 시 잘못된 규칙(rate <= 0 등)이면 ImproperlyConfigured"""
+    for url_name, rule in rules.items():
+        try:
+            rate, burst = float(rule['rate']), float(rule['burst'])
+        except (KeyError, TypeError, ValueError):
+            raise ImproperlyConfigured(f"RATE_LIMIT_RULES['{url_name}']에는 숫자 rate와 burst가 필요합니다.")
+        if not rate > 0 or not burst >= 1:
+            raise ImproperlyConfigured(
+                f"RATE_LIMIT_RULES['{url_name}']: rate는 0보다, burst는 1 이상이어야 합니다 (rate={rule['rate']}, burst={rule['burst']})"
+            )
+
+
+def create_rate_limiter(backend, rate, capacity, scope=''):
+    """설정값(backend 이름)에 맞는 제한기 생성"""
+    if backend not in RATE_LIMITER_BACKENDS:
+        raise ValueError(f"지원하지 않는 요청 제한 백엔드: {backend}")
+
+    if backend == 'cache':
+        return CacheRateLimiter(rate, capacity, prefix=f"ratelimit:{scope}")
+    return LocalMemoryRateLimiter(rate, capacity)
+
+
+class ClientRateLimiter:
+    """규칙 하나의 클라이언트별 제한 (RateLimitMiddleware와 채팅 웹소켓 공용 - 같은 키 규칙)
+
+    key_type='ip'면 IP 버킷 하나. 'session'이면 서버에 실제로 있는 세션만 세션 버킷을 쓰고
+    (쿠키를 버리거나 지어낸 클라이언트는 IP 버킷), 세션을 계속 새로 받아 오는 경우를 막기 위해
+    같은 IP의 모든 세션이 나눠 쓰는 session_ip_factor배 크기의 IP 버킷도 함께 소비한다.
+    """
+
+    def __init__(self, backend, rate, burst, scope, key_type='ip', session_ip_factor=5):
+        self.key_type = key_type
+        self.limiter = create_rate_limiter(backend, rate, burst, scope=scope)
+        self.ip_limiter = None
+        if key_type == 'session':
+            self.ip_limiter = create_rate_limiter(
+                backend, rate * session_ip_factor, burst * session_ip_factor, scope=f"{scope}:ip"
+            )
+
+    def client_key(self, ip, session=None):
+        """버킷 키 - 세션 모드에서 유효한 세션이면 세션, 아니면 IP"""
+        if self.key_type == 'session' and session is not None:
+            session_key = session.session_key
+            if session_key and session.exists(session_key):
+                return f"session:{session_key}"
+        return f"ip:{ip}"
+
+    def consume(self, ip, session=None, cost=1):
+        """토큰 소비 시도 - (허용 여부, 재시도까지 남은 초, 버킷 키) 반환"""
+        client_key = self.client_key(ip, session)
+        allowed, retry_after = self.limiter.consume(client_key, cost)
+        # 세션 버킷에서 거부된 요청은 IP 버킷을 건드리지 않음 (한 세션이 같은 IP의 다른 세션 몫을 쓰지 않게)
+        if allowed and self.ip_limiter is not None and client_key.startswith('session:'):
+            allowed, retry_after = self.ip_limiter.consume(f"ip:{ip}", cost)
+            if not allowed:
+                return False, retry_after, f"ip:{ip}"
+        return allowed, retry_after, client_key
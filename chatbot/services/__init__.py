@@ -1 +1,69 @@
-# Empty file to make Python treat the directory as a package\n
\ No newline at end of file
+"""서비스 싱글톤 접근자
+
+서비스 객체는 처음 사용할 때 생성한다. 모듈 import 시점에 만들면 manage.py 명령,
+테스트, 워커 기동마다 httpx 클라이언트 초기화 비용을 치르게 된다.
+"""
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_game_recommendation_service():
+    """게임 추천 서비스 (지연 생성)"""
+    from .game_recommendation import GameRecommendationService
+    return GameRecommendationService()
+
+
+@lru_cache(maxsize=None)
+def get_rule_explanation_service():
+    """룰 설명 서비스 (지연 생성)"""
+    from .rule_explanation import RuleExplanationService
+    return RuleExplanationService()
+
+
+@lru_cache(maxsize=None)
+def get_qr_code_service():
+    """QR 코드 서비스 (지연 생성)"""
+    from .qr_code import QRCodeService
+    return QRCodeService()
+
+
+@lru_cache(maxsize=None)
+def get_game_search_service():
+    """게임 검색 서비스 (지연 생성, 룰 설명 서비스의 게임 목록 사용)"""
+    from .game_search import GameSearchService
+    return GameSearchService(get_rule_explanation_service())
+
+
+@lru_cache(maxsize=None)
+def get_trending_service():
+    """기간별 인기 게임 순위 서비스 (지연 생성)"""
+    from .trending import TrendingService
+    return TrendingService()
+
+
+@lru_cache(maxsize=None)
+def get_batch_chat_service():
+    """여러 질문/요약 일괄 처리 서비스 (지연 생성, 룰 설명 서비스 사용)"""
+    from .batch_chat import BatchChatService
+    return BatchChatService(get_rule_explanation_service())
+
+
+@lru_cache(maxsize=None)
+def get_prefetch_service():
+    """룰 요약/자주 묻는 질문 미리 받기 서비스 (지연 생성, 워커당 스레드 풀 하나)"""
+    from .prefetch import PrefetchService
+    return PrefetchService(get_rule_explanation_service())
+
+
+@lru_cache(maxsize=None)
+def get_conversation_store():
+    """세션별 대화 기록 저장소 (지연 생성)"""
+    from .conversation import ConversationStore
+    return ConversationStore()
+
+
+@lru_cache(maxsize=None)
+def get_rule_chat_service():
+    """룰 설명 채팅 턴 처리 서비스 (지연 생성, chat_api와 채팅 웹소켓 공용)"""
+    from .rule_chat import RuleChatService
+    return RuleChatService(get_rule_explanation_service(), get_game_recommendation_service(), get_conversation_store())
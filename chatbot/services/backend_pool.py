@@ -0,0 +1,184 @@
+import bisect
+import hashlib
+import logging
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+import httpx
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class Backend:
+    """Runpod 백엔드(파드) 하나의 상태"""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip('/')
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.last_checked = 0.0
+
+    def snapshot(self) -> Dict:
+        return {
+            'url': self.url,
+            'healthy': self.healthy,
+            'consecutive_failures': self.consecutive_failures,
+        }
+
+
+class BackendPool:
+    """Runpod 백엔드 풀 - 상태 확인, 무작위 분산, 세션 고정
+
+    - 세션 없는 호출(/games, /health, 첫 /recommend 등): 정상 백엔드 중 무작위
+      (gunicorn sync 워커는 요청을 하나씩만 처리하므로 워커별 처리 중 요청 수로는 파드 부하를 알 수 없음)
+    - 세션 있는 호출: 세션을 만든 백엔드(공유 캐시에 기록)로, 기록이 없으면 session_id 일관 해시로
+      -> 파드가 하나 빠져도 그 파드의 세션만 다른 곳으로 옮겨짐
+    - 연속 실패한 백엔드는 제외하고, 백그라운드 스레드가 /health로 주기적으로 확인해 복구
+    """
+
+    VIRTUAL_NODES = 100  # 해시 링에서 백엔드 하나가 차지하는 지점 수 (분포 균등화)
+
+    def __init__(self, urls: List[str]):
+        if not urls:
+            raise ValueError('Runpod 백엔드 URL이 하나 이상 필요합니다')
+        self.backends = [Backend(url) for url in dict.fromkeys(urls)]
+        self.health_interval = getattr(settings, 'RUNPOD_HEALTH_CHECK_INTERVAL', 10.0)
+        self.health_timeout = getattr(settings, 'RUNPOD_HEALTH_CHECK_TIMEOUT', 3.0)
+        self.failure_threshold = getattr(settings, 'RUNPOD_UNHEALTHY_THRESHOLD', 2)
+        self.affinity_ttl = getattr(settings, 'RUNPOD_SESSION_AFFINITY_TTL', 86400)
+        self._lock = threading.Lock()
+        self._checker = None
+        self._ring = sorted(
+            ((self._hash(f"{backend.url}#{i}"), backend) for backend in self.backends for i in range(self.VIRTUAL_NODES)),
+            key=lambda point: point[0]
+        )
+        self._ring_keys = [key for key, _ in self._ring]
+
+    @property
+    def primary(self) -> Backend:
+        return self.backends[0]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.sha1(value.encode('utf-8')).digest()[:8], 'big')
+
+    @staticmethod
+    def _affinity_key(session_id: str) -> str:
+        from ..cache_keys import make_key
+        return make_key('session_backend', session_id)
+
+    def pick(self, session_id: str = '', exclude=()) -> Backend:
+        """요청을 보낼 백엔드 선택 (exclude: 이미 시도한 백엔드)"""
+        if len(self.backends) == 1:
+            return self.primary
+        self._ensure_health_checker()
+
+        if session_id:
+            backend = self._pick_for_session(session_id, exclude)
+            if backend is not None:
+                return backend
+
+        with self._lock:
+            candidates = [b for b in self.backends if b.healthy and b not in exclude]
+            if not candidates:
+                # 모두 비정상이면 제외 목록만 빼고 시도 (상태 확인이 늦었을 수 있음)
+                candidates = [b for b in self.backends if b not in exclude] or self.backends
+            return random.choice(candidates)
+
+    def _pick_for_session(self, session_id: str, exclude) -> Optional[Backend]:
+        """세션을 가진 백엔드 - 기록된 백엔드 우선, 없으면 해시 링에서 시계 방향 첫 정상 백엔드"""
+        url = cache.get(self._affinity_key(session_id))
+        if url:
+            for backend in self.backends:
+                if backend.url == url and backend.healthy and backend not in exclude:
+                    return backend
+
+        start = bisect.bisect(self._ring_keys, self._hash(session_id)) % len(self._ring)
+        for offset in range(len(self._ring)):
+            backend = self._ring[(start + offset) % len(self._ring)][1]
+            if backend.healthy and backend not in exclude:
+                return backend
+        return None
+
+    def remember_session(self, session_id: str, backend: Backend):
+        """백엔드가 만든/사용한 세션 기록 (후속 턴을 같은 파드로, 파드가 하나여도 세션이 살아 있는지 판단용)"""
+        if session_id:
+            cache.set(self._affinity_key(session_id), backend.url, self.affinity_ttl)
+
+    def forget_session(self, session_id: str):
+        if session_id:
+            cache.delete(self._affinity_key(session_id))
+
+    def has_live_session(self, session_id: str) -> bool:
+        """세션을 가진 파드가 기록돼 있고 정상인지 - 아니면 다른 파드에서 대화 기록으로 다시 만들어야 함"""
+        url = cache.get(self._affinity_key(session_id))
+        return any(backend.url == url and backend.healthy for backend in self.backends)
+
+    def mark_success(self, backend: Backend):
+        with self._lock:
+            backend.consecutive_failures = 0
+            if not backend.healthy:
+                logger.info(f"✅ Runpod 백엔드 복구: {backend.url}")
+            backend.healthy = True
+
+    def mark_failure(self, backend: Backend):
+        """연결 실패/5xx - 연속 실패가 기준을 넘으면 상태 확인으로 복구될 때까지 제외"""
+        with self._lock:
+            backend.consecutive_failures += 1
+            if backend.healthy and backend.consecutive_failures >= self.failure_threshold and len(self.backends) > 1:
+                backend.healthy = False
+                logger.warning(f"⚠️ Runpod 백엔드 제외: {backend.url} (연속 실패 {backend.consecutive_failures}회)")
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            return [backend.snapshot() for backend in self.backends]
+
+    def _ensure_health_checker(self):
+        """백엔드가 여럿일 때만 워커당 상태 확인 스레드 하나 시작"""
+        if self._checker is not None:
+            return
+        with self._lock:
+            if self._checker is None:
+                self._checker = threading.Thread(target=self._health_loop, name='runpod-health', daemon=True)
+                self._checker.start()
+
+    def _health_loop(self):
+        while True:
+            for backend in self.backends:
+                self.check(backend)
+            time.sleep(self.health_interval)
+
+    def check(self, backend: Backend) -> bool:
+        """/health 호출로 상태 갱신"""
+        try:
+            response = httpx.get(f"{backend.url}/health", timeout=self.health_timeout)
+            ok = response.status_code < 500
+        except httpx.HTTPError:
+            ok = False
+        backend.last_checked = time.time()
+        if ok:
+            self.mark_success(backend)
+        else:
+            with self._lock:
+                if backend.healthy and len(self.backends) > 1:
+                    logger.warning(f"⚠️ Runpod 백엔드 상태 확인 실패: {backend.url}")
+                backend.healthy = len(self.backends) == 1
+        return ok
+
+
+_pools: Dict[tuple, BackendPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_backend_pool(urls) -> BackendPool:
+    """같은 URL 목록이면 워커 안에서 풀 하나를 공유 (추천/룰 설명 서비스가 같은 파드 상태를 봄)"""
+    key = tuple(urls)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = BackendPool(list(key))
+            if len(key) > 1:
+                logger.info(f"🔀 Runpod 백엔드 풀: {len(_pools[key].backends)}개")
+        return _pools[key]
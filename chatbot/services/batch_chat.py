@@ -0,0 +1,159 @@
+import json
+import time
+import logging
+import contextvars
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from ..deadline import deadline_scope
+from ..models import GPTRuleQA, FinetuningRuleQA, GameQAHourly
+
+logger = logging.getLogger(__name__)
+
+QA_MODELS_BY_CHAT_TYPE = {
+    'gpt_rules': GPTRuleQA,
+    'finetuning_rules': FinetuningRuleQA,
+}
+
+
+class BatchChatService:
+    """여러 룰 질문/요약을 한 요청으로 - 동시 처리 수를 제한해 Runpod에 보내고 끝나는 순서대로 결과 전달
+
+    항목마다 chat_api/rule_summary_api와 같은 서비스 메서드를 쓰므로 캐시, 폴백, 지연 시간 기록이
+    같다. 질문 답변은 모두 끝난 뒤 QA 테이블에 한 번에 저장한다.
+    """
+
+    def __init__(self, rule_explanation_service):
+        self.rule_service = rule_explanation_service
+        self.max_items = getattr(settings, 'BATCH_CHAT_MAX_ITEMS', 10)
+        self.max_concurrency = getattr(settings, 'BATCH_CHAT_MAX_CONCURRENCY', 4)
+
+    def parse_items(self, data):
+        """요청 본문 -> [(chat_type, game_name, question, session_id)] (잘못된 요청은 ValueError)"""
+        items = data.get('items') if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            raise ValueError('items 목록이 필요합니다.')
+        if len(items) > self.max_items:
+            raise ValueError(f'한 번에 최대 {self.max_items}개까지 요청할 수 있습니다.')
+
+        parsed = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise ValueError(f'{index}번 항목 형식이 올바르지 않습니다.')
+            chat_type = item.get('chat_type') or 'gpt_rules'
+            game_name = str(item.get('game_name') or '').strip()
+            if chat_type not in QA_MODELS_BY_CHAT_TYPE:
+                raise ValueError(f'{index}번 항목: 알 수 없는 채팅 타입입니다.')
+            if not game_name:
+                raise ValueError(f'{index}번 항목: 게임 이름이 필요합니다.')
+            parsed.append((chat_type, game_name, str(item.get('question') or '').strip(), item.get('session_id') or ''))
+        return parsed
+
+    def stream(self, items):
+        """NDJSON 줄 생성기 - 항목 결과(끝난 순서), 마지막에 저장 결과 요약
+
+        StreamingHttpResponse는 뷰가 반환된 뒤 소비하므로 마감 시간도 여기서 건다.
+        """
+        started = time.perf_counter()
+        seconds = getattr(settings, 'RUNPOD_REQUEST_DEADLINES', {}).get('batch_chat', 90)
+        results = []
+        with deadline_scope(seconds), ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            # 항목마다 게임 목록을 확인하므로 작업 스레드들이 동시에 Runpod에 목록을 요청하지 않게 미리 채움
+            self.rule_service.get_available_games()
+            futures = {
+                # 스레드에는 contextvars가 전달되지 않으므로 마감 시간이 담긴 컨텍스트를 복사
+                executor.submit(contextvars.copy_context().run, self._run_item, *item): index
+                for index, item in enumerate(items)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                chat_type, game_name, question, _ = items[index]
+                line = {'index': index, 'chat_type': chat_type, 'game_name': game_name, 'question': question}
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"❌ 일괄 처리 항목 실패 ({index}): {str(e)}")
+                    line.update({'status': 'error', 'error': str(e)})
+                else:
+                    results.append((index, result))
+                    line.update({
+                        'status': 'success',
+                        'response': result.get('response', ''),
+                        'session_id': result.get('session_id', ''),
+                        'source': result.get('source', ''),
+                        'latency_ms': result.get('latency_ms'),
+                    })
+                yield self._encode(line)
+
+        saved = self._save(items, results)
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        logger.info(f"✅ 일괄 처리 완료: {len(items)}개, QA {saved}개 저장 ({elapsed_ms}ms)")
+        yield self._encode({'status': 'done', 'count': len(items), 'saved': saved, 'elapsed_ms': elapsed_ms})
+
+    def _run_item(self, chat_type, game_name, question, session_id):
+        """항목 하나 (작업 스레드) - 질문이 없으면 룰 요약"""
+        api_chat_type = "finetuning" if chat_type == 'finetuning_rules' else "gpt"
+        try:
+            if not question:
+                started = time.perf_counter()
+                result = self.rule_service.explain_game_rules(game_name, api_chat_type, session_id)
+                return {**result, 'latency_ms': int((time.perf_counter() - started) * 1000)}
+            return self.rule_service.answer_rule_question(game_name, question, api_chat_type, session_id)
+        finally:
+            # 작업 스레드가 연 DB 연결(캐시 DB 등) 정리
+            connections.close_all()
+
+    @staticmethod
+    def _save(items, results):
+        """질문 답변을 채팅 타입별 bulk_create 한 번으로 저장 - 저장한 행 수 반환"""
+        rows = {chat_type: [] for chat_type in QA_MODELS_BY_CHAT_TYPE}
+        for index, result in results:
+            chat_type, game_name, question, session_id = items[index]
+            # 룰 요약과 다시 시도 안내(source='error')는 QA로 저장하지 않음
+            if not question or result.get('source') == 'error':
+                continue
+            response_text = result.get('response', '')
+            rows[chat_type].append(QA_MODELS_BY_CHAT_TYPE[chat_type](
+                game_name=game_name,
+                question=question,
+                answer=response_text,
+                answer_source=result.get('source', ''),
+                latency_ms=result.get('latency_ms'),
+                session_id=(result.get('session_id') or session_id or '')[:100],
+                response_size=len(response_text.encode('utf-8')),
+                prompt_tokens=result.get('prompt_tokens'),
+                completion_tokens=result.get('completion_tokens'),
+            ))
+
+        created = {}
+        try:
+            with transaction.atomic():
+                for chat_type, instances in rows.items():
+                    if instances:
+                        created[chat_type] = BatchChatService._bulk_create(QA_MODELS_BY_CHAT_TYPE[chat_type], instances)
+        except DatabaseError as e:
+            logger.error(f"❌ 일괄 QA 저장 실패: {str(e)}")
+            return 0  # 트랜잭션 전체가 롤백됨
+
+        # 커밋된 뒤에 집계 - bulk_create는 save()를 거치지 않으므로 게임별로 묶어서 증가 (실패는 record가 로그만 남김)
+        for chat_type, instances in created.items():
+            model = QA_MODELS_BY_CHAT_TYPE[chat_type]
+            for game_name, count in Counter(qa.game_name for qa in instances).items():
+                GameQAHourly.record(model.ARCHIVE_SOURCE, game_name, instances[0].created_at, count)
+        return sum(len(instances) for instances in created.values())
+
+    @staticmethod
+    def _bulk_create(model, instances):
+        """같은 content_hash는 qa_import처럼 유니크 제약으로 무시 - 새로 저장한 인스턴스 반환"""
+        model.prepare_for_bulk_create(instances)
+        existing = set(model.objects.filter(
+            content_hash__in=[qa.content_hash for qa in instances]
+        ).values_list('content_hash', flat=True))
+        new = list({qa.content_hash: qa for qa in instances if qa.content_hash not in existing}.values())
+        model.objects.bulk_create(instances, ignore_conflicts=True)
+        return new
+
+    @staticmethod
+    def _encode(line):
+        return json.dumps(line, ensure_ascii=False) + '\n'
@@ -0,0 +1,131 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from ..models import Conversation, ConversationTurn
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationStore:
+    """세션 ID별 대화 기록 - 턴은 추가만 하고 압축해서 저장, 마지막 턴부터 CONVERSATION_TTL초 뒤 만료
+
+    - 새로고침한 페이지는 restore()로 한 번에 대화를 복원한다 (같은 질문을 다시 보내지 않음).
+    - 세션을 가진 파드가 빠졌거나 세션이 이미 닫혔으면 get_history()의 최근 턴을 Runpod 요청에 실어
+      다른 파드에서 세션을 이어간다 (RunpodClient.explain_rules의 history).
+    """
+
+    def __init__(self):
+        self.ttl = getattr(settings, 'CONVERSATION_TTL', 86400)
+        self.max_turns = getattr(settings, 'CONVERSATION_MAX_TURNS', 200)
+        self.restore_turns = getattr(settings, 'CONVERSATION_RESTORE_TURNS', 50)
+        self.history_turns = getattr(settings, 'CONVERSATION_REHYDRATE_TURNS', 10)
+
+    def append(self, session_id, chat_type, game_name, turns, new_session_id=None):
+        """턴 추가 - turns: [(역할, 내용)] (백엔드가 새 세션 ID를 주면 대화를 그 ID로 옮김)
+
+        QA 저장과 마찬가지로 실패해도 채팅 응답은 그대로 나가야 하므로 예외는 로그만 남긴다.
+        """
+        key = (new_session_id or session_id or '')[:100]
+        if not key or not turns:
+            return
+        expires_at = timezone.now() + timedelta(seconds=self.ttl)
+        try:
+            with transaction.atomic():
+                conversation = self._get_or_create(session_id, key, chat_type, game_name, expires_at)
+                if conversation.turn_count + len(turns) > self.max_turns:
+                    logger.warning(f"⚠️ 대화 턴 수 초과 ({self.max_turns}), 저장 생략: {key[:8]}")
+                    return
+                instances = []
+                for role, text in turns:
+                    turn = ConversationTurn(conversation=conversation, role=role, game_name=game_name)
+                    turn.text = text
+                    instances.append(turn)
+                ConversationTurn.objects.bulk_create(instances)
+                Conversation.objects.filter(pk=conversation.pk).update(
+                    session_id=key, game_name=game_name, turn_count=F('turn_count') + len(turns),
+                    expires_at=expires_at, updated_at=timezone.now()
+                )
+        except DatabaseError as e:
+            logger.error(f"❌ 대화 저장 실패 ({key[:8]}): {str(e)}")
+
+    @staticmethod
+    def _get_or_create(session_id, key, chat_type, game_name, expires_at):
+        """이전 세션 ID의 대화 -> 새 세션 ID의 대화 -> 새로 생성 순 (만료된 대화는 새로 시작)"""
+        now = timezone.now()
+        for candidate in dict.fromkeys(filter(None, [session_id, key])):
+            conversation = Conversation.objects.select_for_update().filter(session_id=candidate).first()
+            if conversation is None:
+                continue
+            if conversation.expires_at <= now:
+                conversation.delete()
+                continue
+            return conversation
+        try:
+            with transaction.atomic():
+                return Conversation.objects.create(
+                    session_id=key, chat_type=chat_type, game_name=game_name, expires_at=expires_at
+                )
+        except IntegrityError:
+            # 같은 세션의 다른 요청이 먼저 만든 경우
+            return Conversation.objects.select_for_update().get(session_id=key)
+
+    def _recent_turns(self, session_id, limit, roles=None, game_name=None):
+        """만료되지 않은 대화의 최근 턴 (오래된 순) - 대화 행과 JOIN한 쿼리 한 번"""
+        queryset = ConversationTurn.objects.filter(
+            conversation__session_id=session_id, conversation__expires_at__gt=timezone.now()
+        )
+        if roles is not None:
+            queryset = queryset.filter(role__in=roles)
+        if game_name is not None:
+            queryset = queryset.filter(game_name=game_name)
+        turns = list(queryset.select_related('conversation').order_by('-id')[:limit])
+        turns.reverse()
+        return turns
+
+    def restore(self, session_id, chat_type=None):
+        """복원 API 응답 - 대화가 없거나 만료됐거나 다른 채팅 타입이면 None"""
+        if not session_id:
+            return None
+        turns = self._recent_turns(session_id, self.restore_turns)
+        if not turns:
+            return None
+        conversation = turns[0].conversation
+        if chat_type and conversation.chat_type != chat_type:
+            return None
+        summary = next((turn for turn in reversed(turns) if turn.role == 'summary'), None)
+        return {
+            'session_id': conversation.session_id,
+            'chat_type': conversation.chat_type,
+            'game_name': conversation.game_name,
+            'summary': summary.text if summary is not None and summary.game_name == conversation.game_name else '',
+            'messages': [
+                {'role': turn.role, 'content': turn.text, 'game_name': turn.game_name}
+                for turn in turns
+                if turn.role != 'summary' and turn.game_name == conversation.game_name
+            ],
+            'turn_count': conversation.turn_count,
+            'expires_at': conversation.expires_at,
+        }
+
+    def get_history(self, session_id, game_name):
+        """Runpod에 세션을 다시 만들 때 보낼 같은 게임의 최근 질문/답변 [{role, content}]"""
+        try:
+            turns = self._recent_turns(session_id, self.history_turns, ('user', 'assistant'), game_name)
+        except DatabaseError as e:
+            logger.error(f"❌ 대화 기록 조회 실패 ({session_id[:8]}): {str(e)}")
+            return []
+        return [{'role': turn.role, 'content': turn.text} for turn in turns]
+
+    @staticmethod
+    def prune_expired(batch_size=1000):
+        """만료된 대화 삭제 (턴은 CASCADE) - 삭제한 대화 수 반환"""
+        deleted = 0
+        while True:
+            ids = list(Conversation.objects.filter(expires_at__lte=timezone.now()).values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            Conversation.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
@@ -0,0 +1,196 @@
+import difflib
+import logging
+import threading
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# 한글 음절 분해용 자모 테이블 (호환 자모 - 사용자가 키보드로 입력하는 문자)
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSEONG = ['', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ',
+             'ㄿ', 'ㅀ', 'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+
+# 겹모음/겹받침은 입력 순서대로 풀어야 '과' 입력 중간 상태('고')도 접두사로 맞는다
+COMPOUND_JAMO = {
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ',
+    'ㄽ': 'ㄹㅅ', 'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ',
+}
+
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+
+
+def normalize(text):
+    """소문자화 + 공백 제거"""
+    return ''.join((text or '').lower().split())
+
+
+def to_jamo(text):
+    """한글 음절을 자모 단위로 분해 ('카탄' -> 'ㅋㅏㅌㅏㄴ'), 그 외 문자는 그대로"""
+    result = []
+    for char in text:
+        code = ord(char)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            index = code - HANGUL_BASE
+            jamo = CHOSEONG[index // 588] + JUNGSEONG[(index % 588) // 28] + JONGSEONG[index % 28]
+        else:
+            jamo = char
+        result.append(''.join(COMPOUND_JAMO.get(j, j) for j in jamo))
+    return ''.join(result)
+
+
+def to_choseong(text):
+    """한글 음절을 초성으로 변환 ('카탄' -> 'ㅋㅌ'), 그 외 문자는 그대로"""
+    result = []
+    for char in text:
+        code = ord(char)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            result.append(CHOSEONG[(code - HANGUL_BASE) // 588])
+        else:
+            result.append(char)
+    return ''.join(result)
+
+
+def is_choseong_query(text):
+    """자음만으로 이루어진 입력인지 ('ㅋㅌ' 같은 초성 검색)"""
+    return bool(text) and all(char in CHOSEONG for char in text)
+
+
+class PrefixTrie:
+    """접두사 트라이 - 각 노드에 그 접두사를 가진 게임 번호 집합을 둔다"""
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, key, game_id):
+        node = self.root
+        for char in key:
+            node = node.setdefault(char, {})
+            node.setdefault(None, set()).add(game_id)
+
+    def find(self, prefix):
+        """접두사에 해당하는 게임 번호 집합 (없으면 빈 집합)"""
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return set()
+        return node.get(None, set())
+
+
+class GameSearchIndex:
+    """게임 이름 검색 인덱스 (전체 이름/단어 접두사, 초성, 자모 부분 일치, 유사어 순으로 매칭)"""
+
+    # 매칭 단계 - 숫자가 작을수록 앞에 정렬
+    EXACT, NAME_PREFIX, WORD_PREFIX, CHOSEONG_PREFIX, SUBSTRING, FUZZY = range(6)
+    MATCH_NAMES = ['exact', 'prefix', 'word_prefix', 'choseong', 'substring', 'fuzzy']
+
+    def __init__(self, games, version=''):
+        self.games = list(games)
+        self.version = version
+        self.name_trie = PrefixTrie()
+        self.word_trie = PrefixTrie()
+        self.choseong_trie = PrefixTrie()
+        self.jamo_names = []
+        self.choseong_names = []
+        self.exact = {}
+
+        for game_id, game in enumerate(self.games):
+            name = normalize(game)
+            jamo = to_jamo(name)
+            choseong = to_choseong(name)
+            self.jamo_names.append(jamo)
+            self.choseong_names.append(choseong)
+            self.exact.setdefault(jamo, game_id)
+
+            self.name_trie.insert(jamo, game_id)
+            self.choseong_trie.insert(choseong, game_id)
+            # '7 원더스'를 '원더'로도 찾을 수 있도록 단어별 접두사도 색인
+            for word in game.lower().split()[1:]:
+                self.word_trie.insert(to_jamo(word), game_id)
+                self.choseong_trie.insert(to_choseong(word), game_id)
+
+    def search(self, query, limit=10, fuzzy_cutoff=0.6):
+        """상위 limit개 결과 [{'name', 'match'}] 반환"""
+        query = normalize(query)
+        if not query or limit <= 0:
+            return []
+
+        jamo = to_jamo(query)
+        ranked = {}
+
+        def add(game_ids, rank):
+            for game_id in game_ids:
+                if rank < ranked.get(game_id, len(self.MATCH_NAMES)):
+                    ranked[game_id] = rank
+
+        if jamo in self.exact:
+            add([self.exact[jamo]], self.EXACT)
+        add(self.name_trie.find(jamo), self.NAME_PREFIX)
+        add(self.word_trie.find(jamo), self.WORD_PREFIX)
+        if is_choseong_query(query):
+            add(self.choseong_trie.find(query), self.CHOSEONG_PREFIX)
+
+        # 접두사 매칭만으로 부족하면 중간 일치까지 (게임 수에 선형이므로 이때만)
+        if len(ranked) < limit:
+            names = self.choseong_names if is_choseong_query(query) else self.jamo_names
+            needle = query if is_choseong_query(query) else jamo
+            add((i for i, name in enumerate(names) if needle in name), self.SUBSTRING)
+
+        # 아무것도 없으면 오타 허용 (자모 단위 유사도)
+        if not ranked:
+            matches = difflib.get_close_matches(jamo, self.jamo_names, n=limit, cutoff=fuzzy_cutoff)
+            add((i for i, name in enumerate(self.jamo_names) if name in matches), self.FUZZY)
+
+        ordered = sorted(ranked, key=lambda i: (ranked[i], len(self.jamo_names[i]), i))
+        return [
+            {'name': self.games[i], 'match': self.MATCH_NAMES[ranked[i]]}
+            for i in ordered[:limit]
+        ]
+
+
+class GameSearchService:
+    """게임 검색 서비스 - 룰 설명 서비스의 게임 목록이 바뀌면 인덱스를 다시 만든다"""
+
+    def __init__(self, rule_explanation_service):
+        self.rule_explanation_service = rule_explanation_service
+        self.default_limit = getattr(settings, 'GAME_SEARCH_DEFAULT_LIMIT', 10)
+        self.max_limit = getattr(settings, 'GAME_SEARCH_MAX_LIMIT', 50)
+        self.max_query_length = getattr(settings, 'GAME_SEARCH_MAX_QUERY_LENGTH', 50)
+        self.fuzzy_cutoff = getattr(settings, 'GAME_SEARCH_FUZZY_CUTOFF', 0.6)
+        self._index = None
+        self._lock = threading.Lock()
+
+    def get_version(self):
+        """인덱스 버전 (게임 목록 해시와 동일)"""
+        return self.rule_explanation_service.get_games_version()
+
+    def get_index(self):
+        """현재 게임 목록 기준 인덱스 (버전이 바뀐 경우에만 재생성)"""
+        version = self.get_version()
+        index = self._index
+        if index is not None and index.version == version:
+            return index
+
+        with self._lock:
+            if self._index is None or self._index.version != version:
+                games = self.rule_explanation_service.get_available_games()
+                self._index = GameSearchIndex(games, version)
+                logger.info(f"🔎 게임 검색 인덱스 생성: {len(games)}개 (버전 {version})")
+            return self._index
+
+    def normalize_params(self, query, limit=None):
+        """요청 파라미터를 허용 범위의 (검색어, 개수)로 정리"""
+        query = (query or '').strip()[:self.max_query_length]
+        try:
+            limit = int(limit) if limit else self.default_limit
+        except (TypeError, ValueError):
+            limit = self.default_limit
+        return query, min(max(limit, 1), self.max_limit)
+
+    def search(self, query, limit=None):
+        """게임 검색 결과 목록"""
+        query, limit = self.normalize_params(query, limit)
+        return self.get_index().search(query, limit, self.fuzzy_cutoff)
@@ -0,0 +1,64 @@
+import math
+import threading
+from collections import deque
+from functools import lru_cache
+from django.conf import settings
+
+
+class HedgePolicy:
+    """엔드포인트별 헤지 요청 기준 - 최근 응답 시간 백분위를 넘기면 두 번째 요청을 보냄
+
+    헤지 비율 상한(RUNPOD_HEDGE_MAX_RATE)을 넘으면 헤지하지 않는다. 장애로 모든 응답이
+    느려졌을 때 요청을 두 배로 보내 부하를 키우지 않기 위함.
+    """
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.percentile = getattr(settings, 'RUNPOD_HEDGE_PERCENTILE', 95)
+        self.min_samples = getattr(settings, 'RUNPOD_HEDGE_MIN_SAMPLES', 20)
+        self.min_delay = getattr(settings, 'RUNPOD_HEDGE_MIN_DELAY', 0.05)
+        self.max_rate = getattr(settings, 'RUNPOD_HEDGE_MAX_RATE', 0.1)
+        window = getattr(settings, 'RUNPOD_HEDGE_WINDOW', 200)
+        self._latencies = deque(maxlen=window)  # 최근 성공 응답 시간(초)
+        self._outcomes = deque(maxlen=window)  # 최근 요청별 헤지 여부
+        self._lock = threading.Lock()
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def delay(self):
+        """헤지까지 기다릴 시간(초) - 표본이 부족하면 None (헤지 안 함)"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        rank = max(math.ceil(self.percentile / 100 * len(ordered)), 1)
+        return max(ordered[rank - 1], self.min_delay)
+
+    def try_acquire(self):
+        """헤지 허용 여부 - 최근 요청 중 헤지 비율이 상한 미만일 때만 (허용하면 헤지로 기록)"""
+        with self._lock:
+            allowed = sum(self._outcomes) < self.max_rate * max(len(self._outcomes), 1)
+            if allowed and self._outcomes:
+                self._outcomes[-1] = True
+            return allowed
+
+    def start_request(self):
+        """헤지 비율 분모 - 헤지 대상 요청마다 한 번"""
+        with self._lock:
+            self._outcomes.append(False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'endpoint': self.endpoint,
+                'samples': len(self._latencies),
+                'hedge_rate': round(sum(self._outcomes) / len(self._outcomes), 4) if self._outcomes else 0.0,
+            }
+
+
+@lru_cache(maxsize=None)
+def get_hedge_policy(endpoint):
+    """엔드포인트별 정책 (워커 안에서 공유)"""
+    return HedgePolicy(endpoint)
@@ -0,0 +1,96 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils import timezone
+from ..cache_keys import make_key
+from ..deadline import deadline_scope
+from ..qa_analytics import frequent_questions
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchService:
+    """게임 선택 직후(또는 검색 결과에 손가락/마우스를 올렸을 때) 룰 요약과 자주 묻는 질문 답변을 미리 캐싱
+
+    작업은 워커 안의 작은 스레드 풀에서 돌고, 같은 게임은 공유 캐시 잠금으로 한 번만 실행한다.
+    이후 rule_summary_api/chat_api는 RuleExplanationService의 캐시에서 바로 응답한다.
+    """
+
+    def __init__(self, rule_explanation_service):
+        self.rule_service = rule_explanation_service
+        self.top_questions = getattr(settings, 'PREFETCH_TOP_QUESTIONS', 3)
+        self.lookback_days = getattr(settings, 'PREFETCH_LOOKBACK_DAYS', 30)
+        self.min_count = getattr(settings, 'PREFETCH_MIN_QUESTION_COUNT', 2)
+        self.lock_timeout = getattr(settings, 'PREFETCH_LOCK_TIMEOUT', 120)
+        self._executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'PREFETCH_MAX_WORKERS', 2), thread_name_prefix='prefetch'
+        )
+
+    def get_top_questions(self, game_name, chat_type):
+        """최근 lookback_days 동안 많이 나온 질문 (띄어쓰기/문장부호만 다른 질문은 합쳐서 셈)"""
+        cache_key = make_key('faq_questions', game_name, chat_type)
+        questions = cache.get(cache_key)
+        if questions is not None:
+            return questions
+
+        since = timezone.now() - timedelta(days=self.lookback_days)
+        top = frequent_questions(chat_type, since, self.top_questions, self.min_count, game_name, scan_limit=200)
+        questions = [question for _, question, _ in top.get(game_name, [])]
+        cache.set(cache_key, questions, getattr(settings, 'PREFETCH_QUESTIONS_CACHE_TIMEOUT', 3600))
+        return questions
+
+    def prefetch(self, game_name, chat_type, include_summary=True):
+        """캐시에 없는 요약/답변만 백그라운드로 요청 - 예약 상태 반환 (지원하지 않는 게임은 ValueError)"""
+        if game_name not in self.rule_service.get_available_games():
+            raise ValueError(f"'{game_name}' 게임은 현재 지원하지 않습니다.")
+
+        questions = self.get_top_questions(game_name, chat_type)
+        summary_needed = include_summary and not self.rule_service.has_cached_summary(game_name, chat_type)
+        pending = [q for q in questions if not self.rule_service.has_cached_answer(game_name, chat_type, q)]
+        status = {
+            'summary': 'scheduled' if summary_needed else ('cached' if include_summary else 'skipped'),
+            'questions': [{'question': q, 'cached': q not in pending} for q in questions],
+        }
+        if not summary_needed and not pending:
+            return status
+
+        # 다른 탭/워커가 같은 게임을 이미 받는 중이면 건너뜀
+        lock_key = make_key('prefetch_lock', game_name, chat_type)
+        if not cache.add(lock_key, 1, self.lock_timeout):
+            return {**status, 'summary': 'running'} if summary_needed else status
+        self._executor.submit(self._run, lock_key, game_name, chat_type, summary_needed, pending)
+        return status
+
+    def _run(self, lock_key, game_name, chat_type, summary_needed, questions):
+        """백그라운드 작업 - 미리 받으려고 만든 백엔드 세션은 바로 닫음
+
+        사용자 세션은 캐시로 받은 요약/답변을 모르므로 RuleExplanationService가 다음 질문의 history로 보낸다.
+        """
+        seconds = getattr(settings, 'RUNPOD_REQUEST_DEADLINES', {}).get('prefetch', 60)
+        fetched = 0
+        try:
+            with deadline_scope(seconds):
+                if summary_needed:
+                    result = self.rule_service.explain_game_rules(game_name, chat_type, "")
+                    self._close(result.get('session_id'))
+                    fetched += self.rule_service.has_cached_summary(game_name, chat_type)
+                for question in questions:
+                    result = self.rule_service.answer_rule_question(game_name, question, chat_type, "")
+                    self._close(result.get('session_id'))
+                    # 폴백/오류 답변은 캐싱하지 않음
+                    if result.get('source') == 'backend':
+                        self.rule_service.cache_answer(game_name, chat_type, question, result.get('response', ''))
+                        fetched += 1
+            logger.info(f"⚡ 미리 받기 완료: {game_name} ({chat_type}) {fetched}건")
+        except Exception as e:
+            logger.error(f"❌ 미리 받기 실패 ({game_name}, {chat_type}): {str(e)}")
+        finally:
+            cache.delete(lock_key)
+            connections.close_all()
+
+    def _close(self, session_id):
+        if session_id:
+            self.rule_service.close_session(session_id)
@@ -0,0 +1,296 @@
+import io
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import urllib.request
+from collections import OrderedDict
+from pathlib import Path
+import qrcode
+from qrcode.image.pure import PyPNGImage
+from qrcode.image.svg import SvgPathImage
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QRCodeService:
+    """모바일 접속용 QR 코드 생성 서비스 (베이스 URL / 이미지 캐싱)"""
+
+    # 외부 IP 서비스들 (순차적으로 시도)
+    IP_SERVICES = [
+        'https://ifconfig.me/ip',
+        'https://icanhazip.com',
+        'https://ipecho.net/plain',
+        'https://api.ipify.org',
+        'https://checkip.amazonaws.com'
+    ]
+
+    CONTENT_TYPES = {
+        'png': 'image/png',
+        'svg': 'image/svg+xml',
+    }
+
+    ERROR_CORRECTIONS = {
+        'L': qrcode.constants.ERROR_CORRECT_L,
+        'M': qrcode.constants.ERROR_CORRECT_M,
+        'Q': qrcode.constants.ERROR_CORRECT_Q,
+        'H': qrcode.constants.ERROR_CORRECT_H,
+    }
+
+    DEFAULT_BOX_SIZE = 10
+    MIN_BOX_SIZE = 1
+    MAX_BOX_SIZE = 40
+
+    def __init__(self):
+        self.base_url_ttl = getattr(settings, 'QR_BASE_URL_TTL', 3600)
+        self.base_url_failure_ttl = getattr(settings, 'QR_BASE_URL_FAILURE_TTL', 300)
+        self.ip_lookup_timeout = getattr(settings, 'QR_IP_LOOKUP_TIMEOUT', 3)
+        cache_dir = getattr(settings, 'QR_CACHE_DIR', None)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        asset_dir = getattr(settings, 'QR_ASSET_DIR', None)
+        self.asset_dir = Path(asset_dir) if asset_dir else None
+        self._asset_manifest = None
+
+        # 퍼블릭 IP 기반 베이스 URL 캐시 (None이면 감지 실패)
+        self._public_base_url = None
+        self._resolved_at = None
+        self._expires_at = 0.0
+        self._resolve_lock = threading.Lock()
+
+        # QR 이미지 메모리 캐시 (LRU): 캐시 키 -> (이미지 바이트, ETag, Content-Type)
+        self.memory_cache_size = getattr(settings, 'QR_MEMORY_CACHE_SIZE', 128)
+        self.disk_cache_max_files = getattr(settings, 'QR_DISK_CACHE_MAX_FILES', 1000)
+        self._images = OrderedDict()
+        self._images_lock = threading.Lock()
+
+    def get_base_url(self, request):
+        """QR에 들어갈 베이스 URL (환경변수 > 퍼블릭 IP > 요청 Host 순)"""
+        return self.get_trusted_base_url() or self.get_request_base_url(request)
+
+    def get_trusted_base_url(self):
+        """요청과 무관한 베이스 URL (환경변수 > 퍼블릭 IP) - 둘 다 없으면 None"""
+        # 1순위: 환경변수로 QR_BASE_URL이 설정된 경우
+        qr_base_url = os.getenv('QR_BASE_URL')
+        if qr_base_url:
+            return qr_base_url.rstrip('/')
+
+        # 2순위: 캐시된 퍼블릭 IP (만료 시 백그라운드 갱신, 최초 1회만 대기)
+        return self._get_public_base_url()
+
+    def peek_trusted_base_url(self):
+        """get_trusted_base_url과 같지만 기다리지 않음 - 퍼블릭 IP를 아직 모르면 백그라운드 감지만 시작하고 None"""
+        qr_base_url = os.getenv('QR_BASE_URL')
+        if qr_base_url:
+            return qr_base_url.rstrip('/')
+        return self._get_public_base_url(wait=False)
+
+    @staticmethod
+    def get_request_base_url(request):
+        """요청 Host 기반 베이스 URL (폴백 - 클라이언트가 값을 정하므로 캐시하지 않음)"""
+        scheme = 'https' if request.is_secure() else 'http'
+        logger.debug("📱 퍼블릭 IP 감지 실패 - 요청 Host로 QR 생성")
+        return f"{scheme}://{request.get_host()}"
+
+    def _get_public_base_url(self, wait=True):
+        """퍼블릭 IP 베이스 URL을 TTL 동안 캐싱해서 반환 (wait=False면 최초 감지도 백그라운드로)"""
+        if time.monotonic() < self._expires_at:
+            return self._public_base_url
+
+        if self._resolved_at is not None or not wait:
+            # 이전 값이 있으면 그대로 쓰고 갱신은 백그라운드에서
+            if self._resolve_lock.acquire(blocking=False):
+                threading.Thread(target=self._refresh_public_base_url, args=(True,), daemon=True).start()
+            return self._public_base_url
+
+        # 최초 감지: 동시 요청들은 한 번의 감지 결과를 기다림
+        with self._resolve_lock:
+            if self._resolved_at is None:
+                self._refresh_public_base_url(False)
+        return self._public_base_url
+
+    def _refresh_public_base_url(self, release_lock):
+        """외부 IP 서비스로 퍼블릭 IP 감지 후 캐시 갱신"""
+        try:
+            public_ip = self._lookup_public_ip()
+            if public_ip:
+                self._public_base_url = f"http://{public_ip}"
+                ttl = self.base_url_ttl
+            else:
+                logger.warning("📱 퍼블릭 IP 감지 실패 - 요청 Host로 QR 생성")
+                ttl = self.base_url_failure_ttl
+            self._resolved_at = time.monotonic()
+            self._expires_at = self._resolved_at + ttl
+        finally:
+            if release_lock:
+                self._resolve_lock.release()
+
+    def _lookup_public_ip(self):
+        """urllib로 외부 IP 서비스 순차 조회"""
+        for service in self.IP_SERVICES:
+            try:
+                with urllib.request.urlopen(service, timeout=self.ip_lookup_timeout) as response:
+                    ip = response.read().decode('utf-8').strip()
+                    if ip and '.' in ip and not ip.startswith('127.'):
+                        logger.info(f"📱 IP 감지 성공 ({service}): {ip}")
+                        return ip
+            except Exception as e:
+                logger.debug(f"📱 IP 감지 실패 ({service}): {str(e)}")
+                continue
+        return None
+
+    def normalize_variant(self, fmt='png', size=None, error_correction=None):
+        """요청 파라미터를 허용 범위의 (포맷, 크기, 오류 정정 레벨)로 정리"""
+        fmt = (fmt or 'png').lower()
+        if fmt not in self.CONTENT_TYPES:
+            raise ValueError(f"지원하지 않는 QR 포맷: {fmt}")
+
+        try:
+            size = int(size) if size else self.DEFAULT_BOX_SIZE
+        except (TypeError, ValueError):
+            size = self.DEFAULT_BOX_SIZE
+        size = min(max(size, self.MIN_BOX_SIZE), self.MAX_BOX_SIZE)
+
+        error_correction = (error_correction or 'L').upper()
+        if error_correction not in self.ERROR_CORRECTIONS:
+            error_correction = 'L'
+
+        return fmt, size, error_correction
+
+    def get_image(self, mobile_url, fmt='png', size=None, error_correction=None, cache=True):
+        """QR 이미지 바이트, ETag, Content-Type 반환 (메모리 > 사전 렌더링 파일 > 디스크 > 새로 생성)
+
+        cache=False(요청 Host로 만든 URL)이면 메모리/디스크 캐시에 넣지 않는다.
+        """
+        fmt, size, error_correction = self.normalize_variant(fmt, size, error_correction)
+        variant = f"{mobile_url}|{fmt}|{size}|{error_correction}"
+        cache_key = hashlib.sha256(variant.encode('utf-8')).hexdigest()[:32]
+
+        with self._images_lock:
+            cached = self._images.get(cache_key)
+            if cached is not None:
+                self._images.move_to_end(cache_key)
+                return cached
+
+        image = self._read_asset(mobile_url, fmt, size, error_correction)
+        if image is None and cache:
+            image = self._read_disk_cache(cache_key, fmt)
+        if image is None:
+            image = self.render(mobile_url, fmt, size, error_correction)
+            if cache:
+                self._write_disk_cache(cache_key, fmt, image)
+            logger.info(f"📱 QR 코드 생성 ({fmt}, {size}, {error_correction}): {mobile_url}")
+
+        entry = (image, f'"{hashlib.sha256(image).hexdigest()[:32]}"', self.CONTENT_TYPES[fmt])
+        if cache:
+            with self._images_lock:
+                self._images[cache_key] = entry
+                while len(self._images) > self.memory_cache_size:
+                    self._images.popitem(last=False)
+        return entry
+
+    def render(self, mobile_url, fmt='png', size=None, error_correction=None):
+        """qrcode로 렌더링 - PNG는 PyPNG, SVG는 벡터 패스로 만들어 Pillow를 쓰지 않음"""
+        fmt, size, error_correction = self.normalize_variant(fmt, size, error_correction)
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=self.ERROR_CORRECTIONS[error_correction],
+            box_size=size,
+            border=4
+        )
+        qr.add_data(mobile_url)
+        qr.make(fit=True)
+
+        image_factory = SvgPathImage if fmt == 'svg' else PyPNGImage
+        qr_image = qr.make_image(image_factory=image_factory)
+        buffer = io.BytesIO()
+        qr_image.save(buffer)
+        return buffer.getvalue()
+
+    @staticmethod
+    def asset_name(chat_type, fmt, size, error_correction):
+        """사전 렌더링 파일 이름 (static/chatbot/qr/ 기준)"""
+        return f"{chat_type}-{error_correction}-{size}.{fmt}"
+
+    def get_asset_manifest(self):
+        """render_qr_assets 명령이 남긴 manifest.json (없으면 None)"""
+        if self.asset_dir is None:
+            return None
+        manifest_path = self.asset_dir / 'manifest.json'
+        try:
+            mtime = manifest_path.stat().st_mtime
+        except OSError:
+            return None
+
+        # 파일이 바뀌었을 때만 다시 읽음
+        if self._asset_manifest is None or self._asset_manifest[0] != mtime:
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ QR manifest 읽기 실패: {str(e)}")
+                return None
+            self._asset_manifest = (mtime, manifest)
+        return self._asset_manifest[1]
+
+    def find_asset(self, chat_type, base_url, fmt='png', size=None, error_correction=None):
+        """같은 베이스 URL로 사전 렌더링된 파일이 있으면 static 상대 경로 반환"""
+        manifest = self.get_asset_manifest()
+        if not manifest or manifest.get('base_url') != base_url:
+            return None
+        fmt, size, error_correction = self.normalize_variant(fmt, size, error_correction)
+        name = self.asset_name(chat_type, fmt, size, error_correction)
+        if name not in manifest.get('files', []):
+            return None
+        return f"chatbot/qr/{name}"
+
+    def _read_asset(self, mobile_url, fmt, size, error_correction):
+        """사전 렌더링 파일 중 같은 URL을 담은 것이 있으면 읽기"""
+        manifest = self.get_asset_manifest()
+        if not manifest:
+            return None
+        for chat_type, url in manifest.get('urls', {}).items():
+            if url == mobile_url:
+                name = self.asset_name(chat_type, fmt, size, error_correction)
+                if name in manifest.get('files', []):
+                    try:
+                        return (self.asset_dir / name).read_bytes()
+                    except OSError:
+                        return None
+        return None
+
+    def _read_disk_cache(self, cache_key, fmt):
+        if self.cache_dir is None:
+            return None
+        try:
+            return (self.cache_dir / f"{cache_key}.{fmt}").read_bytes()
+        except OSError:
+            return None
+
+    def _write_disk_cache(self, cache_key, fmt, image):
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # 다른 워커가 읽는 중일 수 있으므로 임시 파일에 쓰고 교체
+            tmp_path = self.cache_dir / f"{cache_key}.{os.getpid()}.tmp"
+            tmp_path.write_bytes(image)
+            os.replace(tmp_path, self.cache_dir / f"{cache_key}.{fmt}")
+        except OSError as e:
+            logger.warning(f"⚠️ QR 디스크 캐시 저장 실패: {str(e)}")
+            return
+        self._prune_disk_cache()
+
+    def _prune_disk_cache(self):
+        """디스크 캐시 파일이 disk_cache_max_files를 넘으면 오래된 것부터 삭제 (새 파일을 쓸 때만 실행)"""
+        try:
+            files = [path for path in self.cache_dir.iterdir() if path.suffix in ('.png', '.svg')]
+            if len(files) <= self.disk_cache_max_files:
+                return
+            files.sort(key=lambda path: path.stat().st_mtime)
+            for path in files[:len(files) - self.disk_cache_max_files]:
+                path.unlink(missing_ok=True)
+        except OSError as e:
+            # 다른 워커가 먼저 지운 경우 등 - 다음 저장 때 다시 정리
+            logger.debug(f"📱 QR 디스크 캐시 정리 실패: {str(e)}")
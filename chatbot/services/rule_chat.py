@@ -0,0 +1,83 @@
+import logging
+from .batch_chat import QA_MODELS_BY_CHAT_TYPE
+
+logger = logging.getLogger(__name__)
+
+
+class RuleChatService:
+    """룰 설명 채팅 한 턴 - 답변 받기, QA 저장, 대화 기록 (chat_api와 채팅 웹소켓이 같이 사용)"""
+
+    def __init__(self, rule_explanation_service, game_recommendation_service, conversation_store):
+        self.rule_service = rule_explanation_service
+        self.recommendation_service = game_recommendation_service
+        self.conversation_store = conversation_store
+
+    def open_session(self, session_id=''):
+        """빈 요청으로 세션 ID만 받아오기 (__INIT_SESSION__) - 받지 못하면 기존 ID 반환"""
+        result = self.recommendation_service.recommend_games("initialize", session_id)
+        if isinstance(result, dict):
+            return result.get('session_id', session_id)
+        return session_id
+
+    def close_session(self, session_id):
+        """두 서비스 모두에 세션 종료 요청 - 하나라도 성공하면 True"""
+        rec_success = self.recommendation_service.close_session(session_id)
+        rule_success = self.rule_service.close_session(session_id)
+        return rec_success or rule_success
+
+    def answer(self, chat_type, game_name, message, session_id):
+        """룰 질문 답변 - {'response', 'session_id', 'source', 'latency_ms'}"""
+        if not game_name:
+            return {'response': "게임을 먼저 선택해주세요.", 'session_id': session_id, 'source': '', 'latency_ms': None}
+
+        # 파인튜닝 타입 매핑
+        api_chat_type = "finetuning" if chat_type == 'finetuning_rules' else "gpt"
+        result = self.rule_service.answer_rule_question(game_name, message, api_chat_type, session_id)
+        logger.info(f"🔍 룰 설명 서비스 반환 데이터: {result}")
+
+        if isinstance(result, dict):
+            response_text = result.get('response', '')
+            new_session_id = result.get('session_id', session_id)
+        else:
+            # 문자열로 반환하는 경우 (하위 호환성)
+            logger.warning(f"⚠️ 룰 설명 서비스가 문자열로 반환함: {type(result)}")
+            response_text, new_session_id, result = result, session_id, {}
+
+        # 다시 시도 안내는 답변이 아니므로 QA/대화 기록에 남기지 않음
+        if result.get('source') == 'error':
+            return {
+                'response': response_text,
+                'session_id': new_session_id,
+                'source': 'error',
+                'latency_ms': result.get('latency_ms'),
+            }
+
+        # 🔥 핵심: 질문과 답변을 QA DB에 자동 저장! (지연 시간/출처/토큰 수 포함)
+        try:
+            QA_MODELS_BY_CHAT_TYPE[chat_type].objects.create(
+                game_name=game_name,
+                question=message,
+                answer=response_text,
+                answer_source=result.get('source', ''),
+                latency_ms=result.get('latency_ms'),
+                session_id=(new_session_id or '')[:100],
+                response_size=len(response_text.encode('utf-8')),
+                prompt_tokens=result.get('prompt_tokens'),
+                completion_tokens=result.get('completion_tokens'),
+            )
+            qa_label = 'GPT' if chat_type == 'gpt_rules' else '파인튜닝'
+            logger.info(f"✅ {qa_label} QA 저장: {game_name} - {message[:30]}... ({result.get('latency_ms')}ms)")
+        except Exception as e:
+            logger.error(f"❌ QA 저장 실패: {str(e)}")
+
+        # 새로고침 복원 / 다른 파드로 세션 옮기기용 대화 기록
+        self.conversation_store.append(
+            session_id, chat_type, game_name, [('user', message), ('assistant', response_text)],
+            new_session_id=new_session_id
+        )
+        return {
+            'response': response_text,
+            'session_id': new_session_id,
+            'source': result.get('source', ''),
+            'latency_ms': result.get('latency_ms'),
+        }
@@ -1,9 +1,18 @@
+import time
+import hashlib
 import logging
 from django.conf import settings
+from django.core.cache import cache
 from .runpod_client import RunpodClient
+from ..cache_keys import make_key
+from ..models import RuleFAQ
+from ..qa_analytics import normalize_question
 
 logger = logging.getLogger(__name__)
 
+# 폴백 대신 다시 시도를 안내하는 오류 종류 (RunpodError.kind)
+RETRYABLE_ERROR_KINDS = ('timeout', 'deadline')
+
 class RuleExplanationService:
     """룰 설명 서비스 - Runpod 백엔드 연동 (GPT/파인튜닝 세션 분리)"""
     
@@ -14,27 +23,49 @@ class RuleExplanationService:
         # 폴백 옵션 설정
         self.use_fallback = getattr(settings, 'RUNPOD_USE_FALLBACK', True)
         
-        # 게임 목록 가져오기 (캐시용)
+        # 게임 목록 (공유 캐시를 워커 메모리에 잠깐 들고 있음)
         self._available_games = None
+        self._available_games_checked = 0.0
+        self._games_version = None  # (게임 목록, 버전 해시)
         
         logger.info("✅ 룰 설명 서비스가 초기화되었습니다.")
     
     def get_available_games(self):
-        """사용 가능한 게임 목록 반환 (캐싱)"""
-        if self._available_games is None:
+        """사용 가능한 게임 목록 반환 (워커 메모리 -> 공유 캐시 -> Runpod 순)"""
+        now = time.monotonic()
+        if self._available_games is not None and now - self._available_games_checked < getattr(settings, 'GAME_LIST_LOCAL_TTL', 30):
+            return self._available_games
+        
+        cache_key = make_key('games', self.runpod_client.base_url)
+        games = cache.get(cache_key)
+        if games is None:
             try:
-                self._available_games = self.runpod_client.sync_get_available_games()
-                logger.info(f"✅ 게임 목록 로드: {len(self._available_games)}개")
+                games = self.runpod_client.sync_get_available_games()
+                logger.info(f"✅ 게임 목록 로드: {len(games)}개")
             except Exception as e:
                 logger.error(f"❌ 게임 목록 로드 실패: {str(e)}")
-                # 기본 게임 목록
-                self._available_games = [
-                    "카탄", "스플렌더", "아줄", "윙스팬", "뱅", 
-                    "킹 오브 도쿄", "7 원더스", "도미니언", "스몰 월드", "티켓 투 라이드"
-                ]
+                games = list(self.runpod_client.FALLBACK_GAMES)
+            # 연결 실패로 기본 목록을 받은 경우는 짧게만 캐싱해서 서버가 살아나면 바로 반영
+            if games == self.runpod_client.FALLBACK_GAMES:
+                timeout = getattr(settings, 'GAME_LIST_FAILURE_CACHE_TIMEOUT', 60)
+            else:
+                timeout = getattr(settings, 'GAME_LIST_CACHE_TIMEOUT', 3600)
+            cache.set(cache_key, games, timeout)
         
+        # 내용이 같으면 기존 리스트 객체를 유지 (버전 해시/검색 인덱스 재계산 방지)
+        if games != self._available_games:
+            self._available_games = games
+        self._available_games_checked = now
         return self._available_games
     
+    def get_games_version(self):
+        """게임 목록 버전 (목록 내용의 해시) - 템플릿 조각 캐시 키로 사용"""
+        games = self.get_available_games()
+        if self._games_version is None or self._games_version[0] is not games:
+            version = hashlib.sha1('\n'.join(games).encode('utf-8')).hexdigest()[:12]
+            self._games_version = (games, version)
+        return self._games_version[1]
+    
     def explain_game_rules(self, game_name, chat_type='gpt_rules', session_id=""):
         """게임 룰 전체 설명 (GPT 또는 파인튜닝 세션 관리 포함)"""
         session_type = 'gpt' if chat_type == 'gpt_rules' else 'finetuning'
@@ -46,6 +77,20 @@ class RuleExplanationService:
                 'session_type': session_type
             }
         
+        # 룰 요약은 게임/채팅 타입별로 같으므로 공유 캐시에서 바로 응답
+        # (백엔드 세션은 요약을 모르므로 다음 질문에 history로 함께 보냄)
+        cache_key = make_key('rule_summary', game_name, chat_type)
+        cached_summary = cache.get(cache_key)
+        if cached_summary is not None:
+            logger.info(f"⚡ 룰 요약 캐시 사용: {game_name} ({session_type})")
+            self._queue_unsent(session_id, game_name, chat_type, summary=cached_summary)
+            return {
+                'response': cached_summary,
+                'session_id': session_id,
+                'session_type': session_type,
+                'source': 'cache'
+            }
+        
         try:
             logger.info(f"📚 룰 요약 요청: {game_name} ({session_type} 세션: {session_id})")
             result = self.runpod_client.sync_rule_summary(game_name, chat_type, session_id)
@@ -56,72 +101,196 @@ class RuleExplanationService:
             
             logger.info(f"✅ 룰 요약 완료 ({actual_session_type} 세션: {actual_session_id})")
             
+            # 백엔드가 요약을 만든 세션은 이미 게임 맥락을 가짐
+            cache.delete(self._unsent_key(actual_session_id))
+            cache.set(cache_key, result['response'], getattr(settings, 'RULE_SUMMARY_CACHE_TIMEOUT', 86400))
+            
             return {
-                'response': result.get('response', '요약을 가져올 수 없습니다.'),
+                'response': result['response'],
                 'session_id': actual_session_id,
-                'session_type': actual_session_type
+                'session_type': actual_session_type,
+                'source': 'backend'
             }
             
         except Exception as e:
-            logger.error(f"❌ 룰 설명 실패 ({session_type}): {str(e)}")
+            logger.error(f"❌ 룰 설명 실패 ({session_type}, {getattr(e, 'kind', 'error')}): {str(e)}")
             
-            if self.use_fallback:
-                fallback_response = self._get_fallback_rule_explanation(game_name, chat_type)
+            if self._should_use_fallback(e):
                 return {
-                    'response': fallback_response,
+                    'response': self._get_fallback_rule_explanation(game_name, chat_type),
                     'session_id': session_id,
-                    'session_type': session_type
-                }
-            else:
-                return {
-                    'response': f"룰 설명 서비스에 일시적인 문제가 발생했습니다: {str(e)}",
-                    'session_id': session_id,
-                    'session_type': session_type
+                    'session_type': session_type,
+                    'source': 'fallback'
                 }
+            return {
+                'response': self._get_retry_message(e),
+                'session_id': session_id,
+                'session_type': session_type,
+                'source': 'error'
+            }
     
     def answer_rule_question(self, game_name, question, chat_type='gpt_rules', session_id=""):
-        """특정 룰 질문에 답변 (GPT 또는 파인튜닝 세션 관리 포함)"""
+        """특정 룰 질문에 답변 (GPT 또는 파인튜닝 세션 관리 포함)
+
+        응답에는 QA 행에 함께 저장할 메타데이터(source, latency_ms, 토큰 수)가 들어 있다.
+        """
         session_type = 'gpt' if chat_type == 'gpt_rules' else 'finetuning'
+        started = time.perf_counter()
         
         if game_name not in self.get_available_games():
             return {
                 'response': f"'{game_name}' 게임은 현재 지원하지 않습니다.",
                 'session_id': session_id,
-                'session_type': session_type
+                'session_type': session_type,
+                'source': 'fallback',
+                'latency_ms': self._elapsed_ms(started)
+            }
+        
+        # 미리 받아 둔 자주 묻는 질문 답변 (PrefetchService, build_faqs) - 백엔드 호출 없이 바로 응답
+        cached_answer = self._get_cached_answer(game_name, chat_type, question)
+        if cached_answer is not None:
+            logger.info(f"⚡ 자주 묻는 질문 캐시 사용: {game_name} - {question} ({session_type})")
+            self._queue_unsent(session_id, game_name, chat_type, turns=[
+                {'role': 'user', 'content': question}, {'role': 'assistant', 'content': cached_answer}
+            ])
+            return {
+                'response': cached_answer,
+                'session_id': session_id,
+                'session_type': session_type,
+                'source': 'cache',
+                'latency_ms': self._elapsed_ms(started)
             }
         
         try:
             logger.info(f"💬 룰 질문: {game_name} - {question} ({session_type} 세션: {session_id})")
-            result = self.runpod_client.sync_explain_rules(game_name, question, chat_type, session_id)
+            history = self._rehydration_history(session_id, game_name, chat_type)
+            result = self.runpod_client.sync_explain_rules(game_name, question, chat_type, session_id, history)
+            cache.delete(self._unsent_key(session_id))
             
             # 세션 ID 처리: 백엔드에서 받은 session_id 사용
             actual_session_id = result.get('session_id', session_id)
             actual_session_type = result.get('session_type', session_type)
+            latency_ms = self._elapsed_ms(started)
             
-            logger.info(f"✅ 룰 질문 답변 완료 ({actual_session_type} 세션: {actual_session_id})")
+            logger.info(f"✅ 룰 질문 답변 완료 ({actual_session_type} 세션: {actual_session_id}, {latency_ms}ms)")
             
             return {
-                'response': result.get('response', '답변을 가져올 수 없습니다.'),
+                'response': result['response'],
                 'session_id': actual_session_id,
-                'session_type': actual_session_type
+                'session_type': actual_session_type,
+                'source': 'backend',
+                'latency_ms': latency_ms,
+                'prompt_tokens': result.get('prompt_tokens'),
+                'completion_tokens': result.get('completion_tokens')
             }
             
         except Exception as e:
-            logger.error(f"❌ 룰 질문 답변 실패 ({session_type}): {str(e)}")
+            logger.error(f"❌ 룰 질문 답변 실패 ({session_type}, {getattr(e, 'kind', 'error')}): {str(e)}")
             
-            if self.use_fallback:
-                fallback_response = self._get_fallback_rule_answer(game_name, question, chat_type)
-                return {
-                    'response': fallback_response,
-                    'session_id': session_id,
-                    'session_type': session_type
-                }
-            else:
+            if self._should_use_fallback(e):
                 return {
-                    'response': f"룰 질문 답변 서비스에 일시적인 문제가 발생했습니다: {str(e)}",
+                    'response': self._get_fallback_rule_answer(game_name, question, chat_type),
                     'session_id': session_id,
-                    'session_type': session_type
+                    'session_type': session_type,
+                    'source': 'fallback',
+                    'latency_ms': self._elapsed_ms(started)
                 }
+            return {
+                'response': self._get_retry_message(e),
+                'session_id': session_id,
+                'session_type': session_type,
+                'source': 'error',
+                'latency_ms': self._elapsed_ms(started)
+            }
+    
+    def _should_use_fallback(self, error):
+        """서버에 닿지 않았거나 실패한 경우만 기본 설명 - 시간 초과는 서버가 처리 중일 수 있어 다시 시도 안내"""
+        return self.use_fallback and getattr(error, 'kind', 'error') not in RETRYABLE_ERROR_KINDS
+    
+    @staticmethod
+    def _get_retry_message(error):
+        """사용자에게 보여줄 다시 시도 안내 (QA로 저장하지 않음, 내부 오류 내용은 로그에만)"""
+        if getattr(error, 'kind', 'error') in RETRYABLE_ERROR_KINDS:
+            return "⏳ 답변이 늦어지고 있습니다. 잠시 후 다시 질문해주세요."
+        return "⚠️ 지금은 AI 서버에 연결할 수 없습니다. 잠시 후 다시 시도해주세요."
+    
+    @staticmethod
+    def _elapsed_ms(started):
+        return int((time.perf_counter() - started) * 1000)
+    
+    @staticmethod
+    def _faq_answer_key(game_name, chat_type, question):
+        return make_key('faq_answer', game_name, chat_type, normalize_question(question))
+    
+    def has_cached_summary(self, game_name, chat_type):
+        return cache.get(make_key('rule_summary', game_name, chat_type)) is not None
+    
+    def has_cached_answer(self, game_name, chat_type, question):
+        return self._get_cached_answer(game_name, chat_type, question) is not None
+    
+    def _get_cached_answer(self, game_name, chat_type, question):
+        """미리 받은 답변 캐시 -> FAQ 테이블 순 (없으면 None)"""
+        answer = cache.get(self._faq_answer_key(game_name, chat_type, question))
+        if answer is not None:
+            return answer
+        normalized = normalize_question(question)
+        for faq in self.get_faqs(game_name, chat_type):
+            if faq['normalized_question'] == normalized:
+                return faq['answer']
+        return None
+    
+    def get_faqs(self, game_name, chat_type):
+        """build_faqs 명령이 만든 게임별 추천 질문과 답변 (순위순, 공유 캐시 - 명령 실행 시 'faq' 무효화)"""
+        cache_key = make_key('faq', game_name, chat_type)
+        faqs = cache.get(cache_key)
+        if faqs is None:
+            faqs = list(RuleFAQ.objects.filter(source=chat_type, game_name=game_name).order_by('rank').values(
+                'normalized_question', 'question', 'answer'
+            ))
+            cache.set(cache_key, faqs, getattr(settings, 'FAQ_CACHE_TIMEOUT', 86400))
+        return faqs
+    
+    def cache_answer(self, game_name, chat_type, question, answer):
+        """자주 묻는 질문 답변 저장 - 띄어쓰기/문장부호만 다른 질문도 같은 답변 사용"""
+        cache.set(self._faq_answer_key(game_name, chat_type, question), answer,
+                  getattr(settings, 'FAQ_ANSWER_CACHE_TIMEOUT', 86400))
+    
+    @staticmethod
+    def _unsent_key(session_id):
+        return make_key('session_unsent', session_id)
+    
+    def _queue_unsent(self, session_id, game_name, chat_type, summary=None, turns=()):
+        """캐시로 응답해 백엔드 세션이 모르는 요약/질문답변 기록 - 다음 질문의 history로 보냄 (게임이 바뀌면 새로 시작)"""
+        if not session_id:
+            return
+        key = self._unsent_key(session_id)
+        unsent = cache.get(key)
+        if not unsent or (unsent['game_name'], unsent['chat_type']) != (game_name, chat_type):
+            unsent = {'game_name': game_name, 'chat_type': chat_type, 'summary': None, 'turns': []}
+        if summary is not None:
+            unsent['summary'] = summary
+        unsent['turns'] = (unsent['turns'] + list(turns))[-getattr(settings, 'CONVERSATION_REHYDRATE_TURNS', 10):]
+        cache.set(key, unsent, self.runpod_client.pool.affinity_ttl)
+    
+    def _rehydration_history(self, session_id, game_name, chat_type):
+        """백엔드 세션이 모르는 대화 - 세션이 살아 있으면 캐시로 응답한 요약/답변만,
+        닫혔거나 세션을 가진 파드가 빠졌으면 저장된 대화 기록 전체 (새 파드가 세션을 이어가도록)"""
+        if not session_id:
+            return None
+        unsent = cache.get(self._unsent_key(session_id))
+        if not unsent or (unsent['game_name'], unsent['chat_type']) != (game_name, chat_type):
+            unsent = {'summary': None, 'turns': []}
+        summary = [{'role': 'assistant', 'content': unsent['summary']}] if unsent['summary'] else []
+        
+        if self.runpod_client.pool.has_live_session(session_id):
+            history = summary + unsent['turns']
+        else:
+            from . import get_conversation_store
+            # 저장된 기록에는 캐시 답변도 들어 있음 (요약은 따로 저장되므로 앞에 붙임)
+            history = summary + get_conversation_store().get_history(session_id, game_name)
+        if history:
+            logger.info(f"♻️ 세션 복원 요청: {session_id[:8]} ({len(history)}턴)")
+        return history or None
     
     def close_session(self, session_id, session_type=None):
         """세션 종료 요청 (GPT 또는 파인튜닝 세션)"""
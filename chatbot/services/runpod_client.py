@@ -1,17 +1,80 @@
 import httpx
+import time
+import random
 import asyncio
 import logging
 from django.conf import settings
-from typing import Dict, Any, Optional
+from django.core.cache import cache
+from typing import Dict, Any, List, Optional
+from .backend_pool import Backend, get_backend_pool
+from .hedging import get_hedge_policy
+from ..deadline import current_deadline
 
 logger = logging.getLogger(__name__)
 
+# 엔드포인트별 설정(RUNPOD_RETRY_POLICY)이 없을 때의 재시도 정책
+DEFAULT_RETRY_POLICY = {
+    'max_attempts': 2,  # 첫 시도 포함
+    'retry_statuses': (502, 503, 504),  # 프록시/파드 재시작 중 응답
+    'retry_connect_errors': True,  # 요청이 서버에 닿지 않았으므로 항상 안전
+    'retry_timeouts': False,  # 서버가 처리 중일 수 있어 세션 요청은 중복될 수 있음
+    'same_backend': False,  # True면 다른 파드가 아니라 처음 보낸 파드로 재시도 (세션이 있는 파드)
+    'backoff_base': 0.2,
+    'backoff_max': 2.0,
+}
+
+
+class RunpodError(Exception):
+    """Runpod 통신 오류 - kind로 종류 구분 (timeout/connection/server_error/client_error/deadline)"""
+    kind = 'error'
+    
+    def __init__(self, message: str, url: str = '', status_code: Optional[int] = None):
+        super().__init__(message)
+        self.url = url
+        self.status_code = status_code
+
+
+class RunpodTimeoutError(RunpodError):
+    """응답 시간 초과"""
+    kind = 'timeout'
+
+
+class RunpodDeadlineExceeded(RunpodTimeoutError):
+    """뷰가 정한 전체 마감 시간 초과 (더 이상 재시도하지 않음)"""
+    kind = 'deadline'
+
+
+class RunpodConnectionError(RunpodError):
+    """연결 거부, DNS 실패 등 요청이 서버에 닿지 않음"""
+    kind = 'connection'
+
+
+class RunpodServerError(RunpodError):
+    """5xx 응답"""
+    kind = 'server_error'
+
+
+class RunpodClientError(RunpodError):
+    """4xx 응답 (재시도하지 않음)"""
+    kind = 'client_error'
+
+
 class RunpodClient:
     """Runpod AI 백엔드와 통신하는 클라이언트"""
     
+    # Runpod 서버에 연결할 수 없을 때 쓰는 게임 목록
+    FALLBACK_GAMES = [
+        "카탄", "스플렌더", "아줄", "윙스팬", "뱅", 
+        "킹 오브 도쿄", "7 원더스", "도미니언", "스몰 월드", "티켓 투 라이드"
+    ]
+    
     def __init__(self):
-        self.base_url = getattr(settings, 'RUNPOD_API_URL', 'http://localhost:8000')
+        # 여러 파드를 쓰면 RUNPOD_API_URLS, 아니면 RUNPOD_API_URL 하나
+        urls = getattr(settings, 'RUNPOD_API_URLS', None) or [getattr(settings, 'RUNPOD_API_URL', 'http://localhost:8000')]
+        self.pool = get_backend_pool(urls)
+        self.base_url = self.pool.primary.url
         self.timeout = getattr(settings, 'RUNPOD_TIMEOUT', 30.0)
+        self.hedge_enabled = getattr(settings, 'RUNPOD_HEDGE_ENABLED', False)
         
         # HTTP 헤더 설정
         self.headers = {
@@ -19,34 +82,138 @@ class RunpodClient:
             'User-Agent': 'Django-BoardgameBot/1.0'
         }
         
-    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict[str, Any]:
-        """HTTP 요청 공통 메서드"""
-        url = f"{self.base_url}{endpoint}"
+    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, session_id: str = "",
+                            backend: Optional[Backend] = None) -> Dict[str, Any]:
+        """HTTP 요청 공통 메서드 (session_id가 있으면 그 세션을 가진 백엔드로)
+
+        엔드포인트별 재시도 정책(RUNPOD_RETRY_POLICY)에 따라 다른 백엔드(same_backend면 같은 백엔드)로 재시도하며,
+        뷰가 정한 마감 시간(deadline_scope)을 넘기면 RunpodDeadlineExceeded를 던진다.
+        """
+        if method.upper() not in ('GET', 'POST'):
+            raise ValueError(f"지원하지 않는 HTTP 메서드: {method}")
+        
+        policy = self._retry_policy(endpoint)
+        deadline = current_deadline()
+        tried = []
+        for attempt in range(1, policy['max_attempts'] + 1):
+            if backend is None or (attempt > 1 and not policy['same_backend']):
+                backend = self.pool.pick(session_id, exclude=tried)
+            timeout = self.timeout
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    raise RunpodDeadlineExceeded("AI 서버 응답 시간이 초과되었습니다.", f"{backend.url}{endpoint}")
+            
+            try:
+                return await self._send(method, endpoint, data, session_id, backend, timeout)
+            except RunpodError as e:
+                tried.append(backend)
+                if deadline is not None and isinstance(e, RunpodTimeoutError) and time.monotonic() >= deadline:
+                    raise RunpodDeadlineExceeded("AI 서버 응답 시간이 초과되었습니다.", e.url) from e
+                if attempt >= policy['max_attempts'] or not self._should_retry(e, policy):
+                    raise
+                # 지수 백오프 + full jitter (여러 워커가 같은 순간에 다시 몰리지 않도록)
+                delay = random.uniform(0, min(policy['backoff_max'], policy['backoff_base'] * 2 ** (attempt - 1)))
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    raise
+                logger.warning(f"🔁 Runpod 재시도 {attempt}/{policy['max_attempts'] - 1}: {endpoint} ({e.kind}, {delay:.2f}초 후)")
+                await asyncio.sleep(delay)
+    
+    async def _send(self, method: str, endpoint: str, data: Optional[Dict], session_id: str,
+                    backend: Backend, timeout: float) -> Dict[str, Any]:
+        """백엔드 하나로 한 번 요청 - httpx 오류를 종류별 RunpodError로 변환"""
+        url = f"{backend.url}{endpoint}"
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with httpx.AsyncClient(timeout=timeout) as client:
                 if method.upper() == 'GET':
                     response = await client.get(url, headers=self.headers)
-                elif method.upper() == 'POST':
-                    response = await client.post(url, json=data, headers=self.headers)
                 else:
-                    raise ValueError(f"지원하지 않는 HTTP 메서드: {method}")
+                    response = await client.post(url, json=data, headers=self.headers)
                 
                 response.raise_for_status()
-                return response.json()
+                result = response.json()
+            
+            self.pool.mark_success(backend)
+            # 백엔드가 만든 세션은 다음 턴도 같은 파드로 가도록 기록
+            if isinstance(result, dict) and isinstance(result.get('data'), dict):
+                self.pool.remember_session(result['data'].get('session_id') or session_id, backend)
+            return result
                 
-        except httpx.TimeoutException:
+        except httpx.TimeoutException as e:
+            self.pool.mark_failure(backend)
             logger.error(f"❌ Runpod API 타임아웃: {url}")
-            raise Exception("AI 서버 응답 시간이 초과되었습니다.")
+            raise RunpodTimeoutError("AI 서버 응답 시간이 초과되었습니다.", url) from e
         except httpx.HTTPStatusError as e:
-            logger.error(f"❌ Runpod API HTTP 오류: {e.response.status_code} - {url}")
-            raise Exception(f"AI 서버 오류가 발생했습니다: {e.response.status_code}")
+            status_code = e.response.status_code
+            logger.error(f"❌ Runpod API HTTP 오류: {status_code} - {url}")
+            if status_code >= 500:
+                self.pool.mark_failure(backend)
+                raise RunpodServerError(f"AI 서버 오류가 발생했습니다: {status_code}", url, status_code) from e
+            raise RunpodClientError(f"AI 서버 오류가 발생했습니다: {status_code}", url, status_code) from e
         except httpx.RequestError as e:
+            self.pool.mark_failure(backend)
             logger.error(f"❌ Runpod API 연결 오류: {str(e)} - {url}")
-            raise Exception("AI 서버에 연결할 수 없습니다.")
+            raise RunpodConnectionError("AI 서버에 연결할 수 없습니다.", url) from e
         except Exception as e:
             logger.error(f"❌ Runpod API 알 수 없는 오류: {str(e)} - {url}")
-            raise Exception(f"AI 서버 통신 중 오류가 발생했습니다: {str(e)}")
+            raise RunpodError(f"AI 서버 통신 중 오류가 발생했습니다: {str(e)}", url) from e
+    
+    @staticmethod
+    def _retry_policy(endpoint: str) -> Dict[str, Any]:
+        """기본 정책 위에 엔드포인트별 설정을 덮어쓴 재시도 정책"""
+        policies = getattr(settings, 'RUNPOD_RETRY_POLICY', {})
+        return {**DEFAULT_RETRY_POLICY, **policies.get('default', {}), **policies.get(endpoint, {})}
+    
+    @staticmethod
+    def _should_retry(error: 'RunpodError', policy: Dict[str, Any]) -> bool:
+        if isinstance(error, RunpodConnectionError):
+            return policy['retry_connect_errors']
+        if isinstance(error, RunpodTimeoutError):
+            return policy['retry_timeouts']
+        if isinstance(error, RunpodServerError):
+            return error.status_code in policy['retry_statuses']
+        return False
+    
+    async def _hedged_request(self, method: str, endpoint: str) -> Dict[str, Any]:
+        """멱등 GET 전용 - 최근 응답 시간 백분위 안에 응답이 없으면 다른 백엔드로 한 번 더 보내 먼저 성공한 응답 사용
+
+        느린 쪽 요청은 취소한다. 표본이 부족하거나 헤지 비율 상한에 걸리면 일반 요청과 같다.
+        세션을 만드는 POST는 취소된 쪽 세션이 남으므로 헤지하지 않고, 백엔드가 하나면 같은 파드 부하만 늘어나므로 헤지하지 않는다.
+        """
+        if not self.hedge_enabled or method.upper() != 'GET' or len(self.pool.backends) < 2:
+            return await self._make_request(method, endpoint)
+        
+        policy = get_hedge_policy(endpoint)
+        delay = policy.delay()
+        policy.start_request()
+        primary = self.pool.pick()
+        started = time.monotonic()
+        pending = {asyncio.ensure_future(self._make_request(method, endpoint, backend=primary))}
+        
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done and policy.try_acquire():
+                    backup = self.pool.pick(exclude=(primary,))
+                    logger.info(f"🪁 Runpod 헤지 요청: {endpoint} ({delay * 1000:.0f}ms 초과 -> {backup.url})")
+                    pending.add(asyncio.ensure_future(self._make_request(method, endpoint, backend=backup)))
+            
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        policy.record_latency(time.monotonic() - started)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # 늦은 쪽 요청 취소 (연결 정리가 끝날 때까지 기다려야 이벤트 루프를 닫을 수 있음)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
     
     async def health_check(self) -> Dict[str, Any]:
         """AI 서버 상태 확인"""
@@ -59,17 +226,20 @@ class RunpodClient:
             "session_id": session_id,
             "top_k": top_k
         }
-        return await self._make_request('POST', '/recommend', data)
+        return await self._make_request('POST', '/recommend', data, session_id)
     
-    async def explain_rules(self, game_name: str, question: str, chat_type: str = "gpt", session_id: str = "") -> Dict[str, Any]:
-        """룰 설명 요청"""
+    async def explain_rules(self, game_name: str, question: str, chat_type: str = "gpt", session_id: str = "",
+                            history: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        """룰 설명 요청 (history: 세션을 모르는 파드가 세션을 다시 만들 때 쓸 이전 질문/답변)"""
         data = {
             "game_name": game_name,
             "question": question,
             "chat_type": chat_type,
             "session_id": session_id
         }
-        return await self._make_request('POST', '/explain-rules', data)
+        if history:
+            data["history"] = history
+        return await self._make_request('POST', '/explain-rules', data, session_id)
     
     async def get_rule_summary(self, game_name: str, chat_type: str = "gpt", session_id: str = "") -> Dict[str, Any]:
         """게임 룰 요약 요청"""
@@ -78,122 +248,91 @@ class RunpodClient:
             "chat_type": chat_type,
             "session_id": session_id
         }
-        return await self._make_request('POST', '/rule-summary', data)
+        return await self._make_request('POST', '/rule-summary', data, session_id)
     
     async def close_session(self, session_id: str) -> Dict[str, Any]:
         """세션 종료 요청"""
         data = {"session_id": session_id}
-        return await self._make_request('POST', '/session/close', data)
+        try:
+            return await self._make_request('POST', '/session/close', data, session_id)
+        finally:
+            self.pool.forget_session(session_id)
     
     async def get_available_games(self) -> Dict[str, Any]:
         """사용 가능한 게임 목록 요청"""
-        return await self._make_request('GET', '/games')
+        return await self._hedged_request('GET', '/games')
     
-    def sync_recommend_games(self, query: str, session_id: str = "", top_k: int = 3) -> Dict[str, Any]:
-        """동기 버전 - 게임 추천 (추천 전용 세션)"""
+    @staticmethod
+    def _run_sync(coro):
+        """코루틴을 새 이벤트 루프에서 실행 (요청 스레드용)"""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self.recommend_games(query, session_id, top_k))
+            return loop.run_until_complete(coro)
+        finally:
             loop.close()
-            
-            logger.info(f"🔍 RunPod 추천 서버 응답: {result}")
-            
-            if result.get('status') == 'success':
-                data = result.get('data', {})
-                response_dict = {
-                    'response': data.get('recommendation', '추천을 가져올 수 없습니다.'),
-                    'session_id': data.get('session_id', session_id),
-                    'session_type': 'recommendation'  # 세션 타입 명시
-                }
-                logger.info(f"🔍 추천 리턴 데이터: {response_dict}")
-                return response_dict
-            else:
-                return {
-                    'response': result.get('message', '추천 요청이 실패했습니다.'),
-                    'session_id': session_id,
-                    'session_type': 'recommendation'
-                }
-                
-        except Exception as e:
-            logger.error(f"❌ 동기 게임 추천 실패: {str(e)}")
-            return {
-                'response': f"게임 추천 서비스에 연결할 수 없습니다: {str(e)}",
-                'session_id': session_id,
-                'session_type': 'recommendation'
-            }
-    
-    def sync_explain_rules(self, game_name: str, question: str, chat_type: str = "gpt", session_id: str = "") -> Dict[str, Any]:
-        """동기 버전 - 룰 설명 (GPT 또는 파인튜닝 세션)"""
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self.explain_rules(game_name, question, chat_type, session_id))
-            loop.close()
-            
-            session_type = 'gpt' if chat_type == 'gpt' else 'finetuning'
-            logger.info(f"🔍 RunPod 룰 설명 응답 ({session_type}): {result}")
-            
-            if result.get('status') == 'success':
-                data = result.get('data', {})
-                response_dict = {
-                    'response': data.get('answer', '답변을 가져올 수 없습니다.'),
-                    'session_id': data.get('session_id', session_id),
-                    'session_type': session_type  # 세션 타입 명시
-                }
-                logger.info(f"🔍 룰 설명 리턴 데이터 ({session_type}): {response_dict}")
-                return response_dict
-            else:
-                return {
-                    'response': result.get('message', '룰 설명 요청이 실패했습니다.'),
-                    'session_id': session_id,
-                    'session_type': session_type
-                }
-                
-        except Exception as e:
-            session_type = 'gpt' if chat_type == 'gpt' else 'finetuning'
-            logger.error(f"❌ 동기 룰 설명 실패 ({session_type}): {str(e)}")
-            return {
-                'response': f"룰 설명 서비스에 연결할 수 없습니다: {str(e)}",
-                'session_id': session_id,
-                'session_type': session_type
-            }
+    
+    def sync_recommend_games(self, query: str, session_id: str = "", top_k: int = 3) -> Dict[str, Any]:
+        """동기 버전 - 게임 추천 (추천 전용 세션)
+
+        통신 실패나 실패 응답은 RunpodError로 올려서 호출하는 서비스가 폴백을 고르게 한다.
+        """
+        result = self._run_sync(self.recommend_games(query, session_id, top_k))
+        logger.info(f"🔍 RunPod 추천 서버 응답: {result}")
+        
+        if result.get('status') != 'success':
+            raise RunpodError(result.get('message', '추천 요청이 실패했습니다.'))
+        
+        data = result.get('data', {})
+        response_dict = {
+            'response': data.get('recommendation', '추천을 가져올 수 없습니다.'),
+            'session_id': data.get('session_id', session_id),
+            'session_type': 'recommendation'  # 세션 타입 명시
+        }
+        logger.info(f"🔍 추천 리턴 데이터: {response_dict}")
+        return response_dict
+    
+    def sync_explain_rules(self, game_name: str, question: str, chat_type: str = "gpt", session_id: str = "",
+                           history: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        """동기 버전 - 룰 설명 (GPT 또는 파인튜닝 세션) - 실패는 RunpodError"""
+        session_type = 'gpt' if chat_type == 'gpt' else 'finetuning'
+        result = self._run_sync(self.explain_rules(game_name, question, chat_type, session_id, history))
+        logger.info(f"🔍 RunPod 룰 설명 응답 ({session_type}): {result}")
+        
+        data = result.get('data', {}) if result.get('status') == 'success' else {}
+        if not data.get('answer'):
+            raise RunpodError(result.get('message', '룰 설명 요청이 실패했습니다.'))
+        
+        usage = data.get('usage') or {}  # 백엔드가 토큰 사용량을 주는 경우에만 기록
+        response_dict = {
+            'response': data['answer'],
+            'session_id': data.get('session_id', session_id),
+            'session_type': session_type,  # 세션 타입 명시
+            'source': 'backend',
+            'prompt_tokens': usage.get('prompt_tokens'),
+            'completion_tokens': usage.get('completion_tokens'),
+        }
+        logger.info(f"🔍 룰 설명 리턴 데이터 ({session_type}): {response_dict}")
+        return response_dict
     
     def sync_rule_summary(self, game_name: str, chat_type: str = "gpt", session_id: str = "") -> Dict[str, Any]:
-        """동기 버전 - 룰 요약 (GPT 또는 파인튜닝 세션)"""
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self.get_rule_summary(game_name, chat_type, session_id))
-            loop.close()
-            
-            session_type = 'gpt' if chat_type == 'gpt' else 'finetuning'
-            logger.info(f"🔍 RunPod 룰 요약 응답 ({session_type}): {result}")
-            
-            if result.get('status') == 'success':
-                data = result.get('data', {})
-                response_dict = {
-                    'response': data.get('summary', '요약을 가져올 수 없습니다.'),
-                    'session_id': data.get('session_id', session_id),
-                    'session_type': session_type  # 세션 타입 명시
-                }
-                logger.info(f"🔍 룰 요약 리턴 데이터 ({session_type}): {response_dict}")
-                return response_dict
-            else:
-                return {
-                    'response': result.get('message', '룰 요약 요청이 실패했습니다.'),
-                    'session_id': session_id,
-                    'session_type': session_type
-                }
-                
-        except Exception as e:
-            session_type = 'gpt' if chat_type == 'gpt' else 'finetuning'
-            logger.error(f"❌ 동기 룰 요약 실패 ({session_type}): {str(e)}")
-            return {
-                'response': f"룰 요약 서비스에 연결할 수 없습니다: {str(e)}",
-                'session_id': session_id,
-                'session_type': session_type
-            }
+        """동기 버전 - 룰 요약 (GPT 또는 파인튜닝 세션) - 실패는 RunpodError"""
+        session_type = 'gpt' if chat_type == 'gpt' else 'finetuning'
+        result = self._run_sync(self.get_rule_summary(game_name, chat_type, session_id))
+        logger.info(f"🔍 RunPod 룰 요약 응답 ({session_type}): {result}")
+        
+        data = result.get('data', {}) if result.get('status') == 'success' else {}
+        if not data.get('summary'):
+            raise RunpodError(result.get('message', '룰 요약 요청이 실패했습니다.'))
+        
+        response_dict = {
+            'response': data['summary'],
+            'session_id': data.get('session_id', session_id),
+            'session_type': session_type,  # 세션 타입 명시
+            'source': 'backend'
+        }
+        logger.info(f"🔍 룰 요약 리턴 데이터 ({session_type}): {response_dict}")
+        return response_dict
     
     def sync_close_session(self, session_id: str) -> Dict[str, Any]:
         """동기 버전 - 세션 종료"""
@@ -205,7 +344,7 @@ class RunpodClient:
             return result
         except Exception as e:
             logger.error(f"❌ 동기 세션 종료 실패: {str(e)}")
-            return {"success": False, "message": str(e)}
+            return {"success": False, "message": str(e), "error": getattr(e, 'kind', 'error')}
     
     def sync_get_available_games(self) -> list:
         """동기 버전 - 게임 목록"""
@@ -230,21 +369,28 @@ class RunpodClient:
     
     def _get_fallback_games(self) -> list:
         """폴백 게임 목록"""
-        fallback_games = [
-            "카탄", "스플렌더", "아줄", "윙스팬", "뱅", 
-            "킹 오브 도쿄", "7 원더스", "도미니언", "스몰 월드", "티켓 투 라이드"
-        ]
+        fallback_games = list(self.FALLBACK_GAMES)
         logger.info(f"📋 폴백 게임 목록 사용: {len(fallback_games)}개")
         return fallback_games
     
     def sync_health_check(self) -> Dict[str, Any]:
-        """동기 버전 - 헬스체크"""
+        """동기 버전 - 헬스체크 (결과는 HEALTH_STATUS_CACHE_TIMEOUT 동안 워커 간 공유)"""
+        from ..cache_keys import make_key
+        
+        cache_key = make_key('health', self.base_url)
+        result = cache.get(cache_key)
+        if result is not None:
+            return result
+        
         try:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             result = loop.run_until_complete(self.health_check())
             loop.close()
-            return result
         except Exception as e:
             logger.error(f"❌ 헬스체크 실패: {str(e)}")
-            return {"status": "error", "message": str(e)}
+            result = {"status": "error", "message": str(e), "error": getattr(e, 'kind', 'error')}
+        if len(self.pool.backends) > 1 and isinstance(result, dict):
+            result = {**result, "backends": self.pool.snapshot()}
+        cache.set(cache_key, result, getattr(settings, 'HEALTH_STATUS_CACHE_TIMEOUT', 30))
+        return result
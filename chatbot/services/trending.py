@@ -0,0 +1,73 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from ..models import GameQAHourly
+
+logger = logging.getLogger(__name__)
+
+# 기간 이름 -> 시간 버킷 수 (진행 중인 현재 시간 버킷 포함)
+WINDOWS = {
+    'hour': 1,
+    'day': 24,
+    'week': 24 * 7,
+}
+
+SOURCES = ('all', 'gpt', 'finetuning')
+
+
+class TrendingService:
+    """최근 기간별 인기 게임 순위 - 시간별 집계(GameQAHourly) 버킷 합으로 계산"""
+
+    def __init__(self):
+        self.default_limit = getattr(settings, 'TRENDING_DEFAULT_LIMIT', 5)
+        self.max_limit = getattr(settings, 'TRENDING_MAX_LIMIT', 20)
+        self.cache_timeout = getattr(settings, 'TRENDING_CACHE_TIMEOUT', 60)
+
+    def normalize_params(self, window, limit=None, source=None):
+        """요청 파라미터를 허용 범위의 (기간, 개수, 종류)로 정리"""
+        if window not in WINDOWS:
+            window = 'day'
+        try:
+            limit = int(limit) if limit else self.default_limit
+        except (TypeError, ValueError):
+            limit = self.default_limit
+        if source not in SOURCES:
+            source = 'all'
+        return window, min(max(limit, 1), self.max_limit), source
+
+    def get_trending(self, window='day', limit=None, source='all'):
+        """기간 내 질문 수 순위 + 직전 같은 길이 기간의 질문 수 (상승 표시용)"""
+        window, limit, source = self.normalize_params(window, limit, source)
+        end = GameQAHourly.truncate_hour(timezone.now()) + timedelta(hours=1)
+
+        # 현재 시간 버킷이 키에 들어가므로 정시가 지나면 자연스럽게 새로 계산
+        cache_key = f"trending:{source}:{window}:{limit}:{end:%Y%m%d%H}"
+        result = cache.get(cache_key)
+        if result is not None:
+            return result
+
+        hours = WINDOWS[window]
+        start = end - timedelta(hours=hours)
+        qa_source = None if source == 'all' else source
+        current = GameQAHourly.get_window_counts(start, end, qa_source)
+        previous = GameQAHourly.get_window_counts(start - timedelta(hours=hours), start, qa_source)
+
+        rankings = sorted(current.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        result = {
+            'window': window,
+            'source': source,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'rankings': [
+                {
+                    'game_name': game_name,
+                    'count': count,
+                    'previous_count': previous.get(game_name, 0),
+                }
+                for game_name, count in rankings
+            ],
+        }
+        cache.set(cache_key, result, self.cache_timeout)
+        return result
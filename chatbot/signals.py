@@ -0,0 +1,21 @@
+import logging
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """SQLite 연결이 열릴 때 SQLITE_PRAGMAS 적용 (WAL, busy_timeout 등)"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def connect_signals():
+    connection_created.connect(configure_sqlite_connection, dispatch_uid='chatbot_sqlite_pragmas')
@@ -0,0 +1,47 @@
+import gzip
+import logging
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """해시 파일명 + gzip/brotli 사전 압축 스토리지 (WhiteNoise가 없을 때 사용)
+
+    collectstatic 시 .gz/.br 파일을 함께 만들어 두면 nginx의 gzip_static/brotli_static이
+    요청마다 압축하지 않고 그대로 내보낸다.
+    """
+
+    COMPRESS_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.map')
+    MIN_COMPRESS_SIZE = 256  # 이보다 작은 파일은 압축 이득이 없음
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        for hashed_name in set(self.hashed_files.values()):
+            if hashed_name.endswith(self.COMPRESS_EXTENSIONS):
+                self._write_compressed(hashed_name)
+
+    def _write_compressed(self, name):
+        """원본보다 작아질 때만 .gz / .br 파일 생성"""
+        path = self.path(name)
+        with open(path, 'rb') as f:
+            content = f.read()
+        if len(content) < self.MIN_COMPRESS_SIZE:
+            return
+
+        compressed = {'gz': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed['br'] = brotli.compress(content)
+
+        for extension, data in compressed.items():
+            if len(data) < len(content):
+                with open(f"{path}.{extension}", 'wb') as f:
+                    f.write(data)
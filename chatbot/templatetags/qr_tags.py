@@ -0,0 +1,27 @@
+from django import template
+from django.templatetags.static import static
+from django.urls import reverse
+from ..services import get_qr_code_service
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def qr_code_url(context, chat_type, fmt='png', size=None, error_correction=None):
+    """QR 이미지 URL - 사전 렌더링된 정적 파일이 있으면 static 경로, 없으면 QR API
+
+    페이지 렌더링이 외부 IP 조회를 기다리지 않도록, 사전 렌더링 파일이 있을 때만 이미 알고 있는 베이스 URL과 비교한다.
+    """
+    qr_code_service = get_qr_code_service()
+    if qr_code_service.get_asset_manifest():
+        base_url = qr_code_service.peek_trusted_base_url()
+        asset = qr_code_service.find_asset(chat_type, base_url, fmt, size, error_correction) if base_url else None
+        if asset:
+            return static(asset)
+
+    params = [f"format={fmt}"]
+    if size:
+        params.append(f"size={size}")
+    if error_correction:
+        params.append(f"ec={error_correction}")
+    return f"{reverse('chatbot:generate_qr', args=[chat_type])}?{'&'.join(params)}"
@@ -1,3 +1,847 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta, timezone as dt_timezone
+from pathlib import Path
+from importlib import import_module
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from .chat_sessions import remember_session
+from .finetune_dataset import prepare_batch
+from .models import (
+    AnswerBlob, ArchivedQACount, Conversation, ConversationTurn, FinetuningRuleQA, GameQAHourly, GPTRuleQA,
+    QAAggregation, QADailyStat, QATopQuestion, get_combined_game_rankings,
+)
+from .qa_analytics import frequent_questions
+from .ratelimit import ClientRateLimiter, validate_rules
+from .services.backend_pool import BackendPool
+from .services.batch_chat import BatchChatService
+from .services.conversation import ConversationStore
+from .services.game_search import GameSearchIndex
+from .services.hedging import get_hedge_policy
+from .services.qr_code import QRCodeService
+from .services.runpod_client import (
+    RunpodClient, RunpodClientError, RunpodConnectionError, RunpodError, RunpodServerError, RunpodTimeoutError,
+)
+from .services.rule_explanation import RuleExplanationService
+from .websocket import ChatSocketApp
 
-# Create your tests here.
+# 백엔드가 openai 1.x 마이그레이션 전 코드로 돌던 때 'backend' 출처로 저장된 실제 오류 행
+OPENAI_ERROR_ANSWER = (
+    "룰 질문 답변 중 오류가 발생했습니다: \n\nYou tried to access openai.ChatCompletion, "
+    "but this is no longer supported in openai>=1.0.0 - see the README at "
+    "https://github.com/openai/openai-python for the API."
+)
+
+
+class BuildFinetuneDatasetTests(TestCase):
+    """build_finetune_dataset - 폴백/오류 답변은 샤드에 들어가지 않아야 함"""
+
+    def setUp(self):
+        self.good = GPTRuleQA.objects.create(
+            game_name='카탄', question='도적은 언제 움직이나요?',
+            answer='주사위 합이 7이 나오면 도적을 원하는 타일로 옮기고 인접한 플레이어의 자원을 한 장 가져옵니다.',
+            answer_source='backend',
+        )
+        GPTRuleQA.objects.create(
+            game_name='카탄', question='처음 정착지는 몇 개 놓나요?', answer=OPENAI_ERROR_ANSWER, answer_source='backend',
+        )
+        GPTRuleQA.objects.create(
+            game_name='카탄', question='항구는 어떻게 쓰나요?',
+            answer='룰 설명 서비스에 연결할 수 없습니다: AI 서버에 연결할 수 없습니다.', answer_source='',
+        )
+        GPTRuleQA.objects.create(
+            game_name='스플렌더', question='귀족 타일은 언제 받나요?',
+            answer='답변을 가져올 수 없습니다. 잠시 후 다시 시도해주세요.', answer_source='backend',
+        )
+        GPTRuleQA.objects.create(
+            game_name='스플렌더', question='토큰은 몇 개까지 가질 수 있나요?',
+            answer='일반적으로 2-4명이 플레이할 수 있으며 자세한 내용은 설명서를 참고하세요.', answer_source='fallback',
+        )
+        GPTRuleQA.objects.create(
+            game_name='아줄', question='바닥줄 벌점은 얼마인가요?',
+            answer='지금은 AI 서버에 연결할 수 없습니다. 잠시 후 다시 시도해주세요.', answer_source='error',
+        )
+
+    def test_excludes_fallback_and_error_rows(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            call_command('build_finetune_dataset', output_dir, '--source', 'gpt', '--workers', '1', stdout=open(os.devnull, 'w'))
+            with open(os.path.join(output_dir, 'shard-00000.jsonl'), encoding='utf-8') as f:
+                records = [json.loads(line) for line in f]
+
+        self.assertEqual([record['metadata']['id'] for record in records], [self.good.pk])
+        self.assertNotIn('openai.ChatCompletion', json.dumps(records, ensure_ascii=False))
+
+    def _build(self, output_dir, *args):
+        call_command('build_finetune_dataset', output_dir, '--source', 'gpt', '--workers', '1', *args, stdout=open(os.devnull, 'w'))
+        with open(os.path.join(output_dir, 'shard-00000.jsonl'), encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_max_per_game_samples_by_hash_not_pk(self):
+        GPTRuleQA.objects.all().delete()
+        rows = [
+            GPTRuleQA.objects.create(
+                game_name='카탄', question=f'{i}번 상황에서 {i * 7919}개의 자원은 어떻게 처리하나요?',
+                answer=f'{i * 104729}번 규칙에 따라 자원을 은행에 반납하고 차례를 넘깁니다. ({i})', answer_source='backend',
+            )
+            for i in range(20)
+        ]
+        config = {'num_perm': 64, 'bands': 8, 'shingle_size': 5, 'seed': 1, 'min_question': 5, 'max_question': 1000,
+                  'min_answer': 20, 'max_answer': 8000}
+        prepared, _ = prepare_batch(
+            [('gpt', qa.pk, qa.game_name, qa.question, qa.answer, qa.answer_source) for qa in rows], config
+        )
+        expected = sorted(prepared, key=lambda row: row['sample_value'])[:5]
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            records = self._build(output_dir, '--max-per-game', '5')
+            self.assertEqual(
+                sorted(record['metadata']['id'] for record in records), sorted(row['pk'] for row in expected)
+            )
+            # 샤드 크기/system 프롬프트가 다르면 체크포인트에서 재개하지 않음
+            with self.assertRaises(CommandError):
+                self._build(output_dir, '--max-per-game', '5', '--shard-size', '10')
+
+
+class BackendPoolTests(SimpleTestCase):
+    """BackendPool.pick - 세션 없는 호출은 정상 백엔드 중 무작위, 세션은 기록된 백엔드로"""
+
+    def setUp(self):
+        self.pool = BackendPool(['http://pod-a', 'http://pod-b', 'http://pod-c'])
+        self.pool._checker = object()  # 테스트에서는 /health 확인 스레드를 띄우지 않음
+        self.a, self.b, self.c = self.pool.backends
+
+    def test_pick_spreads_over_healthy_backends(self):
+        self.c.healthy = False
+        picked = {self.pool.pick().url for _ in range(200)}
+        self.assertEqual(picked, {self.a.url, self.b.url})
+        self.assertEqual(self.pool.pick(exclude=[self.a]), self.b)
+
+    def test_session_stays_on_remembered_backend(self):
+        self.pool.remember_session('sess-1', self.c)
+        self.assertEqual({self.pool.pick('sess-1').url for _ in range(20)}, {self.c.url})
+        self.assertNotEqual(self.pool.pick('sess-1', exclude=[self.c]), self.c)
+
+
+class RuleExplanationCacheTests(TestCase):
+    """캐시로 응답한 룰 요약/FAQ 답변은 다음 질문의 history로 백엔드 세션에 전달"""
+
+    def setUp(self):
+        cache.clear()
+        self.service = RuleExplanationService()
+        self.service.get_available_games = lambda: ['카탄']
+        self.client_mock = mock.patch.object(
+            self.service.runpod_client, 'sync_explain_rules',
+            return_value={'response': '답변', 'session_id': 'sess-1', 'session_type': 'gpt'},
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+        # 세션을 가진 파드가 살아 있음
+        self.service.runpod_client.pool.remember_session('sess-1', self.service.runpod_client.pool.primary)
+
+    def test_cached_summary_is_sent_with_next_question(self):
+        self.service.runpod_client.sync_rule_summary = mock.Mock(return_value={'response': '카탄 요약', 'session_id': 'sess-0'})
+        self.assertEqual(self.service.explain_game_rules('카탄', 'gpt', 'sess-0')['source'], 'backend')
+        result = self.service.explain_game_rules('카탄', 'gpt', 'sess-1')
+        self.assertEqual((result['source'], result['session_id']), ('cache', 'sess-1'))
+        self.service.runpod_client.sync_rule_summary.assert_called_once()
+
+        self.service.answer_rule_question('카탄', '도적은 언제 움직이나요?', 'gpt', 'sess-1')
+        self.assertEqual(self.client_mock.call_args.args[4], [{'role': 'assistant', 'content': '카탄 요약'}])
+
+        # 한 번 보낸 뒤에는 세션이 알고 있음
+        self.service.answer_rule_question('카탄', '항구는 어떻게 쓰나요?', 'gpt', 'sess-1')
+        self.assertIsNone(self.client_mock.call_args.args[4])
+
+    def test_cached_faq_answer_is_sent_with_next_question(self):
+        self.service.cache_answer('카탄', 'gpt', '처음 정착지는 몇 개인가요?', '두 개입니다.')
+        result = self.service.answer_rule_question('카탄', '처음 정착지는 몇 개인가요', 'gpt', 'sess-1')
+        self.assertEqual(result['source'], 'cache')
+        self.client_mock.assert_not_called()
+
+        self.service.answer_rule_question('카탄', '도적은 언제 움직이나요?', 'gpt', 'sess-1')
+        self.assertEqual(self.client_mock.call_args.args[4], [
+            {'role': 'user', 'content': '처음 정착지는 몇 개인가요'}, {'role': 'assistant', 'content': '두 개입니다.'},
+        ])
+
+
+class FakeRuleService:
+    """Runpod 없이 BatchChatService를 돌리기 위한 룰 설명 서비스"""
+
+    def get_available_games(self):
+        return ['카탄']
+
+    def answer_rule_question(self, game_name, question, chat_type, session_id):
+        if question == '실패':
+            raise RuntimeError('백엔드 오류')
+        return {'response': f'{question} 답변', 'session_id': 'sess-1', 'source': 'backend', 'latency_ms': 5}
+
+    def explain_game_rules(self, game_name, chat_type, session_id):
+        return {'response': f'{game_name} 요약', 'session_id': 'sess-1', 'source': 'cache'}
+
+
+def hash_without_time(game_name, question, answer, created_at):
+    """같은 질문/답변이면 같은 content_hash (중복 행 만들기용)"""
+    return hashlib.sha256('\x1f'.join([game_name, question, answer]).encode('utf-8')).hexdigest()
+
+
+class BatchChatTests(TestCase):
+    """일괄 채팅 - 항목별 NDJSON 줄 + 요약 줄, 질문 답변은 bulk_create 한 번으로 저장"""
+
+    def setUp(self):
+        self.service = BatchChatService(FakeRuleService())
+
+    def _stream(self, items):
+        return [json.loads(line) for line in self.service.stream(self.service.parse_items({'items': items}))]
+
+    def test_stream_lines_and_bulk_save(self):
+        lines = self._stream([
+            {'game_name': '카탄', 'question': '도적은 언제 움직이나요?'},
+            {'game_name': '카탄'},
+            {'game_name': '카탄', 'question': '실패'},
+        ])
+        items, summary = lines[:-1], lines[-1]
+        self.assertEqual(sorted(line['index'] for line in items), [0, 1, 2])
+        by_index = {line['index']: line for line in items}
+        self.assertEqual(by_index[0]['response'], '도적은 언제 움직이나요? 답변')
+        self.assertEqual(by_index[1]['response'], '카탄 요약')
+        self.assertEqual(by_index[2]['status'], 'error')
+        self.assertEqual((summary['status'], summary['count'], summary['saved']), ('done', 3, 1))
+
+        # 룰 요약과 실패 항목은 저장하지 않음
+        self.assertEqual(list(GPTRuleQA.objects.values_list('question', flat=True)), ['도적은 언제 움직이나요?'])
+        self.assertEqual(GameQAHourly.objects.get(game_name='카탄').count, 1)
+
+    def test_duplicate_hash_is_skipped_without_rolling_back_batch(self):
+        with mock.patch.object(GPTRuleQA, 'compute_content_hash', side_effect=hash_without_time):
+            GPTRuleQA.objects.create(game_name='카탄', question='항구는?', answer='항구는? 답변')
+            lines = self._stream([
+                {'game_name': '카탄', 'question': '항구는?'},
+                {'game_name': '카탄', 'question': '도적은?'},
+            ])
+
+        self.assertEqual(lines[-1]['saved'], 1)
+        self.assertEqual(GPTRuleQA.objects.filter(question='도적은?').count(), 1)
+        self.assertEqual(GPTRuleQA.objects.filter(question='항구는?').count(), 1)
+        # 직접 create한 행(save()에서 1) + 일괄 저장한 새 행 1
+        self.assertEqual(GameQAHourly.objects.get(game_name='카탄').count, 2)
+
+
+class QAAnalyticsTests(TestCase):
+    """aggregate_qa_stats / 분석 API - 마지막 집계일부터 증분 집계, 버전(ETag/Last-Modified)은 항상 증가"""
+
+    def _qa(self, question, days_ago=0, game_name='카탄'):
+        qa = GPTRuleQA.objects.create(game_name=game_name, question=question, answer='충분히 긴 답변입니다.', answer_source='backend')
+        GPTRuleQA.objects.filter(pk=qa.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        return qa
+
+    def _aggregate(self, *args):
+        call_command('aggregate_qa_stats', '--type', 'gpt', *args, stdout=open(os.devnull, 'w'))
+
+    def test_api_etag_and_version_only_move_forward(self):
+        self._qa('도적은 언제 움직이나요?')
+        url = reverse('chatbot:qa_analytics_api') + '?days=7&type=gpt'
+        self._aggregate()
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()['total_questions'], 1)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        # 같은 초에 다시 집계해도 버전이 바뀌고 뒤로 가지 않음
+        self._aggregate()
+        second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertGreater(second.json()['aggregated_at'], first.json()['aggregated_at'])
+
+    def test_aggregates_from_last_processed_day(self):
+        self._qa('항구는 어떻게 쓰나요?', days_ago=10)
+        self._aggregate('--days', '1')  # 처음 집계는 전체
+        self.assertTrue(QADailyStat.objects.filter(day=(timezone.now() - timedelta(days=10)).date()).exists())
+
+        # cron이 며칠 멈췄던 경우 - 기준일부터 빠짐없이 다시 계산
+        QAAggregation.objects.filter(source='gpt').update(aggregated_through=timezone.now().date() - timedelta(days=5))
+        self._qa('항구는 어떻게 쓰나요?', days_ago=4)
+        self._aggregate('--days', '1')
+        self.assertEqual(QADailyStat.objects.filter(source='gpt').count(), 2)
+
+        # 반복 질문은 일별 질문 통계를 합산 - 원본이 보관(삭제)돼도 유지
+        GPTRuleQA.objects.all().delete()
+        self._qa('도적은 언제 움직이나요?')
+        self._aggregate('--days', '1')
+        self.assertEqual(list(QATopQuestion.objects.values_list('question', 'count')), [('항구는 어떻게 쓰나요?', 2)])
+
+        # 자주 묻는 질문: 집계된 날짜는 요약 테이블, 오늘은 원본
+        self._qa('도적은 언제 움직이나요')
+        top = frequent_questions('gpt', timezone.now() - timedelta(days=30), 5)
+        self.assertEqual(sorted((key, count) for key, _, count in top['카탄']), [('도적은언제움직이나요', 2), ('항구는어떻게쓰나요', 2)])
+
+
+class QRCodeTests(SimpleTestCase):
+    """QR 코드 - 퍼블릭 IP 감지를 기다리지 않음, ETag/304, 메모리·디스크 캐시 상한"""
+
+    def setUp(self):
+        os.environ.pop('QR_BASE_URL', None)
+        self.service = QRCodeService()
+        patcher = mock.patch('chatbot.views.get_qr_code_service', return_value=self.service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_first_request_does_not_wait_for_public_ip(self):
+        lookup_started = threading.Event()
+        release = threading.Event()
+
+        def slow_lookup():
+            lookup_started.set()
+            release.wait(5)
+            return '203.0.113.7'
+
+        url = reverse('chatbot:generate_qr', args=['gpt_rules'])
+        with mock.patch.object(self.service, '_lookup_public_ip', side_effect=slow_lookup):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Cache-Control'], 'private, no-cache')  # 요청 Host로 만든 QR
+            self.assertTrue(lookup_started.wait(1))
+            release.set()
+            with self.service._resolve_lock:  # 백그라운드 감지가 끝날 때까지
+                pass
+
+            response = self.client.get(url)
+            self.assertTrue(response['Cache-Control'].startswith('public'))
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_image_caches_are_bounded(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self.service.cache_dir = Path(cache_dir)
+            self.service.memory_cache_size = 2
+            self.service.disk_cache_max_files = 2
+            etags = [self.service.get_image(f'http://203.0.113.7/mobile/{i}/')[1] for i in range(3)]
+            self.assertEqual(len(set(etags)), 3)
+            self.assertEqual(len(self.service._images), 2)
+            self.assertEqual(len(list(Path(cache_dir).glob('*.png'))), 2)
+            # 캐시를 쓰지 않는 이미지(요청 Host)는 넣지 않음
+            self.service.get_image('http://evil.example/mobile/', cache=False)
+            self.assertEqual(len(self.service._images), 2)
+
+
+@override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMIT_BACKEND='local', RATE_LIMIT_KEY='ip',
+                   RATE_LIMIT_RULES={'trending_games_api': {'rate': 0.01, 'burst': 2}})
+class RateLimitTests(TestCase):
+    """요청 제한 - 초과 시 429와 Retry-After, 잘못된 규칙 거부, 세션 키는 서버에 있는 세션만"""
+
+    def test_over_limit_returns_429_with_retry_after(self):
+        url = reverse('chatbot:trending_games_api')
+        for _ in range(2):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['status'], 'error')
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        # 다른 IP는 별도 버킷
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='198.51.100.2').status_code, 200)
+
+    def test_invalid_rules_are_rejected(self):
+        for rule in ({'rate': 0, 'burst': 5}, {'rate': 1, 'burst': 0}, {'rate': 'fast', 'burst': 5}, {'burst': 5}):
+            with self.assertRaises(ImproperlyConfigured):
+                validate_rules({'chat_api': rule})
+
+    def test_session_key_only_for_existing_sessions(self):
+        limiter = ClientRateLimiter('local', 0.01, 1, scope='chat_api', key_type='session', session_ip_factor=2)
+        SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
+        forged = SessionStore('x' * 32)
+        self.assertEqual(limiter.client_key('198.51.100.1', forged), 'ip:198.51.100.1')
+        self.assertEqual(limiter.client_key('198.51.100.1', None), 'ip:198.51.100.1')
+
+        sessions = []
+        for _ in range(3):
+            session = SessionStore()
+            session.create()
+            sessions.append(session)
+        self.assertEqual(limiter.client_key('198.51.100.1', sessions[0]), f"session:{sessions[0].session_key}")
+
+        # 세션마다 버킷이 따로지만, 같은 IP의 세션을 모두 합친 한도(burst x 2)를 넘으면 거부
+        self.assertTrue(limiter.consume('198.51.100.1', sessions[0])[0])
+        self.assertFalse(limiter.consume('198.51.100.1', sessions[0])[0])
+        self.assertTrue(limiter.consume('198.51.100.1', sessions[1])[0])
+        allowed, retry_after, client_key = limiter.consume('198.51.100.1', sessions[2])
+        self.assertFalse(allowed)
+        self.assertGreater(retry_after, 0)
+        self.assertEqual(client_key, 'ip:198.51.100.1')
+
+
+class GameSearchIndexTests(SimpleTestCase):
+    """게임 검색 - 초성, 입력 중인 자모, 단어 접두사, 오타 매칭과 정렬"""
+
+    def setUp(self):
+        self.index = GameSearchIndex(['카탄', '카르카손', '스플렌더', '7 원더스', '티켓 투 라이드', '과일 샐러드'])
+
+    def search(self, query, limit=10):
+        return [(result['name'], result['match']) for result in self.index.search(query, limit)]
+
+    def test_choseong_query(self):
+        # 초성 접두사가 중간 일치('티켓 투' -> ㅌㅋㅌ)보다 앞
+        self.assertEqual(self.search('ㅋㅌ'), [('카탄', 'choseong'), ('티켓 투 라이드', 'substring')])
+        self.assertEqual(self.search('ㅅㅍ'), [('스플렌더', 'choseong')])
+        self.assertEqual(self.search('ㄹㅇ'), [('티켓 투 라이드', 'choseong')])  # 단어 초성
+
+    def test_partial_syllable_matches_as_prefix(self):
+        # '카탄'을 치는 중 ('캍'), '과일'을 치는 중 ('고' - 겹모음 ㅘ의 앞부분)
+        self.assertEqual(self.search('캍'), [('카탄', 'prefix')])
+        self.assertEqual(self.search('고'), [('과일 샐러드', 'prefix')])
+
+    def test_ranking_and_word_prefix(self):
+        self.assertEqual(self.search('카탄')[0], ('카탄', 'exact'))
+        self.assertEqual(self.search('카'), [('카탄', 'prefix'), ('카르카손', 'prefix')])
+        self.assertEqual(self.search('원더'), [('7 원더스', 'word_prefix')])
+        self.assertEqual(self.search('카손'), [('카르카손', 'substring')])
+        self.assertEqual(self.search('스플랜더'), [('스플렌더', 'fuzzy')])
+        self.assertEqual(self.search('카', limit=1), [('카탄', 'prefix')])
+        self.assertEqual(self.search('   '), [])
+
+
+class QAImportExportTests(TestCase):
+    """qa_export -> qa_import - 원래 시각과 긴 답변을 보존하고, 같은 파일을 다시 가져와도 행이 늘지 않음"""
+
+    def setUp(self):
+        created_at = timezone.now() - timedelta(days=3)
+        GPTRuleQA.objects.create(game_name='카탄', question='도적은?', answer='7이 나오면 움직입니다.', created_at=created_at)
+        GPTRuleQA.objects.create(game_name='카탄', question='항구는?', answer='교환 ' * 100, created_at=created_at)
+        FinetuningRuleQA.objects.create(game_name='아줄', question='바닥줄은?', answer='타일마다 감점입니다.')
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def snapshot(self):
+        return sorted(
+            (qa.__class__.__name__, qa.game_name, qa.question, qa.answer, qa.created_at, qa.content_hash)
+            for model in (GPTRuleQA, FinetuningRuleQA) for qa in model.objects.all()
+        )
+
+    def test_round_trip_is_idempotent(self):
+        original = self.snapshot()
+        for name in ('qa.jsonl.gz', 'qa.csv'):
+            path = os.path.join(self.tmp.name, name)
+            call_command('qa_export', path, stdout=io.StringIO())
+            # 그대로 다시 가져오면 모두 중복
+            call_command('qa_import', path, stdout=io.StringIO())
+            self.assertEqual(self.snapshot(), original)
+
+            GPTRuleQA.objects.all().delete()
+            FinetuningRuleQA.objects.all().delete()
+            call_command('qa_import', path, stdout=io.StringIO())
+            self.assertEqual(self.snapshot(), original)
+        self.assertIsNotNone(GPTRuleQA.objects.get(question='항구는?').answer_blob_id)
+
+    def test_row_without_created_at_is_rejected(self):
+        path = os.path.join(self.tmp.name, 'qa.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'type': 'gpt', 'game_name': '카탄', 'question': 'q', 'answer': 'a'}) + '\n')
+        with self.assertRaises(CommandError):
+            call_command('qa_import', path, stdout=io.StringIO())
+        call_command('qa_import', path, '--skip-invalid', stdout=io.StringIO())
+        self.assertEqual(GPTRuleQA.objects.count(), 2)
+
+
+@override_settings(ANSWER_BLOB_MIN_LENGTH=50, ANSWER_BLOB_CODEC='zlib')
+class AnswerBlobTests(TestCase):
+    """긴 답변 압축 저장 - 같은 답변은 blob 하나, 0003 마이그레이션 데이터 이동/되돌리기"""
+
+    LONG_ANSWER = '주사위 합이 7이 나오면 도적을 옮기고 자원을 한 장 가져옵니다. ' * 5
+
+    def test_long_answers_are_deduplicated(self):
+        first = GPTRuleQA.objects.create(game_name='카탄', question='도적은?', answer=self.LONG_ANSWER)
+        second = FinetuningRuleQA.objects.create(game_name='카탄', question='7이 나오면?', answer=self.LONG_ANSWER)
+        short = GPTRuleQA.objects.create(game_name='카탄', question='몇 명?', answer='3-4명')
+
+        self.assertEqual(AnswerBlob.objects.count(), 1)
+        self.assertEqual(first.answer_blob_id, second.answer_blob_id)
+        self.assertEqual(GPTRuleQA.objects.get(pk=first.pk).answer_inline, '')
+        self.assertEqual(GPTRuleQA.objects.get(pk=first.pk).answer, self.LONG_ANSWER)
+        self.assertIsNone(short.answer_blob_id)
+        blob = AnswerBlob.objects.get()
+        self.assertLess(len(blob.data), blob.size)
+
+    def test_migration_moves_and_restores_answers(self):
+        migration = import_module('chatbot.migrations.0003_answer_blob')
+        qa = GPTRuleQA.objects.create(game_name='카탄', question='도적은?', answer=self.LONG_ANSWER * 2)
+        migration.restore_inline_answers(django_apps, None)
+        qa.refresh_from_db()
+        self.assertIsNone(qa.answer_blob_id)
+        self.assertEqual(qa.answer_inline, self.LONG_ANSWER * 2)
+
+        migration.move_answers_to_blobs(django_apps, None)
+        qa.refresh_from_db()
+        self.assertEqual(qa.answer_inline, '')
+        self.assertEqual(qa.answer, self.LONG_ANSWER * 2)
+
+
+class ArchiveQATests(TestCase):
+    """archive_qa - 오래된 행은 원본에서 빠지고 월별 집계로 순위/통계에 계속 포함"""
+
+    def setUp(self):
+        old = timezone.now() - timedelta(days=400)
+        for i in range(3):
+            GPTRuleQA.objects.create(game_name='카탄', question=f'예전 질문 {i}', answer='답변', created_at=old)
+        FinetuningRuleQA.objects.create(game_name='아줄', question='예전 질문', answer='답변', created_at=old)
+        GPTRuleQA.objects.create(game_name='카탄', question='최근 질문', answer='답변')
+        GPTRuleQA.objects.create(game_name='스플렌더', question='최근 질문', answer='답변')
+        self.rankings_before = self.rankings()
+
+    def rankings(self):
+        return sorted(get_combined_game_rankings(), key=lambda item: item['game_name'])
+
+    def test_table_mode_moves_rows_and_keeps_rankings(self):
+        call_command('archive_qa', '--days', '180', '--mode', 'table', '--batch-size', '2', stdout=io.StringIO())
+
+        self.assertEqual(GPTRuleQA.objects.count(), 2)
+        self.assertEqual(FinetuningRuleQA.objects.count(), 0)
+        self.assertEqual(self.rankings(), self.rankings_before)
+        self.assertEqual(ArchivedQACount.objects.get(source='gpt', game_name='카탄').count, 3)
+
+        month = timezone.now() - timedelta(days=400)
+        table = f"{GPTRuleQA._meta.db_table}_archive_{month.astimezone(dt_timezone.utc):%Y%m}"
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+            self.assertEqual(cursor.fetchone()[0], 3)
+
+        # 다시 실행해도 옮길 행이 없으므로 집계가 그대로
+        call_command('archive_qa', '--days', '180', '--mode', 'table', stdout=io.StringIO())
+        self.assertEqual(self.rankings(), self.rankings_before)
+
+    def test_file_mode_output_can_be_imported(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            call_command('archive_qa', '--days', '180', '--mode', 'file', '--output-dir', output_dir, stdout=io.StringIO())
+            self.assertEqual(self.rankings(), self.rankings_before)
+
+            files = sorted(Path(output_dir).glob('*/*.jsonl.gz'))
+            self.assertEqual([path.parent.name for path in files], ['finetuning', 'gpt'])
+            for path in files:
+                call_command('qa_import', str(path), stdout=io.StringIO())
+        self.assertEqual(GPTRuleQA.objects.count(), 5)
+        self.assertEqual(FinetuningRuleQA.objects.count(), 1)
+
+
+class TrendingTests(TestCase):
+    """기간별 인기 게임 - 저장 시 시간별 버킷 증가, 기간/직전 기간 합산, rebuild와 같은 결과"""
+
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        rows = [(0, '카탄'), (0, '카탄'), (0, '아줄'), (3, '아줄'), (3, '아줄'), (30, '스플렌더'), (240, '카탄')]
+        for i, (hours_ago, game_name) in enumerate(rows):
+            GPTRuleQA.objects.create(
+                game_name=game_name, question=f'질문 {i}', answer='답변', created_at=now - timedelta(hours=hours_ago)
+            )
+        FinetuningRuleQA.objects.create(game_name='스플렌더', question='질문', answer='답변')
+
+    def trending(self, window, source='all'):
+        response = self.client.get(reverse('chatbot:trending_games_api'), {'window': window, 'type': source})
+        return [(item['game_name'], item['count'], item['previous_count']) for item in response.json()['rankings']]
+
+    def test_window_rankings(self):
+        self.assertEqual(self.trending('hour'), [('카탄', 2, 0), ('스플렌더', 1, 0), ('아줄', 1, 0)])  # 동점은 이름순
+        self.assertEqual(self.trending('day'), [('아줄', 3, 0), ('카탄', 2, 0), ('스플렌더', 1, 1)])
+        self.assertEqual(self.trending('week', 'gpt'), [('아줄', 3, 0), ('카탄', 2, 1), ('스플렌더', 1, 0)])
+
+    def test_rebuild_matches_incremental_buckets(self):
+        def buckets():
+            return sorted(GameQAHourly.objects.values_list('source', 'game_name', 'hour', 'count'))
+
+        recorded = buckets()
+        self.assertEqual(GameQAHourly.rebuild(timezone.now() - timedelta(days=30)), len(recorded))
+        self.assertEqual(buckets(), recorded)
+
+
+def make_runpod_client(urls):
+    """테스트용 RunpodClient - 백엔드 풀의 /health 확인 스레드는 띄우지 않음"""
+    with override_settings(RUNPOD_API_URLS=urls):
+        client = RunpodClient()
+    client.pool._checker = object()
+    return client
+
+
+class RunpodRetryTests(SimpleTestCase):
+    """재시도 정책 - 세션 요청은 503/연결 실패만 같은 파드로, 그 외 오류는 바로 실패"""
+
+    def setUp(self):
+        self.client = make_runpod_client(['http://retry-a', 'http://retry-b'])
+        patcher = mock.patch('chatbot.services.runpod_client.random.uniform', return_value=0)  # 백오프 대기 없음
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def send_results(self, endpoint, *results, session_id='s1'):
+        """_send가 results를 차례로 돌려주거나 던질 때 (최종 결과 또는 오류, 호출된 백엔드 URL 목록)"""
+        with mock.patch.object(self.client, '_send', side_effect=list(results)) as send:
+            try:
+                outcome = self.client._run_sync(self.client._make_request('POST', endpoint, {}, session_id))
+            except RunpodError as e:
+                outcome = e
+        return outcome, [call.args[4].url for call in send.call_args_list]
+
+    def test_session_request_retries_503_and_connect_errors_on_same_backend(self):
+        ok = {'status': 'success'}
+        for error in (RunpodServerError('503', status_code=503), RunpodConnectionError('down')):
+            outcome, urls = self.send_results('/explain-rules', error, ok)
+            self.assertEqual(outcome, ok)
+            self.assertEqual(len(urls), 2)
+            self.assertEqual(urls[0], urls[1])
+
+    def test_session_request_does_not_retry_other_errors(self):
+        for error in (RunpodServerError('502', status_code=502), RunpodServerError('500', status_code=500),
+                      RunpodTimeoutError('slow'), RunpodClientError('400', status_code=400)):
+            outcome, urls = self.send_results('/explain-rules', error, {'status': 'success'})
+            self.assertIs(outcome, error)
+            self.assertEqual(len(urls), 1)
+
+    def test_idempotent_request_retries_on_another_backend(self):
+        outcome, urls = self.send_results(
+            '/games', RunpodTimeoutError('slow'), RunpodServerError('502', status_code=502), {'status': 'success'},
+            session_id=''
+        )
+        self.assertEqual(outcome, {'status': 'success'})
+        self.assertEqual(len(urls), 3)
+        self.assertNotEqual(urls[0], urls[1])
+
+
+@override_settings(RUNPOD_HEDGE_ENABLED=True, RUNPOD_HEDGE_MIN_SAMPLES=5, RUNPOD_HEDGE_MIN_DELAY=0.01)
+class RunpodHedgeTests(SimpleTestCase):
+    """헤지 요청 - 백엔드가 둘 이상일 때 GET만, 느린 쪽 대신 먼저 온 응답"""
+
+    def setUp(self):
+        get_hedge_policy.cache_clear()
+        self.addCleanup(get_hedge_policy.cache_clear)
+
+    def warm_up(self, endpoint, seconds=0.01):
+        policy = get_hedge_policy(endpoint)
+        for _ in range(policy.min_samples):
+            policy.record_latency(seconds)
+        return policy
+
+    def test_slow_backend_is_hedged(self):
+        client = make_runpod_client(['http://hedge-a', 'http://hedge-b'])
+        self.warm_up('/games')
+        slow, fast = client.pool.backends
+
+        def pick(session_id='', exclude=()):
+            return fast if exclude else slow  # 첫 요청은 느린 파드로
+
+        async def send(method, endpoint, data, session_id, backend, timeout):
+            if backend is slow:
+                await asyncio.sleep(5)
+            return {'status': 'success', 'data': {'games': [backend.url]}}
+
+        with mock.patch.object(client.pool, 'pick', side_effect=pick), \
+                mock.patch.object(client, '_send', side_effect=send) as send_mock:
+            started = time.monotonic()
+            result = client._run_sync(client.get_available_games())
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(result['data']['games'], ['http://hedge-b'])
+        self.assertEqual(send_mock.call_count, 2)
+        self.assertEqual(get_hedge_policy('/games').stats()['hedge_rate'], 1.0)
+
+    def test_post_and_single_backend_are_not_hedged(self):
+        single = make_runpod_client(['http://hedge-single'])
+        self.warm_up('/games')
+        pair = make_runpod_client(['http://hedge-c', 'http://hedge-d'])
+        self.warm_up('/rule-summary')
+        for client, method, endpoint in ((single, 'GET', '/games'), (pair, 'POST', '/rule-summary')):
+            with mock.patch.object(client, '_make_request', return_value={'status': 'success'}) as request:
+                client._run_sync(client._hedged_request(method, endpoint))
+            request.assert_called_once_with(method, endpoint)
+        self.assertEqual(get_hedge_policy('/games').stats()['hedge_rate'], 0.0)
+
+
+class ConversationStoreTests(TestCase):
+    """대화 기록 - 새 세션 ID로 이어 쓰기, 복원 API, 만료"""
+
+    def setUp(self):
+        self.store = ConversationStore()
+        self.long_answer = '주사위 합이 7이면 도적을 옮깁니다. ' * 30
+        self.store.append('old-sid', 'gpt_rules', '카탄', [('summary', '카탄 요약')])
+        # 백엔드가 세션을 새로 만들어 다른 ID를 준 경우
+        self.store.append('old-sid', 'gpt_rules', '카탄', [('user', '도적은?'), ('assistant', self.long_answer)],
+                          new_session_id='new-sid')
+        self.store.append('new-sid', 'gpt_rules', '아줄', [('user', '바닥줄은?'), ('assistant', '감점입니다.')])
+        self.store.append('new-sid', 'gpt_rules', '카탄', [('user', '항구는?'), ('assistant', '2:1 교환')])
+
+    def restore(self, session_id, chat_type='gpt_rules'):
+        return self.client.get(reverse('chatbot:conversation_api'), {'session_id': session_id, 'chat_type': chat_type})
+
+    def test_restore_follows_new_session_id_and_last_game(self):
+        self.assertEqual(Conversation.objects.count(), 1)
+        self.assertNotEqual(ConversationTurn.objects.filter(role='assistant').first().codec, '')  # 긴 답변은 압축
+
+        response = self.restore('new-sid')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'no-store')
+        data = response.json()
+        self.assertEqual((data['session_id'], data['game_name'], data['summary'], data['turn_count']),
+                         ('new-sid', '카탄', '카탄 요약', 7))
+        self.assertEqual([m['content'] for m in data['messages']], ['도적은?', self.long_answer, '항구는?', '2:1 교환'])
+
+        self.assertEqual(self.restore('old-sid').status_code, 404)
+        self.assertEqual(self.restore('new-sid', 'finetuning_rules').status_code, 404)
+        self.assertEqual(self.client.get(reverse('chatbot:conversation_api')).status_code, 400)
+        self.assertEqual(self.store.get_history('new-sid', '아줄'),
+                         [{'role': 'user', 'content': '바닥줄은?'}, {'role': 'assistant', 'content': '감점입니다.'}])
+
+    def test_expired_conversation_is_not_restored_and_starts_over(self):
+        Conversation.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.restore('new-sid').status_code, 404)
+        self.assertEqual(self.store.get_history('new-sid', '카탄'), [])
+
+        self.store.append('new-sid', 'gpt_rules', '윙스팬', [('user', '먹이는?')])
+        conversation = Conversation.objects.get()
+        self.assertEqual((conversation.game_name, conversation.turn_count), ('윙스팬', 1))
+        self.assertEqual(ConversationTurn.objects.count(), 1)
+
+        Conversation.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(ConversationStore.prune_expired(), 1)
+        self.assertFalse(ConversationTurn.objects.exists())
+
+
+class FakeChatService:
+    """웹소켓 테스트용 RuleChatService - 호출만 기록"""
+
+    def __init__(self):
+        self.opened = []
+        self.answered = []
+        self.closed = []
+
+    def open_session(self, session_id=''):
+        self.opened.append(session_id)
+        return f'new-{len(self.opened)}'
+
+    def answer(self, chat_type, game_name, message, session_id):
+        self.answered.append(session_id)
+        return {'response': f'{game_name} 답변입니다', 'session_id': session_id, 'source': 'backend', 'latency_ms': 5}
+
+    def close_session(self, session_id):
+        self.closed.append(session_id)
+        return True
+
+
+class FakeSocketClient:
+    """ChatSocketApp에 ASGI websocket 이벤트를 직접 주고받는 클라이언트"""
+
+    def __init__(self, app, headers=()):
+        self.app = app
+        self.scope = {
+            'type': 'websocket', 'path': '/ws/chat/', 'client': ('198.51.100.7', 50000),
+            'headers': [(b'host', b'testserver')] + [(key.encode(), value.encode()) for key, value in headers],
+        }
+        self.incoming = asyncio.Queue()
+        self.outgoing = asyncio.Queue()
+        self.task = None
+
+    async def connect(self):
+        self.task = asyncio.create_task(self.app(self.scope, self.incoming.get, self.outgoing.put))
+        await self.incoming.put({'type': 'websocket.connect'})
+        return await asyncio.wait_for(self.outgoing.get(), timeout=5)
+
+    async def send(self, data):
+        await self.incoming.put({'type': 'websocket.receive', 'text': json.dumps(data, ensure_ascii=False)})
+
+    async def receive(self):
+        message = await asyncio.wait_for(self.outgoing.get(), timeout=5)
+        return json.loads(message['text']) if message['type'] == 'websocket.send' else message
+
+    async def receive_until(self, kind):
+        frames = []
+        while not frames or frames[-1].get('type') != kind:
+            frames.append(await self.receive())
+        return frames
+
+    async def disconnect(self):
+        await self.incoming.put({'type': 'websocket.disconnect', 'code': 1001})
+        await asyncio.wait_for(self.task, timeout=5)
+
+
+@override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMIT_BACKEND='local', RATE_LIMIT_KEY='ip',
+                   RATE_LIMIT_RULES={'chat_api': {'rate': 0.01, 'burst': 3}}, CHAT_SOCKET_CHUNK_CHARS=4)
+class ChatSocketTests(TransactionTestCase):
+    """채팅 웹소켓 - 세션 열기/질문/요청 제한/종료, 다른 사용자 세션은 이어 쓰거나 닫지 않음"""
+
+    def setUp(self):
+        self.service = FakeChatService()
+        patcher = mock.patch('chatbot.websocket.get_rule_chat_service', return_value=self.service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.app = ChatSocketApp()
+
+    def make_owned_session(self, session_id):
+        """HTTP API로 session_id를 받은 Django 세션 -> 쿠키 헤더"""
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        remember_session(session, session_id)
+        session.save()
+        return ('cookie', f'{settings.SESSION_COOKIE_NAME}={session.session_key}')
+
+    async def test_open_chat_and_close(self):
+        socket = FakeSocketClient(self.app)
+        self.assertEqual((await socket.connect())['type'], 'websocket.accept')
+
+        await socket.send({'type': 'open', 'chat_type': 'gpt_rules'})
+        self.assertEqual(await socket.receive(), {'type': 'session', 'session_id': 'new-1'})
+        await socket.send({'type': 'open', 'chat_type': 'gpt_rules'})  # 다시 보내도 세션은 하나
+        self.assertEqual(await socket.receive(), {'type': 'session', 'session_id': 'new-1'})
+
+        await socket.send({'type': 'chat', 'id': 1, 'message': '도적은?', 'game_name': '카탄'})
+        frames = await socket.receive_until('done')
+        self.assertEqual(frames[0], {'type': 'ack', 'id': 1})
+        self.assertEqual(''.join(frame['text'] for frame in frames if frame['type'] == 'chunk'), '카탄 답변입니다')
+        self.assertEqual(frames[-1]['session_id'], 'new-1')
+
+        await socket.send({'type': 'close'})
+        self.assertEqual((await socket.receive())['type'], 'websocket.close')
+        await asyncio.wait_for(socket.task, timeout=5)
+        self.assertEqual((self.service.opened, self.service.answered, self.service.closed), ([''], ['new-1'], ['new-1']))
+
+    async def test_rate_limited_after_burst(self):
+        socket = FakeSocketClient(self.app)
+        await socket.connect()
+        await socket.send({'type': 'open', 'chat_type': 'gpt_rules'})
+        await socket.receive()
+        for turn_id in (1, 2, 3):
+            await socket.send({'type': 'chat', 'id': turn_id, 'message': '질문', 'game_name': '카탄'})
+            frames = await socket.receive_until('done' if turn_id < 3 else 'error')
+        self.assertEqual(frames[-1]['code'], 'rate_limited')
+        self.assertGreaterEqual(frames[-1]['retry_after'], 1)
+        self.assertEqual(len(self.service.answered), 2)
+        await socket.disconnect()
+
+    async def test_foreign_session_is_not_used_or_closed(self):
+        socket = FakeSocketClient(self.app)
+        await socket.connect()
+        await socket.send({'type': 'open', 'chat_type': 'gpt_rules', 'session_id': 'victim'})
+        self.assertEqual(await socket.receive(), {'type': 'session', 'session_id': 'new-1'})
+        await socket.send({'type': 'chat', 'id': 1, 'message': '질문', 'game_name': '카탄', 'session_id': 'victim'})
+        await socket.receive_until('done')
+        await socket.disconnect()
+        self.assertEqual(self.service.answered, ['new-1'])
+        self.assertEqual(self.service.closed, ['new-1'])
+
+    async def test_session_owned_through_cookie_is_adopted(self):
+        cookie = await sync_to_async(self.make_owned_session)('mine')
+        socket = FakeSocketClient(self.app, headers=[cookie])
+        await socket.connect()
+        await socket.send({'type': 'open', 'chat_type': 'gpt_rules', 'session_id': 'mine'})
+        await socket.send({'type': 'chat', 'id': 1, 'message': '질문', 'game_name': '카탄', 'session_id': 'mine'})
+        await socket.receive_until('done')
+        await socket.disconnect()
+        self.assertEqual((self.service.opened, self.service.answered, self.service.closed), ([], ['mine'], ['mine']))
+
+    async def test_cross_origin_connection_is_refused(self):
+        socket = FakeSocketClient(self.app, headers=[('origin', 'https://evil.example')])
+        self.assertEqual(await socket.connect(), {'type': 'websocket.close', 'code': 4403})
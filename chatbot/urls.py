@@ -8,10 +8,19 @@ urlpatterns = [
     path('game-recommendation/', views.game_recommendation, name='game_recommendation'),
     path('gpt-rules/', views.gpt_rules, name='gpt_rules'),
     path('finetuning-rules/', views.finetuning_rules, name='finetuning_rules'),
+    path('mobile/sw.js', views.mobile_service_worker, name='mobile_service_worker'),  # 범위가 /mobile/인 서비스 워커
     path('mobile/<str:chat_type>/', views.mobile_chat, name='mobile_chat'),
+    path('mobile/<str:chat_type>/manifest.webmanifest', views.mobile_manifest, name='mobile_manifest'),
     path('api/chat/', views.chat_api, name='chat_api'),
     path('api/rule-summary/', views.rule_summary_api, name='rule_summary_api'),
+    path('api/chat/batch/', views.batch_chat_api, name='batch_chat_api'),  # 여러 질문/요약 일괄 (NDJSON)
     path('api/close-session/', views.close_session_api, name='close_session'),  # 세션 종료 API
+    path('api/conversation/', views.conversation_api, name='conversation_api'),  # 새로고침 시 대화 복원
+    path('api/games/search/', views.game_search_api, name='game_search_api'),  # 게임 검색/자동완성
+    path('api/games/trending/', views.trending_games_api, name='trending_games_api'),  # 기간별 인기 게임
+    path('api/games/prefetch/', views.prefetch_api, name='prefetch_api'),  # 룰 요약/자주 묻는 질문 미리 받기
+    path('api/games/faqs/', views.faq_api, name='faq_api'),  # 게임별 추천 질문과 미리 만든 답변
     path('api/qr/<str:chat_type>/', views.generate_qr, name='generate_qr'),
     path('qa-stats/', views.qa_stats, name='qa_stats'),  # QA 통계 페이지
+    path('api/qa-stats/analytics/', views.qa_analytics_api, name='qa_analytics_api'),  # QA 분석 요약
 ]
@@ -1,30 +1,46 @@
 from django.shortcuts import render
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, Http404, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.urls import reverse
+from django.templatetags.static import static
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.cache import cache_page
 import json
-import qrcode
-import io
+import hashlib
 import logging
-import requests
+from datetime import datetime
+from .chat_sessions import ensure_session, remember_session
+from .deadline import with_deadline
 from .models import GPTRuleQA, FinetuningRuleQA, get_combined_game_rankings
-from .services.game_recommendation import GameRecommendationService
-from .services.rule_explanation import RuleExplanationService
+from .services import (
+    get_game_recommendation_service,
+    get_rule_explanation_service,
+    get_qr_code_service,
+    get_game_search_service,
+    get_trending_service,
+    get_batch_chat_service,
+    get_prefetch_service,
+    get_conversation_store,
+    get_rule_chat_service,
+)
 
 logger = logging.getLogger(__name__)
 
-# 서비스 인스턴스 생성 (싱글톤 패턴)
-game_recommendation_service = GameRecommendationService()
-rule_explanation_service = RuleExplanationService()
-
+# 모바일 채팅 타입 -> 표시 이름
+CHAT_TYPE_NAMES = {
+    'gpt_rules': 'GPT 룰 설명',
+    'finetuning_rules': '파인튜닝 룰 설명'
+}
 
 
 def home(request):
     """홈페이지"""
     # 서비스 상태 체크
     try:
-        rec_status = game_recommendation_service.get_service_status()
-        rule_status = rule_explanation_service.get_service_status()
+        rec_status = get_game_recommendation_service().get_service_status()
+        rule_status = get_rule_explanation_service().get_service_status()
         
         # 게임 순위 데이터 가져오기
         game_rankings = get_combined_game_rankings(limit=10)
@@ -44,39 +60,104 @@ def home(request):
     
     return render(request, 'chatbot/home.html', context)
 
+@cache_page(getattr(settings, 'STATIC_PAGE_CACHE_TIMEOUT', 3600))
 def game_recommendation(request):
-    """게임 추천 페이지"""
+    """게임 추천 페이지 (요청별 데이터가 없으므로 렌더링 결과 전체를 캐싱)"""
     return render(request, 'chatbot/game_recommendation.html')
 
+def _game_list_context():
+    """룰 설명 페이지 공통 템플릿 컨텍스트 (games_version은 조각 캐시 키, 채팅 웹소켓이 꺼져 있으면 chat_socket_path는 빈 값)"""
+    rule_explanation_service = get_rule_explanation_service()
+    return {
+        'available_games': rule_explanation_service.get_available_games(),
+        'games_version': rule_explanation_service.get_games_version(),
+        'chat_socket_path': settings.CHAT_SOCKET_PATH if getattr(settings, 'CHAT_SOCKET_ENABLED', False) else '',
+    }
+
 def gpt_rules(request):
     """GPT 룰 설명 페이지"""
-    available_games = rule_explanation_service.get_available_games()
-    context = {'available_games': available_games}
+    context = _game_list_context()
+    if context['chat_socket_path']:
+        ensure_session(request)
     return render(request, 'chatbot/gpt_rules.html', context)
 
 def finetuning_rules(request):
     """파인튜닝 룰 설명 페이지"""
-    available_games = rule_explanation_service.get_available_games()
-    context = {'available_games': available_games}
+    context = _game_list_context()
+    if context['chat_socket_path']:
+        ensure_session(request)
     return render(request, 'chatbot/finetuning_rules.html', context)
 
 def mobile_chat(request, chat_type):
     """모바일 채팅 페이지"""
-    chat_type_names = {
-        'gpt_rules': 'GPT 룰 설명',
-        'finetuning_rules': '파인튜닝 룰 설명'
-    }
-    
-    available_games = rule_explanation_service.get_available_games()
-    
     context = {
         'chat_type': chat_type,
-        'chat_type_name': chat_type_names.get(chat_type, '채팅'),
-        'available_games': available_games
+        'chat_type_name': CHAT_TYPE_NAMES.get(chat_type, '채팅'),
+        'theme_color': getattr(settings, 'PWA_THEME_COLOR', '#5096ff'),
+        **_game_list_context()
     }
+    if context['chat_socket_path']:
+        ensure_session(request)
     return render(request, 'chatbot/mobile_chat.html', context)
 
+def mobile_manifest(request, chat_type):
+    """모바일 채팅 웹 앱 매니페스트 (홈 화면에 추가)"""
+    if chat_type not in CHAT_TYPE_NAMES:
+        raise Http404('지원하지 않는 채팅 타입입니다.')
+    theme_color = getattr(settings, 'PWA_THEME_COLOR', '#5096ff')
+    manifest = {
+        'name': f"보드게임 {CHAT_TYPE_NAMES[chat_type]}",
+        'short_name': '보드게임 룰',
+        'start_url': reverse('chatbot:mobile_chat', args=[chat_type]),
+        'scope': reverse('chatbot:mobile_service_worker').rsplit('/', 1)[0] + '/',
+        'display': 'standalone',
+        'background_color': '#ffffff',
+        'theme_color': theme_color,
+        'lang': 'ko',
+        'icons': [{
+            'src': static('chatbot/icons/icon.svg'),
+            'sizes': 'any',
+            'type': 'image/svg+xml',
+            'purpose': 'any',
+        }],
+    }
+    response = JsonResponse(manifest, content_type='application/manifest+json', json_dumps_params={'ensure_ascii': False})
+    response['Cache-Control'] = f"public, max-age={getattr(settings, 'PWA_MANIFEST_MAX_AGE', 86400)}"
+    return response
+
+def mobile_service_worker(request):
+    """모바일 채팅 서비스 워커 - /mobile/ 아래 페이지만 제어하도록 같은 경로에서 제공
+
+    캐시할 정적 파일 URL(배포마다 해시가 바뀜)로 캐시 버전을 만들어, 배포하면 이전 셸 캐시가 교체된다.
+    """
+    precache_urls = [
+        static(path) for path in (
+            'chatbot/css/base.css',
+            'chatbot/css/rule_chat.css',
+            'chatbot/css/mobile_chat.css',
+            'chatbot/js/base.js',
+            'chatbot/js/rule_chat.js',
+            'chatbot/icons/icon.svg',
+        )
+    ] + [reverse('chatbot:mobile_chat', args=[chat_type]) for chat_type in CHAT_TYPE_NAMES]
+    cache_version = hashlib.sha1(
+        json.dumps([getattr(settings, 'PWA_CACHE_VERSION', '1'), precache_urls]).encode()
+    ).hexdigest()[:12]
+    context = {
+        'scope': reverse('chatbot:mobile_service_worker').rsplit('/', 1)[0] + '/',
+        'static_url': settings.STATIC_URL,
+        'precache_urls': json.dumps(precache_urls),
+        'cache_version': cache_version,
+        'summary_cache_limit': getattr(settings, 'PWA_SUMMARY_CACHE_LIMIT', 30),
+        'summary_network_timeout_ms': getattr(settings, 'PWA_SUMMARY_NETWORK_TIMEOUT_MS', 3000),
+    }
+    response = render(request, 'chatbot/sw.js', context, content_type='application/javascript; charset=utf-8')
+    # 브라우저가 매번 새 버전을 확인하도록 (파일 자체는 작음)
+    response['Cache-Control'] = 'no-cache'
+    return response
+
 @csrf_exempt
+@with_deadline('chat')
 def chat_api(request):
     """🔥 핵심: 채팅 API - Runpod 백엔드 연동"""
     if request.method == 'POST':
@@ -91,27 +172,16 @@ def chat_api(request):
             
             # 세션 초기화 더미 요청 처리
             if message == '__INIT_SESSION__':
-                logger.info(f"🚀 세션 초기화 요청")
+                logger.info("🚀 세션 초기화 요청")
                 # 빈 session_id로 더미 요청을 보내서 세션 ID만 받아오기
-                result = game_recommendation_service.recommend_games("initialize", session_id)
-                
-                if isinstance(result, dict):
-                    response_data = {
-                        'response': "세션이 초기화되었습니다.",  # 더미 메시지
-                        'session_id': result.get('session_id', session_id)
-                    }
-                else:
-                    response_data = {
-                        'response': "세션이 초기화되었습니다.",
-                        'session_id': session_id
-                    }
-                    
-                logger.info(f"✅ 세션 초기화 완료: {response_data.get('session_id')}")
+                new_session_id = get_rule_chat_service().open_session(session_id)
+                remember_session(request.session, new_session_id)
+                logger.info(f"✅ 세션 초기화 완료: {new_session_id}")
                 
                 # 세션 초기화 응답 바로 리턴
                 return JsonResponse({
-                    'response': response_data.get('response'),
-                    'session_id': response_data.get('session_id'),
+                    'response': "세션이 초기화되었습니다.",
+                    'session_id': new_session_id,
                     'status': 'success'
                 })
             
@@ -120,7 +190,7 @@ def chat_api(request):
             
             if chat_type == 'game_recommendation':
                 # 게임 추천 서비스 호출
-                result = game_recommendation_service.recommend_games(message, session_id)
+                result = get_game_recommendation_service().recommend_games(message, session_id)
                 logger.info(f"🔍 게임 추천 서비스 반환 데이터: {result}")
                 
                 # RunPod 클라이언트에서 딕셔너리 형태로 반환하는 경우
@@ -139,54 +209,9 @@ def chat_api(request):
                     logger.warning(f"⚠️ 게임 추천 서비스가 문자열로 반환함: {type(result)}")
                 
             elif chat_type in ['gpt_rules', 'finetuning_rules']:
-                if not game_name:
-                    response_data = {
-                        'response': "게임을 먼저 선택해주세요.",
-                        'session_id': session_id
-                    }
-                else:
-                    # 파인튜닝 타입 매핑
-                    api_chat_type = "finetuning" if chat_type == 'finetuning_rules' else "gpt"
-                    result = rule_explanation_service.answer_rule_question(
-                        game_name, message, api_chat_type, session_id
-                    )
-                    logger.info(f"🔍 룰 설명 서비스 반환 데이터: {result}")
-                    
-                    # 서비스에서 딕셔너리 형태로 반환하는 경우
-                    if isinstance(result, dict):
-                        response_data = {
-                            'response': result.get('response', ''),
-                            'session_id': result.get('session_id', session_id)
-                        }
-                        response_text = result.get('response', '')
-                    else:
-                        # 문자열로 반환하는 경우 (하위 호환성)
-                        response_data = {
-                            'response': result,
-                            'session_id': session_id
-                        }
-                        response_text = result
-                        logger.warning(f"⚠️ 룰 설명 서비스가 문자열로 반환함: {type(result)}")
-                    
-                    # 🔥 핵심: 질문과 답변을 QA DB에 자동 저장!
-                    try:
-                        if chat_type == 'gpt_rules':
-                            GPTRuleQA.objects.create(
-                                game_name=game_name,
-                                question=message,
-                                answer=response_text
-                            )
-                            logger.info(f"✅ GPT QA 저장: {game_name} - {message[:30]}...")
-                            
-                        elif chat_type == 'finetuning_rules':
-                            FinetuningRuleQA.objects.create(
-                                game_name=game_name,
-                                question=message,
-                                answer=response_text
-                            )
-                            logger.info(f"✅ 파인튜닝 QA 저장: {game_name} - {message[:30]}...")
-                    except Exception as e:
-                        logger.error(f"❌ QA 저장 실패: {str(e)}")
+                # 답변 + QA 저장 + 대화 기록 (채팅 웹소켓과 같은 처리)
+                response_data = get_rule_chat_service().answer(chat_type, game_name, message, session_id)
+                remember_session(request.session, response_data.get('session_id'))
             else:
                 response_data = {'response': "알 수 없는 채팅 타입입니다."}
             
@@ -218,6 +243,7 @@ def chat_api(request):
     return JsonResponse({'error': 'POST method required'}, status=405)
 
 @csrf_exempt
+@with_deadline('close_session')
 def close_session_api(request):
     """세션 종료 API"""
     if request.method == 'POST':
@@ -231,10 +257,10 @@ def close_session_api(request):
             logger.info(f"🗑️ 세션 종료 요청: {session_id}")
             
             # 게임 추천 서비스에 세션 종료 요청
-            rec_success = game_recommendation_service.close_session(session_id)
+            rec_success = get_game_recommendation_service().close_session(session_id)
             
             # 룰 설명 서비스에 세션 종료 요청
-            rule_success = rule_explanation_service.close_session(session_id)
+            rule_success = get_rule_explanation_service().close_session(session_id)
             
             # 두 서비스 중 하나라도 성공하면 성공으로 처리
             success = rec_success or rule_success
@@ -258,6 +284,7 @@ def close_session_api(request):
     return JsonResponse({'error': 'POST method required'}, status=405)
 
 @csrf_exempt
+@with_deadline('rule_summary')
 def rule_summary_api(request):
     """게임 룰 요약 API - Runpod 백엔드 연동"""
     if request.method == 'POST':
@@ -274,12 +301,19 @@ def rule_summary_api(request):
             
             # 파인튜닝 타입 매핑
             api_chat_type = "finetuning" if chat_type == 'finetuning_rules' else "gpt"
-            result = rule_explanation_service.explain_game_rules(game_name, api_chat_type, session_id)
+            result = get_rule_explanation_service().explain_game_rules(game_name, api_chat_type, session_id)
             
             logger.info(f"🔍 룰 요약 서비스 반환 데이터: {result}")
             
             # 서비스에서 딕셔너리 형태로 반환하는 경우
             if isinstance(result, dict):
+                remember_session(request.session, result.get('session_id'))
+                # 새로고침 시 요약도 다시 요청하지 않도록 대화 기록에 함께 저장 (세션이 있을 때만, 다시 시도 안내는 제외)
+                if result.get('source') != 'error':
+                    get_conversation_store().append(
+                        session_id, chat_type, game_name, [('summary', result.get('response', ''))],
+                        new_session_id=result.get('session_id')
+                    )
                 return JsonResponse({
                     'summary': result.get('response', ''),
                     'game_name': game_name,
@@ -304,73 +338,185 @@ def rule_summary_api(request):
     
     return JsonResponse({'error': 'POST method required'}, status=405)
 
+@csrf_exempt
+def prefetch_api(request):
+    """미리 받기 API - 게임 선택(또는 검색 결과 hover) 시 룰 요약과 자주 묻는 질문 답변을 백그라운드로 캐싱
+
+    요청: {game_name, chat_type, summary: true|false} / 응답은 바로 202 (작업 완료를 기다리지 않음)
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST method required'}, status=405)
+    
+    try:
+        data = json.loads(request.body)
+        game_name = data.get('game_name', '')
+        api_chat_type = "finetuning" if data.get('chat_type') == 'finetuning_rules' else "gpt"
+        result = get_prefetch_service().prefetch(game_name, api_chat_type, bool(data.get('summary', True)))
+    except (ValueError, AttributeError) as e:
+        return JsonResponse({'error': str(e), 'status': 'error'}, status=400)
+    
+    return JsonResponse({**result, 'game_name': game_name, 'status': 'accepted'}, status=202)
+
+def conversation_api(request):
+    """대화 복원 API - ?session_id=세션ID&chat_type=gpt_rules|finetuning_rules
+
+    새로고침한 페이지가 질문을 다시 보내지 않고 마지막 게임, 룰 요약, 대화를 한 번에 받아 간다.
+    """
+    session_id = (request.GET.get('session_id') or '').strip()
+    if not session_id:
+        return JsonResponse({'error': '세션 ID가 필요합니다.', 'status': 'error'}, status=400)
+    
+    conversation = get_conversation_store().restore(session_id, request.GET.get('chat_type'))
+    if conversation is None:
+        return JsonResponse({'error': '대화 기록이 없거나 만료되었습니다.', 'status': 'not_found'}, status=404)
+    response = JsonResponse({**conversation, 'status': 'success'})
+    response['Cache-Control'] = 'no-store'
+    return response
+
+def faq_api(request):
+    """추천 질문 API - ?game=게임이름&type=gpt_rules|finetuning_rules
+
+    build_faqs 명령이 미리 만든 답변까지 함께 내려주므로 칩을 누르면 서버 호출 없이 바로 답변을 보여준다.
+    """
+    game_name = (request.GET.get('game') or '').strip()
+    if not game_name:
+        return JsonResponse({'error': 'game 파라미터가 필요합니다.', 'status': 'error'}, status=400)
+    api_chat_type = "finetuning" if request.GET.get('type') == 'finetuning_rules' else "gpt"
+    
+    faqs = get_rule_explanation_service().get_faqs(game_name, api_chat_type)
+    response = JsonResponse({
+        'game_name': game_name,
+        'faqs': [{'question': faq['question'], 'answer': faq['answer']} for faq in faqs],
+        'status': 'success'
+    })
+    response['Cache-Control'] = f"public, max-age={getattr(settings, 'FAQ_CACHE_MAX_AGE', 600)}"
+    return response
+
+@csrf_exempt
+def batch_chat_api(request):
+    """일괄 채팅 API - items: [{chat_type, game_name, question}] (질문이 없으면 룰 요약)
+
+    항목을 동시에 처리하고 끝나는 순서대로 한 줄씩 NDJSON으로 보낸다 (마지막 줄은 저장 결과 요약).
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST method required'}, status=405)
+    
+    batch_chat_service = get_batch_chat_service()
+    try:
+        items = batch_chat_service.parse_items(json.loads(request.body))
+    except ValueError as e:
+        return JsonResponse({'error': str(e), 'status': 'error'}, status=400)
+    
+    logger.info(f"📦 일괄 채팅 요청: {len(items)}개")
+    response = StreamingHttpResponse(batch_chat_service.stream(items), content_type='application/x-ndjson; charset=utf-8')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx가 모아 두지 않고 줄마다 바로 전달
+    return response
+
 def generate_qr(request, chat_type):
-    """QR 코드 생성 - urllib로 IP 감지"""
-    import os
-    import urllib.request
-    import urllib.error
+    """QR 코드 생성 - ?format=png|svg&size=1~40&ec=L|M|Q|H, ETag로 브라우저·nginx 캐시 허용"""
+    if chat_type not in CHAT_TYPE_NAMES:
+        raise Http404("알 수 없는 채팅 타입입니다.")
+    
+    qr_code_service = get_qr_code_service()
+    # 퍼블릭 IP 감지를 기다리지 않음 - 아직 모르면(첫 요청, TTL 만료) 백그라운드로 감지하고 이번에는 요청 Host 사용
+    base_url = qr_code_service.peek_trusted_base_url()
+    # 요청 Host로 만든 URL은 클라이언트가 마음대로 바꿀 수 있으므로 캐시하지 않음
+    cacheable = base_url is not None
+    if not cacheable:
+        base_url = qr_code_service.get_request_base_url(request)
+    mobile_url = f"{base_url}{reverse('chatbot:mobile_chat', args=[chat_type])}"
+    try:
+        image, etag, content_type = qr_code_service.get_image(
+            mobile_url,
+            fmt=request.GET.get('format', 'png'),
+            size=request.GET.get('size'),
+            error_correction=request.GET.get('ec'),
+            cache=cacheable
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e), 'status': 'error'}, status=400)
     
-    # 1순위: 환경변수로 QR_BASE_URL이 설정된 경우
-    qr_base_url = os.getenv('QR_BASE_URL')
+    # If-None-Match가 일치하면 304로 응답
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
     
-    if qr_base_url:
-        mobile_url = f"{qr_base_url.rstrip('/')}{reverse('chatbot:mobile_chat', args=[chat_type])}"
-        logger.info(f"📱 QR 코드 생성 (환경변수): {mobile_url}")
+    response = HttpResponse(image, content_type=content_type)
+    response['ETag'] = etag
+    if cacheable:
+        response['Cache-Control'] = f"public, max-age={getattr(settings, 'QR_CACHE_MAX_AGE', 86400)}"
     else:
-        # 2순위: urllib로 직접 IP 가져오기
-        public_ip = None
-        
-        # 외부 IP 서비스들 순차적으로 시도
-        ip_services = [
-            'https://ifconfig.me/ip',
-            'https://icanhazip.com',
-            'https://ipecho.net/plain',
-            'https://api.ipify.org',
-            'https://checkip.amazonaws.com'
-        ]
-        
-        for service in ip_services:
-            try:
-                with urllib.request.urlopen(service, timeout=5) as response:
-                    ip = response.read().decode('utf-8').strip()
-                    if ip and '.' in ip and not ip.startswith('127.'):
-                        public_ip = ip
-                        service_name = service.split('/')[-2] if service.endswith('/') else service.split('/')[-1]
-                        logger.info(f"📱 IP 감지 성공 ({service_name}): {public_ip}")
-                        break
-            except Exception as e:
-                logger.debug(f"📱 IP 감지 실패 ({service}): {str(e)}")
-                continue
-        
-        # IP를 찾았으면 QR URL 생성
-        if public_ip:
-            mobile_url = f"http://{public_ip}{reverse('chatbot:mobile_chat', args=[chat_type])}"
-            logger.info(f"📱 QR 코드 생성 (자동 IP: {public_ip}): {mobile_url}")
-        else:
-            # 3순위: request.get_host() 사용 (폴백)
-            host = request.get_host()
-            if request.is_secure():
-                base_url = f"https://{host}"
-            else:
-                base_url = f"http://{host}"
-            mobile_url = f"{base_url}{reverse('chatbot:mobile_chat', args=[chat_type])}"
-            logger.warning(f"📱 QR 코드 생성 (폴백 - IP 감지 실패): {mobile_url}")
+        # 퍼블릭 IP를 알게 되면 바뀌므로 브라우저/nginx가 오래 들고 있지 않게 (ETag로 재검증만)
+        response['Cache-Control'] = 'private, no-cache'
+    return response
+
+def game_search_api(request):
+    """게임 검색/자동완성 API - ?q=검색어&limit=개수, 게임 목록 버전 기반 ETag"""
+    game_search_service = get_game_search_service()
+    query, limit = game_search_service.normalize_params(request.GET.get('q'), request.GET.get('limit'))
+    version = game_search_service.get_version()
     
-    qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4)
-    qr.add_data(mobile_url)
-    qr.make(fit=True)
+    # 결과는 (게임 목록 버전, 검색어, 개수)로 결정되므로 검색 전에 ETag 비교
+    etag_source = f"{version}|{query}|{limit}"
+    etag = f'"{hashlib.sha1(etag_source.encode("utf-8")).hexdigest()[:20]}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+    
+    results = game_search_service.search(query, limit)
+    response = JsonResponse({
+        'query': query,
+        'results': results,
+        'version': version,
+        'status': 'success'
+    })
+    response['ETag'] = etag
+    response['Cache-Control'] = f"public, max-age={getattr(settings, 'GAME_SEARCH_CACHE_MAX_AGE', 300)}"
+    return response
+
+def trending_games_api(request):
+    """기간별 인기 게임 API - ?window=hour|day|week&limit=개수&type=all|gpt|finetuning"""
+    trending = get_trending_service().get_trending(
+        request.GET.get('window'), request.GET.get('limit'), request.GET.get('type')
+    )
+    response = JsonResponse({**trending, 'status': 'success'})
+    response['Cache-Control'] = f"public, max-age={getattr(settings, 'TRENDING_CACHE_TIMEOUT', 60)}"
+    return response
+
+def qa_analytics_api(request):
+    """QA 분석 API - ?days=기간&type=all|gpt|finetuning (aggregate_qa_stats 요약 테이블 기반)"""
+    from .qa_analytics import build_report, get_version
+    
+    max_days = getattr(settings, 'QA_ANALYTICS_MAX_DAYS', 180)
+    try:
+        days = int(request.GET.get('days') or getattr(settings, 'QA_ANALYTICS_DEFAULT_DAYS', 30))
+    except ValueError:
+        days = getattr(settings, 'QA_ANALYTICS_DEFAULT_DAYS', 30)
+    days = min(max(days, 1), max_days)
+    source = request.GET.get('type')
+    if source not in ('gpt', 'finetuning'):
+        source = 'all'
     
-    qr_image = qr.make_image(fill_color="black", back_color="white")
-    buffer = io.BytesIO()
-    qr_image.save(buffer, format='PNG')
-    buffer.seek(0)
+    # 결과는 (집계 버전, 기간, 종류)로 결정되므로 요약 테이블을 읽기 전에 비교
+    version = get_version()
+    etag = f'"{hashlib.sha1(f"{version}|{days}|{source}".encode("utf-8")).hexdigest()[:20]}"'
+    last_modified = int(datetime.fromisoformat(version).timestamp())
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
     
-    return HttpResponse(buffer.getvalue(), content_type='image/png')
+    response = JsonResponse({**build_report(days, source), 'status': 'success'})
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'no-cache'  # 매번 재검증 (변경 없으면 304)
+    return response
 
 def qa_stats(request):
     """QA 데이터 통계"""
-    gpt_count = GPTRuleQA.objects.count()
-    ft_count = FinetuningRuleQA.objects.count()
+    # 보관(archive_qa)된 행은 월별 집계로 합산
+    gpt_count = GPTRuleQA.get_total_count()
+    ft_count = FinetuningRuleQA.get_total_count()
     recent_gpt = GPTRuleQA.objects.all()[:10]
     recent_ft = FinetuningRuleQA.objects.all()[:10]
     
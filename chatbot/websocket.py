@@ -0,0 +1,373 @@
+"""룰 설명 채팅 웹소켓 - 탭마다 연결 하나로 질문, 답변 청크, 세션 열기/닫기를 주고받음
+
+Channels 없이 ASGI websocket 프로토콜을 직접 처리한다. boardgame_chatbot.asgi가 CHAT_SOCKET_PATH로 들어온
+연결만 여기로 보내고, 턴 처리는 chat_api와 같은 RuleChatService를 작업 스레드에서 호출한다.
+
+클라이언트 -> 서버 (JSON 텍스트 프레임)
+    {"type": "open", "chat_type": "gpt_rules", "session_id": ""}   세션이 없으면 새로 받아 session으로 응답 (연결당 한 번)
+    {"type": "chat", "id": 1, "message": "...", "game_name": "카탄", "session_id": "..."}
+    {"type": "close"}                                               백엔드 세션을 닫고 연결 종료
+    {"type": "ping"} / {"type": "pong"}
+서버 -> 클라이언트
+    {"type": "session", "session_id": "..."}
+    {"type": "ack", "id": 1}
+    {"type": "chunk", "id": 1, "text": "..."}                       답변 조각 (여러 번)
+    {"type": "done", "id": 1, "session_id": "...", "source": "backend", "latency_ms": 1234}
+    {"type": "error", "id": 1, "code": "busy|rate_limited|invalid|server", "error": "..."}
+    {"type": "ping"} / {"type": "pong"}
+
+연결이 끊기면(탭 닫기, 새로고침) 마지막 세션을 닫는다 - 기존 beforeunload 세션 종료 요청을 대신함.
+클라이언트가 보낸 session_id는 이 연결이 만든 세션이거나 같은 Django 세션(쿠키)이 HTTP API로 받은 세션일 때만
+이어 쓰고 닫는다 (chat_sessions). 아니면 open은 새 세션을 만들고, chat은 연결의 세션을 그대로 쓴다.
+"""
+import json
+import math
+import asyncio
+import logging
+from urllib.parse import urlsplit
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http.cookie import parse_cookie
+from .chat_sessions import load_session, owns_session, remember_session
+from .deadline import deadline_scope
+from .middleware import create_client_rate_limiter
+from .services import get_rule_chat_service
+from .services.batch_chat import QA_MODELS_BY_CHAT_TYPE
+
+logger = logging.getLogger(__name__)
+
+
+class SocketClosed(Exception):
+    """클라이언트가 끊겼거나 보낸 프레임을 제때 받지 않음"""
+
+
+class ChatSocketApp:
+    """ASGI websocket 앱 - 워커(프로세스)당 하나, 연결마다 ChatSocket 생성"""
+
+    def __init__(self):
+        self.max_concurrent_turns = getattr(settings, 'CHAT_SOCKET_MAX_CONCURRENT_TURNS', 8)
+        self._turn_slots = None
+        # HTTP chat_api와 같은 규칙/범위/키 규칙 (RATE_LIMIT_KEY) - cache 백엔드면 두 경로가 같은 버킷을 씀
+        rule = getattr(settings, 'RATE_LIMIT_RULES', {}).get('chat_api')
+        self.limiter = None
+        if getattr(settings, 'RATE_LIMIT_ENABLED', True) and rule:
+            self.limiter = create_client_rate_limiter(rule, 'chat_api')
+
+    @property
+    def turn_slots(self):
+        """워커 전체에서 동시에 Runpod 답변을 기다리는 턴 수 제한 (이벤트 루프 안에서 처음 사용할 때 생성)"""
+        if self._turn_slots is None:
+            self._turn_slots = asyncio.Semaphore(self.max_concurrent_turns)
+        return self._turn_slots
+
+    async def __call__(self, scope, receive, send):
+        await ChatSocket(self, scope, receive, send).run()
+
+
+class ChatSocket:
+    """연결 하나 - 읽기/턴 처리/하트비트 작업 중 하나가 끝나면 연결 종료"""
+
+    def __init__(self, app, scope, receive, send):
+        self.app = app
+        self.scope = scope
+        self.receive = receive
+        self._send = send
+        self.chat_type = ''
+        self.session_id = ''
+        self.session_created = False  # 이 연결에서 open으로 백엔드 세션을 만들었는지 (연결당 하나)
+        self.owned_sessions = set()  # 이 연결이 이어 써도 되는 세션 (만들었거나 소유를 확인함)
+        self.ip = client_ip(scope)
+        self.client_key = f"ip:{self.ip}"
+        self.django_session_key = parse_cookie(header(scope, 'cookie')).get(settings.SESSION_COOKIE_NAME, '')
+        self.turns = asyncio.Queue(maxsize=getattr(settings, 'CHAT_SOCKET_MAX_PENDING', 3))
+        self.heartbeat_interval = getattr(settings, 'CHAT_SOCKET_HEARTBEAT_INTERVAL', 20)
+        self.idle_timeout = getattr(settings, 'CHAT_SOCKET_IDLE_TIMEOUT', 60)
+        self.send_timeout = getattr(settings, 'CHAT_SOCKET_SEND_TIMEOUT', 10)
+        self.max_message_bytes = getattr(settings, 'CHAT_SOCKET_MAX_MESSAGE_BYTES', 8192)
+        self.chunk_chars = getattr(settings, 'CHAT_SOCKET_CHUNK_CHARS', 1024)
+        self.last_seen = 0.0
+        self._send_lock = asyncio.Lock()
+
+    async def run(self):
+        message = await self.receive()
+        if message['type'] != 'websocket.connect':
+            return
+        if not origin_allowed(self.scope):
+            logger.warning(f"🚫 채팅 웹소켓 거부 (다른 출처): {header(self.scope, 'origin')}")
+            await self._send({'type': 'websocket.close', 'code': 4403})
+            return
+        await self._send({'type': 'websocket.accept'})
+        self.last_seen = asyncio.get_running_loop().time()
+        logger.info(f"🔌 채팅 웹소켓 연결: {self.client_key}")
+
+        tasks = [asyncio.create_task(coro) for coro in (self._read_loop(), self._turn_loop(), self._heartbeat())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await asyncio.wait_for(self._send({'type': 'websocket.close', 'code': 1000}), timeout=1)
+            except Exception:
+                pass  # 이미 끊긴 연결
+            await self._close_backend_session()
+            logger.info(f"🔌 채팅 웹소켓 종료: {self.client_key} (세션: {self.session_id[:8] or '없음'})")
+
+    async def _read_loop(self):
+        """클라이언트 프레임 읽기 - 턴은 대기열에 넣고 바로 다음 프레임을 읽음 (ping/close가 막히지 않게)"""
+        while True:
+            message = await self.receive()
+            if message['type'] == 'websocket.disconnect':
+                return
+            if message['type'] != 'websocket.receive':
+                continue
+            self.last_seen = asyncio.get_running_loop().time()
+
+            text = message.get('text')
+            if text is None or len(text.encode('utf-8')) > self.max_message_bytes:
+                await self.send_json({'type': 'error', 'code': 'invalid', 'error': '메시지 형식이 올바르지 않습니다.'})
+                continue
+            try:
+                data = json.loads(text)
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                await self.send_json({'type': 'error', 'code': 'invalid', 'error': '메시지 형식이 올바르지 않습니다.'})
+                continue
+
+            kind = data.get('type')
+            if kind == 'ping':
+                await self.send_json({'type': 'pong'})
+            elif kind == 'close':
+                return
+            elif kind in ('open', 'chat'):
+                try:
+                    self.turns.put_nowait(data)
+                except asyncio.QueueFull:
+                    # 앞선 질문이 끝나기 전에 너무 많이 보냄 - 클라이언트가 잠시 뒤 다시 보냄
+                    await self.send_json({
+                        'type': 'error', 'id': data.get('id'), 'code': 'busy',
+                        'error': '앞선 질문을 처리하는 중입니다. 잠시 후 다시 시도해주세요.'
+                    })
+                    continue
+                if kind == 'chat':
+                    await self.send_json({'type': 'ack', 'id': data.get('id')})
+
+    async def _turn_loop(self):
+        """대기열의 세션 열기/질문을 순서대로 처리 (같은 세션의 질문이 뒤섞이지 않게 연결당 하나씩)"""
+        while True:
+            data = await self.turns.get()
+            if data['type'] == 'open':
+                await self._open(data)
+            else:
+                await self._chat(data)
+
+    async def _heartbeat(self):
+        """서버 ping - 응답(아무 프레임)이 idle_timeout 동안 없으면 끊긴 연결로 보고 종료"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if loop.time() - self.last_seen > self.idle_timeout:
+                logger.info(f"💤 채팅 웹소켓 응답 없음, 종료: {self.client_key}")
+                return
+            await self.send_json({'type': 'ping'})
+
+    async def _open(self, data):
+        chat_type = data.get('chat_type') or self.chat_type
+        if chat_type not in QA_MODELS_BY_CHAT_TYPE:
+            await self.send_json({'type': 'error', 'code': 'invalid', 'error': '알 수 없는 채팅 타입입니다.'})
+            return
+        self.chat_type = chat_type
+        session_id = str(data.get('session_id') or '')[:100]
+        if session_id and await self._owns_session(session_id):
+            # 복원한 세션/다른 요청(룰 요약)이 바꾼 세션 - 받아 두기만 함
+            self.session_id = session_id
+            return
+        if session_id:
+            logger.warning(f"🚫 웹소켓 세션 소유 확인 실패, 새 세션 사용: {session_id[:8]} ({self.client_key})")
+        if self.session_created and self.session_id:
+            # 재연결 없이 다시 보낸 open - 새 백엔드 세션을 만들지 않고 기존 세션으로 응답
+            await self.send_json({'type': 'session', 'session_id': self.session_id})
+            return
+        # 세션 열기도 Runpod 호출이므로 질문과 같은 요청 제한
+        if await self._rate_limited(data.get('id')):
+            return
+        try:
+            session_id = await self._run_sync(get_rule_chat_service().open_session, 'chat', '')
+        except Exception as e:
+            logger.error(f"❌ 웹소켓 세션 초기화 실패: {str(e)}")
+            await self.send_json({'type': 'error', 'code': 'server', 'error': '세션을 초기화하지 못했습니다.'})
+            return
+        self.session_id = session_id or ''
+        self.session_created = bool(self.session_id)
+        await self._remember_session(self.session_id)
+        logger.info(f"✅ 웹소켓 세션 초기화 완료: {self.session_id}")
+        await self.send_json({'type': 'session', 'session_id': self.session_id})
+
+    async def _chat(self, data):
+        turn_id = data.get('id')
+        message = str(data.get('message') or '').strip()
+        game_name = str(data.get('game_name') or '').strip()
+        chat_type = data.get('chat_type') or self.chat_type
+        if not message or chat_type not in QA_MODELS_BY_CHAT_TYPE:
+            await self.send_json({'type': 'error', 'id': turn_id, 'code': 'invalid', 'error': '질문 또는 채팅 타입이 없습니다.'})
+            return
+        session_id = str(data.get('session_id') or '')[:100]
+        if session_id and session_id != self.session_id:
+            if await self._owns_session(session_id):
+                self.session_id = session_id
+            else:
+                logger.warning(f"🚫 웹소켓 세션 소유 확인 실패, 연결 세션 사용: {session_id[:8]} ({self.client_key})")
+
+        if await self._rate_limited(turn_id):
+            return
+
+        logger.info(f"💬 웹소켓 채팅 요청: {chat_type} - {message} (세션: {self.session_id})")
+        try:
+            async with self.app.turn_slots:
+                result = await self._run_sync(
+                    get_rule_chat_service().answer, 'chat', chat_type, game_name, message, self.session_id
+                )
+        except Exception as e:
+            logger.error(f"❌ 웹소켓 채팅 오류: {str(e)}")
+            await self.send_json({'type': 'error', 'id': turn_id, 'code': 'server', 'error': str(e)})
+            return
+
+        if result.get('session_id') and result['session_id'] != self.session_id:
+            # 세션이 없었거나 만료되어 백엔드가 새로 만든 세션
+            self.session_id = result['session_id']
+            await self._remember_session(self.session_id)
+        # 백엔드는 답변을 한 번에 주므로 프레임 크기만 나눠 보냄 (send가 기다리는 동안 다음 조각은 만들지 않음)
+        response_text = result.get('response', '')
+        for start in range(0, len(response_text), self.chunk_chars):
+            await self.send_json({'type': 'chunk', 'id': turn_id, 'text': response_text[start:start + self.chunk_chars]})
+        await self.send_json({
+            'type': 'done', 'id': turn_id, 'session_id': self.session_id,
+            'source': result.get('source', ''), 'latency_ms': result.get('latency_ms'),
+        })
+
+    async def _rate_limited(self, turn_id):
+        """chat_api와 같은 버킷에서 토큰 하나 사용 - 초과면 rate_limited 오류를 보내고 True"""
+        if self.app.limiter is None:
+            return False
+        allowed, retry_after, self.client_key = await self._run_db(
+            lambda: self.app.limiter.consume(self.ip, load_session(self.django_session_key))
+        )
+        if allowed:
+            return False
+        retry_seconds = max(1, math.ceil(retry_after))
+        logger.warning(f"🚦 요청 제한 초과: chat_socket - {self.client_key} ({retry_seconds}초 후 재시도)")
+        await self.send_json({
+            'type': 'error', 'id': turn_id, 'code': 'rate_limited', 'retry_after': retry_seconds,
+            'error': '요청이 너무 많습니다. 잠시 후 다시 시도해주세요.'
+        })
+        return True
+
+    async def _owns_session(self, session_id):
+        """이 연결이 만들었거나 같은 Django 세션이 HTTP API로 받은 백엔드 세션인지 (HTTP 쪽 기록이 늦게 생길 수 있어 매번 새로 읽음)"""
+        if session_id in self.owned_sessions:
+            return True
+        if await self._run_db(lambda: owns_session(load_session(self.django_session_key), session_id)):
+            self.owned_sessions.add(session_id)
+            return True
+        return False
+
+    async def _remember_session(self, session_id):
+        """이 연결이 받은 세션 - 재연결/새로고침한 연결도 이어 쓸 수 있게 Django 세션에도 기록"""
+        if not session_id:
+            return
+        self.owned_sessions.add(session_id)
+
+        def record():
+            session = load_session(self.django_session_key)
+            if session is not None and session.exists(session.session_key):
+                remember_session(session, session_id)
+                session.save()
+
+        try:
+            await self._run_db(record)
+        except Exception as e:
+            logger.warning(f"⚠️ 웹소켓 세션 소유 기록 실패: {str(e)}")
+
+    async def _close_backend_session(self):
+        # 이 연결이 이어 쓴(소유를 확인한) 세션만 닫음
+        if not self.session_id or self.session_id not in self.owned_sessions:
+            return
+        try:
+            await self._run_sync(get_rule_chat_service().close_session, 'close_session', self.session_id)
+            logger.info(f"🗑️ 웹소켓 세션 종료: {self.session_id}")
+        except Exception as e:
+            logger.error(f"❌ 웹소켓 세션 종료 실패: {str(e)}")
+
+    @staticmethod
+    async def _run_db(func):
+        """세션/요청 제한 조회(DB·캐시)를 작업 스레드에서 - 작업 스레드가 연 DB 연결은 바로 정리"""
+        def call():
+            try:
+                return func()
+            finally:
+                connections.close_all()
+
+        return await sync_to_async(call, thread_sensitive=False)()
+
+    @staticmethod
+    async def _run_sync(func, deadline_name, *args):
+        """서비스(동기) 호출을 작업 스레드에서 - 뷰와 같은 RUNPOD_REQUEST_DEADLINES 적용"""
+        seconds = getattr(settings, 'RUNPOD_REQUEST_DEADLINES', {}).get(deadline_name, 60)
+
+        def call():
+            try:
+                with deadline_scope(seconds):
+                    return func(*args)
+            finally:
+                # 작업 스레드가 연 DB 연결 정리 (요청/응답 주기가 없으므로 직접)
+                connections.close_all()
+
+        return await sync_to_async(call, thread_sensitive=False)()
+
+    async def send_json(self, data):
+        """프레임 전송 - 클라이언트가 send_timeout 안에 받지 않으면(느린 연결) SocketClosed"""
+        text = json.dumps(data, ensure_ascii=False)
+        try:
+            async with self._send_lock:
+                await asyncio.wait_for(self._send({'type': 'websocket.send', 'text': text}), timeout=self.send_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"🐢 채팅 웹소켓 전송 지연, 종료: {self.client_key}")
+            raise SocketClosed()
+        except (OSError, RuntimeError) as e:
+            # 서버마다 끊긴 연결에 보낼 때 예외가 다름 (uvicorn: ClientDisconnected(OSError)/RuntimeError)
+            raise SocketClosed() from e
+
+
+def header(scope, name):
+    """ASGI 헤더 값 (없으면 '')"""
+    name = name.encode('latin-1')
+    for key, value in scope.get('headers', []):
+        if key == name:
+            return value.decode('latin-1')
+    return ''
+
+
+def client_ip(scope):
+    """클라이언트 IP (middleware.get_client_ip와 같은 규칙)"""
+    if getattr(settings, 'RATE_LIMIT_TRUST_PROXY_HEADERS', False):
+        real_ip = header(scope, 'x-real-ip')
+        if real_ip:
+            return real_ip.strip()
+        forwarded_for = header(scope, 'x-forwarded-for')
+        if forwarded_for:
+            return forwarded_for.split(',')[0].strip()
+    client = scope.get('client')
+    return client[0] if client else 'unknown'
+
+
+def origin_allowed(scope):
+    """다른 사이트 페이지가 사용자 브라우저로 연결하지 못하게 Origin 확인 (같은 호스트 또는 CSRF_TRUSTED_ORIGINS)"""
+    origin = header(scope, 'origin')
+    if not origin:
+        return True  # 브라우저가 아닌 클라이언트
+    if origin in getattr(settings, 'CSRF_TRUSTED_ORIGINS', []):
+        return True
+    return urlsplit(origin).netloc == header(scope, 'host')
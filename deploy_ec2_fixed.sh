@@ -28,6 +28,18 @@ DB_NAME="boardgame_db"
 DB_USER="juno"
 DB_PASSWORD="hwang0719"
 
+# EC2 환경 지정 (settings.py가 메타데이터 서비스를 프로브하지 않도록)
+export DJANGO_ENV=ec2
+if ! grep -q "DJANGO_ENV=ec2" ~/.bashrc 2>/dev/null; then
+    echo "export DJANGO_ENV=ec2" >> ~/.bashrc
+fi
+
+# 공유 캐시 폴더 - 서비스(PrivateTmp)와 SSH 셸의 manage.py가 같은 캐시를 보도록 프로젝트 폴더 아래 고정 경로
+export CACHE_DIR="$PROJECT_DIR/cache"
+if ! grep -q "CACHE_DIR=" ~/.bashrc 2>/dev/null; then
+    echo "export CACHE_DIR=$CACHE_DIR" >> ~/.bashrc
+fi
+
 # 현재 IP 자동 감지
 PUBLIC_IP=$(curl -s http://169.254.169.254/latest/meta-data/public-ipv4 2>/dev/null || echo "unknown")
 log_info "감지된 퍼블릭 IP: $PUBLIC_IP"
@@ -81,6 +93,11 @@ log_info "프로젝트 디렉토리: $PROJECT_DIR"
 
 # 5. 파일 권한 설정
 sudo chown -R ubuntu:ubuntu "$PROJECT_DIR"
+mkdir -p "$CACHE_DIR"
+touch .env
+if ! grep -q "^CACHE_DIR=" .env; then
+    echo "CACHE_DIR=$CACHE_DIR" >> .env
+fi
 
 # 6. Python 가상환경 설정
 log_info "🐍 Python 가상환경 설정..."
@@ -109,6 +126,13 @@ fi
 log_info "🔧 Django 프로젝트 설정 및 Static Files 수집..."
 python manage.py makemigrations
 python manage.py migrate
+if [ "${CACHE_PROFILE:-sqlite}" = "sqlite" ]; then
+    python manage.py createcachetable --database cache  # SQLite 공유 캐시 테이블
+fi
+# QR 코드 사전 렌더링 (nginx가 /static/chatbot/qr/ 에서 직접 서빙)
+if [ "$PUBLIC_IP" != "unknown" ]; then
+    python manage.py render_qr_assets --base-url "http://$PUBLIC_IP" || log_warning "QR 사전 렌더링 실패 (API로 대체)"
+fi
 python manage.py collectstatic --noinput --clear
 
 # static 파일이 제대로 수집되었는지 확인
@@ -146,6 +170,8 @@ User=ubuntu
 Group=www-data
 WorkingDirectory=$PROJECT_DIR
 Environment="PATH=$PROJECT_DIR/venv/bin"
+Environment="DJANGO_ENV=ec2"
+Environment="CACHE_DIR=$PROJECT_DIR/cache"
 ExecStart=$PROJECT_DIR/venv/bin/gunicorn \\
     --access-logfile - \\
     --error-logfile - \\
@@ -163,6 +189,35 @@ PrivateTmp=true
 WantedBy=multi-user.target
 EOF
 
+# 채팅 웹소켓 (ASGI) - HTTP는 위 Gunicorn, /ws/만 uvicorn 프로세스 하나가 처리
+log_info "🔌 채팅 웹소켓 서비스 설정..."
+sudo tee /etc/systemd/system/boardgame_chatbot_ws.service > /dev/null << EOF
+[Unit]
+Description=BOVI Boardgame Chatbot WebSocket (uvicorn) daemon
+After=network.target
+
+[Service]
+User=ubuntu
+Group=www-data
+WorkingDirectory=$PROJECT_DIR
+Environment="PATH=$PROJECT_DIR/venv/bin"
+Environment="DJANGO_ENV=ec2"
+Environment="CACHE_DIR=$PROJECT_DIR/cache"
+ExecStart=$PROJECT_DIR/venv/bin/uvicorn boardgame_chatbot.asgi:application \\
+    --uds /run/gunicorn/boardgame_chatbot_ws.sock \\
+    --workers 1 \\
+    --ws-max-size 16384 \\
+    --ws-ping-interval 20 \\
+    --ws-ping-timeout 20
+Restart=on-failure
+KillMode=mixed
+TimeoutStopSec=5
+PrivateTmp=true
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
 # 11. 개선된 Nginx 설정 (Static Files 경로 최적화)
 log_info "🌐 Nginx 웹서버 설정 (Static Files 경로 최적화)..."
 sudo tee /etc/nginx/sites-available/boardgame_chatbot > /dev/null << EOF
@@ -172,6 +227,15 @@ server {
 
     client_max_body_size 100M;
 
+    # Django 응답 압축 보조 - 앱이 이미 압축한 응답(Content-Encoding 있음)은 건너뜀
+    # NDJSON 스트리밍은 청크가 버퍼링되지 않도록 gzip_types에서 제외
+    gzip on;
+    gzip_vary on;
+    gzip_proxied any;
+    gzip_comp_level 5;
+    gzip_min_length 512;
+    gzip_types text/plain text/css application/json application/javascript image/svg+xml;
+
     # 로그 설정
     access_log /var/log/nginx/boardgame_chatbot_access.log;
     error_log /var/log/nginx/boardgame_chatbot_error.log;
@@ -187,6 +251,7 @@ server {
         expires 1y;
         add_header Cache-Control "public, immutable";
         add_header Access-Control-Allow-Origin "*";
+        gzip_static on;
         
         # 파일이 staticfiles에 없으면 static에서 찾기
         try_files \$uri @static_fallback;
@@ -208,6 +273,21 @@ server {
         add_header Access-Control-Allow-Origin "*";
     }
 
+    # 룰 설명 채팅 웹소켓 - uvicorn(ASGI) 서비스로 (서버 ping 20초보다 긴 읽기 타임아웃)
+    location /ws/ {
+        proxy_pass http://unix:/run/gunicorn/boardgame_chatbot_ws.sock;
+        proxy_http_version 1.1;
+        proxy_set_header Upgrade \$http_upgrade;
+        proxy_set_header Connection "upgrade";
+        proxy_set_header Host \$http_host;
+        proxy_set_header X-Real-IP \$remote_addr;
+        proxy_set_header X-Forwarded-For \$proxy_add_x_forwarded_for;
+        proxy_set_header X-Forwarded-Proto \$scheme;
+        proxy_buffering off;
+        proxy_read_timeout 120s;
+        proxy_send_timeout 120s;
+    }
+
     # Django 애플리케이션
     location / {
         proxy_pass http://unix:/run/gunicorn/boardgame_chatbot.sock;
@@ -233,6 +313,8 @@ sudo nginx -t
 sudo systemctl daemon-reload
 sudo systemctl start boardgame_chatbot
 sudo systemctl enable boardgame_chatbot
+sudo systemctl start boardgame_chatbot_ws
+sudo systemctl enable boardgame_chatbot_ws
 sudo systemctl restart nginx
 sudo systemctl enable nginx
 
@@ -257,6 +339,7 @@ log_info "🔍 서비스 상태 확인..."
 sleep 3
 
 GUNICORN_STATUS=$(sudo systemctl is-active boardgame_chatbot)
+WS_STATUS=$(sudo systemctl is-active boardgame_chatbot_ws)
 NGINX_STATUS=$(sudo systemctl is-active nginx)
 
 if [ "$GUNICORN_STATUS" = "active" ]; then
@@ -266,6 +349,13 @@ else
     sudo journalctl -u boardgame_chatbot --no-pager -n 10
 fi
 
+if [ "$WS_STATUS" = "active" ]; then
+    log_success "✅ 채팅 웹소켓 서비스: 실행 중"
+else
+    log_error "❌ 채팅 웹소켓 서비스: $WS_STATUS"
+    sudo journalctl -u boardgame_chatbot_ws --no-pager -n 10
+fi
+
 if [ "$NGINX_STATUS" = "active" ]; then
     log_success "✅ Nginx 서비스: 실행 중"
 else
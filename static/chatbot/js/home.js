@@ -0,0 +1,88 @@
+function handleGameClick(gameName) {
+    // 페이지 URL은 템플릿에서 data 속성으로 전달
+    const rankingsList = document.querySelector('.rankings-list');
+
+    // 뱅인지 확인
+    if (gameName.toLowerCase().includes('뱅') || gameName.toLowerCase().includes('bang')) {
+        // 뱅이면 파인튜닝 룰 설명 페이지로
+        window.location.href = rankingsList.dataset.finetuningUrl + "?game=" + encodeURIComponent(gameName);
+    } else {
+        // 다른 게임이면 GPT 룰 설명 페이지로
+        window.location.href = rankingsList.dataset.gptUrl + "?game=" + encodeURIComponent(gameName);
+    }
+}
+
+// 기간별 인기 게임 위젯
+const trendingCache = new Map();
+
+function renderTrending(list, data) {
+    list.replaceChildren();
+    if (!data.rankings.length) {
+        const empty = document.createElement('div');
+        empty.className = 'no-rankings';
+        empty.textContent = '이 기간에는 아직 질문이 없습니다.';
+        list.appendChild(empty);
+        return;
+    }
+
+    data.rankings.forEach((ranking, index) => {
+        const item = document.createElement('div');
+        item.className = 'ranking-item';
+        item.addEventListener('click', () => handleGameClick(ranking.game_name));
+
+        const number = document.createElement('div');
+        number.className = 'ranking-number' + (index < 3 ? ' top-3' : '');
+        number.textContent = index + 1;
+
+        const game = document.createElement('div');
+        game.className = 'ranking-game';
+        game.textContent = ranking.game_name;
+
+        const count = document.createElement('div');
+        count.className = 'ranking-count';
+        count.textContent = `${ranking.count}개 질문`;
+
+        item.append(number, game, count);
+
+        // 직전 같은 길이 기간보다 늘었으면 상승 표시
+        if (ranking.count > ranking.previous_count) {
+            const badge = document.createElement('span');
+            badge.className = 'ranking-badge trending-up';
+            badge.textContent = ranking.previous_count ? `▲ ${ranking.count - ranking.previous_count}` : 'NEW';
+            item.appendChild(badge);
+        }
+        list.appendChild(item);
+    });
+}
+
+async function loadTrending(period) {
+    const list = document.getElementById('trendingList');
+    if (!list) return;
+
+    let data = trendingCache.get(period);
+    if (!data) {
+        try {
+            const response = await fetch(`${list.dataset.trendingUrl}?window=${encodeURIComponent(period)}`);
+            if (!response.ok) throw new Error(response.status);
+            data = await response.json();
+            trendingCache.set(period, data);
+        } catch (error) {
+            console.error('인기 게임 불러오기 실패:', error);
+            return;
+        }
+    }
+    renderTrending(list, data);
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    const tabs = document.querySelectorAll('.trending-tab');
+    tabs.forEach(tab => {
+        tab.addEventListener('click', () => {
+            tabs.forEach(t => t.classList.toggle('active', t === tab));
+            loadTrending(tab.dataset.window);
+        });
+    });
+
+    const active = document.querySelector('.trending-tab.active');
+    if (active) loadTrending(active.dataset.window);
+});
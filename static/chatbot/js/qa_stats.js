@@ -0,0 +1,89 @@
+// QA 분석 대시보드 - 요약 테이블 기반 API를 불러와 막대 그래프로 표시
+
+function renderBars(container, rows) {
+    container.replaceChildren();
+    if (!rows.length) {
+        const empty = document.createElement('p');
+        empty.className = 'no-data';
+        empty.textContent = '데이터가 없습니다.';
+        container.appendChild(empty);
+        return;
+    }
+
+    const max = Math.max(...rows.map(row => row.value), 1);
+    rows.forEach(row => {
+        const line = document.createElement('div');
+        line.className = 'bar-row';
+
+        const label = document.createElement('span');
+        label.className = 'bar-label';
+        label.textContent = row.label;
+        label.title = row.label;
+
+        const track = document.createElement('div');
+        track.className = 'bar-track';
+        const fill = document.createElement('div');
+        fill.className = 'bar-fill';
+        fill.style.width = `${(row.value / max) * 100}%`;
+        track.appendChild(fill);
+
+        const value = document.createElement('span');
+        value.className = 'bar-value';
+        value.textContent = row.text ?? row.value.toLocaleString();
+
+        line.append(label, track, value);
+        container.appendChild(line);
+    });
+}
+
+function renderAnalytics(data) {
+    document.getElementById('analyticsMeta').textContent =
+        `${data.start_day} 이후 질문 ${data.total_questions.toLocaleString()}개 · ` +
+        `폴백 비율 ${(data.fallback_ratio * 100).toFixed(1)}% · 집계 시각 ${data.aggregated_at}`;
+
+    // 일별 합계 (게임별 행을 날짜로 합침)
+    const daily = new Map();
+    data.per_day.forEach(item => daily.set(item.day, (daily.get(item.day) || 0) + item.count));
+    renderBars(document.getElementById('analyticsDaily'),
+        [...daily].map(([day, count]) => ({ label: day.slice(5), value: count })));
+
+    renderBars(document.getElementById('analyticsLengths'),
+        data.length_distribution.map(bucket => ({
+            label: bucket.max === null ? `${bucket.min}자~` : `${bucket.min}~${bucket.max}자`,
+            value: bucket.count
+        })));
+
+    renderBars(document.getElementById('analyticsFallback'),
+        data.games.map(game => ({
+            label: game.game_name,
+            value: game.fallback_ratio,
+            text: `${(game.fallback_ratio * 100).toFixed(1)}%`
+        })));
+
+    const list = document.getElementById('analyticsTopQuestions');
+    list.replaceChildren();
+    data.top_questions.forEach(item => {
+        const li = document.createElement('li');
+        li.textContent = `[${item.game_name}] ${item.question} (${item.count}회)`;
+        list.appendChild(li);
+    });
+}
+
+async function loadAnalytics() {
+    const section = document.getElementById('qaAnalytics');
+    const days = document.getElementById('analyticsDays').value;
+    try {
+        const response = await fetch(`${section.dataset.analyticsUrl}?days=${encodeURIComponent(days)}`);
+        if (!response.ok) throw new Error(response.status);
+        renderAnalytics(await response.json());
+    } catch (error) {
+        console.error('QA 분석 불러오기 실패:', error);
+        document.getElementById('analyticsMeta').textContent = '분석 데이터를 불러오지 못했습니다.';
+    }
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    if (!document.getElementById('qaAnalytics')) return;
+    document.getElementById('analyticsDays').addEventListener('change', loadAnalytics);
+    loadAnalytics();
+});
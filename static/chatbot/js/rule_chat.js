@@ -0,0 +1,765 @@
+let sessionId = "";
+let selectedGame = '';
+// 페이지별 설정(채팅 타입, 문구, API URL)은 템플릿에서 data 속성으로 전달
+const chatConfig = document.getElementById('chatConfig').dataset;
+
+// 게임 검색은 서버 API로 (입력이 멈춘 뒤 요청, 같은 검색어는 재사용)
+const SEARCH_DEBOUNCE_MS = 150;
+const SEARCH_CACHE_SIZE = 50;
+const searchCache = new Map();
+let searchTimer = null;
+let searchController = null;
+
+// 게임을 고르기 직전(검색 결과 hover/터치)이나 고른 직후 서버가 룰 요약과 자주 묻는 질문 답변을 미리 받아 두도록 (게임당 한 번)
+const prefetchedGames = new Set();
+
+// 게임별 추천 질문 (build_faqs가 미리 만든 답변 포함) - 칩을 누르면 서버 호출 없이 바로 답변 표시
+const faqCache = new Map();
+
+// 새로고침해도 같은 탭에서는 세션 ID를 유지해서 서버에 저장된 대화를 복원 (탭을 닫으면 사라짐)
+const SESSION_STORAGE_KEY = `boardgame_session_${chatConfig.chatType}`;
+
+// 오프라인일 때 보낸 질문은 브라우저에 보관했다가 연결되면 순서대로 전송 (탭을 닫아도 유지)
+const OUTBOX_STORAGE_KEY = `boardgame_outbox_${chatConfig.chatType}`;
+const OUTBOX_MAX_ITEMS = 20;
+const shownOutboxIds = new Set();
+let outboxFlushing = false;
+
+// 채팅 웹소켓 (서버가 켜 둔 경우) - 탭당 연결 하나로 질문/답변 청크/세션 열기·닫기, 연결이 안 되면 fetch 사용
+const SOCKET_RETRY_MAX_MS = 30000;
+const SOCKET_MAX_FAILURES = 3;  // 한 번도 열리지 않고 연속 실패하면 이 페이지에서는 fetch만 사용
+const SOCKET_SILENCE_TIMEOUT_MS = 60000;  // 서버 ping이 이 시간 동안 없으면 끊긴 연결로 보고 다시 연결
+const chatSocket = {
+    ws: null,
+    open: false,
+    nextId: 1,
+    pending: new Map(),  // 질문 id -> { resolve, reject, text, bubble }
+    retryDelay: 1000,
+    failures: 0,
+    silenceTimer: null,
+    sentSessionId: '',
+    closing: false
+};
+
+// 페이지 로드 시 저장된 대화 복원, 없으면 세션 ID 미리 받아오기
+window.addEventListener('DOMContentLoaded', function() {
+    restoreConversation().then(restoredGame => {
+        if (socketEnabled()) {
+            // 연결되면 open 메시지로 세션을 알리거나 새로 받음
+            connectChatSocket();
+        } else if (!restoredGame) {
+            initializeSession();
+        }
+        selectGameFromUrl(restoredGame);
+        flushOutbox();
+    });
+});
+
+// 연결이 돌아오면 (오프라인으로 열어서 세션이 없으면 세션부터) 보관한 질문 전송
+window.addEventListener('online', function() {
+    if (chatConfig.socketUrl && !chatSocket.ws) {
+        chatSocket.failures = 0;
+        connectChatSocket();
+    }
+    // 웹소켓은 연결되면 open 메시지로 세션을 받음
+    if (!sessionId && readOutbox().length === 0 && !chatSocket.ws) {
+        initializeSession();
+    }
+    flushOutbox();
+});
+
+// 모바일 페이지만 서비스 워커 등록 (셸/정적 파일/게임 목록/이전에 받은 룰 요약을 오프라인에서도 사용)
+if (chatConfig.serviceWorkerUrl && 'serviceWorker' in navigator) {
+    window.addEventListener('load', function() {
+        navigator.serviceWorker.register(chatConfig.serviceWorkerUrl)
+            .catch(error => console.warn('⚠️ 서비스 워커 등록 실패:', error));
+    });
+}
+
+// 페이지 이동 전에 세션 종료
+window.addEventListener('beforeunload', function() {
+    closeSession();
+});
+
+// 페이지 벗어날 때 세션 종료
+window.addEventListener('pagehide', function() {
+    closeSession();
+});
+
+function initializeSession() {
+    console.log(`🚀 ${chatConfig.label} 룰 설명 세션 초기화 시작...`);
+    
+    if (chatSocket.open) {
+        // 서버가 세션을 받아 session 메시지로 알려줌
+        sendSocketFrame({ type: 'open', chat_type: chatConfig.chatType, session_id: '' });
+        return;
+    }
+    
+    // 더미 요청으로 세션 ID 미리 받아오기
+    fetch(chatConfig.chatUrl, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            message: '__INIT_SESSION__',  // 더미 메시지
+            chat_type: chatConfig.chatType,
+            session_id: ""  // 빈 값으로 전송
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.status === 'success' && data.session_id) {
+            setSessionId(data.session_id);
+            console.log(`✅ ${chatConfig.label} 룰 설명 세션 초기화 완료:`, sessionId);
+        } else {
+            console.error(`❌ ${chatConfig.label} 룰 설명 세션 초기화 실패:`, data);
+        }
+    })
+    .catch(error => {
+        console.error(`❌ ${chatConfig.label} 룰 설명 세션 초기화 오류:`, error);
+    });
+}
+
+function setSessionId(newSessionId) {
+    sessionId = newSessionId;
+    try {
+        sessionStorage.setItem(SESSION_STORAGE_KEY, sessionId);
+    } catch (error) {
+        // 사생활 보호 모드 등에서 저장소를 못 쓰면 복원만 안 됨
+    }
+    
+    // 화면에 세션 ID 표시
+    const sessionStatusElement = document.getElementById('sessionStatus');
+    if (sessionStatusElement) {
+        sessionStatusElement.textContent = sessionId.substring(0, 8) + '...';
+    }
+    
+    // 룰 요약 등 HTTP 응답으로 바뀐 세션도 연결이 끊길 때 서버가 닫을 수 있게 알림
+    if (chatSocket.open && sessionId !== chatSocket.sentSessionId) {
+        sendSocketFrame({ type: 'open', chat_type: chatConfig.chatType, session_id: sessionId });
+    }
+}
+
+function restoreConversation() {
+    // 서버에 저장된 대화를 한 번에 받아 화면 복원 - 복원한 게임 이름 반환 (없으면 null)
+    let storedSessionId = null;
+    try {
+        storedSessionId = sessionStorage.getItem(SESSION_STORAGE_KEY);
+    } catch (error) {
+        storedSessionId = null;
+    }
+    if (!storedSessionId || !chatConfig.conversationUrl) {
+        return Promise.resolve(null);
+    }
+    
+    const params = new URLSearchParams({ session_id: storedSessionId, chat_type: chatConfig.chatType });
+    return fetch(`${chatConfig.conversationUrl}?${params}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.status !== 'success') {
+                sessionStorage.removeItem(SESSION_STORAGE_KEY);
+                return null;
+            }
+            // 닫힌 세션이어도 다음 질문 때 서버가 저장된 대화로 세션을 다시 만듦
+            setSessionId(data.session_id);
+            showRestoredConversation(data);
+            console.log(`♻️ ${chatConfig.label} 대화 복원:`, data.game_name, data.messages.length);
+            return data.game_name;
+        })
+        .catch(error => {
+            console.error('❌ 대화 복원 오류:', error);
+            return null;
+        });
+}
+
+function showRestoredConversation(data) {
+    const gameName = data.game_name;
+    selectedGame = gameName;
+    document.getElementById('gameSearch').value = gameName;
+    document.getElementById('gameSelect').value = gameName;
+    document.getElementById('selectedGameName').textContent = `선택된 게임: ${gameName}`;
+    document.getElementById('chatContainer').style.display = 'block';
+    
+    if (data.summary) {
+        document.getElementById('summaryContent').innerHTML = data.summary.replace(/\n/g, '<br>');
+        document.getElementById('ruleSummary').style.display = 'block';
+    } else {
+        loadGameRuleSummary(gameName);
+    }
+    
+    const chatMessages = document.getElementById('chatMessages');
+    chatMessages.innerHTML = '';
+    addMessage(chatConfig.welcomeMessage.replace('{game}', gameName), 'bot');
+    data.messages.forEach(message => {
+        if (message.role === 'user') {
+            addMessage(escapeHtml(message.content), 'user');
+        } else {
+            addMessage(message.content, 'bot');
+        }
+    });
+    loadFaqChips(gameName);
+}
+
+function escapeHtml(text) {
+    const element = document.createElement('div');
+    element.textContent = text;
+    return element.innerHTML;
+}
+
+function closeSession() {
+    if (sessionId) {
+        if (chatSocket.open) {
+            // 서버가 세션을 닫고 연결 종료 (close가 전달되지 못해도 연결이 끊기면 서버가 닫음)
+            chatSocket.closing = true;
+            sendSocketFrame({ type: 'close' });
+        } else {
+            // 세션 종료 요청 (동기적으로)
+            const xhr = new XMLHttpRequest();
+            xhr.open('POST', chatConfig.closeSessionUrl, false); // 동기 요청
+            xhr.setRequestHeader('Content-Type', 'application/json');
+            xhr.send(JSON.stringify({
+                session_id: sessionId
+            }));
+        }
+        
+        console.log(`${chatConfig.label} 룰 설명 세션 종료:`, sessionId);
+        sessionId = "";
+        
+        // 화면에서 세션 ID 삭제
+        const sessionStatusElement = document.getElementById('sessionStatus');
+        if (sessionStatusElement) {
+            sessionStatusElement.textContent = '없음';
+        }
+    }
+}
+
+// 게임 검색 기능
+document.getElementById('gameSearch').addEventListener('input', function() {
+    const searchTerm = this.value.trim();
+    const searchResults = document.getElementById('searchResults');
+    
+    clearTimeout(searchTimer);
+    if (searchTerm === '') {
+        if (searchController) searchController.abort();
+        searchResults.style.display = 'none';
+        return;
+    }
+    
+    searchTimer = setTimeout(() => searchGames(searchTerm), SEARCH_DEBOUNCE_MS);
+});
+
+function searchGames(searchTerm) {
+    if (searchCache.has(searchTerm)) {
+        renderSearchResults(searchCache.get(searchTerm));
+        return;
+    }
+    
+    // 이전 검색 요청은 취소 (늦게 도착한 응답이 최신 결과를 덮지 않도록)
+    if (searchController) searchController.abort();
+    searchController = new AbortController();
+    
+    const params = new URLSearchParams({ q: searchTerm, limit: 10 });
+    fetch(`${chatConfig.searchUrl}?${params}`, { signal: searchController.signal })
+    .then(response => response.json())
+    .then(data => {
+        if (data.status !== 'success') return;
+        if (searchCache.size >= SEARCH_CACHE_SIZE) {
+            searchCache.delete(searchCache.keys().next().value);
+        }
+        searchCache.set(searchTerm, data.results);
+        if (document.getElementById('gameSearch').value.trim() === searchTerm) {
+            renderSearchResults(data.results);
+        }
+    })
+    .catch(error => {
+        if (error.name !== 'AbortError') {
+            console.error('❌ 게임 검색 오류:', error);
+        }
+    });
+}
+
+function renderSearchResults(results) {
+    const searchResults = document.getElementById('searchResults');
+    searchResults.innerHTML = '';
+    
+    if (results.length > 0) {
+        results.forEach(result => {
+            const item = document.createElement('div');
+            item.className = 'search-result-item';
+            item.textContent = `${chatConfig.resultIcon} ${result.name}`;
+            item.addEventListener('click', () => selectGameFromSearch(result.name));
+            item.addEventListener('mouseenter', () => prefetchGame(result.name));
+            item.addEventListener('touchstart', () => prefetchGame(result.name), { passive: true });
+            searchResults.appendChild(item);
+        });
+    } else {
+        searchResults.innerHTML = '<div class="no-results">검색 결과가 없습니다. 다른 키워드로 검색해보세요.</div>';
+    }
+    searchResults.style.display = 'block';
+}
+
+// 검색 결과에서 게임 선택
+function selectGameFromSearch(gameName) {
+    selectedGame = gameName;
+    document.getElementById('gameSearch').value = gameName;
+    document.getElementById('searchResults').style.display = 'none';
+    document.getElementById('gameSelect').value = gameName;
+    
+    // 게임 선택 이벤트 트리거
+    loadGameAndSetupChat(gameName);
+}
+
+// 게임 로드 및 채팅 설정 (공통 함수)
+function loadGameAndSetupChat(gameName) {
+    selectedGame = gameName;
+    prefetchGame(gameName, false);  // 요약은 바로 아래에서 요청하므로 자주 묻는 질문만
+    loadGameRuleSummary(gameName);
+    loadFaqChips(gameName);
+    document.getElementById('selectedGameName').textContent = `선택된 게임: ${gameName}`;
+    document.getElementById('chatContainer').style.display = 'block';
+    
+    // 채팅 메시지 초기화
+    const chatMessages = document.getElementById('chatMessages');
+    chatMessages.innerHTML = `
+        <div class="message bot">
+            <div class="message-bubble">
+                ${chatConfig.welcomeMessage.replace('{game}', gameName)}
+            </div>
+        </div>
+    `;
+}
+
+function prefetchGame(gameName, includeSummary = true) {
+    if (!chatConfig.prefetchUrl || prefetchedGames.has(gameName)) return;
+    prefetchedGames.add(gameName);
+    
+    fetch(chatConfig.prefetchUrl, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            game_name: gameName,
+            chat_type: chatConfig.chatType,
+            summary: includeSummary
+        })
+    })
+    .catch(error => {
+        console.error('❌ 미리 받기 오류:', error);
+    });
+}
+
+function loadFaqChips(gameName) {
+    const faqChips = document.getElementById('faqChips');
+    if (!faqChips || !chatConfig.faqsUrl) return;
+    faqChips.hidden = true;
+    faqChips.innerHTML = '';
+    
+    const cached = faqCache.get(gameName);
+    const request = cached
+        ? Promise.resolve(cached)
+        : fetch(`${chatConfig.faqsUrl}?game=${encodeURIComponent(gameName)}&type=${encodeURIComponent(chatConfig.chatType)}`)
+            .then(response => response.json())
+            .then(data => {
+                const faqs = data.status === 'success' ? data.faqs : [];
+                faqCache.set(gameName, faqs);
+                return faqs;
+            });
+    
+    request
+        .then(faqs => {
+            // 응답을 기다리는 동안 다른 게임을 골랐으면 무시
+            if (selectedGame !== gameName || faqs.length === 0) return;
+            faqs.forEach(faq => {
+                const chip = document.createElement('button');
+                chip.type = 'button';
+                chip.className = 'faq-chip';
+                chip.textContent = faq.question;
+                chip.addEventListener('click', () => showFaqAnswer(faq));
+                faqChips.appendChild(chip);
+            });
+            faqChips.hidden = false;
+        })
+        .catch(error => {
+            console.error('❌ 추천 질문 오류:', error);
+        });
+}
+
+function showFaqAnswer(faq) {
+    // 질문 원문은 다른 사용자가 입력한 내용이므로 HTML로 해석하지 않음
+    addMessage(escapeHtml(faq.question), 'user');
+    addMessage(faq.answer, 'bot');
+}
+
+// 검색창 외부 클릭 시 검색 결과 숨기기
+document.addEventListener('click', function(e) {
+    const searchContainer = document.querySelector('.game-search-container');
+    const searchResults = document.getElementById('searchResults');
+    
+    if (!searchContainer.contains(e.target)) {
+        searchResults.style.display = 'none';
+    }
+});
+
+// 기존 드롭다운 게임 선택 시 룰 요약 로드
+document.getElementById('gameSelect').addEventListener('change', function() {
+    if (this.value) {
+        // 검색창도 업데이트
+        document.getElementById('gameSearch').value = this.value;
+        loadGameAndSetupChat(this.value);
+    } else {
+        selectedGame = '';
+        document.getElementById('gameSearch').value = '';
+        document.getElementById('ruleSummary').style.display = 'none';
+        document.getElementById('chatContainer').style.display = 'none';
+    }
+});
+
+function loadGameRuleSummary(gameName) {
+    const summaryDiv = document.getElementById('ruleSummary');
+    const contentDiv = document.getElementById('summaryContent');
+    
+    // 로딩 표시
+    contentDiv.innerHTML = `<div class="loading">${chatConfig.loadingMessage}</div>`;
+    summaryDiv.style.display = 'block';
+    
+    fetch(chatConfig.summaryUrl, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            game_name: gameName,
+            chat_type: chatConfig.chatType,
+            session_id: sessionId  // 세션 ID 추가
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        console.log(`${chatConfig.label} 룰 요약 응답:`, data);  // 디버깅용
+        
+        if (data.status === 'success') {
+            contentDiv.innerHTML = data.summary.replace(/\n/g, '<br>');
+            
+            // 세션 ID 업데이트
+            if (data.session_id && data.session_id.trim() !== '') {
+                if (sessionId !== data.session_id) {
+                    console.log(`🔄 ${chatConfig.label} 룰 요약 세션 ID 업데이트:`, data.session_id);
+                    setSessionId(data.session_id);
+                }
+            }
+        } else {
+            contentDiv.innerHTML = '룰 요약을 불러오는데 실패했습니다.';
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        contentDiv.innerHTML = '룰 요약을 불러오는데 오류가 발생했습니다.';
+    });
+}
+
+function sendMessage() {
+    const input = document.getElementById('messageInput');
+    const message = input.value.trim();
+    
+    if (!message || !selectedGame) {
+        if (!selectedGame) {
+            alert('먼저 게임을 선택해주세요.');
+        }
+        return;
+    }
+    
+    // 세션이 아직 초기화되지 않았으면 잠시 대기 (오프라인이면 보관했다가 보낼 때 세션을 새로 받음)
+    if (!sessionId && navigator.onLine) {
+        addMessage('세션을 초기화하는 중입니다. 잠시 후 다시 시도해주세요.', 'bot');
+        return;
+    }
+    
+    // 사용자 메시지 표시
+    addMessage(message, 'user');
+    input.value = '';
+    
+    if (!navigator.onLine) {
+        queueOutbox(message, selectedGame);
+        return;
+    }
+    
+    // 봇 응답 요청
+    postChatMessage(message, selectedGame)
+        .then(() => flushOutbox())
+        .catch(error => {
+            console.error('Error:', error);
+            if (error instanceof TypeError) {
+                // fetch 자체가 실패한 경우 (연결 끊김) - 보관했다가 다시 보냄
+                queueOutbox(message, selectedGame);
+            } else {
+                addMessage('죄송합니다. 네트워크 오류가 발생했습니다.', 'bot');
+            }
+        });
+}
+
+function postChatMessage(message, gameName) {
+    // 웹소켓이 열려 있으면 소켓으로 (답변은 청크가 올 때마다 표시), 아니면 fetch
+    const request = chatSocket.open
+        ? sendSocketChat(message, gameName)
+        : fetch(chatConfig.chatUrl, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                message: message,
+                chat_type: chatConfig.chatType,
+                session_id: sessionId,  // 미리 받은 세션 ID 사용
+                game_name: gameName
+            })
+        })
+        .then(response => response.json());
+    return request.then(data => {
+        console.log(`${chatConfig.label} 룰 설명 서버 응답 데이터:`, data);  // 디버깅용
+        
+        if (data.status === 'success') {
+            if (!data.streamed) {
+                addMessage(data.response, 'bot');
+            }
+            
+            // 세션 ID 업데이트 (혹시 모를 변경사항 반영)
+            if (data.session_id && data.session_id.trim() !== '') {
+                if (sessionId !== data.session_id) {
+                    console.log(`🔄 ${chatConfig.label} 룰 설명 세션 ID 업데이트:`, data.session_id);
+                    setSessionId(data.session_id);
+                }
+            }
+        } else {
+            addMessage('죄송합니다. 오류가 발생했습니다.', 'bot');
+        }
+    });
+}
+
+function socketEnabled() {
+    return Boolean(chatConfig.socketUrl) && 'WebSocket' in window && chatSocket.failures < SOCKET_MAX_FAILURES;
+}
+
+function connectChatSocket() {
+    if (!socketEnabled() || chatSocket.ws) return;
+    const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    const ws = new WebSocket(`${scheme}://${window.location.host}${chatConfig.socketUrl}`);
+    chatSocket.ws = ws;
+    
+    ws.onopen = function() {
+        chatSocket.open = true;
+        chatSocket.closing = false;
+        chatSocket.failures = 0;
+        chatSocket.retryDelay = 1000;
+        watchSocketSilence();
+        // 복원한 세션이 있으면 알리고, 없으면 서버가 새로 받아 session 메시지로 응답
+        sendSocketFrame({ type: 'open', chat_type: chatConfig.chatType, session_id: sessionId });
+        console.log(`🔌 ${chatConfig.label} 채팅 웹소켓 연결`);
+        flushOutbox();
+    };
+    
+    ws.onmessage = function(event) {
+        watchSocketSilence();
+        let data;
+        try {
+            data = JSON.parse(event.data);
+        } catch (error) {
+            return;
+        }
+        handleSocketMessage(data);
+    };
+    
+    ws.onclose = function() {
+        const wasOpen = chatSocket.open;
+        chatSocket.ws = null;
+        chatSocket.open = false;
+        chatSocket.sentSessionId = '';
+        clearTimeout(chatSocket.silenceTimer);
+        
+        // 답을 기다리던 질문은 연결 끊김(TypeError)으로 처리 - 보관함에 넣었다가 다시 보냄
+        chatSocket.pending.forEach(turn => turn.reject(new TypeError('채팅 웹소켓 연결이 끊겼습니다.')));
+        chatSocket.pending.clear();
+        if (chatSocket.closing) return;  // 페이지를 떠나는 중
+        
+        if (!wasOpen) {
+            chatSocket.failures += 1;
+        }
+        if (!socketEnabled()) {
+            // 서버나 프록시가 웹소켓을 지원하지 않음 - 이 페이지에서는 fetch로
+            console.warn(`⚠️ ${chatConfig.label} 채팅 웹소켓을 사용할 수 없어 fetch로 전송합니다.`);
+            if (!sessionId) {
+                initializeSession();
+            }
+            flushOutbox();
+            return;
+        }
+        setTimeout(connectChatSocket, chatSocket.retryDelay);
+        chatSocket.retryDelay = Math.min(chatSocket.retryDelay * 2, SOCKET_RETRY_MAX_MS);
+        setTimeout(flushOutbox, 0);
+    };
+}
+
+function sendSocketFrame(data) {
+    if (data.type === 'open') {
+        chatSocket.sentSessionId = data.session_id;
+    }
+    chatSocket.ws.send(JSON.stringify(data));
+}
+
+function watchSocketSilence() {
+    // 모바일 네트워크 전환 등으로 close 이벤트 없이 끊긴 연결 감지
+    clearTimeout(chatSocket.silenceTimer);
+    chatSocket.silenceTimer = setTimeout(() => {
+        if (chatSocket.ws) {
+            chatSocket.ws.close();
+        }
+    }, SOCKET_SILENCE_TIMEOUT_MS);
+}
+
+function sendSocketChat(message, gameName) {
+    return new Promise((resolve, reject) => {
+        const id = chatSocket.nextId++;
+        chatSocket.pending.set(id, { resolve: resolve, reject: reject, text: '', bubble: null });
+        sendSocketFrame({
+            type: 'chat',
+            id: id,
+            message: message,
+            chat_type: chatConfig.chatType,
+            session_id: sessionId,
+            game_name: gameName
+        });
+    });
+}
+
+function handleSocketMessage(data) {
+    const turn = chatSocket.pending.get(data.id);
+    switch (data.type) {
+        case 'ping':
+            sendSocketFrame({ type: 'pong' });
+            break;
+        case 'session':
+            if (data.session_id && data.session_id !== sessionId) {
+                setSessionId(data.session_id);
+                console.log(`✅ ${chatConfig.label} 룰 설명 세션 초기화 완료:`, sessionId);
+            }
+            break;
+        case 'chunk':
+            if (!turn) break;
+            turn.text += data.text;
+            if (!turn.bubble) {
+                turn.bubble = addMessage('', 'bot');
+            }
+            turn.bubble.innerHTML = turn.text.replace(/\n/g, '<br>');
+            document.getElementById('chatMessages').scrollTop = document.getElementById('chatMessages').scrollHeight;
+            break;
+        case 'done':
+            if (!turn) break;
+            chatSocket.pending.delete(data.id);
+            turn.resolve({ status: 'success', response: turn.text, session_id: data.session_id, streamed: Boolean(turn.bubble) });
+            break;
+        case 'error':
+            if (!turn) {
+                console.error(`❌ ${chatConfig.label} 채팅 웹소켓 오류:`, data.error);
+                break;
+            }
+            chatSocket.pending.delete(data.id);
+            turn.resolve({ status: 'error', error: data.error });
+            break;
+    }
+}
+
+function readOutbox() {
+    try {
+        return JSON.parse(localStorage.getItem(OUTBOX_STORAGE_KEY)) || [];
+    } catch (error) {
+        return [];
+    }
+}
+
+function writeOutbox(items) {
+    try {
+        localStorage.setItem(OUTBOX_STORAGE_KEY, JSON.stringify(items));
+    } catch (error) {
+        console.error('❌ 보낼 질문 저장 실패:', error);
+    }
+}
+
+function queueOutbox(message, gameName) {
+    const items = readOutbox();
+    if (items.length >= OUTBOX_MAX_ITEMS) {
+        addMessage('보관할 수 있는 질문이 가득 찼습니다. 연결된 뒤 다시 질문해주세요.', 'bot');
+        return;
+    }
+    const item = { id: `${Date.now()}-${Math.random().toString(36).slice(2, 8)}`, message: message, gameName: gameName };
+    items.push(item);
+    writeOutbox(items);
+    shownOutboxIds.add(item.id);
+    addMessage('📮 연결이 끊겨 질문을 보관했습니다. 연결되면 자동으로 보냅니다.', 'bot');
+}
+
+function flushOutbox() {
+    // 보관한 질문을 순서대로 하나씩 전송 (연결이 다시 끊기면 남은 질문은 그대로 둠)
+    const items = readOutbox();
+    if (outboxFlushing || !navigator.onLine || items.length === 0) return;
+    outboxFlushing = true;
+    
+    const item = items[0];
+    if (!shownOutboxIds.has(item.id)) {
+        // 이전 페이지에서 보관한 질문은 화면에 없으므로 다시 표시
+        addMessage(escapeHtml(item.message), 'user');
+        shownOutboxIds.add(item.id);
+    }
+    postChatMessage(item.message, item.gameName)
+        .then(() => {
+            writeOutbox(readOutbox().filter(queued => queued.id !== item.id));
+            outboxFlushing = false;
+            flushOutbox();
+        })
+        .catch(error => {
+            outboxFlushing = false;
+            if (!(error instanceof TypeError)) {
+                // 서버 오류는 다시 보내도 같으므로 버림
+                writeOutbox(readOutbox().filter(queued => queued.id !== item.id));
+                addMessage('죄송합니다. 보관한 질문을 보내는 중 오류가 발생했습니다.', 'bot');
+            }
+        });
+}
+
+function addMessage(message, sender) {
+    const chatMessages = document.getElementById('chatMessages');
+    const messageDiv = document.createElement('div');
+    messageDiv.className = `message ${sender}`;
+    
+    const bubbleDiv = document.createElement('div');
+    bubbleDiv.className = 'message-bubble';
+    bubbleDiv.innerHTML = message.replace(/\n/g, '<br>');
+    
+    messageDiv.appendChild(bubbleDiv);
+    chatMessages.appendChild(messageDiv);
+    
+    // 스크롤을 맨 아래로
+    chatMessages.scrollTop = chatMessages.scrollHeight;
+    return bubbleDiv;
+}
+
+// 엔터 키로 메시지 전송
+document.getElementById('messageInput').addEventListener('keypress', function(e) {
+    if (e.key === 'Enter') {
+        sendMessage();
+    }
+});
+
+// 페이지 로드 시 URL 파라미터 확인 (복원한 대화와 같은 게임이면 그대로 둠)
+function selectGameFromUrl(restoredGame) {
+    const urlParams = new URLSearchParams(window.location.search);
+    const gameParam = urlParams.get('game');
+    
+    const gameOptions = Array.from(document.getElementById('gameSelect').options);
+    if (gameParam && gameParam !== restoredGame && gameOptions.some(option => option.value === gameParam)) {
+        // URL 파라미터로 게임이 지정된 경우 자동 선택
+        document.getElementById('gameSearch').value = gameParam;
+        document.getElementById('gameSelect').value = gameParam;
+        loadGameAndSetupChat(gameParam);
+    }
+}
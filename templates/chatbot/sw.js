@@ -0,0 +1,123 @@
+// 모바일 채팅 서비스 워커 (mobile_service_worker 뷰가 렌더링, 범위: {{ scope }})
+// - 페이지 셸/게임 목록: 캐시로 바로 그리고 백그라운드에서 갱신 (stale-while-revalidate)
+// - 정적 파일: 캐시 우선 (배포 시 해시 파일명이 바뀌면 이 파일도 바뀌어 새 캐시로 교체)
+// - 룰 요약(POST): 네트워크 우선, 느리거나 오프라인이면 이전에 받은 요약
+const CACHE_VERSION = '{{ cache_version }}';
+const SHELL_CACHE = `bovi-shell-${CACHE_VERSION}`;
+const DATA_CACHE = 'bovi-data-v1';  // 룰 요약/검색/추천 질문 - 배포와 무관하게 유지
+const PRECACHE_URLS = {{ precache_urls|safe }};
+const SCOPE_PATH = '{{ scope }}';
+const STATIC_PATH = '{{ static_url }}';
+const SUMMARY_PATH = '{% url "chatbot:rule_summary_api" %}';
+const DATA_PATHS = ['{% url "chatbot:game_search_api" %}', '{% url "chatbot:faq_api" %}'];
+const SUMMARY_CACHE_LIMIT = {{ summary_cache_limit }};
+const SUMMARY_NETWORK_TIMEOUT_MS = {{ summary_network_timeout_ms }};
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(SHELL_CACHE)
+            .then(cache => cache.addAll(PRECACHE_URLS))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    // 이전 배포의 셸 캐시 삭제
+    event.waitUntil(
+        caches.keys()
+            .then(names => Promise.all(
+                names
+                    .filter(name => name.startsWith('bovi-') && name !== SHELL_CACHE && name !== DATA_CACHE)
+                    .map(name => caches.delete(name))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+
+    if (request.method === 'POST' && url.pathname === SUMMARY_PATH) {
+        event.respondWith(summaryNetworkFirst(event));
+        return;
+    }
+    if (request.method !== 'GET') return;  // 채팅/세션 API는 그대로 (오프라인 질문은 페이지의 보관함이 처리)
+
+    if (request.mode === 'navigate' && url.pathname.startsWith(SCOPE_PATH)) {
+        // ?game= 등 쿼리만 다른 페이지는 같은 셸 사용
+        event.respondWith(staleWhileRevalidate(event, SHELL_CACHE, new Request(url.origin + url.pathname)));
+    } else if (url.pathname.startsWith(STATIC_PATH)) {
+        event.respondWith(cacheFirst(request, SHELL_CACHE));
+    } else if (DATA_PATHS.includes(url.pathname)) {
+        event.respondWith(staleWhileRevalidate(event, DATA_CACHE, request));
+    }
+});
+
+function cacheFirst(request, cacheName) {
+    return caches.open(cacheName).then(cache =>
+        cache.match(request).then(cached => cached || fetch(request).then(response => {
+            if (response.ok) cache.put(request, response.clone());
+            return response;
+        }))
+    );
+}
+
+function staleWhileRevalidate(event, cacheName, cacheKey) {
+    return caches.open(cacheName).then(cache =>
+        cache.match(cacheKey).then(cached => {
+            const network = fetch(event.request).then(response => {
+                if (response.ok) cache.put(cacheKey, response.clone());
+                return response;
+            });
+            if (cached) {
+                event.waitUntil(network.catch(() => null));
+                return cached;
+            }
+            return network;
+        })
+    );
+}
+
+function summaryNetworkFirst(event) {
+    // 요청 본문(게임, 채팅 타입)으로 GET 캐시 키를 만들어 저장
+    return event.request.clone().json()
+        .catch(() => ({}))
+        .then(body => {
+            const params = new URLSearchParams({ game: body.game_name || '', type: body.chat_type || '' });
+            const cacheKey = new Request(`${self.location.origin}${SUMMARY_PATH}?${params}`);
+            return caches.open(DATA_CACHE).then(cache => cache.match(cacheKey).then(cached => {
+                const network = fetch(event.request).then(response => {
+                    if (response.ok) {
+                        event.waitUntil(storeSummary(cache, cacheKey, response.clone()));
+                    }
+                    return response;
+                });
+                if (!cached) return network;
+
+                // 느린 Wi-Fi에서는 기다리지 않고 이전 요약을 먼저 보여줌 (응답이 오면 캐시만 갱신)
+                const timeout = new Promise(resolve => setTimeout(() => resolve(null), SUMMARY_NETWORK_TIMEOUT_MS));
+                event.waitUntil(network.catch(() => null));
+                return Promise.race([network.catch(() => null), timeout]).then(response => response || cached);
+            }));
+        });
+}
+
+function storeSummary(cache, cacheKey, response) {
+    return response.json().then(data => {
+        if (data.status !== 'success') return null;
+        // 캐시에서 꺼낸 요약이 현재 세션 ID를 바꾸지 않도록 세션 ID는 비워서 저장
+        const body = JSON.stringify({ ...data, session_id: '' });
+        return cache.put(cacheKey, new Response(body, { headers: { 'Content-Type': 'application/json' } }))
+            .then(() => trimSummaries(cache));
+    }).catch(() => null);
+}
+
+function trimSummaries(cache) {
+    // 오래 저장된 요약부터 삭제 (캐시 키는 저장 순서대로 나옴)
+    return cache.keys().then(keys => {
+        const summaries = keys.filter(key => new URL(key.url).pathname === SUMMARY_PATH);
+        return Promise.all(summaries.slice(0, Math.max(0, summaries.length - SUMMARY_CACHE_LIMIT)).map(key => cache.delete(key)));
+    });
+}